@@ -14,6 +14,7 @@ from app.security.compliance_manager import compliance_manager
 from app.services.ruleset_registry import ruleset_registry
 from app.marketplace.partner_registry import partner_registry
 from app.billing.subscription_manager import subscription_manager, SubscriptionTier, UsageType
+from app.billing.usage_pipeline import usage_pipeline
 from app.reliability.sla_manager import sla_manager
 from app.reliability.circuit_breaker import circuit_breaker_manager
 
@@ -167,7 +168,7 @@ async def list_signed_rulesets(
 async def verify_ruleset(ruleset_id: str):
     """Verify ruleset signature and integrity."""
     try:
-        is_valid, errors = ruleset_registry.verify_ruleset(ruleset_id)
+        is_valid, errors = ruleset_registry.verify_ruleset(ruleset_id, use_cache=False)
         
         return {
             "ruleset_id": ruleset_id,
@@ -308,7 +309,10 @@ async def record_customer_usage(
         from decimal import Decimal
         
         usage_type_enum = UsageType(usage_type)
-        usage_id = subscription_manager.record_usage(
+        if not subscription_manager.get_customer_subscription(customer_id):
+            raise ValueError(f"No active subscription found for customer: {customer_id}")
+        
+        usage_id = usage_pipeline.record_subscription_usage(
             customer_id=customer_id,
             usage_type=usage_type_enum,
             quantity=Decimal(str(quantity)),
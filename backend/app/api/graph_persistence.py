@@ -20,12 +20,14 @@ class GraphSaveRequest(BaseModel):
     filename: Optional[str] = None
     save_to_neo4j: bool = False
     neo4j_graph_name: str = "xreason_knowledge_graph"
+    neo4j_incremental: bool = False
     description: Optional[str] = None
+    format: str = "json"  # "json" or "snapshot"
 
 
 class GraphLoadRequest(BaseModel):
     """Request model for loading a graph."""
-    source: str = "json"  # "json" or "neo4j"
+    source: str = "json"  # "json", "snapshot" or "neo4j"
     filepath: Optional[str] = None
     neo4j_graph_name: str = "xreason_knowledge_graph"
 
@@ -39,6 +41,7 @@ class GraphInfo(BaseModel):
     edge_count: int
     size_bytes: Optional[int] = None
     description: Optional[str] = None
+    format: Optional[str] = None
 
 
 class GraphSaveResponse(BaseModel):
@@ -82,13 +85,8 @@ async def save_graph(
         Save operation results
     """
     try:
-        # Create graph from data
-        graph = KnowledgeGraph()
-        
-        # Clear default domain knowledge
-        graph.nodes.clear()
-        graph.edges.clear()
-        graph.graph.clear()
+        # Create graph from data, without the default domain knowledge
+        graph = KnowledgeGraph(initialize_domain_knowledge=False)
         
         # Add nodes from data
         for node_data in graph_data.get("nodes", []):
@@ -119,7 +117,9 @@ async def save_graph(
             graph=graph,
             filename=request.filename,
             save_to_neo4j=request.save_to_neo4j,
-            neo4j_graph_name=request.neo4j_graph_name
+            neo4j_graph_name=request.neo4j_graph_name,
+            format=request.format,
+            neo4j_incremental=request.neo4j_incremental
         )
         
         return GraphSaveResponse(
@@ -206,7 +206,8 @@ async def list_graphs() -> GraphListResponse:
                 created_at=g["created_at"],
                 node_count=g["node_count"],
                 edge_count=g["edge_count"],
-                size_bytes=g["size_bytes"]
+                size_bytes=g["size_bytes"],
+                format=g.get("format")
             )
             for g in graphs["json"]
         ]
@@ -29,17 +29,12 @@ async def health_check():
 async def detailed_health_check():
     """Detailed health check with component status."""
     try:
-        # Check OpenAI connection (basic check)
-        from app.services.llm_service import LLMService
-        llm_service = LLMService()
-        
-        # Check symbolic service
-        from app.services.symbolic_service import SymbolicService
-        symbolic_service = SymbolicService()
-        
-        # Check knowledge service
-        from app.services.knowledge_service import KnowledgeService
-        knowledge_service = KnowledgeService()
+        # Use the shared app-scoped services rather than building new ones
+        from app.services.service_container import service_container
+        orchestration_service = service_container.get_orchestration_service()
+        llm_service = orchestration_service.llm_service
+        symbolic_service = service_container.get_symbolic_service()
+        knowledge_service = service_container.get_knowledge_service()
         
         components = {
             "llm_service": {
@@ -53,7 +48,8 @@ async def detailed_health_check():
             "knowledge_service": {
                 "status": "healthy",
                 "facts_count": len(knowledge_service.facts)
-            }
+            },
+            "service_container": service_container.get_status()
         }
         
         return BaseResponse(
@@ -2,12 +2,16 @@
 Reasoning endpoints for the XReason API.
 """
 
+import json
+import time
 from fastapi import APIRouter, HTTPException, Depends
-from app.models.reasoning import ReasoningRequest, ReasoningResponse
+from fastapi.responses import StreamingResponse
+from app.models.reasoning import ReasoningRequest, ReasoningResponse, BatchReasoningRequest
 from app.models.base import BaseResponse
 from app.services.orchestration_service import OrchestrationService
 from app.services.symbolic_service import SymbolicService
 from app.services.knowledge_service import KnowledgeService
+from app.services.service_container import service_container
 from app.core.config import settings
 
 router = APIRouter(prefix="/reason", tags=["reasoning"])
@@ -15,15 +19,15 @@ router = APIRouter(prefix="/reason", tags=["reasoning"])
 
 # Dependency injection
 def get_orchestration_service() -> OrchestrationService:
-    return OrchestrationService()
+    return service_container.get_orchestration_service()
 
 
 def get_symbolic_service() -> SymbolicService:
-    return SymbolicService()
+    return service_container.get_symbolic_service()
 
 
 def get_knowledge_service() -> KnowledgeService:
-    return KnowledgeService()
+    return service_container.get_knowledge_service()
 
 
 @router.post("/", response_model=ReasoningResponse)
@@ -70,6 +74,99 @@ async def reason(
         )
 
 
+@router.post("/stream")
+async def reason_stream(
+    request: ReasoningRequest,
+    orchestration_service: OrchestrationService = Depends(get_orchestration_service)
+):
+    """
+    Streaming variant of the reasoning endpoint using Server-Sent Events.
+    
+    Emits a ``trace`` event as soon as each pipeline stage completes, ``token``
+    events while LLM output is generated and a final ``result`` event with the
+    complete ReasoningResponse.
+    
+    Args:
+        request: Reasoning request with question and optional context
+        
+    Returns:
+        text/event-stream response
+    """
+    
+    validation = await orchestration_service.validate_request(request)
+    if not validation["valid"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid request: {', '.join(validation['issues'])}"
+        )
+    
+    async def event_stream():
+        try:
+            async for event in orchestration_service.reason_stream(request):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/batch")
+async def reason_batch(
+    batch: BatchReasoningRequest,
+    orchestration_service: OrchestrationService = Depends(get_orchestration_service)
+):
+    """
+    Batch reasoning endpoint using Server-Sent Events.
+    
+    Requests are fanned out through the reasoning pipeline with bounded
+    concurrency, and identical requests are only reasoned about once. An
+    ``item`` event is emitted for each request as soon as its result is
+    available, in completion order, followed by a final ``summary`` event.
+    
+    Args:
+        batch: Batch of reasoning requests and optional concurrency limit
+        
+    Returns:
+        text/event-stream response
+    """
+    
+    if len(batch.requests) > settings.batch_max_requests:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large (max {settings.batch_max_requests} requests)"
+        )
+    
+    async def event_stream():
+        start_time = time.time()
+        summary = {
+            "total_requests": len(batch.requests),
+            "successful_requests": 0,
+            "failed_requests": 0,
+            "unique_requests": 0
+        }
+        try:
+            async for item in orchestration_service.reason_many(batch.requests, batch.max_concurrency):
+                summary["successful_requests" if item.status == "success" else "failed_requests"] += 1
+                if not item.deduplicated:
+                    summary["unique_requests"] += 1
+                yield f"event: item\ndata: {json.dumps(item.model_dump(mode='json'))}\n\n"
+            
+            summary["execution_time_ms"] = (time.time() - start_time) * 1000
+            yield f"event: summary\ndata: {json.dumps(summary)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/rules", response_model=BaseResponse)
 async def get_rules(
     domain: str = None,
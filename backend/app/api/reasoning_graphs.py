@@ -2,6 +2,7 @@
 API endpoints for reasoning graph visualization and management.
 """
 
+import asyncio
 from typing import List, Optional, Union
 from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import Response, JSONResponse
@@ -20,15 +21,17 @@ router = APIRouter(prefix="/api/v1/graphs", tags=["reasoning-graphs"])
 @router.get("/", response_model=List[ReasoningGraph])
 async def list_graphs(
     session_id: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
     graph_service: ReasoningGraphService = Depends(lambda: ReasoningGraphService())
 ) -> List[ReasoningGraph]:
-    """List all reasoning graphs with optional filtering by session."""
+    """List reasoning graphs, newest first, with optional session/tenant filters and pagination."""
     try:
-        if session_id:
-            # Filter by session ID
-            graphs = [g for g in graph_service.graphs.values() if g.session_id == session_id]
-        else:
-            graphs = list(graph_service.graphs.values())
+        # The store reads and writes its database, so keep it off the event loop
+        graphs, _ = await asyncio.to_thread(
+            graph_service.list_graphs, session_id=session_id, tenant_id=tenant_id, offset=offset, limit=limit
+        )
         
         return graphs
     except Exception as e:
@@ -42,7 +45,7 @@ async def get_graph(
 ) -> ReasoningGraph:
     """Get a specific reasoning graph by ID."""
     try:
-        graph = graph_service.graphs.get(graph_id)
+        graph = await asyncio.to_thread(graph_service.get_graph, graph_id)
         if not graph:
             raise HTTPException(status_code=404, detail=f"Graph not found: {graph_id}")
         return graph
@@ -60,7 +63,7 @@ async def get_graph_visualization(
 ) -> GraphVisualizationData:
     """Get visualization data for a reasoning graph with custom layouts."""
     try:
-        return graph_service.generate_visualization_data(graph_id, layout_type)
+        return await asyncio.to_thread(graph_service.generate_visualization_data, graph_id, layout_type)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -74,7 +77,7 @@ async def get_plotly_visualization(
 ):
     """Get an interactive Plotly visualization of the reasoning graph."""
     try:
-        fig = graph_service.generate_plotly_visualization(graph_id)
+        fig = await asyncio.to_thread(graph_service.generate_plotly_visualization, graph_id)
         return JSONResponse(content=fig.to_dict())
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -89,7 +92,7 @@ async def get_graph_statistics(
 ) -> GraphStatistics:
     """Get statistics about a reasoning graph."""
     try:
-        return graph_service.calculate_statistics(graph_id)
+        return await asyncio.to_thread(graph_service.calculate_statistics, graph_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -104,7 +107,7 @@ async def export_graph(
 ):
     """Export a reasoning graph in various formats."""
     try:
-        result = graph_service.export_graph(
+        result = await graph_service.export_graph_async(
             graph_id=graph_id,
             format=export_request.format,
             include_metadata=export_request.include_metadata,
@@ -144,7 +147,7 @@ async def export_graph_simple(
 ):
     """Export a reasoning graph with simple format specification."""
     try:
-        result = graph_service.export_graph(graph_id=graph_id, format=format)
+        result = await graph_service.export_graph_async(graph_id=graph_id, format=format)
         
         # Set appropriate content type
         content_type_map = {
@@ -177,11 +180,9 @@ async def delete_graph(
 ) -> BaseResponse:
     """Delete a reasoning graph."""
     try:
-        if graph_id not in graph_service.graphs:
+        if not await asyncio.to_thread(graph_service.delete_graph, graph_id):
             raise HTTPException(status_code=404, detail=f"Graph not found: {graph_id}")
         
-        del graph_service.graphs[graph_id]
-        
         return BaseResponse(
             success=True,
             message=f"Graph {graph_id} deleted successfully"
@@ -198,16 +199,21 @@ async def get_graph_stats_summary(
 ) -> dict:
     """Get summary statistics for all graphs."""
     try:
-        graphs = list(graph_service.graphs.values())
-        
-        total_graphs = len(graphs)
-        total_nodes = sum(len(graph.nodes) for graph in graphs)
-        total_edges = sum(len(graph.edges) for graph in graphs)
+        def count_graphs():
+            total_graphs = 0
+            total_nodes = 0
+            total_edges = 0
+            session_counts = {}
+            
+            # Page through the store instead of loading every graph at once
+            for graph in graph_service.graphs.iter_graphs():
+                total_graphs += 1
+                total_nodes += len(graph.nodes)
+                total_edges += len(graph.edges)
+                session_counts[graph.session_id] = session_counts.get(graph.session_id, 0) + 1
+            return total_graphs, total_nodes, total_edges, session_counts
         
-        # Count by session
-        session_counts = {}
-        for graph in graphs:
-            session_counts[graph.session_id] = session_counts.get(graph.session_id, 0) + 1
+        total_graphs, total_nodes, total_edges, session_counts = await asyncio.to_thread(count_graphs)
         
         # Average nodes and edges per graph
         avg_nodes = total_nodes / total_graphs if total_graphs > 0 else 0
@@ -251,51 +257,54 @@ async def create_graph_from_session(
 ) -> ReasoningGraph:
     """Create a reasoning graph from a reasoning session."""
     try:
-        # This would typically load the session and its traces from the database
-        # For now, we'll create a mock graph
-        graph = graph_service.create_graph(session_id)
-        
-        # Add some sample nodes and edges
-        input_node = graph_service.add_input_node(
-            graph_id=graph.id,
-            question="Sample question",
-            context={"domain": "legal"}
-        )
-        
-        llm_node = graph_service.add_llm_hypothesis_node(
-            graph_id=graph.id,
-            hypothesis="Sample hypothesis",
-            confidence=0.85
-        )
+        def build_graph() -> ReasoningGraph:
+            # Written to the store once, when the batch ends
+            with graph_service.graphs.batch():
+                # This would typically load the session and its traces from the database
+                # For now, we'll create a mock graph
+                graph = graph_service.create_graph(session_id)
+                
+                # Add some sample nodes and edges
+                input_node = graph_service.add_input_node(
+                    graph_id=graph.id,
+                    question="Sample question",
+                    context={"domain": "legal"}
+                )
+                
+                llm_node = graph_service.add_llm_hypothesis_node(
+                    graph_id=graph.id,
+                    hypothesis="Sample hypothesis",
+                    confidence=0.85
+                )
+                
+                rule_node = graph_service.add_rule_node(
+                    graph_id=graph.id,
+                    rule_name="Sample Rule",
+                    rule_type="keyword_rule",
+                    result={"passed": True},
+                    confidence=0.9
+                )
+                
+                # Add edges
+                graph_service.add_edge(
+                    graph_id=graph.id,
+                    source_id=input_node.id,
+                    target_id=llm_node.id,
+                    edge_type="generates",
+                    label="Generates Hypothesis"
+                )
+                
+                graph_service.add_edge(
+                    graph_id=graph.id,
+                    source_id=llm_node.id,
+                    target_id=rule_node.id,
+                    edge_type="validates",
+                    label="Validates Hypothesis"
+                )
+                
+                # Calculate layout
+                return graph_service.calculate_layout(graph, layout_type)
         
-        rule_node = graph_service.add_rule_node(
-            graph_id=graph.id,
-            rule_name="Sample Rule",
-            rule_type="keyword_rule",
-            result={"passed": True},
-            confidence=0.9
-        )
-        
-        # Add edges
-        graph_service.add_edge(
-            graph_id=graph.id,
-            source_id=input_node.id,
-            target_id=llm_node.id,
-            edge_type="generates",
-            label="Generates Hypothesis"
-        )
-        
-        graph_service.add_edge(
-            graph_id=graph.id,
-            source_id=llm_node.id,
-            target_id=rule_node.id,
-            edge_type="validates",
-            label="Validates Hypothesis"
-        )
-        
-        # Calculate layout
-        graph_service.calculate_layout(graph, layout_type)
-        
-        return graph
+        return await asyncio.to_thread(build_graph)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create graph: {str(e)}")
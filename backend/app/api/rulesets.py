@@ -11,7 +11,7 @@ from app.models.rulesets import (
     RuleExecutionResult
 )
 from app.models.base import BaseResponse, ErrorResponse
-from app.services.ruleset_service import RulesetService
+from app.services.ruleset_service import RulesetService, ruleset_service as shared_ruleset_service
 
 router = APIRouter(prefix="/api/v1/rulesets", tags=["rulesets"])
 
@@ -20,7 +20,7 @@ router = APIRouter(prefix="/api/v1/rulesets", tags=["rulesets"])
 async def list_rulesets(
     domain: Optional[str] = None,
     enabled: Optional[bool] = None,
-    ruleset_service: RulesetService = Depends(lambda: RulesetService())
+    ruleset_service: RulesetService = Depends(lambda: shared_ruleset_service)
 ) -> List[RulesetDefinition]:
     """List all available rulesets with optional filtering."""
     try:
@@ -38,7 +38,7 @@ async def list_rulesets(
 @router.get("/{ruleset_id}", response_model=RulesetDefinition)
 async def get_ruleset(
     ruleset_id: str,
-    ruleset_service: RulesetService = Depends(lambda: RulesetService())
+    ruleset_service: RulesetService = Depends(lambda: shared_ruleset_service)
 ) -> RulesetDefinition:
     """Get a specific ruleset by ID."""
     try:
@@ -55,7 +55,7 @@ async def get_ruleset(
 @router.post("/", response_model=RulesetDefinition)
 async def create_ruleset(
     ruleset: RulesetDefinition,
-    ruleset_service: RulesetService = Depends(lambda: RulesetService())
+    ruleset_service: RulesetService = Depends(lambda: shared_ruleset_service)
 ) -> RulesetDefinition:
     """Create a new ruleset."""
     try:
@@ -79,7 +79,7 @@ async def create_ruleset(
 @router.post("/upload", response_model=RulesetDefinition)
 async def upload_ruleset(
     file: UploadFile = File(...),
-    ruleset_service: RulesetService = Depends(lambda: RulesetService())
+    ruleset_service: RulesetService = Depends(lambda: shared_ruleset_service)
 ) -> RulesetDefinition:
     """Upload a ruleset from YAML or JSON file."""
     try:
@@ -124,7 +124,7 @@ async def upload_ruleset(
 @router.post("/{ruleset_id}/validate", response_model=RulesetValidationResult)
 async def validate_ruleset(
     ruleset_id: str,
-    ruleset_service: RulesetService = Depends(lambda: RulesetService())
+    ruleset_service: RulesetService = Depends(lambda: shared_ruleset_service)
 ) -> RulesetValidationResult:
     """Validate a ruleset."""
     try:
@@ -145,7 +145,7 @@ async def execute_ruleset(
     question: str,
     hypothesis: str,
     context: Optional[dict] = None,
-    ruleset_service: RulesetService = Depends(lambda: RulesetService())
+    ruleset_service: RulesetService = Depends(lambda: shared_ruleset_service)
 ) -> RulesetExecutionResult:
     """Execute a ruleset against given input."""
     try:
@@ -164,7 +164,7 @@ async def execute_ruleset(
 @router.delete("/{ruleset_id}")
 async def delete_ruleset(
     ruleset_id: str,
-    ruleset_service: RulesetService = Depends(lambda: RulesetService())
+    ruleset_service: RulesetService = Depends(lambda: shared_ruleset_service)
 ) -> BaseResponse:
     """Delete a ruleset."""
     try:
@@ -173,8 +173,7 @@ async def delete_ruleset(
             raise HTTPException(status_code=404, detail=f"Ruleset not found: {ruleset_id}")
         
         # Remove from service (in a real implementation, this would persist to DB)
-        if ruleset_id in ruleset_service.rulesets:
-            del ruleset_service.rulesets[ruleset_id]
+        ruleset_service.remove_ruleset(ruleset_id)
         
         return BaseResponse(
             success=True,
@@ -188,7 +187,7 @@ async def delete_ruleset(
 
 @router.get("/domains/list")
 async def list_domains(
-    ruleset_service: RulesetService = Depends(lambda: RulesetService())
+    ruleset_service: RulesetService = Depends(lambda: shared_ruleset_service)
 ) -> dict:
     """List all available domains."""
     try:
@@ -204,7 +203,7 @@ async def list_domains(
 
 @router.get("/stats/summary")
 async def get_ruleset_stats(
-    ruleset_service: RulesetService = Depends(lambda: RulesetService())
+    ruleset_service: RulesetService = Depends(lambda: shared_ruleset_service)
 ) -> dict:
     """Get statistics about rulesets."""
     try:
@@ -7,6 +7,8 @@ from .usage_meter import UsageMeter, UsageMetric, ReasoningUnit
 from .subscription_manager import SubscriptionManager, SubscriptionTier, SubscriptionStatus
 from .billing_service import BillingService, Invoice, PaymentMethod
 from .quota_manager import QuotaManager, QuotaType, QuotaViolation
+from .quota_store import MemoryQuotaStore, SQLiteQuotaStore
+from .usage_pipeline import UsageEventPipeline, UsageEvent, UsageEventKind
 
 __all__ = [
     'UsageMeter',
@@ -20,5 +22,10 @@ __all__ = [
     'PaymentMethod',
     'QuotaManager',
     'QuotaType',
-    'QuotaViolation'
+    'QuotaViolation',
+    'MemoryQuotaStore',
+    'SQLiteQuotaStore',
+    'UsageEventPipeline',
+    'UsageEvent',
+    'UsageEventKind'
 ]
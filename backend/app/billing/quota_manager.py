@@ -3,13 +3,17 @@ Quota Manager for XReason
 Manages usage quotas, limits, and violations for billing.
 """
 
+import calendar
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
 
+from app.core.config import settings
+from .quota_store import MemoryQuotaStore, SQLiteQuotaStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,6 +47,48 @@ class QuotaViolationLevel(str, Enum):
     CRITICAL = "critical"
 
 
+# Fixed-length periods; monthly and yearly periods follow the calendar
+PERIOD_LENGTHS = {
+    QuotaPeriod.DAILY: timedelta(days=1),
+    QuotaPeriod.WEEKLY: timedelta(weeks=1)
+}
+
+PERIOD_MONTHS = {
+    QuotaPeriod.MONTHLY: 1,
+    QuotaPeriod.YEARLY: 12
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
+VIOLATION_SEVERITY = {
+    QuotaViolationLevel.WARNING: 1,
+    QuotaViolationLevel.SOFT_LIMIT: 2,
+    QuotaViolationLevel.HARD_LIMIT: 3,
+    QuotaViolationLevel.CRITICAL: 4
+}
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    """Shift a datetime by whole months, clamping the day to the length of the target month."""
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(moment.day, calendar.monthrange(year, month)[1]))
+
+
+def _period_bounds(period: QuotaPeriod, anchor: datetime, now: datetime) -> Tuple[datetime, datetime]:
+    """Get the start and end of the period containing ``now`` for periods counted from ``anchor``."""
+    if period in PERIOD_LENGTHS:
+        length = PERIOD_LENGTHS[period]
+        start = anchor + length * ((now - anchor) // length)
+        return start, start + length
+    
+    step = PERIOD_MONTHS[period]
+    count = ((now.year - anchor.year) * 12 + now.month - anchor.month) // step
+    if _add_months(anchor, count * step) > now:
+        count -= 1
+    return _add_months(anchor, count * step), _add_months(anchor, (count + 1) * step)
+
+
 @dataclass
 class QuotaViolation:
     """Represents a quota violation."""
@@ -113,6 +159,7 @@ class QuotaLimit:
     hard_limit: float = 0.0  # Blocking threshold
     current_usage: float = 0.0
     reset_date: datetime = field(default_factory=datetime.utcnow)
+    period_start: datetime = field(default_factory=datetime.utcnow)  # Anchor the periods are counted from
     is_active: bool = True
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
@@ -136,6 +183,7 @@ class QuotaLimit:
             "hard_limit": self.hard_limit,
             "current_usage": self.current_usage,
             "reset_date": self.reset_date.isoformat(),
+            "period_start": self.period_start.isoformat(),
             "is_active": self.is_active,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
@@ -154,6 +202,7 @@ class QuotaLimit:
             hard_limit=data.get("hard_limit", 0.0),
             current_usage=data.get("current_usage", 0.0),
             reset_date=datetime.fromisoformat(data.get("reset_date", datetime.utcnow().isoformat())),
+            period_start=datetime.fromisoformat(data.get("period_start", datetime.utcnow().isoformat())),
             is_active=data.get("is_active", True),
             created_at=datetime.fromisoformat(data.get("created_at", datetime.utcnow().isoformat())),
             updated_at=datetime.fromisoformat(data.get("updated_at", datetime.utcnow().isoformat()))
@@ -161,11 +210,24 @@ class QuotaLimit:
 
 
 class QuotaManager:
-    """Manages quotas and usage limits for tenants."""
+    """
+    Manages quotas and usage limits for tenants.
     
-    def __init__(self):
+    Usage counters live in a quota store keyed by tenant, quota type and
+    period, so a new period starts from zero without an explicit reset.
+    Periods are counted from the quota's own start, which is kept in the
+    store so every worker sees the same period boundaries. The
+    default store is in-process; a SQLite store lets several workers on one
+    host enforce a single consistent limit. Per-tenant request rates are
+    limited with token buckets and optional sliding-window counters.
+    """
+    
+    def __init__(self, store=None):
         self.quotas: Dict[str, Dict[QuotaType, QuotaLimit]] = {}
         self.violations: Dict[str, List[QuotaViolation]] = {}
+        self.rate_limits: Dict[str, Dict[str, float]] = {}
+        self.store = store or MemoryQuotaStore()
+        self._reported_levels: Dict[Tuple[str, QuotaType], Tuple[str, QuotaViolationLevel]] = {}
         self.logger = logging.getLogger(__name__)
     
     def set_quota(self, tenant_id: str, quota_type: QuotaType, limit: float,
@@ -174,19 +236,14 @@ class QuotaManager:
                   hard_limit: Optional[float] = None) -> QuotaLimit:
         """Set a quota limit for a tenant."""
         try:
-            if tenant_id not in self.quotas:
-                self.quotas[tenant_id] = {}
-            
-            quota = QuotaLimit(
+            quota = self.add_quota(QuotaLimit(
                 tenant_id=tenant_id,
                 quota_type=quota_type,
                 period=period,
                 limit=limit,
                 soft_limit=soft_limit or (limit * 0.8),
                 hard_limit=hard_limit or limit
-            )
-            
-            self.quotas[tenant_id][quota_type] = quota
+            ))
             
             self.logger.info(f"Set quota for tenant {tenant_id}: {quota_type.value} = {limit}")
             return quota
@@ -195,6 +252,35 @@ class QuotaManager:
             self.logger.error(f"Error setting quota: {e}")
             raise
     
+    def add_quota(self, quota: QuotaLimit) -> QuotaLimit:
+        """
+        Register a quota, e.g. one restored with ``QuotaLimit.from_dict``.
+        
+        The first registration of a tenant's quota type and period fixes the
+        period start in the store; later registrations, from this or another
+        worker, reuse it. Usage the quota carries for its current period seeds
+        the store when the store has no usage for that period yet.
+        
+        Args:
+            quota: Quota to register
+            
+        Returns:
+            QuotaLimit: The registered quota with its period start and usage synced from the store
+        """
+        anchor_key = f"anchor:{quota.tenant_id}:{quota.quota_type.value}:{quota.period.value}"
+        anchor = self.store.setdefault(anchor_key, int((quota.period_start - _EPOCH).total_seconds()))
+        quota.period_start = _EPOCH + timedelta(seconds=int(anchor))
+        
+        carried_period_end = quota.reset_date
+        key, period_end = self._counter_key(quota)
+        if quota.current_usage > 0 and carried_period_end == period_end:
+            quota.current_usage = self.store.setdefault(key, quota.current_usage)
+        else:
+            quota.current_usage = self.store.get(key)
+        
+        self.quotas.setdefault(quota.tenant_id, {})[quota.quota_type] = quota
+        return quota
+    
     def get_quota(self, tenant_id: str, quota_type: QuotaType) -> Optional[QuotaLimit]:
         """Get a quota limit for a tenant."""
         return self.quotas.get(tenant_id, {}).get(quota_type)
@@ -203,6 +289,28 @@ class QuotaManager:
         """Get all quotas for a tenant."""
         return self.quotas.get(tenant_id, {})
     
+    def _counter_key(self, quota: QuotaLimit) -> Tuple[str, datetime]:
+        """Get the store key and end of the quota's current period, updating its reset date."""
+        start, end = _period_bounds(quota.period, quota.period_start, datetime.utcnow())
+        quota.reset_date = end
+        start_seconds = int((start - _EPOCH).total_seconds())
+        return f"quota:{quota.tenant_id}:{quota.quota_type.value}:{quota.period.value}:{start_seconds}", end
+    
+    def _escalate(self, quota: QuotaLimit, key: str, usage: float,
+                  user_id: Optional[str] = None) -> Optional[QuotaViolationLevel]:
+        """Record a violation when usage reaches a more severe level than already reported this period."""
+        quota.current_usage = usage
+        violation = self._check_violation(quota, user_id)
+        if violation is None:
+            return None
+        
+        reported = self._reported_levels.get((quota.tenant_id, quota.quota_type))
+        if reported is None or reported[0] != key or \
+                VIOLATION_SEVERITY[violation.violation_level] > VIOLATION_SEVERITY[reported[1]]:
+            self._reported_levels[(quota.tenant_id, quota.quota_type)] = (key, violation.violation_level)
+            self._record_violation(violation)
+        return violation.violation_level
+    
     def update_usage(self, tenant_id: str, quota_type: QuotaType, 
                     usage_delta: float, user_id: Optional[str] = None) -> bool:
         """Update usage for a quota and check for violations."""
@@ -211,32 +319,54 @@ class QuotaManager:
             if not quota:
                 return True  # No quota set, allow usage
             
-            # Check if quota period has reset
-            if datetime.utcnow() >= quota.reset_date:
-                self._reset_quota(quota)
+            key, _ = self._counter_key(quota)
+            usage = self.store.add(key, usage_delta)
             
-            # Update usage
-            old_usage = quota.current_usage
-            quota.current_usage += usage_delta
-            quota.updated_at = datetime.utcnow()
+            # Handle hard limit violations
+            if self._escalate(quota, key, usage, user_id) == QuotaViolationLevel.HARD_LIMIT:
+                self.logger.debug(f"Hard limit violation for tenant {tenant_id}: {quota_type.value}")
+                return False  # Block the operation
             
-            # Check for violations
-            violation = self._check_violation(quota, user_id)
-            if violation:
-                self._record_violation(violation)
-                
-                # Handle hard limit violations
-                if violation.violation_level == QuotaViolationLevel.HARD_LIMIT:
-                    self.logger.warning(f"Hard limit violation for tenant {tenant_id}: {quota_type.value}")
-                    return False  # Block the operation
-            
-            self.logger.debug(f"Updated usage for tenant {tenant_id}: {quota_type.value} = {quota.current_usage}")
             return True
             
         except Exception as e:
             self.logger.error(f"Error updating usage: {e}")
             return False
     
+    def reserve(self, tenant_id: str, quota_type: QuotaType, amount: float = 1.0,
+                user_id: Optional[str] = None) -> bool:
+        """
+        Atomically reserve quota for an operation.
+        
+        Usage is only added if it stays within the hard limit, so concurrent
+        callers (including other workers sharing the store) cannot overshoot.
+        
+        Args:
+            tenant_id: Tenant ID
+            quota_type: Quota to reserve from
+            amount: Amount to reserve
+            user_id: User performing the operation
+            
+        Returns:
+            bool: True if the reservation was made
+        """
+        try:
+            quota = self.get_quota(tenant_id, quota_type)
+            if not quota:
+                return True  # No quota set, allow usage
+            
+            key, _ = self._counter_key(quota)
+            reserved, usage = self.store.reserve(key, amount, quota.hard_limit)
+            if reserved:
+                self._escalate(quota, key, usage, user_id)
+            else:
+                quota.current_usage = usage
+            return reserved
+            
+        except Exception as e:
+            self.logger.error(f"Error reserving usage: {e}")
+            return False
+    
     def check_usage(self, tenant_id: str, quota_type: QuotaType, 
                    required_amount: float = 1.0) -> bool:
         """Check if usage is allowed without updating."""
@@ -245,18 +375,52 @@ class QuotaManager:
             if not quota:
                 return True  # No quota set, allow usage
             
-            # Check if quota period has reset
-            if datetime.utcnow() >= quota.reset_date:
-                self._reset_quota(quota)
-            
             # Check if usage would exceed hard limit
-            if quota.current_usage + required_amount > quota.hard_limit:
-                return False
+            key, _ = self._counter_key(quota)
+            return self.store.get(key) + required_amount <= quota.hard_limit
             
+        except Exception as e:
+            self.logger.error(f"Error checking usage: {e}")
+            return False
+    
+    def set_rate_limit(self, tenant_id: str, requests_per_second: float, burst: Optional[float] = None,
+                       window_limit: Optional[float] = None, window_seconds: float = 60.0) -> None:
+        """
+        Set a request rate limit for a tenant.
+        
+        Args:
+            tenant_id: Tenant ID
+            requests_per_second: Sustained request rate (token refill rate)
+            burst: Token bucket capacity (defaults to one second of requests)
+            window_limit: Optional maximum requests per sliding window
+            window_seconds: Sliding window length
+        """
+        self.rate_limits[tenant_id] = {
+            "requests_per_second": requests_per_second,
+            "burst": burst or max(1.0, requests_per_second),
+            "window_limit": window_limit,
+            "window_seconds": window_seconds
+        }
+        self.store.reset(f"rate:{tenant_id}")
+        self.store.reset(f"window:{tenant_id}")
+    
+    def allow_request(self, tenant_id: str, cost: float = 1.0) -> bool:
+        """Check a tenant's rate limits, consuming capacity if the request is allowed."""
+        rate_limit = self.rate_limits.get(tenant_id)
+        if not rate_limit:
+            return True
+        
+        try:
+            if not self.store.take_tokens(f"rate:{tenant_id}", cost, rate_limit["burst"],
+                                          rate_limit["requests_per_second"]):
+                return False
+            if rate_limit["window_limit"] is not None:
+                return self.store.reserve_window(f"window:{tenant_id}", cost, rate_limit["window_limit"],
+                                                 rate_limit["window_seconds"])
             return True
             
         except Exception as e:
-            self.logger.error(f"Error checking usage: {e}")
+            self.logger.error(f"Error checking rate limit: {e}")
             return False
     
     def get_usage_summary(self, tenant_id: str) -> Dict[str, Any]:
@@ -270,6 +434,8 @@ class QuotaManager:
             }
             
             for quota_type, quota in quotas.items():
+                key, _ = self._counter_key(quota)
+                quota.current_usage = self.store.get(key)
                 summary["quotas"][quota_type.value] = {
                     "current_usage": quota.current_usage,
                     "limit": quota.limit,
@@ -359,18 +525,11 @@ class QuotaManager:
             self.logger.error(f"Error recording violation: {e}")
     
     def _reset_quota(self, quota: QuotaLimit) -> None:
-        """Reset quota usage for a new period."""
+        """Reset quota usage for the current period."""
         try:
-            # Calculate next reset date based on period
-            if quota.period == QuotaPeriod.DAILY:
-                quota.reset_date = datetime.utcnow() + timedelta(days=1)
-            elif quota.period == QuotaPeriod.WEEKLY:
-                quota.reset_date = datetime.utcnow() + timedelta(weeks=1)
-            elif quota.period == QuotaPeriod.MONTHLY:
-                # Approximate - add 30 days
-                quota.reset_date = datetime.utcnow() + timedelta(days=30)
-            elif quota.period == QuotaPeriod.YEARLY:
-                quota.reset_date = datetime.utcnow() + timedelta(days=365)
+            key, _ = self._counter_key(quota)
+            self.store.reset(key)
+            self._reported_levels.pop((quota.tenant_id, quota.quota_type), None)
             
             # Reset usage
             quota.current_usage = 0.0
@@ -454,5 +613,12 @@ class QuotaManager:
             self.logger.error(f"Error clearing old violations: {e}")
 
 
+def create_quota_store(path: Optional[str] = None, shards: int = 16):
+    """Create a SQLite-backed store when a path is given, otherwise an in-process store."""
+    if path:
+        return SQLiteQuotaStore(path)
+    return MemoryQuotaStore(shards)
+
+
 # Global quota manager instance
-quota_manager = QuotaManager()
+quota_manager = QuotaManager(create_quota_store(settings.quota_store_path, settings.quota_store_shards))
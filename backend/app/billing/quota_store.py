@@ -0,0 +1,232 @@
+"""
+Quota Counter Stores for XReason
+Atomic counters, token buckets and sliding windows for quota enforcement.
+"""
+
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+
+
+def _roll_window(index: int, previous: float, current: float, stored_index: int) -> Tuple[float, float]:
+    """Shift a two-window counter to the window at index."""
+    if stored_index == index:
+        return previous, current
+    if stored_index == index - 1:
+        return current, 0.0
+    return 0.0, 0.0
+
+
+def _window_estimate(now: float, window_seconds: float, previous: float, current: float) -> float:
+    """Weight the previous window by how much of it still overlaps the sliding window."""
+    elapsed = (now % window_seconds) / window_seconds
+    return previous * (1.0 - elapsed) + current
+
+
+class MemoryQuotaStore:
+    """
+    In-process quota store with counters sharded across locks.
+    
+    Keys are spread over independent shards so updates for different
+    tenants rarely contend on the same lock.
+    """
+    
+    def __init__(self, shards: int = 16):
+        self._shards: List[Tuple[threading.Lock, Dict[str, float], Dict[str, List[float]], Dict[str, List[float]]]] = [
+            (threading.Lock(), {}, {}, {}) for _ in range(max(1, shards))
+        ]
+    
+    def _shard(self, key: str):
+        return self._shards[hash(key) % len(self._shards)]
+    
+    def get(self, key: str) -> float:
+        """Get a counter value."""
+        lock, counters, _, _ = self._shard(key)
+        with lock:
+            return counters.get(key, 0.0)
+    
+    def add(self, key: str, amount: float) -> float:
+        """Add to a counter and return the new value."""
+        lock, counters, _, _ = self._shard(key)
+        with lock:
+            value = counters.get(key, 0.0) + amount
+            counters[key] = value
+            return value
+    
+    def setdefault(self, key: str, value: float) -> float:
+        """Set a counter only if it has no value yet and return its value."""
+        lock, counters, _, _ = self._shard(key)
+        with lock:
+            return counters.setdefault(key, value)
+    
+    def reserve(self, key: str, amount: float, limit: float) -> Tuple[bool, float]:
+        """Add to a counter only if the result stays within the limit."""
+        lock, counters, _, _ = self._shard(key)
+        with lock:
+            value = counters.get(key, 0.0)
+            if value + amount > limit:
+                return False, value
+            counters[key] = value + amount
+            return True, value + amount
+    
+    def reset(self, key: str) -> None:
+        """Reset a counter, token bucket or window."""
+        lock, counters, buckets, windows = self._shard(key)
+        with lock:
+            counters.pop(key, None)
+            buckets.pop(key, None)
+            windows.pop(key, None)
+    
+    def take_tokens(self, key: str, amount: float, capacity: float, refill_rate: float) -> bool:
+        """Take tokens from a bucket refilled at refill_rate tokens per second."""
+        now = time.monotonic()
+        lock, _, buckets, _ = self._shard(key)
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [capacity, now]
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+            bucket[1] = now
+            if tokens < amount:
+                bucket[0] = tokens
+                return False
+            bucket[0] = tokens - amount
+            return True
+    
+    def reserve_window(self, key: str, amount: float, limit: float, window_seconds: float) -> bool:
+        """Count amount in a sliding window if the estimated total stays within the limit."""
+        now = time.monotonic()
+        index = int(now // window_seconds)
+        lock, _, _, windows = self._shard(key)
+        with lock:
+            stored_index, previous, current = windows.get(key, (index, 0.0, 0.0))
+            previous, current = _roll_window(index, previous, current, stored_index)
+            if _window_estimate(now, window_seconds, previous, current) + amount > limit:
+                windows[key] = [index, previous, current]
+                return False
+            windows[key] = [index, previous, current + amount]
+            return True
+
+
+class SQLiteQuotaStore:
+    """
+    Quota store backed by SQLite, shared by every worker process on a host.
+    
+    Each operation runs in its own ``BEGIN IMMEDIATE`` transaction, so
+    check-and-update sequences are atomic across processes. Token buckets
+    and windows are timed with wall-clock time, since the monotonic clock
+    restarts with the host while the database file outlives it; a clock
+    that steps backwards neither refills buckets nor reopens windows.
+    """
+    
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS quota_counters (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_windows "
+            "(key TEXT PRIMARY KEY, idx INTEGER NOT NULL, previous REAL NOT NULL, current REAL NOT NULL)"
+        )
+    
+    def _transaction(self, operation):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(self._conn)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+    
+    @staticmethod
+    def _counter(conn: sqlite3.Connection, key: str) -> float:
+        row = conn.execute("SELECT value FROM quota_counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0.0
+    
+    @staticmethod
+    def _set_counter(conn: sqlite3.Connection, key: str, value: float) -> None:
+        conn.execute("INSERT OR REPLACE INTO quota_counters (key, value) VALUES (?, ?)", (key, value))
+    
+    def get(self, key: str) -> float:
+        """Get a counter value."""
+        with self._lock:
+            return self._counter(self._conn, key)
+    
+    def add(self, key: str, amount: float) -> float:
+        """Add to a counter and return the new value."""
+        def operation(conn):
+            value = self._counter(conn, key) + amount
+            self._set_counter(conn, key, value)
+            return value
+        return self._transaction(operation)
+    
+    def setdefault(self, key: str, value: float) -> float:
+        """Set a counter only if it has no value yet and return its value."""
+        def operation(conn):
+            row = conn.execute("SELECT value FROM quota_counters WHERE key = ?", (key,)).fetchone()
+            if row:
+                return row[0]
+            self._set_counter(conn, key, value)
+            return value
+        return self._transaction(operation)
+    
+    def reserve(self, key: str, amount: float, limit: float) -> Tuple[bool, float]:
+        """Add to a counter only if the result stays within the limit."""
+        def operation(conn):
+            value = self._counter(conn, key)
+            if value + amount > limit:
+                return False, value
+            self._set_counter(conn, key, value + amount)
+            return True, value + amount
+        return self._transaction(operation)
+    
+    def reset(self, key: str) -> None:
+        """Reset a counter, token bucket or window."""
+        def operation(conn):
+            for table in ("quota_counters", "quota_buckets", "quota_windows"):
+                conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        self._transaction(operation)
+    
+    def take_tokens(self, key: str, amount: float, capacity: float, refill_rate: float) -> bool:
+        """Take tokens from a bucket refilled at refill_rate tokens per second."""
+        def operation(conn):
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM quota_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * refill_rate)
+            allowed = tokens >= amount
+            if allowed:
+                tokens -= amount
+            conn.execute(
+                "INSERT OR REPLACE INTO quota_buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now)
+            )
+            return allowed
+        return self._transaction(operation)
+    
+    def reserve_window(self, key: str, amount: float, limit: float, window_seconds: float) -> bool:
+        """Count amount in a sliding window if the estimated total stays within the limit."""
+        def operation(conn):
+            now = time.time()
+            row = conn.execute("SELECT idx, previous, current FROM quota_windows WHERE key = ?", (key,)).fetchone()
+            index = max(int(now // window_seconds), row[0]) if row else int(now // window_seconds)
+            previous, current = _roll_window(index, row[1], row[2], row[0]) if row else (0.0, 0.0)
+            allowed = _window_estimate(now, window_seconds, previous, current) + amount <= limit
+            if allowed:
+                current += amount
+            conn.execute(
+                "INSERT OR REPLACE INTO quota_windows (key, idx, previous, current) VALUES (?, ?, ?, ?)",
+                (key, index, previous, current)
+            )
+            return allowed
+        return self._transaction(operation)
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
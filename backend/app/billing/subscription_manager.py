@@ -3,8 +3,9 @@ Subscription Management & SaaS Tiers
 Comprehensive subscription lifecycle management with usage-based billing.
 """
 
+from collections import deque
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Deque
 from enum import Enum
 from dataclasses import dataclass, field
 from decimal import Decimal
@@ -75,6 +76,14 @@ class UsageRecord:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class UsagePeriodTotals:
+    """Running usage totals for one subscription, period and usage type."""
+    quantity: Decimal = Decimal("0")
+    cost: Decimal = Decimal("0")
+    records: int = 0
+
+
 @dataclass
 class Subscription:
     """Customer subscription details."""
@@ -126,13 +135,41 @@ class SubscriptionManager:
     - Enterprise custom pricing
     """
     
-    def __init__(self):
+    ACTIVE_STATUSES = (SubscriptionStatus.ACTIVE, SubscriptionStatus.TRIAL)
+    
+    def __init__(self, recent_usage_records: int = 10000):
         self.subscriptions: Dict[str, Subscription] = {}
         self.tier_configurations = self._initialize_tier_configurations()
         self.pricing_matrix = self._initialize_pricing_matrix()
-        self.usage_records: List[UsageRecord] = []
+        
+        # Only recent usage records are kept; billing reads the ledger
+        self.usage_records: Deque[UsageRecord] = deque(maxlen=recent_usage_records)
+        self.usage_record_count = 0
+        
+        # subscription_id -> period -> usage type -> running totals
+        self.usage_ledger: Dict[str, Dict[str, Dict[str, UsagePeriodTotals]]] = {}
+        self.period_usage_revenue: Dict[str, Decimal] = {}
+        
+        # customer_id -> subscription IDs in creation order, and the active one
+        self._customer_subscriptions: Dict[str, List[str]] = {}
+        self._active_subscriptions: Dict[str, str] = {}
+        
         self._initialize_sample_subscriptions()
     
+    @staticmethod
+    def _period_key(timestamp: datetime) -> str:
+        """Get the monthly ledger period for a timestamp."""
+        return timestamp.strftime("%Y-%m")
+    
+    def _index_subscription(self, subscription: Subscription) -> None:
+        """Update the customer's active subscription after a create or status change."""
+        customer_id = subscription.customer_id
+        for subscription_id in self._customer_subscriptions.get(customer_id, []):
+            if self.subscriptions[subscription_id].status in self.ACTIVE_STATUSES:
+                self._active_subscriptions[customer_id] = subscription_id
+                return
+        self._active_subscriptions.pop(customer_id, None)
+    
     def _initialize_tier_configurations(self) -> Dict[str, TierLimits]:
         """Initialize tier configurations with limits and features."""
         return {
@@ -401,6 +438,8 @@ class SubscriptionManager:
         )
         
         self.subscriptions[subscription_id] = subscription
+        self._customer_subscriptions.setdefault(customer_id, []).append(subscription_id)
+        self._index_subscription(subscription)
         
         # Log subscription creation
         audit_logger.log_event(
@@ -428,7 +467,8 @@ class SubscriptionManager:
         customer_id: str,
         usage_type: UsageType,
         quantity: Decimal,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        usage_id: Optional[str] = None
     ) -> str:
         """
         Record usage for a customer.
@@ -438,16 +478,13 @@ class SubscriptionManager:
             usage_type: Type of usage
             quantity: Usage quantity
             metadata: Additional metadata
+            usage_id: Pre-assigned usage record ID
             
         Returns:
             str: Usage record ID
         """
         # Find customer subscription
-        subscription = None
-        for sub in self.subscriptions.values():
-            if sub.customer_id == customer_id and sub.status in [SubscriptionStatus.ACTIVE, SubscriptionStatus.TRIAL]:
-                subscription = sub
-                break
+        subscription = self.get_customer_subscription(customer_id)
         
         if not subscription:
             raise ValueError(f"No active subscription found for customer: {customer_id}")
@@ -464,7 +501,7 @@ class SubscriptionManager:
             unit_price = pricing["storage_overage_per_gb"]
         
         # Create usage record
-        usage_id = f"usage_{uuid.uuid4().hex[:8]}"
+        usage_id = usage_id or f"usage_{uuid.uuid4().hex[:8]}"
         usage_record = UsageRecord(
             usage_id=usage_id,
             customer_id=customer_id,
@@ -476,6 +513,18 @@ class SubscriptionManager:
         )
         
         self.usage_records.append(usage_record)
+        self.usage_record_count += 1
+        
+        # Add to the subscription's ledger for the period
+        period = self._period_key(usage_record.timestamp)
+        totals = self.usage_ledger.setdefault(subscription.subscription_id, {}).setdefault(period, {})
+        entry = totals.get(usage_type.value)
+        if entry is None:
+            entry = totals[usage_type.value] = UsagePeriodTotals()
+        entry.quantity += quantity
+        entry.cost += quantity * unit_price
+        entry.records += 1
+        self.period_usage_revenue[period] = self.period_usage_revenue.get(period, Decimal("0")) + quantity * unit_price
         
         # Update subscription current usage
         usage_key = usage_type.value
@@ -552,11 +601,50 @@ class SubscriptionManager:
     
     def get_customer_subscription(self, customer_id: str) -> Optional[Subscription]:
         """Get active subscription for customer."""
-        for subscription in self.subscriptions.values():
-            if (subscription.customer_id == customer_id and 
-                subscription.status in [SubscriptionStatus.ACTIVE, SubscriptionStatus.TRIAL]):
-                return subscription
-        return None
+        subscription_id = self._active_subscriptions.get(customer_id)
+        return self.subscriptions.get(subscription_id) if subscription_id else None
+    
+    def update_subscription_status(self, subscription_id: str, status: SubscriptionStatus) -> Subscription:
+        """
+        Change a subscription's status.
+        
+        Args:
+            subscription_id: Subscription to update
+            status: New status
+            
+        Returns:
+            Subscription: The updated subscription
+        """
+        subscription = self.subscriptions.get(subscription_id)
+        if not subscription:
+            raise ValueError(f"Subscription not found: {subscription_id}")
+        
+        previous_status = subscription.status
+        subscription.status = status
+        subscription.updated_at = datetime.now(timezone.utc)
+        self._index_subscription(subscription)
+        
+        audit_logger.log_event(
+            event_type=AuditEventType.ADMIN_ACTION,
+            action="update_subscription_status",
+            result="success",
+            details={
+                "subscription_id": subscription_id,
+                "customer_id": subscription.customer_id,
+                "previous_status": previous_status.value,
+                "status": status.value
+            },
+            user_id=subscription.customer_id,
+            compliance_frameworks=[ComplianceFramework.SOC2_TYPE_II],
+            risk_level="low"
+        )
+        
+        return subscription
+    
+    def get_period_usage(self, subscription_id: str, period: Optional[str] = None) -> Dict[str, UsagePeriodTotals]:
+        """Get usage totals by type for a subscription and period (default: current month)."""
+        period = period or self._period_key(datetime.now(timezone.utc))
+        return self.usage_ledger.get(subscription_id, {}).get(period, {})
     
     def calculate_monthly_bill(self, subscription_id: str) -> Dict[str, Any]:
         """
@@ -577,19 +665,15 @@ class SubscriptionManager:
         
         # Calculate usage overages for current month
         current_month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        monthly_usage_records = [
-            record for record in self.usage_records
-            if (record.customer_id == subscription.customer_id and 
-                record.timestamp >= current_month_start)
-        ]
+        monthly_usage = self.get_period_usage(subscription_id, self._period_key(current_month_start))
         
         # Calculate overage charges
         overage_charges = {}
         total_overage = Decimal("0.00")
         
         for usage_type in UsageType:
-            usage_records = [r for r in monthly_usage_records if r.usage_type == usage_type]
-            total_usage = sum(r.quantity for r in usage_records)
+            totals = monthly_usage.get(usage_type.value, UsagePeriodTotals())
+            total_usage = totals.quantity
             
             # Get included limits
             included = 0
@@ -602,7 +686,7 @@ class SubscriptionManager:
             
             # Calculate overage
             overage = max(0, total_usage - included)
-            overage_cost = sum(r.quantity * r.unit_price for r in usage_records if total_usage > included)
+            overage_cost = totals.cost if total_usage > included else Decimal("0")
             
             if overage > 0:
                 overage_charges[usage_type.value] = {
@@ -706,10 +790,8 @@ class SubscriptionManager:
         annual_recurring_revenue = monthly_recurring_revenue * 12
         
         # Usage metrics
-        total_usage_this_month = sum(
-            record.quantity * record.unit_price
-            for record in self.usage_records
-            if record.timestamp >= datetime.now(timezone.utc).replace(day=1)
+        total_usage_this_month = self.period_usage_revenue.get(
+            self._period_key(datetime.now(timezone.utc)), Decimal("0")
         )
         
         return {
@@ -726,7 +808,7 @@ class SubscriptionManager:
             },
             "usage_metrics": {
                 "total_usage_revenue_this_month": float(total_usage_this_month),
-                "total_usage_records": len(self.usage_records),
+                "total_usage_records": self.usage_record_count,
                 "average_usage_per_customer": float(total_usage_this_month / total_subscriptions) if total_subscriptions else 0
             },
             "growth_metrics": {
@@ -5,8 +5,9 @@ Tracks reasoning units, API calls, and usage metrics for billing.
 
 import time
 import uuid
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import json
@@ -123,23 +124,254 @@ class UsageMetric:
         )
 
 
-class UsageMeter:
-    """Meter for tracking usage and reasoning units."""
+# Series stored in usage buckets: every metric type and every reasoning unit type
+SERIES: List[Union[UsageMetricType, ReasoningUnitType]] = list(UsageMetricType) + list(ReasoningUnitType)
+SERIES_CODES: Dict[Union[UsageMetricType, ReasoningUnitType], int] = {series: code for code, series in enumerate(SERIES)}
+
+# Bucket resolutions in seconds, coarsest first
+DAY_SECONDS = 86400
+HOUR_SECONDS = 3600
+MINUTE_SECONDS = 60
+BUCKET_RESOLUTIONS = (DAY_SECONDS, HOUR_SECONDS, MINUTE_SECONDS)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(timestamp: datetime) -> float:
+    """Convert a (naive UTC or aware) datetime to epoch seconds."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH).total_seconds()
+
+
+class UsageBucket:
+    """
+    Pre-aggregated usage for one time bucket.
+    
+    Rows are stored column-wise in arrays, one row per (series, user)
+    combination seen in the bucket.
+    """
+    
+    __slots__ = ("series", "users", "totals", "counts", "_rows")
     
     def __init__(self):
-        self.metrics: Dict[str, List[UsageMetric]] = {}
-        self.reasoning_units: Dict[str, List[ReasoningUnit]] = {}
+        self.series = array("H")
+        self.users = array("I")
+        self.totals = array("d")
+        self.counts = array("I")
+        self._rows: Dict[Tuple[int, int], int] = {}
+    
+    def add(self, series_code: int, user_code: int, value: float, count: int = 1) -> None:
+        """Add one or more (pre-aggregated) events to the bucket."""
+        row = self._rows.get((series_code, user_code))
+        if row is None:
+            self._rows[(series_code, user_code)] = len(self.series)
+            self.series.append(series_code)
+            self.users.append(user_code)
+            self.totals.append(value)
+            self.counts.append(count)
+        else:
+            self.totals[row] += value
+            self.counts[row] += count
+    
+    def accumulate(self, totals: Dict[int, List[float]], user_code: Optional[int] = None) -> None:
+        """Add the bucket's per-series totals and counts, optionally for one user."""
+        for row in range(len(self.series)):
+            if user_code is not None and self.users[row] != user_code:
+                continue
+            entry = totals.setdefault(self.series[row], [0.0, 0])
+            entry[0] += self.totals[row]
+            entry[1] += self.counts[row]
+
+
+class TenantUsageStore:
+    """
+    Time-bucketed usage store for a single tenant.
+    
+    Every event is aggregated into minute, hour and day buckets. Range
+    queries answer each part of the range from the coarsest resolution that
+    covers it, so their cost depends on the number of buckets rather than
+    the number of events. Range boundaries are resolved to the finest
+    resolution still retained for that time (a minute for recent data).
+    """
+    
+    def __init__(self, minute_retention_seconds: int, hour_retention_seconds: int):
+        self.retention = {
+            DAY_SECONDS: None,
+            HOUR_SECONDS: hour_retention_seconds,
+            MINUTE_SECONDS: minute_retention_seconds
+        }
+        self.buckets: Dict[int, Dict[int, UsageBucket]] = {resolution: {} for resolution in BUCKET_RESOLUTIONS}
+        self.series_seen: set = set()
+        self._user_codes: Dict[Optional[str], int] = {None: 0}
+        self._latest = 0.0
+    
+    def add(self, timestamp: float, series_code: int, value: float, user_id: Optional[str] = None,
+            count: int = 1) -> None:
+        """Record an event, or several events already summed into value."""
+        user_code = self._user_codes.setdefault(user_id, len(self._user_codes))
+        self.series_seen.add(series_code)
+        
+        for resolution in BUCKET_RESOLUTIONS:
+            start = int(timestamp // resolution) * resolution
+            levels = self.buckets[resolution]
+            bucket = levels.get(start)
+            if bucket is None:
+                bucket = levels[start] = UsageBucket()
+                self._expire(resolution, timestamp)
+            bucket.add(series_code, user_code, value, count)
+        
+        self._latest = max(self._latest, timestamp)
+    
+    def _expire(self, resolution: int, now: float) -> None:
+        retention = self.retention[resolution]
+        if retention is None:
+            return
+        horizon = now - retention
+        levels = self.buckets[resolution]
+        for start in [start for start in levels if start + resolution <= horizon]:
+            del levels[start]
+    
+    def _retained_from(self, resolution: int) -> float:
+        retention = self.retention[resolution]
+        if retention is None:
+            return float("-inf")
+        return self._latest - retention
+    
+    def summarize(self, start: float, end: float, user_id: Optional[str] = None) -> Dict[int, List[float]]:
+        """
+        Get per-series [total, count] for events between start and end (inclusive).
+        
+        Args:
+            start: Range start in epoch seconds
+            end: Range end in epoch seconds
+            user_id: Only include events of this user
+        """
+        totals: Dict[int, List[float]] = {}
+        user_code = None
+        if user_id is not None:
+            user_code = self._user_codes.get(user_id)
+            if user_code is None:
+                return totals
+        
+        self._cover(start, end + 1e-6, 0, totals, user_code)
+        return totals
+    
+    def _cover(self, low: float, high: float, level: int, totals: Dict[int, List[float]], user_code: Optional[int]) -> None:
+        """Aggregate [low, high) using whole buckets at this level and finer levels for the edges."""
+        if low >= high:
+            return
+        
+        resolution = BUCKET_RESOLUTIONS[level]
+        levels = self.buckets[resolution]
+        finest = level == len(BUCKET_RESOLUTIONS) - 1
+        finer_available = not finest and low >= self._retained_from(BUCKET_RESOLUTIONS[level + 1])
+        
+        first_full = -(-low // resolution) * resolution
+        last_full_end = (high // resolution) * resolution
+        if first_full >= last_full_end or finest:
+            if finer_available:
+                self._cover(low, high, level + 1, totals, user_code)
+                return
+            
+            # Finest data retained here; include buckets overlapping the edge
+            first = int(low // resolution) * resolution
+            last = int(-(-high // resolution)) * resolution
+            for start in range(first, last, resolution):
+                bucket = levels.get(start)
+                if bucket is not None:
+                    bucket.accumulate(totals, user_code)
+            return
+        
+        if last_full_end - first_full > len(levels) * resolution:
+            bucket_starts = [start for start in levels if first_full <= start < last_full_end]
+        else:
+            bucket_starts = range(int(first_full), int(last_full_end), resolution)
+        for start in bucket_starts:
+            bucket = levels.get(start)
+            if bucket is not None:
+                bucket.accumulate(totals, user_code)
+        
+        self._cover(low, first_full, level, totals, user_code)
+        self._cover(last_full_end, high, level, totals, user_code)
+    
+    def drop_before(self, cutoff: float) -> None:
+        """Drop whole buckets that end before the cutoff."""
+        for resolution, levels in self.buckets.items():
+            for start in [start for start in levels if start + resolution <= cutoff]:
+                del levels[start]
+    
+    def is_empty(self) -> bool:
+        """Check whether any buckets remain."""
+        return not self.buckets[DAY_SECONDS]
+    
+    def export_buckets(self, start: float, end: float, resolution: int = HOUR_SECONDS) -> List[Dict[str, Any]]:
+        """Export bucket rows overlapping a range."""
+        users = {code: user_id for user_id, code in self._user_codes.items()}
+        rows = []
+        for bucket_start in sorted(self.buckets[resolution]):
+            if bucket_start + resolution <= start or bucket_start > end:
+                continue
+            bucket = self.buckets[resolution][bucket_start]
+            for row in range(len(bucket.series)):
+                rows.append({
+                    "bucket_start": datetime.utcfromtimestamp(bucket_start).isoformat(),
+                    "resolution_seconds": resolution,
+                    "series": SERIES[bucket.series[row]].value,
+                    "user_id": users[bucket.users[row]],
+                    "total": bucket.totals[row],
+                    "count": bucket.counts[row]
+                })
+        return rows
+
+
+class UsageMeter:
+    """
+    Meter for tracking usage and reasoning units.
+    
+    Usage is kept per tenant in pre-aggregated minute, hour and day buckets
+    rather than as individual events, so memory and query cost grow with the
+    number of buckets instead of the number of recorded events.
+    """
+    
+    def __init__(self, minute_retention_hours: int = 48, hour_retention_days: int = 35):
+        self.minute_retention_hours = minute_retention_hours
+        self.hour_retention_days = hour_retention_days
+        self.stores: Dict[str, TenantUsageStore] = {}
         self.tenant_usage: Dict[str, Dict[str, float]] = {}
         self.logger = logging.getLogger(__name__)
     
+    def _get_store(self, tenant_id: str) -> TenantUsageStore:
+        store = self.stores.get(tenant_id)
+        if store is None:
+            store = self.stores[tenant_id] = TenantUsageStore(
+                minute_retention_seconds=self.minute_retention_hours * HOUR_SECONDS,
+                hour_retention_seconds=self.hour_retention_days * DAY_SECONDS
+            )
+        return store
+    
+    def _summarize(self, tenant_id: str, start_date: Optional[datetime], end_date: Optional[datetime],
+                   user_id: Optional[str] = None) -> Tuple[Optional[TenantUsageStore], Dict[int, List[float]]]:
+        if start_date is None:
+            start_date = datetime.utcnow() - timedelta(days=30)
+        if end_date is None:
+            end_date = datetime.utcnow()
+        
+        store = self.stores.get(tenant_id)
+        if store is None:
+            return None, {}
+        return store, store.summarize(_to_epoch(start_date), _to_epoch(end_date), user_id)
+    
     def record_reasoning_unit(self, tenant_id: str, reasoning_unit: ReasoningUnit, 
                             user_id: Optional[str] = None) -> None:
         """Record a reasoning unit for billing."""
         try:
-            if tenant_id not in self.reasoning_units:
-                self.reasoning_units[tenant_id] = []
-            
-            self.reasoning_units[tenant_id].append(reasoning_unit)
+            self._get_store(tenant_id).add(
+                _to_epoch(reasoning_unit.timestamp),
+                SERIES_CODES[reasoning_unit.type],
+                reasoning_unit.complexity,
+                user_id
+            )
             
             # Update tenant usage
             if tenant_id not in self.tenant_usage:
@@ -158,17 +390,11 @@ class UsageMeter:
                 metric_type=UsageMetricType.REASONING_UNITS,
                 value=reasoning_unit.complexity,
                 unit="RU",
-                metadata={
-                    "reasoning_unit_id": reasoning_unit.id,
-                    "type": reasoning_unit.type.value,
-                    "duration_ms": reasoning_unit.duration_ms,
-                    "token_count": reasoning_unit.token_count,
-                    "rule_count": reasoning_unit.rule_count
-                }
+                timestamp=reasoning_unit.timestamp
             )
             self.record_metric(metric)
             
-            self.logger.info(f"Recorded reasoning unit: {reasoning_unit.id} for tenant: {tenant_id}")
+            self.logger.debug(f"Recorded reasoning unit: {reasoning_unit.id} for tenant: {tenant_id}")
             
         except Exception as e:
             self.logger.error(f"Error recording reasoning unit: {e}")
@@ -176,17 +402,40 @@ class UsageMeter:
     def record_metric(self, metric: UsageMetric) -> None:
         """Record a usage metric."""
         try:
-            metric_key = f"{metric.tenant_id}_{metric.metric_type.value}"
-            if metric_key not in self.metrics:
-                self.metrics[metric_key] = []
-            
-            self.metrics[metric_key].append(metric)
+            self._get_store(metric.tenant_id).add(
+                _to_epoch(metric.timestamp),
+                SERIES_CODES[metric.metric_type],
+                metric.value,
+                metric.user_id
+            )
             
             self.logger.debug(f"Recorded metric: {metric.metric_type.value} = {metric.value} {metric.unit}")
             
         except Exception as e:
             self.logger.error(f"Error recording metric: {e}")
     
+    def record_aggregate(self, tenant_id: str, series: Union[UsageMetricType, ReasoningUnitType],
+                         total: float, count: int, timestamp: Optional[datetime] = None,
+                         user_id: Optional[str] = None) -> None:
+        """
+        Record several events of one series that were already summed.
+        
+        Reasoning unit aggregates also update the tenant totals and the
+        reasoning units metric, like record_reasoning_unit.
+        """
+        try:
+            epoch = _to_epoch(timestamp or datetime.utcnow())
+            store = self._get_store(tenant_id)
+            store.add(epoch, SERIES_CODES[series], total, user_id, count)
+            
+            if isinstance(series, ReasoningUnitType):
+                usage = self.tenant_usage.setdefault(tenant_id, {})
+                usage[series.value] = usage.get(series.value, 0.0) + total
+                store.add(epoch, SERIES_CODES[UsageMetricType.REASONING_UNITS], total, user_id, count)
+            
+        except Exception as e:
+            self.logger.error(f"Error recording aggregated usage: {e}")
+    
     def record_api_call(self, tenant_id: str, endpoint: str, duration_ms: float, 
                        user_id: Optional[str] = None) -> None:
         """Record an API call."""
@@ -247,35 +496,25 @@ class UsageMeter:
                         end_date: Optional[datetime] = None) -> Dict[str, float]:
         """Get usage summary for a tenant."""
         try:
-            if start_date is None:
-                start_date = datetime.utcnow() - timedelta(days=30)
-            if end_date is None:
-                end_date = datetime.utcnow()
+            store, totals = self._summarize(tenant_id, start_date, end_date)
+            if store is None:
+                return {}
             
             usage_summary = {}
             
             # Get reasoning units
-            if tenant_id in self.reasoning_units:
-                units = [
-                    unit for unit in self.reasoning_units[tenant_id]
-                    if start_date <= unit.timestamp <= end_date
-                ]
-                
+            if any(SERIES_CODES[unit_type] in store.series_seen for unit_type in ReasoningUnitType):
                 for unit_type in ReasoningUnitType:
-                    type_units = [u for u in units if u.type == unit_type]
-                    usage_summary[f"{unit_type.value}_units"] = sum(u.complexity for u in type_units)
-                    usage_summary[f"{unit_type.value}_count"] = len(type_units)
+                    total, count = totals.get(SERIES_CODES[unit_type], (0.0, 0))
+                    usage_summary[f"{unit_type.value}_units"] = total
+                    usage_summary[f"{unit_type.value}_count"] = count
             
             # Get metrics
             for metric_type in UsageMetricType:
-                metric_key = f"{tenant_id}_{metric_type.value}"
-                if metric_key in self.metrics:
-                    metrics = [
-                        m for m in self.metrics[metric_key]
-                        if start_date <= m.timestamp <= end_date
-                    ]
-                    usage_summary[f"{metric_type.value}_total"] = sum(m.value for m in metrics)
-                    usage_summary[f"{metric_type.value}_count"] = len(metrics)
+                if SERIES_CODES[metric_type] in store.series_seen:
+                    total, count = totals.get(SERIES_CODES[metric_type], (0.0, 0))
+                    usage_summary[f"{metric_type.value}_total"] = total
+                    usage_summary[f"{metric_type.value}_count"] = count
             
             return usage_summary
             
@@ -288,23 +527,18 @@ class UsageMeter:
                       end_date: Optional[datetime] = None) -> Dict[str, float]:
         """Get usage summary for a specific user."""
         try:
-            if start_date is None:
-                start_date = datetime.utcnow() - timedelta(days=30)
-            if end_date is None:
-                end_date = datetime.utcnow()
+            store, totals = self._summarize(tenant_id, start_date, end_date, user_id)
+            if store is None:
+                return {}
             
             usage_summary = {}
             
             # Get user-specific metrics
             for metric_type in UsageMetricType:
-                metric_key = f"{tenant_id}_{metric_type.value}"
-                if metric_key in self.metrics:
-                    metrics = [
-                        m for m in self.metrics[metric_key]
-                        if m.user_id == user_id and start_date <= m.timestamp <= end_date
-                    ]
-                    usage_summary[f"{metric_type.value}_total"] = sum(m.value for m in metrics)
-                    usage_summary[f"{metric_type.value}_count"] = len(metrics)
+                if SERIES_CODES[metric_type] in store.series_seen:
+                    total, count = totals.get(SERIES_CODES[metric_type], (0.0, 0))
+                    usage_summary[f"{metric_type.value}_total"] = total
+                    usage_summary[f"{metric_type.value}_count"] = count
             
             return usage_summary
             
@@ -339,7 +573,12 @@ class UsageMeter:
     
     def export_usage_data(self, tenant_id: str, start_date: Optional[datetime] = None,
                          end_date: Optional[datetime] = None) -> Dict[str, Any]:
-        """Export usage data for reporting."""
+        """
+        Export usage data for reporting.
+        
+        Individual events are not retained; reasoning units and metrics are
+        exported as hourly bucket rows with per-user totals and counts.
+        """
         try:
             if start_date is None:
                 start_date = datetime.utcnow() - timedelta(days=30)
@@ -357,23 +596,12 @@ class UsageMeter:
                 "metrics": []
             }
             
-            # Export reasoning units
-            if tenant_id in self.reasoning_units:
-                units = [
-                    unit for unit in self.reasoning_units[tenant_id]
-                    if start_date <= unit.timestamp <= end_date
-                ]
-                export_data["reasoning_units"] = [unit.to_dict() for unit in units]
-            
-            # Export metrics
-            for metric_type in UsageMetricType:
-                metric_key = f"{tenant_id}_{metric_type.value}"
-                if metric_key in self.metrics:
-                    metrics = [
-                        m for m in self.metrics[metric_key]
-                        if start_date <= m.timestamp <= end_date
-                    ]
-                    export_data["metrics"].extend([m.to_dict() for m in metrics])
+            store = self.stores.get(tenant_id)
+            if store is not None:
+                unit_types = {unit_type.value for unit_type in ReasoningUnitType}
+                for row in store.export_buckets(_to_epoch(start_date), _to_epoch(end_date)):
+                    key = "reasoning_units" if row["series"] in unit_types else "metrics"
+                    export_data[key].append(row)
             
             return export_data
             
@@ -384,25 +612,14 @@ class UsageMeter:
     def clear_old_data(self, days_to_keep: int = 90) -> None:
         """Clear old usage data to prevent memory bloat."""
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
-            
-            # Clear old reasoning units
-            for tenant_id in list(self.reasoning_units.keys()):
-                self.reasoning_units[tenant_id] = [
-                    unit for unit in self.reasoning_units[tenant_id]
-                    if unit.timestamp >= cutoff_date
-                ]
-                if not self.reasoning_units[tenant_id]:
-                    del self.reasoning_units[tenant_id]
-            
-            # Clear old metrics
-            for metric_key in list(self.metrics.keys()):
-                self.metrics[metric_key] = [
-                    metric for metric in self.metrics[metric_key]
-                    if metric.timestamp >= cutoff_date
-                ]
-                if not self.metrics[metric_key]:
-                    del self.metrics[metric_key]
+            cutoff = _to_epoch(datetime.utcnow() - timedelta(days=days_to_keep))
+            
+            # Drop whole buckets that ended before the cutoff
+            for tenant_id in list(self.stores.keys()):
+                store = self.stores[tenant_id]
+                store.drop_before(cutoff)
+                if store.is_empty():
+                    del self.stores[tenant_id]
             
             self.logger.info(f"Cleared usage data older than {days_to_keep} days")
             
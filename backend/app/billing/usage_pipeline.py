@@ -0,0 +1,449 @@
+"""
+Usage Event Pipeline for XReason
+Asynchronous write-behind of usage, quota and billing events.
+"""
+
+import json
+import asyncio
+import logging
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, List, Optional, Any, Union, Tuple
+
+from app.core.config import settings
+from .usage_meter import usage_meter, UsageMetricType, ReasoningUnitType
+from .quota_manager import quota_manager, QuotaType
+from .subscription_manager import subscription_manager, UsageType
+
+logger = logging.getLogger(__name__)
+
+
+class UsageEventKind(str, Enum):
+    """Kinds of usage events handled by the pipeline."""
+    METRIC = "metric"
+    REASONING_UNIT = "reasoning_unit"
+    QUOTA = "quota"
+    SUBSCRIPTION = "subscription"
+
+
+@dataclass
+class UsageEvent:
+    """A single usage event waiting to be applied."""
+    
+    kind: UsageEventKind
+    tenant_id: str
+    key: str
+    value: Union[float, Decimal]
+    user_id: Optional[str] = None
+    event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    metadata: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class CoalescedUsage:
+    """Usage events of one kind, tenant, user and key within the same minute (subscription events stay single)."""
+    
+    kind: UsageEventKind
+    tenant_id: str
+    user_id: Optional[str]
+    key: str
+    window_start: datetime
+    total: Union[float, Decimal]
+    count: int
+    event_ids: List[str] = field(default_factory=list)
+    event_metadata: List[Dict[str, Any]] = field(default_factory=list)
+    attempts: int = 0
+    
+    def to_row(self) -> Dict[str, Any]:
+        """Convert to a usage_events table row."""
+        return {
+            "id": str(uuid.uuid4()),
+            "kind": self.kind.value,
+            "tenant_id": self.tenant_id,
+            "user_id": self.user_id,
+            "key": self.key,
+            "total": float(self.total),
+            "event_count": self.count,
+            "window_start": self.window_start,
+            "flushed_at": datetime.utcnow()
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict (for dead letters)."""
+        return {
+            "kind": self.kind.value,
+            "tenant_id": self.tenant_id,
+            "user_id": self.user_id,
+            "key": self.key,
+            "window_start": self.window_start.isoformat(),
+            "total": str(self.total),
+            "count": self.count,
+            "event_ids": self.event_ids,
+            "event_metadata": self.event_metadata,
+            "attempts": self.attempts
+        }
+
+
+def coalesce_events(events: List[UsageEvent]) -> List[CoalescedUsage]:
+    """
+    Sum events per kind, tenant, user, key and minute, keeping first-seen order.
+    
+    Subscription events are never merged: each becomes its own usage record
+    under the event ID returned to the caller.
+    """
+    groups: Dict[Tuple, CoalescedUsage] = {}
+    for event in events:
+        window_start = event.timestamp.replace(second=0, microsecond=0)
+        group_key = (event.kind, event.tenant_id, event.user_id, event.key, window_start)
+        if event.kind == UsageEventKind.SUBSCRIPTION:
+            group_key += (event.event_id,)
+        group = groups.get(group_key)
+        if group is None:
+            groups[group_key] = CoalescedUsage(
+                kind=event.kind,
+                tenant_id=event.tenant_id,
+                user_id=event.user_id,
+                key=event.key,
+                window_start=window_start,
+                total=event.value,
+                count=1,
+                event_ids=[event.event_id]
+            )
+        else:
+            group.total += event.value
+            group.count += 1
+            group.event_ids.append(event.event_id)
+        if event.metadata:
+            groups[group_key].event_metadata.append(event.metadata)
+    return list(groups.values())
+
+
+class UsageEventPipeline:
+    """
+    Write-behind pipeline for metering events.
+    
+    Request paths submit events without waiting; a background batcher drains
+    the bounded queue every flush interval (or once a batch is full),
+    coalesces events per tenant and key, applies them to the usage meter,
+    quota manager and subscription manager, and bulk-inserts the coalesced
+    rows into the database. When the queue is full, or the pipeline is not
+    running, events are applied inline on the caller instead of being
+    dropped.
+    
+    Usage that fails to apply is retried on later flushes, and rows that
+    fail to insert are written again with the next batch. Anything still
+    failing after max_attempts, or when the pipeline stops, is kept in
+    dead_letters (and appended to dead_letter_path as JSON lines when set).
+    """
+    
+    def __init__(self, flush_interval: float = 1.0, batch_size: int = 500,
+                 max_queue_size: int = 10000, persist: bool = True, engine=None,
+                 max_attempts: int = 3, dead_letter_path: Optional[str] = None):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_queue_size = max_queue_size
+        self.persist = persist
+        self.engine = engine
+        self.max_attempts = max(1, max_attempts)
+        self.dead_letter_path = dead_letter_path
+        self.dead_letters: List[Dict[str, Any]] = []
+        self._retry_groups: List[CoalescedUsage] = []
+        self._retry_rows: List[Dict[str, Any]] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._apply_lock = threading.Lock()
+        self.stats = {
+            "submitted": 0,
+            "flushes": 0,
+            "flushed_events": 0,
+            "flushed_rows": 0,
+            "inline_events": 0,
+            "flush_errors": 0,
+            "retried": 0,
+            "dead_lettered": 0
+        }
+        self.logger = logging.getLogger(__name__)
+    
+    @property
+    def running(self) -> bool:
+        """Check whether the background batcher is running."""
+        return self._running
+    
+    async def start(self) -> None:
+        """Start the background batcher on the running event loop."""
+        if self._running:
+            return
+        
+        if self.persist:
+            try:
+                await asyncio.to_thread(self._create_table)
+            except Exception as e:
+                self.logger.error(f"Usage event persistence disabled: {e}")
+                self.persist = False
+        
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+        self._running = True
+    
+    async def stop(self) -> None:
+        """Stop the batcher after flushing every queued event."""
+        if not self._running:
+            return
+        
+        self._running = False
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        
+        # Nothing will retry these any more
+        for group in self._retry_groups:
+            self._dead_letter("apply", "pipeline stopped", group=group.to_dict())
+        for row in self._retry_rows:
+            self._dead_letter("persist", "pipeline stopped", row=row)
+        self._retry_groups = []
+        self._retry_rows = []
+    
+    def submit(self, event: UsageEvent) -> None:
+        """Submit an event without waiting for it to be applied."""
+        self.stats["submitted"] += 1
+        if not self._running:
+            self._apply_inline([event], persist=False)
+            return
+        
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        
+        if current_loop is self._loop:
+            self._enqueue(event)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, event)
+    
+    async def emit(self, event: UsageEvent) -> None:
+        """Submit an event, waiting for queue space when the pipeline is saturated."""
+        if not self._running:
+            self.submit(event)
+            return
+        
+        self.stats["submitted"] += 1
+        await self._queue.put(event)
+    
+    def _enqueue(self, event: UsageEvent) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Backpressure: the caller pays for applying its own event
+            self._apply_inline([event], persist=self.persist)
+    
+    def _apply_inline(self, events: List[UsageEvent], persist: bool) -> None:
+        self.stats["inline_events"] += len(events)
+        applied = self._apply(coalesce_events(events))
+        if persist:
+            rows = [group.to_row() for group in applied]
+            try:
+                self._write_rows(rows)
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                self.logger.error(f"Error persisting usage events: {e}")
+                self._hold_rows(rows, e)
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            # Wake up for pending retries even when no new events arrive
+            timeout = self.flush_interval if self._retry_groups or self._retry_rows else None
+            try:
+                event = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await self._flush([])
+                continue
+            if event is None:
+                stopping = True
+                batch = []
+            else:
+                batch = [event]
+            
+            deadline = loop.time() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    event = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        event = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if event is None:
+                    stopping = True
+                else:
+                    batch.append(event)
+            
+            if stopping:
+                # Drain events submitted before shutdown
+                while not self._queue.empty():
+                    event = self._queue.get_nowait()
+                    if event is not None:
+                        batch.append(event)
+            
+            if batch or self._retry_groups or self._retry_rows:
+                await self._flush(batch)
+    
+    async def _flush(self, events: List[UsageEvent]) -> None:
+        groups, self._retry_groups = self._retry_groups + coalesce_events(events), []
+        applied = self._apply(groups)
+        if self.persist:
+            rows, self._retry_rows = self._retry_rows + [group.to_row() for group in applied], []
+            try:
+                await asyncio.to_thread(self._write_rows, rows)
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                self.logger.error(f"Error flushing usage events: {e}")
+                self._hold_rows(rows, e)
+        
+        self.stats["flushes"] += 1
+        self.stats["flushed_events"] += len(events)
+        self.stats["flushed_rows"] += len(applied)
+    
+    def _hold_rows(self, rows: List[Dict[str, Any]], error: Exception) -> None:
+        """Keep rows that failed to insert for the next flush, dead-lettering the overflow."""
+        if not self._running:
+            for row in rows:
+                self._dead_letter("persist", str(error), row=row)
+            return
+        self._retry_rows.extend(rows)
+        self.stats["retried"] += len(rows)
+        overflow = len(self._retry_rows) - self.max_queue_size
+        if overflow > 0:
+            for row in self._retry_rows[:overflow]:
+                self._dead_letter("persist", str(error), row=row)
+            del self._retry_rows[:overflow]
+    
+    def _dead_letter(self, stage: str, error: str, **entry: Any) -> None:
+        record = {"stage": stage, "error": error, "failed_at": datetime.utcnow().isoformat(), **entry}
+        self.stats["dead_lettered"] += 1
+        self.logger.error(f"Usage {stage} failed permanently: {record}")
+        with self._apply_lock:
+            self.dead_letters.append(record)
+            if self.dead_letter_path:
+                try:
+                    with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, default=str) + "\n")
+                except OSError as e:
+                    self.logger.error(f"Error writing usage dead letter: {e}")
+    
+    def _apply(self, groups: List[CoalescedUsage]) -> List[CoalescedUsage]:
+        """
+        Apply coalesced usage to the in-memory billing services.
+        
+        Returns the groups that were applied; failed groups are queued for
+        retry, or dead-lettered once they run out of attempts.
+        """
+        applied = []
+        failed = []
+        with self._apply_lock:
+            for group in groups:
+                try:
+                    if group.kind == UsageEventKind.METRIC:
+                        usage_meter.record_aggregate(group.tenant_id, UsageMetricType(group.key), group.total,
+                                                     group.count, group.window_start, group.user_id)
+                    elif group.kind == UsageEventKind.REASONING_UNIT:
+                        usage_meter.record_aggregate(group.tenant_id, ReasoningUnitType(group.key), group.total,
+                                                     group.count, group.window_start, group.user_id)
+                    elif group.kind == UsageEventKind.QUOTA:
+                        quota_manager.update_usage(group.tenant_id, QuotaType(group.key), group.total, group.user_id)
+                    elif group.kind == UsageEventKind.SUBSCRIPTION:
+                        subscription_manager.record_usage(
+                            customer_id=group.tenant_id,
+                            usage_type=UsageType(group.key),
+                            quantity=Decimal(str(group.total)),
+                            metadata=group.event_metadata[0] if group.event_metadata else None,
+                            usage_id=group.event_ids[0]
+                        )
+                    applied.append(group)
+                except Exception as e:
+                    self.logger.error(f"Error applying {group.kind} usage for {group.tenant_id}: {e}")
+                    group.attempts += 1
+                    failed.append((group, e))
+        
+        for group, error in failed:
+            if self._running and group.attempts < self.max_attempts:
+                self._retry_groups.append(group)
+                self.stats["retried"] += 1
+            else:
+                self._dead_letter("apply", str(error), group=group.to_dict())
+        return applied
+    
+    def _get_engine(self):
+        if self.engine is None:
+            from app.core.database import engine
+            self.engine = engine
+        return self.engine
+    
+    def _create_table(self) -> None:
+        from app.models.billing import UsageEventRecord
+        UsageEventRecord.__table__.create(bind=self._get_engine(), checkfirst=True)
+    
+    def _write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert coalesced rows in one executemany statement."""
+        if not rows:
+            return
+        
+        from sqlalchemy import insert
+        from app.models.billing import UsageEventRecord
+        with self._get_engine().begin() as connection:
+            connection.execute(insert(UsageEventRecord.__table__), rows)
+    
+    # Producer helpers
+    
+    def record_metric(self, tenant_id: str, metric_type: UsageMetricType, value: float,
+                      user_id: Optional[str] = None) -> None:
+        """Meter a usage metric."""
+        self.submit(UsageEvent(kind=UsageEventKind.METRIC, tenant_id=tenant_id,
+                               key=metric_type.value, value=value, user_id=user_id))
+    
+    def record_api_call(self, tenant_id: str, user_id: Optional[str] = None) -> None:
+        """Meter an API call."""
+        self.record_metric(tenant_id, UsageMetricType.API_CALLS, 1.0, user_id)
+    
+    def record_reasoning_unit(self, tenant_id: str, unit_type: ReasoningUnitType, complexity: float = 1.0,
+                              user_id: Optional[str] = None) -> None:
+        """Meter a reasoning unit."""
+        self.submit(UsageEvent(kind=UsageEventKind.REASONING_UNIT, tenant_id=tenant_id,
+                               key=unit_type.value, value=complexity, user_id=user_id))
+    
+    def update_quota(self, tenant_id: str, quota_type: QuotaType, usage_delta: float,
+                     user_id: Optional[str] = None) -> None:
+        """Add usage to a tenant quota."""
+        self.submit(UsageEvent(kind=UsageEventKind.QUOTA, tenant_id=tenant_id,
+                               key=quota_type.value, value=usage_delta, user_id=user_id))
+    
+    def record_subscription_usage(self, customer_id: str, usage_type: UsageType, quantity: Decimal,
+                                  metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Record billable subscription usage, returning its usage ID."""
+        event = UsageEvent(kind=UsageEventKind.SUBSCRIPTION, tenant_id=customer_id, key=usage_type.value,
+                           value=quantity, event_id=f"usage_{uuid.uuid4().hex[:8]}", metadata=metadata)
+        self.submit(event)
+        return event.event_id
+
+
+# Global usage pipeline instance
+usage_pipeline = UsageEventPipeline(
+    flush_interval=settings.usage_pipeline_flush_interval_seconds,
+    batch_size=settings.usage_pipeline_batch_size,
+    max_queue_size=settings.usage_pipeline_max_queue_size,
+    persist=settings.usage_pipeline_persist,
+    max_attempts=settings.usage_pipeline_max_attempts,
+    dead_letter_path=settings.usage_pipeline_dead_letter_path
+)
@@ -14,10 +14,31 @@ class Settings(BaseSettings):
     # OpenAI Configuration
     openai_api_key: str = "sk-demo-key-for-testing"
     openai_model: str = "gpt-4o"
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    
+    # LLM Response Cache Configuration
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_seconds: int = 3600
+    llm_cache_sqlite_path: Optional[str] = None
+    llm_cache_sqlite_max_entries: int = 100000
     
     # Database Configuration
     database_url: str = "sqlite:///./xreason.db"
     
+    # Reasoning Graph Store Configuration
+    reasoning_graph_cache_size: int = 256
+    reasoning_graph_cache_ttl_seconds: float = 0.0  # Serve cached graphs without a version check for this long
+    reasoning_graph_store_backend: str = "sql"  # "sql", "filesystem" or "memory"
+    reasoning_graph_store_path: Optional[str] = None  # Database URL or directory; defaults to database_url
+    reasoning_graph_layout_cache_size: int = 512
+    
+    # Graph Image Rendering Configuration
+    graph_render_workers: int = 2
+    graph_render_cache_max_bytes: int = 64 * 1024 * 1024
+    graph_render_cache_dir: Optional[str] = None
+    
     # Application Configuration
     app_name: str = "XReason API"
     app_version: str = "1.0.0"
@@ -49,6 +70,38 @@ class Settings(BaseSettings):
     default_confidence_threshold: float = 0.7
     max_reasoning_steps: int = 10
     timeout_seconds: int = 30
+    llm_stage_timeout_seconds: float = 20.0
+    check_stage_timeout_seconds: float = 10.0
+    batch_max_requests: int = 1000
+    batch_max_concurrency: int = 8
+    
+    # Usage Metering Pipeline Configuration
+    usage_pipeline_enabled: bool = True
+    usage_pipeline_flush_interval_seconds: float = 1.0
+    usage_pipeline_batch_size: int = 500
+    usage_pipeline_max_queue_size: int = 10000
+    usage_pipeline_persist: bool = True
+    usage_pipeline_max_attempts: int = 3
+    usage_pipeline_dead_letter_path: Optional[str] = None  # JSON lines file for usage that could not be applied or stored
+    
+    # Quota Enforcement Configuration
+    quota_store_path: Optional[str] = None
+    quota_store_shards: int = 16
+    
+    # Audit Log Configuration
+    audit_log_dir: Optional[str] = None  # Required for durable audit logs; None keeps recent segments in memory only
+    audit_log_batch_size: int = 256
+    audit_log_checkpoint_interval: int = 1024
+    audit_log_max_queue_size: int = 10000
+    audit_log_fsync: bool = True
+    
+    # Encryption Configuration
+    encryption_dek_cache_size: int = 256
+    encryption_dek_cache_ttl_seconds: float = 300.0
+    
+    # Ruleset Registry Configuration
+    ruleset_verification_ttl_seconds: float = 3600.0
+    ruleset_verification_sweep_interval_seconds: float = 900.0
     
     @field_validator("backend_cors_origins", mode="before")
     @classmethod
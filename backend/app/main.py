@@ -7,11 +7,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import time
+import asyncio
 import logging
 
 from app.core.config import settings
 from app.api import reasoning_router, health_router, rulesets_router, reasoning_graphs_router, setup_metrics_instrumentation, pilots_router, agents_router, financial_analysis_router, commercial_router, graph_persistence
 from app.api.auth import router as auth_router
+from app.services.service_container import service_container
+from app.billing.usage_pipeline import usage_pipeline
+from app.security.audit_logger import audit_logger
+from app.services.ruleset_registry import ruleset_registry
+from app.services.graph_renderer import graph_renderer
 
 # Configure logging
 logging.basicConfig(
@@ -30,10 +36,30 @@ async def lifespan(app: FastAPI):
     logger.info(f"Version: {settings.app_version}")
     logger.info(f"Debug Mode: {settings.debug}")
     
+    # Warm-start shared reasoning services
+    service_container.start()
+    app.state.services = service_container
+    
+    if not settings.audit_log_dir:
+        logger.warning("audit_log_dir is not set; audit events are kept in memory only and are not durable")
+    
+    # Start write-behind usage metering
+    if settings.usage_pipeline_enabled:
+        await usage_pipeline.start()
+    
+    # Periodically re-verify memoized ruleset signatures
+    if settings.ruleset_verification_sweep_interval_seconds > 0:
+        await ruleset_registry.start_verification_sweep(settings.ruleset_verification_sweep_interval_seconds)
+    
     yield
     
     # Shutdown
     logger.info("Shutting down XReason API...")
+    await usage_pipeline.stop()
+    await ruleset_registry.stop_verification_sweep()
+    await asyncio.to_thread(audit_logger.flush)
+    await asyncio.to_thread(graph_renderer.shutdown)
+    await service_container.shutdown()
 
 
 # Create FastAPI app
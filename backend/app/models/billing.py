@@ -0,0 +1,28 @@
+"""
+Database models for persisted billing and usage events.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, Float, Index
+
+from app.core.database import Base
+
+
+class UsageEventRecord(Base):
+    """Usage events coalesced per tenant, key and minute by the usage pipeline."""
+    
+    __tablename__ = "usage_events"
+    
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(32), nullable=False)
+    tenant_id = Column(String(255), nullable=False)
+    user_id = Column(String(255), nullable=True)
+    key = Column(String(64), nullable=False)
+    total = Column(Float, nullable=False, default=0.0)
+    event_count = Column(Integer, nullable=False, default=1)
+    window_start = Column(DateTime, nullable=False)
+    flushed_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_usage_events_tenant_window", "tenant_id", "window_start"),
+    )
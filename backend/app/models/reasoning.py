@@ -34,6 +34,8 @@ class ReasoningTrace(BaseModel):
     confidence: Optional[float] = None
     metadata: Optional[Dict[str, Any]] = None
     timestamp: Optional[str] = None
+    wall_clock_ms: Optional[float] = None
+    queue_time_ms: Optional[float] = None
 
 
 class ReasoningRequest(BaseModel):
@@ -56,6 +58,23 @@ class ReasoningResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+class BatchReasoningRequest(BaseModel):
+    """Request model for the batch reasoning endpoint."""
+    
+    requests: List[ReasoningRequest] = Field(..., min_length=1, description="Reasoning requests to process")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Maximum requests reasoned about at once")
+
+
+class BatchReasoningItem(BaseModel):
+    """Result for a single request of a batch."""
+    
+    index: int = Field(..., description="Position of the request in the batch")
+    status: str = Field(..., description="'success' or 'error'")
+    response: Optional[ReasoningResponse] = None
+    error: Optional[str] = None
+    deduplicated: bool = Field(False, description="Whether the result was shared with an identical earlier request")
+
+
 class RuleSet(BaseModel):
     """Model for a rule set."""
     
@@ -77,7 +77,7 @@ class ReasoningGraphDB(SQLModel, table=True):
     __tablename__ = "reasoning_graphs"
     
     id: str = SQLField(primary_key=True, index=True)
-    session_id: str = SQLField(foreign_key="reasoning_sessions.id", index=True)
+    session_id: str = SQLField(index=True)
     nodes_data: str = SQLField(description="JSON serialized nodes")
     edges_data: str = SQLField(description="JSON serialized edges")
     meta_data: str = SQLField(description="JSON serialized metadata")
@@ -6,6 +6,7 @@ Domain-specific reasoning pilots for different industries.
 from .cybersecurity_compliance import CybersecurityCompliancePilot
 from .finance_compliance import FinanceCompliancePilot
 from .healthcare_compliance import HealthcareCompliancePilot
+from .keyword_matcher import ComplianceKeywordMatcher, KeywordAutomaton, compliance_keyword_matcher
 from .legal_compliance import LegalCompliancePilot
 from .manufacturing_compliance import ManufacturingCompliancePilot
 from .scientific_validation import ScientificValidationPilot
@@ -14,6 +15,9 @@ __all__ = [
     "CybersecurityCompliancePilot",
     "FinanceCompliancePilot", 
     "HealthcareCompliancePilot",
+    "ComplianceKeywordMatcher",
+    "KeywordAutomaton",
+    "compliance_keyword_matcher",
     "LegalCompliancePilot",
     "ManufacturingCompliancePilot",
     "ScientificValidationPilot"
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from enum import Enum
 
 from app.services.metrics_service import metrics_service
+from app.pilots.keyword_matcher import compliance_keyword_matcher
 
 
 class CybersecurityDomain(Enum):
@@ -55,6 +56,13 @@ class CybersecurityCompliancePilot:
         self.threat_detection_rules = self._load_threat_detection_rules()
         self.incident_response_rules = self._load_incident_response_rules()
         self.data_protection_rules = self._load_data_protection_rules()
+        
+        compliance_keyword_matcher.register_rules(
+            self.security_frameworks_rules,
+            self.threat_detection_rules,
+            self.incident_response_rules,
+            self.data_protection_rules
+        )
     
     def _load_security_frameworks_rules(self) -> Dict[str, Dict]:
         """Load security frameworks compliance rules."""
@@ -159,17 +167,9 @@ class CybersecurityCompliancePilot:
     
     def _check_rule_violation(self, text: str, rule: Dict) -> bool:
         """Check if text violates a specific rule."""
-        text_lower = text.lower()
-        keywords = rule.get("keywords", [])
-        
-        # Check if any keywords are missing
-        missing_keywords = []
-        for keyword in keywords:
-            if keyword.lower() not in text_lower:
-                missing_keywords.append(keyword)
-        
-        # If more than 50% of keywords are missing, consider it a violation
-        return len(missing_keywords) > len(keywords) * 0.5
+        # Keywords are matched in one shared pass over the text; if less
+        # than 50% of them are found, consider it a violation
+        return compliance_keyword_matcher.check_rule_violation(text, rule)
     
     async def analyze_security_frameworks(self, text: str, context: Optional[Dict] = None) -> CybersecurityAnalysis:
         """Analyze security frameworks compliance of given text."""
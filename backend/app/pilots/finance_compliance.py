@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from enum import Enum
 
 from app.services.metrics_service import metrics_service
+from app.pilots.keyword_matcher import compliance_keyword_matcher
 
 
 class FinanceDomain(Enum):
@@ -63,6 +64,17 @@ class FinanceCompliancePilot:
         self.insurance_rules = self._load_insurance_rules()
         self.crypto_rules = self._load_crypto_rules()
         self.fintech_rules = self._load_fintech_rules()
+        
+        compliance_keyword_matcher.register_rules(
+            self.banking_rules,
+            self.investment_rules,
+            self.aml_kyc_rules,
+            self.basel_rules,
+            self.financial_reporting_rules,
+            self.insurance_rules,
+            self.crypto_rules,
+            self.fintech_rules
+        )
     
     def _load_banking_rules(self) -> Dict[str, Dict]:
         """Load banking compliance rules."""
@@ -466,17 +478,9 @@ class FinanceCompliancePilot:
     
     def _check_rule_violation(self, text: str, rule: Dict) -> bool:
         """Check if text violates a specific rule."""
-        text_lower = text.lower()
-        keywords = rule.get("keywords", [])
-        
-        # Check if any keywords are missing
-        missing_keywords = []
-        for keyword in keywords:
-            if keyword.lower() not in text_lower:
-                missing_keywords.append(keyword)
-        
-        # If more than 50% of keywords are missing, consider it a violation
-        return len(missing_keywords) > len(keywords) * 0.5
+        # Keywords are matched in one shared pass over the text; if less
+        # than 50% of them are found, consider it a violation
+        return compliance_keyword_matcher.check_rule_violation(text, rule)
     
     async def analyze_banking_compliance(self, text: str, context: Optional[Dict] = None) -> FinanceAnalysis:
         """Analyze banking compliance of given text."""
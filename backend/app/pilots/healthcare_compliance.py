@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from enum import Enum
 
 from app.services.metrics_service import metrics_service
+from app.pilots.keyword_matcher import compliance_keyword_matcher
 
 
 class HealthcareDomain(Enum):
@@ -63,6 +64,17 @@ class HealthcareCompliancePilot:
         self.pharmacy_rules = self._load_pharmacy_rules()
         self.laboratory_rules = self._load_laboratory_rules()
         self.emergency_medicine_rules = self._load_emergency_medicine_rules()
+        
+        compliance_keyword_matcher.register_rules(
+            self.hipaa_rules,
+            self.fda_rules,
+            self.clinical_trial_rules,
+            self.medical_device_rules,
+            self.quality_standards_rules,
+            self.pharmacy_rules,
+            self.laboratory_rules,
+            self.emergency_medicine_rules
+        )
     
     def _load_hipaa_rules(self) -> Dict[str, Dict]:
         """Load HIPAA compliance rules."""
@@ -439,17 +451,9 @@ class HealthcareCompliancePilot:
     
     def _check_rule_violation(self, text: str, rule: Dict) -> bool:
         """Check if text violates a specific rule."""
-        text_lower = text.lower()
-        keywords = rule.get("keywords", [])
-        
-        # Check if any keywords are missing
-        missing_keywords = []
-        for keyword in keywords:
-            if keyword.lower() not in text_lower:
-                missing_keywords.append(keyword)
-        
-        # If more than 50% of keywords are missing, consider it a violation
-        return len(missing_keywords) > len(keywords) * 0.5
+        # Keywords are matched in one shared pass over the text; if less
+        # than 50% of them are found, consider it a violation
+        return compliance_keyword_matcher.check_rule_violation(text, rule)
     
     async def analyze_hipaa_compliance(self, text: str, context: Optional[Dict] = None) -> HealthcareAnalysis:
         """Analyze HIPAA compliance of given text."""
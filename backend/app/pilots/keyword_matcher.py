@@ -0,0 +1,163 @@
+"""
+Compliance Keyword Matcher
+Shared multi-pattern keyword matcher used by the compliance pilots.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Tuple, Iterable, FrozenSet, Optional
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of lowercase keywords.
+    
+    Matching uses plain substring semantics, so results are identical to
+    checking ``keyword in text`` for every keyword, but the text is only
+    walked once regardless of how many keywords there are.
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        self.keywords = frozenset(keyword for keyword in keywords if keyword)
+        
+        for keyword in self.keywords:
+            self._add(keyword)
+        self._build_failure_links()
+    
+    def _add(self, keyword: str) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                next_state = len(self._goto) - 1
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state] = self._output[state] + (keyword,)
+    
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def find_all(self, text: str) -> FrozenSet[str]:
+        """Get every keyword that occurs in the (already lowercased) text."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = set()
+        state = 0
+        
+        for char in text:
+            while True:
+                next_state = goto[state].get(char)
+                if next_state is not None:
+                    state = next_state
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            if output[state]:
+                found.update(output[state])
+        
+        return frozenset(found)
+
+
+class ComplianceKeywordMatcher:
+    """
+    Keyword matcher shared by all compliance pilots.
+    
+    Pilots register their rule sets once; a single automaton is built over
+    every keyword of every registered rule. Scanning a document yields the
+    keywords found across all domains in one pass, and recent scans are
+    cached so comprehensive analyses over the same text reuse the result.
+    """
+    
+    def __init__(self, scan_cache_size: int = 32):
+        self.scan_cache_size = scan_cache_size
+        self._keywords: set = set()
+        self._automaton: Optional[KeywordAutomaton] = None
+        self._scan_cache: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"scans": 0, "cache_hits": 0, "rebuilds": 0}
+    
+    def register_rules(self, *rule_sets: Dict[str, Dict]) -> None:
+        """Register the keywords of one or more pilot rule sets."""
+        keywords = [
+            keyword
+            for rules in rule_sets
+            for rule in rules.values()
+            for keyword in rule.get("keywords", [])
+        ]
+        self.register_keywords(keywords)
+    
+    def register_keywords(self, keywords: Iterable[str]) -> None:
+        """Register keywords, invalidating the automaton if any are new."""
+        new_keywords = {keyword.lower() for keyword in keywords} - self._keywords
+        if not new_keywords:
+            return
+        
+        with self._lock:
+            self._keywords.update(new_keywords)
+            self._automaton = None
+            self._scan_cache.clear()
+    
+    def _get_automaton(self) -> KeywordAutomaton:
+        with self._lock:
+            if self._automaton is None:
+                self._automaton = KeywordAutomaton(self._keywords)
+                self.stats["rebuilds"] += 1
+            return self._automaton
+    
+    def scan(self, text: str) -> FrozenSet[str]:
+        """Get every registered keyword found in the text."""
+        with self._lock:
+            found = self._scan_cache.get(text)
+            if found is not None:
+                self._scan_cache.move_to_end(text)
+                self.stats["cache_hits"] += 1
+                return found
+        
+        found = self._get_automaton().find_all(text.lower())
+        
+        with self._lock:
+            self.stats["scans"] += 1
+            self._scan_cache[text] = found
+            while len(self._scan_cache) > self.scan_cache_size:
+                self._scan_cache.popitem(last=False)
+        return found
+    
+    def rule_hits(self, text: str, rule: Dict) -> List[str]:
+        """Get the keywords of a rule that occur in the text."""
+        keywords = rule.get("keywords", [])
+        self.register_keywords(keywords)
+        found = self.scan(text)
+        return [keyword for keyword in keywords if keyword.lower() in found]
+    
+    def check_rule_violation(self, text: str, rule: Dict) -> bool:
+        """Check whether fewer than half of a rule's keywords occur in the text."""
+        keywords = rule.get("keywords", [])
+        return len(self.rule_hits(text, rule)) < len(keywords) * 0.5
+    
+    def clear_cache(self) -> None:
+        """Drop cached scan results."""
+        with self._lock:
+            self._scan_cache.clear()
+
+
+# Global instance
+compliance_keyword_matcher = ComplianceKeywordMatcher()
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from enum import Enum
 
 from app.services.metrics_service import metrics_service
+from app.pilots.keyword_matcher import compliance_keyword_matcher
 
 
 class LegalDomain(Enum):
@@ -62,6 +63,16 @@ class LegalCompliancePilot:
         self.sox_rules = self._load_sox_rules()
         self.pci_dss_rules = self._load_pci_dss_rules()
         
+        compliance_keyword_matcher.register_rules(
+            self.gdpr_rules,
+            self.hipaa_rules,
+            self.contract_rules,
+            self.privacy_rules,
+            self.ccpa_rules,
+            self.sox_rules,
+            self.pci_dss_rules
+        )
+    
     def _load_gdpr_rules(self) -> Dict[str, Dict]:
         """Load GDPR compliance rules."""
         return {
@@ -673,14 +684,9 @@ class LegalCompliancePilot:
     
     def _check_rule_violation(self, text: str, rule: Dict) -> bool:
         """Check if text violates a specific rule."""
-        text_lower = text.lower()
-        keywords = rule.get("keywords", [])
-        
-        # Check if any keywords are missing
-        found_keywords = [kw for kw in keywords if kw.lower() in text_lower]
-        
-        # If less than 50% of keywords are found, consider it a violation
-        return len(found_keywords) < len(keywords) * 0.5
+        # Keywords are matched in one shared pass over the text; if less
+        # than 50% of them are found, consider it a violation
+        return compliance_keyword_matcher.check_rule_violation(text, rule)
     
     async def analyze_legal_compliance(self, text: str, domains: List[LegalDomain] = None) -> Dict[str, LegalAnalysis]:
         """Analyze legal compliance across multiple domains."""
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from enum import Enum
 
 from app.services.metrics_service import metrics_service
+from app.pilots.keyword_matcher import compliance_keyword_matcher
 
 
 class ManufacturingDomain(Enum):
@@ -63,6 +64,17 @@ class ManufacturingCompliancePilot:
         self.lean_manufacturing_rules = self._load_lean_manufacturing_rules()
         self.automotive_rules = self._load_automotive_rules()
         self.aerospace_rules = self._load_aerospace_rules()
+        
+        compliance_keyword_matcher.register_rules(
+            self.quality_control_rules,
+            self.safety_standards_rules,
+            self.environmental_rules,
+            self.supply_chain_rules,
+            self.iso_standards_rules,
+            self.lean_manufacturing_rules,
+            self.automotive_rules,
+            self.aerospace_rules
+        )
     
     def _load_quality_control_rules(self) -> Dict[str, Dict]:
         """Load quality control compliance rules."""
@@ -466,17 +478,9 @@ class ManufacturingCompliancePilot:
     
     def _check_rule_violation(self, text: str, rule: Dict) -> bool:
         """Check if text violates a specific rule."""
-        text_lower = text.lower()
-        keywords = rule.get("keywords", [])
-        
-        # Check if any keywords are missing
-        missing_keywords = []
-        for keyword in keywords:
-            if keyword.lower() not in text_lower:
-                missing_keywords.append(keyword)
-        
-        # If more than 50% of keywords are missing, consider it a violation
-        return len(missing_keywords) > len(keywords) * 0.5
+        # Keywords are matched in one shared pass over the text; if less
+        # than 50% of them are found, consider it a violation
+        return compliance_keyword_matcher.check_rule_violation(text, rule)
     
     async def analyze_quality_control(self, text: str, context: Optional[Dict] = None) -> ManufacturingAnalysis:
         """Analyze quality control compliance of given text."""
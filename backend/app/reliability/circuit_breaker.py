@@ -9,8 +9,6 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Optional, Callable, Awaitable
 from enum import Enum
 from dataclasses import dataclass
-import statistics
-from collections import deque
 
 from app.security.audit_logger import audit_logger, AuditEventType, ComplianceFramework
 
@@ -31,6 +29,7 @@ class CircuitBreakerConfig:
     timeout_duration: float = 5.0       # Request timeout in seconds
     monitoring_window: int = 300        # Monitoring window in seconds
     error_rate_threshold: float = 50.0  # Error rate percentage to open circuit
+    window_slots: int = 60              # Ring buffer slots in the monitoring window
 
 
 @dataclass
@@ -51,6 +50,100 @@ class CircuitBreakerException(Exception):
     pass
 
 
+class WindowedCounters:
+    """
+    Request outcome counters over a sliding time window.
+    
+    The window is split into fixed time slots held in ring buffers. Running
+    totals are kept for the whole window; when the clock moves into a new
+    slot, the stale slot's counts are subtracted and it is reused, so
+    recording and reading are O(1).
+    """
+    
+    def __init__(self, window_seconds: float, slots: int = 60):
+        self.slots = max(1, slots)
+        self.slot_seconds = window_seconds / self.slots
+        self._slot_ids = [-1] * self.slots
+        self._successes = [0] * self.slots
+        self._failures = [0] * self.slots
+        self._timeouts = [0] * self.slots
+        self._blocked = [0] * self.slots
+        self._response_time = [0.0] * self.slots
+        self._current_slot = None
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.blocked = 0
+        self.response_time_total = 0.0
+    
+    def _advance(self, now: float) -> int:
+        """Expire slots that left the window and return the ring position for now."""
+        slot_id = int(now // self.slot_seconds)
+        if self._current_slot is not None and slot_id - self._current_slot >= self.slots:
+            self.clear()
+        
+        start = slot_id if self._current_slot is None else max(self._current_slot + 1, slot_id - self.slots + 1)
+        for stale_id in range(start, slot_id + 1):
+            position = stale_id % self.slots
+            if self._slot_ids[position] != stale_id:
+                self.successes -= self._successes[position]
+                self.failures -= self._failures[position]
+                self.timeouts -= self._timeouts[position]
+                self.blocked -= self._blocked[position]
+                self.response_time_total -= self._response_time[position]
+                self._successes[position] = self._failures[position] = 0
+                self._timeouts[position] = self._blocked[position] = 0
+                self._response_time[position] = 0.0
+                self._slot_ids[position] = stale_id
+        
+        if self._current_slot is None or slot_id > self._current_slot:
+            self._current_slot = slot_id
+        return slot_id % self.slots
+    
+    def record(self, now: float, success: bool = False, timeout: bool = False, blocked: bool = False,
+               response_time: Optional[float] = None) -> None:
+        """Record one request outcome."""
+        position = self._advance(now)
+        if blocked:
+            self._blocked[position] += 1
+            self.blocked += 1
+        elif timeout:
+            self._timeouts[position] += 1
+            self.timeouts += 1
+        elif success:
+            self._successes[position] += 1
+            self.successes += 1
+            if response_time is not None:
+                self._response_time[position] += response_time
+                self.response_time_total += response_time
+        else:
+            self._failures[position] += 1
+            self.failures += 1
+    
+    def error_rate(self, now: float) -> float:
+        """Percentage of requests in the window that failed or timed out (blocked requests count in the total)."""
+        self._advance(now)
+        total = self.successes + self.failures + self.timeouts + self.blocked
+        return (self.failures + self.timeouts) / total * 100 if total > 0 else 0.0
+    
+    def average_response_time(self, now: float) -> float:
+        """Average response time of successful requests in the window."""
+        self._advance(now)
+        return self.response_time_total / self.successes if self.successes else 0.0
+    
+    def clear(self) -> None:
+        """Reset every slot."""
+        self._slot_ids = [-1] * self.slots
+        self._successes = [0] * self.slots
+        self._failures = [0] * self.slots
+        self._timeouts = [0] * self.slots
+        self._blocked = [0] * self.slots
+        self._response_time = [0.0] * self.slots
+        self._current_slot = None
+        self.successes = self.failures = self.timeouts = self.blocked = 0
+        self.response_time_total = 0.0
+
+
 class CircuitBreaker:
     """
     Circuit Breaker implementation for resilient service communication.
@@ -69,14 +162,15 @@ class CircuitBreaker:
         self.state = CircuitState.CLOSED
         self.metrics = CircuitBreakerMetrics()
         
-        # Tracking deques for windowed metrics
-        self.recent_requests: deque = deque(maxlen=1000)
+        # Ring-buffer counters for windowed metrics
+        self.window = WindowedCounters(self.config.monitoring_window, self.config.window_slots)
         self.failure_count = 0
         self.success_count = 0
         self.last_failure_time: Optional[float] = None
         self.state_change_time = time.time()
+        self._half_open_in_flight = 0
         
-        # Lock for thread safety
+        # Lock guarding state and counters; never held while the call runs
         self._lock = asyncio.Lock()
     
     async def call(self, func: Callable[[], Awaitable[Any]], *args, **kwargs) -> Any:
@@ -102,28 +196,51 @@ class CircuitBreaker:
                 self._record_request(success=False, blocked=True)
                 raise CircuitBreakerException(f"Circuit breaker '{self.name}' is OPEN")
             
-            # Allow request through
-            start_time = time.time()
+            # Only let a limited number of trial requests through while half-open
+            trial = self.state == CircuitState.HALF_OPEN
+            if trial:
+                if self._half_open_in_flight >= self.config.success_threshold:
+                    self._record_request(success=False, blocked=True)
+                    raise CircuitBreakerException(f"Circuit breaker '{self.name}' is HALF_OPEN and busy")
+                self._half_open_in_flight += 1
+        
+        # Allow request through without holding the lock
+        start_time = time.monotonic()
+        
+        try:
+            # Execute with timeout
+            result = await asyncio.wait_for(
+                func(*args, **kwargs),
+                timeout=self.config.timeout_duration
+            )
             
-            try:
-                # Execute with timeout
-                result = await asyncio.wait_for(
-                    func(*args, **kwargs),
-                    timeout=self.config.timeout_duration
-                )
-                
-                # Record success
-                response_time = time.time() - start_time
-                await self._on_success(response_time)
-                return result
-                
-            except asyncio.TimeoutError:
+        except asyncio.TimeoutError:
+            async with self._lock:
                 await self._on_timeout()
-                raise
-                
-            except Exception as e:
+                await self._update_state()
+            raise
+            
+        except Exception as e:
+            async with self._lock:
                 await self._on_failure(e)
-                raise
+                await self._update_state()
+            raise
+        
+        finally:
+            # Release the half-open trial slot even when the call is cancelled
+            self._end_trial(trial)
+        
+        # Record success
+        response_time = time.monotonic() - start_time
+        async with self._lock:
+            await self._on_success(response_time)
+            await self._update_state()
+        return result
+    
+    def _end_trial(self, trial: bool):
+        """Release a half-open trial slot."""
+        if trial:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
     
     async def _update_state(self):
         """Update circuit breaker state based on current conditions."""
@@ -161,6 +278,7 @@ class CircuitBreaker:
         elif new_state == CircuitState.HALF_OPEN:
             self.failure_count = 0
             self.success_count = 0
+            self._half_open_in_flight = 0
         elif new_state == CircuitState.OPEN:
             self.metrics.circuit_opens += 1
         
@@ -218,6 +336,10 @@ class CircuitBreaker:
         self.metrics.last_failure_time = datetime.now(timezone.utc)
         
         self._record_request(success=False, timeout=True)
+        
+        # Reset success count on timeout in half-open state
+        if self.state == CircuitState.HALF_OPEN:
+            self.success_count = 0
     
     def _record_request(
         self,
@@ -230,47 +352,16 @@ class CircuitBreaker:
         """Record request metrics."""
         self.metrics.total_requests += 1
         
-        request_record = {
-            "timestamp": time.time(),
-            "success": success,
-            "blocked": blocked,
-            "timeout": timeout,
-            "response_time": response_time,
-            "exception_type": type(exception).__name__ if exception else None
-        }
-        
-        self.recent_requests.append(request_record)
-        self.metrics.current_error_rate = self._calculate_error_rate()
+        now = time.monotonic()
+        self.window.record(now, success=success, timeout=timeout, blocked=blocked, response_time=response_time)
+        self.metrics.current_error_rate = self.window.error_rate(now)
     
     def _calculate_error_rate(self) -> float:
         """Calculate current error rate percentage."""
-        if not self.recent_requests:
-            return 0.0
-        
-        # Calculate error rate for recent window
-        current_time = time.time()
-        window_start = current_time - self.config.monitoring_window
-        
-        recent_in_window = [
-            r for r in self.recent_requests
-            if r["timestamp"] >= window_start
-        ]
-        
-        if not recent_in_window:
-            return 0.0
-        
-        failed_requests = sum(1 for r in recent_in_window if not r["success"] and not r["blocked"])
-        total_requests = len(recent_in_window)
-        
-        return (failed_requests / total_requests) * 100 if total_requests > 0 else 0.0
+        return self.window.error_rate(time.monotonic())
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get circuit breaker metrics."""
-        recent_response_times = [
-            r["response_time"] for r in self.recent_requests
-            if r["response_time"] is not None and r["success"]
-        ]
-        
         return {
             "name": self.name,
             "state": self.state.value,
@@ -284,13 +375,14 @@ class CircuitBreaker:
             "success_count": self.success_count,
             "last_failure_time": self.metrics.last_failure_time.isoformat() if self.metrics.last_failure_time else None,
             "last_success_time": self.metrics.last_success_time.isoformat() if self.metrics.last_success_time else None,
-            "average_response_time": statistics.mean(recent_response_times) if recent_response_times else 0.0,
+            "average_response_time": self.window.average_response_time(time.monotonic()),
             "config": {
                 "failure_threshold": self.config.failure_threshold,
                 "recovery_timeout": self.config.recovery_timeout,
                 "success_threshold": self.config.success_threshold,
                 "timeout_duration": self.config.timeout_duration,
-                "error_rate_threshold": self.config.error_rate_threshold
+                "error_rate_threshold": self.config.error_rate_threshold,
+                "monitoring_window": self.config.monitoring_window
             }
         }
     
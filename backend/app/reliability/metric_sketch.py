@@ -0,0 +1,148 @@
+"""
+Streaming Metric Sketches
+Mergeable quantile sketches and rolling time windows for SLA measurements.
+"""
+
+import math
+from typing import Dict, Optional, Tuple
+
+
+class QuantileSketch:
+    """
+    DDSketch-style quantile sketch.
+    
+    Values are counted in logarithmically sized buckets, so any quantile is
+    estimated within the configured relative accuracy using memory that
+    depends on the value range rather than the number of samples. Sketches
+    can be merged, and subtracted when a merged part expires.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+    
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+    
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+    
+    def add(self, value: float, count: int = 1) -> None:
+        """Add a value (count times)."""
+        if value > 0:
+            index = self._index(value)
+            self.positive[index] = self.positive.get(index, 0) + count
+        elif value < 0:
+            index = self._index(-value)
+            self.negative[index] = self.negative.get(index, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+        self.sum += value * count
+    
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add another sketch with the same accuracy into this one."""
+        self._combine(other, 1)
+    
+    def subtract(self, other: "QuantileSketch") -> None:
+        """Remove a previously merged sketch from this one."""
+        self._combine(other, -1)
+    
+    def _combine(self, other: "QuantileSketch", sign: int) -> None:
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in theirs.items():
+                updated = mine.get(index, 0) + sign * count
+                if updated > 0:
+                    mine[index] = updated
+                else:
+                    mine.pop(index, None)
+        self.zero_count += sign * other.zero_count
+        self.count += sign * other.count
+        self.sum += sign * other.sum
+        if self.count <= 0:
+            self.clear()
+    
+    def clear(self) -> None:
+        """Remove all values."""
+        self.positive.clear()
+        self.negative.clear()
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), or None when empty."""
+        if self.count == 0:
+            return None
+        
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive)) if self.positive else 0.0
+    
+    @property
+    def mean(self) -> Optional[float]:
+        """Exact mean of the values, or None when empty."""
+        return self.sum / self.count if self.count else None
+
+
+class RollingSketch:
+    """
+    Quantile sketch over a rolling time window.
+    
+    Samples go into per-slot sketches and into a running window aggregate.
+    Slots that fall out of the window are subtracted from the aggregate and
+    dropped, so recording and reading are independent of traffic volume.
+    """
+    
+    def __init__(self, window_seconds: float, slots: int = 60, relative_accuracy: float = 0.01):
+        self.window_seconds = window_seconds
+        self.slot_seconds = window_seconds / slots
+        self.relative_accuracy = relative_accuracy
+        self.window = QuantileSketch(relative_accuracy)
+        self._slots: Dict[int, QuantileSketch] = {}
+    
+    def _slot_index(self, timestamp: float) -> int:
+        return int(timestamp // self.slot_seconds)
+    
+    def add(self, value: float, timestamp: float, now: Optional[float] = None) -> bool:
+        """Add a sample taken at timestamp (epoch seconds); samples outside the window are ignored."""
+        now = timestamp if now is None else now
+        self.expire(now)
+        if timestamp < now - self.window_seconds:
+            return False
+        
+        index = self._slot_index(timestamp)
+        slot = self._slots.get(index)
+        if slot is None:
+            slot = self._slots[index] = QuantileSketch(self.relative_accuracy)
+        slot.add(value)
+        self.window.add(value)
+        return True
+    
+    def expire(self, now: float) -> None:
+        """Drop slots that ended before the window starting at now - window_seconds."""
+        oldest = self._slot_index(now - self.window_seconds)
+        for index in [index for index in self._slots if index < oldest]:
+            self.window.subtract(self._slots.pop(index))
+    
+    def snapshot(self, now: float) -> Tuple[int, Optional[float], QuantileSketch]:
+        """Expire old slots and get the window's sample count, mean and sketch."""
+        self.expire(now)
+        return self.window.count, self.window.mean, self.window
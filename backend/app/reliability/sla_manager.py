@@ -9,10 +9,11 @@ from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass, field
 import statistics
-from collections import defaultdict, deque
+from collections import defaultdict
 import uuid
 
 from app.security.audit_logger import audit_logger, AuditEventType, ComplianceFramework
+from .metric_sketch import RollingSketch
 
 
 class SLAType(str, Enum):
@@ -103,7 +104,10 @@ class SLAManager:
         self.sla_targets = self._initialize_sla_targets()
         self.current_metrics: Dict[str, SLAMetrics] = {}
         self.violations: Dict[str, SLAViolation] = {}
-        self.measurement_data: Dict[str, deque] = defaultdict(lambda: deque(maxlen=10000))
+        self.measurement_sketches: Dict[str, RollingSketch] = {
+            key: RollingSketch(target.measurement_window_hours * 3600)
+            for key, target in self.sla_targets.items()
+        }
         self.active_incidents: Dict[str, Dict[str, Any]] = {}
         
         # Start monitoring tasks (only if event loop is running)
@@ -127,7 +131,7 @@ class SLAManager:
         ]
         
         for tier, target, description in availability_targets:
-            key = f"{SLAType.AVAILABILITY}_{tier.value}"
+            key = f"{SLAType.AVAILABILITY.value}_{tier.value}"
             targets[key] = SLATarget(
                 sla_type=SLAType.AVAILABILITY,
                 service_tier=tier,
@@ -150,7 +154,7 @@ class SLAManager:
         ]
         
         for tier, target, description in response_time_targets:
-            key = f"{SLAType.RESPONSE_TIME}_{tier.value}"
+            key = f"{SLAType.RESPONSE_TIME.value}_{tier.value}"
             targets[key] = SLATarget(
                 sla_type=SLAType.RESPONSE_TIME,
                 service_tier=tier,
@@ -173,7 +177,7 @@ class SLAManager:
         ]
         
         for tier, target, description in error_rate_targets:
-            key = f"{SLAType.ERROR_RATE}_{tier.value}"
+            key = f"{SLAType.ERROR_RATE.value}_{tier.value}"
             targets[key] = SLATarget(
                 sla_type=SLAType.ERROR_RATE,
                 service_tier=tier,
@@ -210,11 +214,10 @@ class SLAManager:
         
         key = f"{sla_type.value}_{service_tier.value}"
         
-        # Store measurement data
-        self.measurement_data[key].append({
-            "value": value,
-            "timestamp": timestamp
-        })
+        # Add to the rolling window sketch
+        sketch = self.measurement_sketches.get(key)
+        if sketch is not None:
+            sketch.add(value, timestamp.timestamp(), datetime.now(timezone.utc).timestamp())
         
         # Update current metrics
         await self._update_current_metrics(sla_type, service_tier)
@@ -230,35 +233,27 @@ class SLAManager:
             return
         
         target = self.sla_targets[key]
-        measurements = self.measurement_data[key]
-        
-        if not measurements:
-            return
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(hours=target.measurement_window_hours)
         
-        # Filter measurements within window
-        window_start = datetime.now(timezone.utc) - timedelta(hours=target.measurement_window_hours)
-        recent_measurements = [
-            m for m in measurements
-            if m["timestamp"] >= window_start
-        ]
+        # Read the window's summary from the rolling sketch
+        sample_count, mean, sketch = self.measurement_sketches[key].snapshot(now.timestamp())
         
-        if not recent_measurements:
+        if not sample_count:
             return
         
         # Calculate current value based on SLA type
-        values = [m["value"] for m in recent_measurements]
-        
         if sla_type == SLAType.AVAILABILITY:
             # Availability is percentage of successful requests
-            current_value = statistics.mean(values)
+            current_value = mean
         elif sla_type == SLAType.RESPONSE_TIME:
             # Response time uses 95th percentile
-            current_value = statistics.quantiles(values, n=20)[18]  # 95th percentile
+            current_value = sketch.quantile(0.95)
         elif sla_type == SLAType.ERROR_RATE:
             # Error rate is percentage of failed requests
-            current_value = statistics.mean(values)
+            current_value = mean
         else:
-            current_value = statistics.mean(values)
+            current_value = mean
         
         # Calculate compliance
         if sla_type in [SLAType.RESPONSE_TIME, SLAType.ERROR_RATE]:
@@ -284,9 +279,9 @@ class SLAManager:
             target_value=target.target_value,
             compliance_percentage=compliance,
             measurement_window_start=window_start,
-            measurement_window_end=datetime.now(timezone.utc),
-            sample_count=len(recent_measurements),
-            last_updated=datetime.now(timezone.utc),
+            measurement_window_end=now,
+            sample_count=sample_count,
+            last_updated=now,
             status=status
         )
     
@@ -455,12 +450,8 @@ class SLAManager:
         while True:
             try:
                 # Update all current metrics
-                for key in self.sla_targets:
-                    sla_type_str, service_tier_str = key.split("_", 1)
-                    sla_type = SLAType(sla_type_str)
-                    service_tier = ServiceTier(service_tier_str)
-                    
-                    await self._update_current_metrics(sla_type, service_tier)
+                for target in self.sla_targets.values():
+                    await self._update_current_metrics(target.sla_type, target.service_tier)
                 
                 # Sleep for 30 seconds before next check
                 await asyncio.sleep(30)
@@ -479,6 +470,30 @@ class SLAManager:
                 # Wait before retrying
                 await asyncio.sleep(60)
     
+    def get_percentiles(
+        self,
+        sla_type: SLAType,
+        service_tier: ServiceTier,
+        quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)
+    ) -> Dict[str, Optional[float]]:
+        """
+        Get percentiles of the current measurement window.
+        
+        Args:
+            sla_type: Type of SLA metric
+            service_tier: Service tier
+            quantiles: Quantiles to estimate (0-1)
+            
+        Returns:
+            Dict: Percentile estimates keyed like "p95" (None when there are no samples)
+        """
+        sketch = self.measurement_sketches.get(f"{sla_type.value}_{service_tier.value}")
+        if sketch is None:
+            return {}
+        
+        _, _, window = sketch.snapshot(datetime.now(timezone.utc).timestamp())
+        return {f"p{q * 100:g}": window.quantile(q) for q in quantiles}
+    
     def get_sla_dashboard(self) -> Dict[str, Any]:
         """
         Get comprehensive SLA dashboard data.
@@ -614,10 +629,16 @@ class SLAManager:
                 for severity in SeverityLevel
             },
             "total_penalty_amount": total_penalty,
+            "current_percentiles": {
+                sla_type.value: self.get_percentiles(sla_type, service_tier)
+                for sla_type in SLAType
+                if f"{sla_type.value}_{service_tier.value}" in self.measurement_sketches
+            },
             "average_resolution_time_minutes": avg_resolution_time,
             "sla_targets": {
-                sla_type.value: self.sla_targets.get(f"{sla_type.value}_{service_tier.value}", {}).target_value
+                sla_type.value: self.sla_targets[f"{sla_type.value}_{service_tier.value}"].target_value
                 for sla_type in SLAType
+                if f"{sla_type.value}_{service_tier.value}" in self.sla_targets
             },
             "compliance_percentage": max(0, 100 - (len(period_violations) / 30 * 100)),  # Rough calculation
             "recommendations": self._generate_sla_recommendations(period_violations)
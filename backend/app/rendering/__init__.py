@@ -0,0 +1,7 @@
+"""
+XReason Rendering
+Graph layout and image drawing that run in render worker processes.
+
+Modules here are loaded by spawned workers, so they must not import
+app.services or other server-side packages.
+"""
@@ -0,0 +1,179 @@
+"""
+Force Layout
+Vectorized force-directed layout with a Barnes-Hut quadtree for large graphs.
+
+Render workers import this module, so it must only depend on NumPy.
+"""
+
+from typing import Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+Position = Tuple[float, float]
+
+# Deepest quadtree level; points closer than the finest cell are treated as one body
+_MAX_DEPTH = 16
+
+
+def _exact_repulsion(pos: np.ndarray, k: float, targets: np.ndarray) -> np.ndarray:
+    """Pairwise Fruchterman-Reingold repulsion (k^2 / d) on the target points, O(n^2)."""
+    delta = pos[targets, None, :] - pos[None, :, :]
+    dist_sq = np.einsum("ijk,ijk->ij", delta, delta)
+    dist_sq[np.arange(len(targets)), targets] = np.inf
+    np.maximum(dist_sq, 1e-9, out=dist_sq)
+    return np.einsum("ijk,ij->ik", delta, k * k / dist_sq)
+
+
+def _barnes_hut_repulsion(pos: np.ndarray, k: float, theta: float, targets: np.ndarray) -> np.ndarray:
+    """
+    Barnes-Hut approximation of the repulsive forces on the target points, O(n log n).
+    
+    The quadtree is built level by level: at depth d every point falls in
+    a cell identified by its Morton code, and cells are the unique codes
+    with their point counts and centers of mass. The tree is then walked
+    for all points at once, one level per step, as (point, cell) pairs:
+    a cell far enough away (size / distance < theta) or holding a single
+    point contributes its aggregate force, any other cell is replaced by
+    its children.
+    """
+    n = len(pos)
+    low = pos.min(axis=0)
+    extent = float(max((pos.max(axis=0) - low).max(), 1e-9)) * (1 + 1e-9)
+    unit = (pos - low) / extent
+    
+    # Per level: cell codes, point counts, centers of mass, cell size and
+    # the cell each point falls in
+    levels = []
+    codes = np.zeros(n, dtype=np.int64)
+    for depth in range(_MAX_DEPTH + 1):
+        if depth:
+            cells = np.minimum((unit * (1 << depth)).astype(np.int64), (1 << depth) - 1)
+            codes = (codes << 2) | ((cells[:, 0] & 1) << 1) | (cells[:, 1] & 1)
+        unique, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+        center = np.column_stack([
+            np.bincount(inverse, weights=pos[:, 0]), np.bincount(inverse, weights=pos[:, 1])
+        ]) / counts[:, None]
+        levels.append((unique, counts, center, extent / (1 << depth), inverse))
+        if counts.max() == 1:
+            break
+    
+    # Children of a cell are a contiguous run of the next level's sorted codes
+    children = []
+    for depth in range(len(levels) - 1):
+        parent_codes, next_codes = levels[depth][0], levels[depth + 1][0]
+        first = np.searchsorted(next_codes, parent_codes << 2)
+        children.append((first, np.searchsorted(next_codes, (parent_codes << 2) + 4) - first))
+    
+    # Forces are accumulated per target; points are positions in targets
+    forces = np.zeros((len(targets), 2))
+    if len(levels) < 2:
+        return forces
+    top = len(levels[1][0])
+    points = np.repeat(np.arange(len(targets)), top)
+    index = np.tile(np.arange(top), len(targets))
+    for depth in range(1, len(levels)):
+        _, counts, center, size, inverse = levels[depth]
+        delta = pos[targets[points]] - center[index]
+        dist_sq = np.maximum(np.einsum("ij,ij->i", delta, delta), 1e-9)
+        last_level = depth == len(levels) - 1
+        # The cell holding the point itself is always opened (and dropped
+        # once it holds nothing else), so points never repel themselves
+        own = inverse[targets[points]] == index
+        single = counts[index] == 1
+        accept = ~own & (single | (size * size < theta * theta * dist_sq) | last_level)
+        weight = k * k * counts[index[accept]] / dist_sq[accept]
+        for axis in range(2):
+            forces[:, axis] += np.bincount(points[accept], weights=delta[accept, axis] * weight, minlength=len(targets))
+        
+        expand = ~accept & ~(own & (single | last_level))
+        if last_level or not expand.any():
+            break
+        parents = index[expand]
+        first, child_counts = children[depth]
+        fanout = child_counts[parents]
+        offsets = np.arange(int(fanout.sum())) - np.repeat(np.cumsum(fanout) - fanout, fanout)
+        points = np.repeat(points[expand], fanout)
+        index = np.repeat(first[parents], fanout) + offsets
+    return forces
+
+
+def force_directed_layout(
+    node_ids: Sequence[Hashable],
+    edges: Iterable[Tuple[Hashable, Hashable]],
+    initial: Optional[Dict[Hashable, Position]] = None,
+    fixed: Optional[Iterable[Hashable]] = None,
+    iterations: int = 50,
+    scale: Optional[float] = 1.0,
+    theta: float = 1.0,
+    barnes_hut_threshold: int = 500,
+    seed: int = 42
+) -> Dict[Hashable, Position]:
+    """
+    Fruchterman-Reingold layout computed with NumPy.
+    
+    Attraction along edges and the cooling schedule are vectorized; node
+    repulsion is exact for small graphs and uses a Barnes-Hut quadtree once
+    the graph has more than barnes_hut_threshold nodes. Nodes in initial
+    start at the given positions and nodes in fixed do not move, which is
+    how new nodes are placed into an existing layout. With scale set, the
+    result is centered and rescaled to fit in [-scale, scale].
+    """
+    node_ids = list(node_ids)
+    n = len(node_ids)
+    if n == 0:
+        return {}
+    
+    rng = np.random.default_rng(seed)
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    pos = rng.random((n, 2))
+    if initial:
+        known = [(index[node_id], xy) for node_id, xy in initial.items() if node_id in index]
+        if known:
+            rows, coords = zip(*known)
+            pos[list(rows)] = np.asarray(coords, dtype=float)
+    if n == 1:
+        return {node_ids[0]: (0.0, 0.0) if scale is not None else tuple(pos[0])}
+    
+    pairs = np.array(
+        [(index[s], index[t]) for s, t in edges if s in index and t in index and s != t], dtype=np.int64
+    ).reshape(-1, 2)
+    movable = np.ones(n, dtype=bool)
+    if fixed is not None:
+        movable[[index[node_id] for node_id in fixed if node_id in index]] = False
+    # Forces are only computed for nodes that can move
+    targets = np.flatnonzero(movable)
+    target_row = np.full(n, -1)
+    target_row[targets] = np.arange(len(targets))
+    pairs = pairs[movable[pairs[:, 0]] | movable[pairs[:, 1]]]
+    
+    span = float(np.ptp(pos, axis=0).max()) or 1.0
+    k = span / np.sqrt(n)
+    temperature = span * 0.1
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations if len(targets) else 0):
+        if n > barnes_hut_threshold:
+            displacement = _barnes_hut_repulsion(pos, k, theta, targets)
+        else:
+            displacement = _exact_repulsion(pos, k, targets)
+        
+        if len(pairs):
+            delta = pos[pairs[:, 0]] - pos[pairs[:, 1]]
+            pull = delta * np.sqrt(np.einsum("ij,ij->i", delta, delta))[:, None] / k
+            for end, sign in ((0, -1.0), (1, 1.0)):
+                rows = target_row[pairs[:, end]]
+                moving = rows >= 0
+                for axis in range(2):
+                    displacement[:, axis] += sign * np.bincount(
+                        rows[moving], weights=pull[moving, axis], minlength=len(targets)
+                    )
+        
+        length = np.maximum(np.sqrt(np.einsum("ij,ij->i", displacement, displacement)), 1e-9)[:, None]
+        pos[targets] += displacement / length * np.minimum(length, temperature)
+        temperature -= cooling
+    
+    if scale is not None:
+        pos -= pos.mean(axis=0)
+        extent = np.abs(pos).max()
+        if extent > 0:
+            pos *= scale / extent
+    return {node_id: (float(pos[i, 0]), float(pos[i, 1])) for i, node_id in enumerate(node_ids)}
@@ -0,0 +1,54 @@
+"""
+Graph Image
+Worker-side drawing of graph images for the graph renderer's process pool.
+
+Pool workers import only this module, matplotlib, networkx and NumPy, so
+nothing here may import from app.services.
+"""
+
+import io
+from typing import Any, Dict
+
+from app.rendering.force_layout import force_directed_layout
+
+
+def _init_render_worker() -> None:
+    """Load matplotlib with the non-interactive Agg backend once per worker."""
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    import matplotlib.pyplot  # noqa: F401
+
+
+def render_graph_image(payload: Dict[str, Any], format: str) -> bytes:
+    """
+    Draw a graph payload (see GraphRenderer.make_payload) as an image.
+    
+    Runs in worker processes, so it only takes plain data. The layout is
+    seeded, so a cached image looks the same as a fresh render.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    
+    nx_graph = nx.DiGraph()
+    for node_id, label, color in payload["nodes"]:
+        nx_graph.add_node(node_id, label=label, color=color)
+    for source, target, label in payload["edges"]:
+        nx_graph.add_edge(source, target, label=label)
+    
+    pos = force_directed_layout(list(nx_graph.nodes), list(nx_graph.edges), iterations=50)
+    
+    figure = plt.figure(figsize=(12, 8))
+    try:
+        nx.draw_networkx_nodes(nx_graph, pos, node_color=[nx_graph.nodes[node]["color"] for node in nx_graph.nodes()])
+        nx.draw_networkx_edges(nx_graph, pos, edge_color='gray', arrows=True)
+        nx.draw_networkx_labels(nx_graph, pos, labels={node: nx_graph.nodes[node]["label"] for node in nx_graph.nodes()})
+        plt.title("Reasoning Graph")
+        plt.axis('off')
+        
+        buf = io.BytesIO()
+        figure.savefig(buf, format=format, bbox_inches='tight')
+        return buf.getvalue()
+    finally:
+        plt.close(figure)
@@ -4,6 +4,7 @@ Enterprise-grade security and compliance module for SOC2, ISO27001, HIPAA, and G
 """
 
 from .audit_logger import AuditLogger, AuditEvent
+from .audit_store import AuditLogWriter, AuditCheckpoint, AuditWriteError
 from .compliance_manager import ComplianceManager
 from .encryption_service import EncryptionService
 from .access_control import AccessControlManager, Permission, Role
@@ -12,6 +13,9 @@ from .data_classification import DataClassifier, DataClassification
 __all__ = [
     'AuditLogger',
     'AuditEvent', 
+    'AuditLogWriter',
+    'AuditCheckpoint',
+    'AuditWriteError',
     'ComplianceManager',
     'EncryptionService',
     'AccessControlManager',
@@ -5,7 +5,7 @@ Role-based access control (RBAC) and permission management for XReason.
 
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple, Callable, Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
@@ -36,6 +36,9 @@ class ResourceType(str, Enum):
     MARKETPLACE = "marketplace"
 
 
+WILDCARD_RESOURCE = "*"
+
+
 @dataclass
 class Permission:
     """A permission definition."""
@@ -49,6 +52,11 @@ class Permission:
     conditions: Dict[str, Any] = field(default_factory=dict)
     created_at: datetime = field(default_factory=datetime.utcnow)
     
+    @property
+    def grant_key(self) -> Tuple[ResourceType, str, PermissionLevel]:
+        """Key of this permission in the effective-permission index."""
+        return (self.resource_type, self.resource_id, self.permission_level)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
         return {
@@ -88,6 +96,7 @@ class Role:
     is_system_role: bool = False
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
+    on_change: Optional[Callable[[str], None]] = field(default=None, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -123,6 +132,7 @@ class Role:
         """Add a permission to this role."""
         self.permissions.append(permission)
         self.updated_at = datetime.utcnow()
+        self._changed()
     
     def remove_permission(self, permission_id: str) -> bool:
         """Remove a permission from this role."""
@@ -130,22 +140,70 @@ class Role:
             if perm.id == permission_id:
                 del self.permissions[i]
                 self.updated_at = datetime.utcnow()
+                self._changed()
                 return True
         return False
     
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change(self.id)
+    
     def has_permission(self, resource_type: ResourceType, resource_id: str, 
                       permission_level: PermissionLevel) -> bool:
-        """Check if this role has a specific permission."""
+        """Check if this role has a specific permission (a "*" resource ID grants every resource)."""
         for perm in self.permissions:
             if (perm.resource_type == resource_type and 
-                perm.resource_id == resource_id and
+                perm.resource_id in (resource_id, WILDCARD_RESOURCE) and
                 perm.permission_level == permission_level):
                 return True
         return False
 
 
+@dataclass
+class EffectivePermissions:
+    """Permissions a user or tenant holds through its roles, counted per granting role."""
+    
+    grants: Dict[Tuple[ResourceType, str, PermissionLevel], int] = field(default_factory=dict)
+    permissions: Dict[str, Permission] = field(default_factory=dict)
+    permission_counts: Dict[str, int] = field(default_factory=dict)
+    
+    def add(self, permissions: List[Permission]) -> None:
+        """Add the permissions of one role."""
+        for perm in permissions:
+            self.grants[perm.grant_key] = self.grants.get(perm.grant_key, 0) + 1
+            self.permissions[perm.id] = perm
+            self.permission_counts[perm.id] = self.permission_counts.get(perm.id, 0) + 1
+    
+    def remove(self, permissions: List[Permission]) -> None:
+        """Remove the permissions of one role."""
+        for perm in permissions:
+            count = self.grants.get(perm.grant_key, 0) - 1
+            if count > 0:
+                self.grants[perm.grant_key] = count
+            else:
+                self.grants.pop(perm.grant_key, None)
+            
+            count = self.permission_counts.get(perm.id, 0) - 1
+            if count > 0:
+                self.permission_counts[perm.id] = count
+            else:
+                self.permission_counts.pop(perm.id, None)
+                self.permissions.pop(perm.id, None)
+    
+    def allows(self, resource_type: ResourceType, resource_id: str, permission_level: PermissionLevel) -> bool:
+        """Check for a grant on the resource or on every resource of its type."""
+        return ((resource_type, resource_id, permission_level) in self.grants or
+                (resource_type, WILDCARD_RESOURCE, permission_level) in self.grants)
+
+
 class AccessControlManager:
-    """Manages access control and permissions."""
+    """
+    Manages access control and permissions.
+    
+    Effective permissions are indexed per user and per tenant and kept up to
+    date incrementally as roles are assigned, removed or edited, so a
+    permission check is a couple of set lookups regardless of role counts.
+    """
     
     def __init__(self):
         self.roles: Dict[str, Role] = {}
@@ -153,9 +211,52 @@ class AccessControlManager:
         self.tenant_roles: Dict[str, List[str]] = {}  # tenant_id -> role_ids
         self.logger = logging.getLogger(__name__)
         
+        # Effective-permission index
+        self.user_permissions: Dict[str, EffectivePermissions] = {}
+        self.tenant_permissions: Dict[str, EffectivePermissions] = {}
+        self._indexed_role_permissions: Dict[str, List[Permission]] = {}  # role_id -> permissions as indexed
+        
         # Initialize default roles
         self._initialize_default_roles()
     
+    def _register_role(self, role: Role) -> None:
+        """Add a role and track edits to its permissions."""
+        self.roles[role.id] = role
+        role.on_change = self._reindex_role
+        self._indexed_role_permissions[role.id] = list(role.permissions)
+    
+    def _role_members(self, role_id: str):
+        for user_id, role_ids in self.user_roles.items():
+            if role_id in role_ids:
+                yield self.user_permissions[user_id]
+        for tenant_id, role_ids in self.tenant_roles.items():
+            if role_id in role_ids:
+                yield self.tenant_permissions[tenant_id]
+    
+    def _reindex_role(self, role_id: str) -> None:
+        """Replace a role's old permissions with its current ones for every holder."""
+        role = self.roles.get(role_id)
+        if role is None:
+            return
+        
+        old_permissions = self._indexed_role_permissions.get(role_id, [])
+        new_permissions = list(role.permissions)
+        for effective in self._role_members(role_id):
+            effective.remove(old_permissions)
+            effective.add(new_permissions)
+        self._indexed_role_permissions[role_id] = new_permissions
+    
+    def refresh_permission_index(self) -> None:
+        """Rebuild the effective-permission index (after editing role permission lists directly)."""
+        self.user_permissions = {}
+        self.tenant_permissions = {}
+        self._indexed_role_permissions = {role_id: list(role.permissions) for role_id, role in self.roles.items()}
+        for index, assignments in ((self.user_permissions, self.user_roles), (self.tenant_permissions, self.tenant_roles)):
+            for principal_id, role_ids in assignments.items():
+                effective = index[principal_id] = EffectivePermissions()
+                for role_id in role_ids:
+                    effective.add(self._indexed_role_permissions.get(role_id, []))
+    
     def create_role(self, name: str, description: str = "", 
                    permissions: Optional[List[Permission]] = None) -> Role:
         """Create a new role."""
@@ -166,7 +267,7 @@ class AccessControlManager:
                 permissions=permissions or []
             )
             
-            self.roles[role.id] = role
+            self._register_role(role)
             
             self.logger.info(f"Created role: {name} ({role.id})")
             return role
@@ -199,6 +300,8 @@ class AccessControlManager:
                     setattr(role, key, value)
             
             role.updated_at = datetime.utcnow()
+            if "permissions" in kwargs:
+                self._reindex_role(role_id)
             
             self.logger.info(f"Updated role: {role_id}")
             return True
@@ -218,14 +321,18 @@ class AccessControlManager:
                 raise ValueError("Cannot delete system roles")
             
             # Remove role from all users and tenants
+            role_permissions = self._indexed_role_permissions.pop(role_id, [])
             for user_id in list(self.user_roles.keys()):
                 if role_id in self.user_roles[user_id]:
                     self.user_roles[user_id].remove(role_id)
+                    self.user_permissions[user_id].remove(role_permissions)
             
             for tenant_id in list(self.tenant_roles.keys()):
                 if role_id in self.tenant_roles[tenant_id]:
                     self.tenant_roles[tenant_id].remove(role_id)
+                    self.tenant_permissions[tenant_id].remove(role_permissions)
             
+            role.on_change = None
             del self.roles[role_id]
             
             self.logger.info(f"Deleted role: {role_id}")
@@ -243,9 +350,11 @@ class AccessControlManager:
             
             if user_id not in self.user_roles:
                 self.user_roles[user_id] = []
+                self.user_permissions[user_id] = EffectivePermissions()
             
             if role_id not in self.user_roles[user_id]:
                 self.user_roles[user_id].append(role_id)
+                self.user_permissions[user_id].add(self._indexed_role_permissions[role_id])
             
             self.logger.info(f"Assigned role {role_id} to user {user_id}")
             return True
@@ -259,6 +368,7 @@ class AccessControlManager:
         try:
             if user_id in self.user_roles and role_id in self.user_roles[user_id]:
                 self.user_roles[user_id].remove(role_id)
+                self.user_permissions[user_id].remove(self._indexed_role_permissions.get(role_id, []))
                 self.logger.info(f"Removed role {role_id} from user {user_id}")
                 return True
             return False
@@ -275,9 +385,11 @@ class AccessControlManager:
             
             if tenant_id not in self.tenant_roles:
                 self.tenant_roles[tenant_id] = []
+                self.tenant_permissions[tenant_id] = EffectivePermissions()
             
             if role_id not in self.tenant_roles[tenant_id]:
                 self.tenant_roles[tenant_id].append(role_id)
+                self.tenant_permissions[tenant_id].add(self._indexed_role_permissions[role_id])
             
             self.logger.info(f"Assigned role {role_id} to tenant {tenant_id}")
             return True
@@ -286,6 +398,20 @@ class AccessControlManager:
             self.logger.error(f"Error assigning role to tenant: {e}")
             return False
     
+    def remove_role_from_tenant(self, tenant_id: str, role_id: str) -> bool:
+        """Remove a role from a tenant."""
+        try:
+            if tenant_id in self.tenant_roles and role_id in self.tenant_roles[tenant_id]:
+                self.tenant_roles[tenant_id].remove(role_id)
+                self.tenant_permissions[tenant_id].remove(self._indexed_role_permissions.get(role_id, []))
+                self.logger.info(f"Removed role {role_id} from tenant {tenant_id}")
+                return True
+            return False
+            
+        except Exception as e:
+            self.logger.error(f"Error removing role from tenant: {e}")
+            return False
+    
     def get_user_roles(self, user_id: str) -> List[Role]:
         """Get all roles assigned to a user."""
         role_ids = self.user_roles.get(user_id, [])
@@ -296,24 +422,21 @@ class AccessControlManager:
         role_ids = self.tenant_roles.get(tenant_id, [])
         return [self.roles[role_id] for role_id in role_ids if role_id in self.roles]
     
+    def _effective_permissions(self, user_id: str, tenant_id: Optional[str]) -> List[EffectivePermissions]:
+        effective = []
+        if user_id in self.user_permissions:
+            effective.append(self.user_permissions[user_id])
+        if tenant_id and tenant_id in self.tenant_permissions:
+            effective.append(self.tenant_permissions[tenant_id])
+        return effective
+    
     def check_permission(self, user_id: str, resource_type: ResourceType, 
                         resource_id: str, permission_level: PermissionLevel,
                         tenant_id: Optional[str] = None) -> bool:
-        """Check if a user has a specific permission."""
+        """Check if a user has a specific permission (a "*" resource ID grants every resource)."""
         try:
-            # Get user roles
-            user_roles = self.get_user_roles(user_id)
-            
-            # Get tenant roles if tenant_id is provided
-            tenant_roles = []
-            if tenant_id:
-                tenant_roles = self.get_tenant_roles(tenant_id)
-            
-            # Check all roles for the permission
-            all_roles = user_roles + tenant_roles
-            
-            for role in all_roles:
-                if role.has_permission(resource_type, resource_id, permission_level):
+            for effective in self._effective_permissions(user_id, tenant_id):
+                if effective.allows(resource_type, resource_id, permission_level):
                     return True
             
             return False
@@ -322,26 +445,32 @@ class AccessControlManager:
             self.logger.error(f"Error checking permission: {e}")
             return False
     
-    def get_user_permissions(self, user_id: str, tenant_id: Optional[str] = None) -> List[Permission]:
-        """Get all permissions for a user."""
+    def check_permissions(self, user_id: str, resource_type: ResourceType,
+                          resource_ids: Iterable[str], permission_level: PermissionLevel,
+                          tenant_id: Optional[str] = None) -> Dict[str, bool]:
+        """Check one permission level for many resources of a type at once."""
         try:
-            permissions = []
+            resource_ids = list(resource_ids)
+            effective = self._effective_permissions(user_id, tenant_id)
+            if any((resource_type, WILDCARD_RESOURCE, permission_level) in e.grants for e in effective):
+                return {resource_id: True for resource_id in resource_ids}
             
-            # Get user roles
-            user_roles = self.get_user_roles(user_id)
-            for role in user_roles:
-                permissions.extend(role.permissions)
+            return {
+                resource_id: any((resource_type, resource_id, permission_level) in e.grants for e in effective)
+                for resource_id in resource_ids
+            }
             
-            # Get tenant roles if tenant_id is provided
-            if tenant_id:
-                tenant_roles = self.get_tenant_roles(tenant_id)
-                for role in tenant_roles:
-                    permissions.extend(role.permissions)
-            
-            # Remove duplicates based on permission ID
+        except Exception as e:
+            self.logger.error(f"Error checking permissions: {e}")
+            return {resource_id: False for resource_id in resource_ids}
+    
+    def get_user_permissions(self, user_id: str, tenant_id: Optional[str] = None) -> List[Permission]:
+        """Get all permissions for a user."""
+        try:
+            # Deduplicated by permission ID
             unique_permissions = {}
-            for perm in permissions:
-                unique_permissions[perm.id] = perm
+            for effective in self._effective_permissions(user_id, tenant_id):
+                unique_permissions.update(effective.permissions)
             
             return list(unique_permissions.values())
             
@@ -369,7 +498,7 @@ class AccessControlManager:
             permissions=owner_permissions,
             is_system_role=True
         )
-        self.roles[owner_role.id] = owner_role
+        self._register_role(owner_role)
         
         # Admin role - administrative access
         admin_permissions = [
@@ -395,7 +524,7 @@ class AccessControlManager:
             permissions=admin_permissions,
             is_system_role=True
         )
-        self.roles[admin_role.id] = admin_role
+        self._register_role(admin_role)
         
         # Analyst role - read and execute access
         analyst_permissions = [
@@ -421,7 +550,7 @@ class AccessControlManager:
             permissions=analyst_permissions,
             is_system_role=True
         )
-        self.roles[analyst_role.id] = analyst_role
+        self._register_role(analyst_role)
         
         # Viewer role - read-only access
         viewer_permissions = [
@@ -440,7 +569,7 @@ class AccessControlManager:
             permissions=viewer_permissions,
             is_system_role=True
         )
-        self.roles[viewer_role.id] = viewer_role
+        self._register_role(viewer_role)
         
         self.logger.info("Initialized default roles")
 
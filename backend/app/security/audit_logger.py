@@ -18,6 +18,7 @@ import base64
 import os
 
 from app.core.config import settings
+from .audit_store import AuditLogWriter, AuditCheckpoint, verify_merkle_proof, merkle_leaf
 
 
 class AuditEventType(str, Enum):
@@ -68,6 +69,24 @@ class AuditEvent:
     previous_hash: Optional[str] = None
     event_hash: Optional[str] = None
     signature: Optional[str] = None
+    sequence: Optional[int] = None
+    
+    def to_record(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable audit segment record."""
+        record = asdict(self)
+        record['event_type'] = self.event_type.value
+        record['timestamp'] = self.timestamp.isoformat()
+        record['compliance_frameworks'] = [framework.value for framework in self.compliance_frameworks]
+        return record
+    
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "AuditEvent":
+        """Rebuild an event from an audit segment record."""
+        values = dict(record)
+        values['event_type'] = AuditEventType(values['event_type'])
+        values['timestamp'] = datetime.fromisoformat(values['timestamp'])
+        values['compliance_frameworks'] = [ComplianceFramework(value) for value in values['compliance_frameworks']]
+        return cls(**values)
 
 
 class AuditLogger:
@@ -80,13 +99,32 @@ class AuditLogger:
     - Encryption for sensitive data
     - Compliance framework mapping
     - Automatic retention policies
+    - Batched background persistence with signed Merkle checkpoints
+    
+    Events are durable only with a log_dir; without one the writer keeps
+    the most recent segments in memory.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        log_dir: Optional[str] = None,
+        batch_size: int = 256,
+        checkpoint_interval: int = 1024,
+        max_queue_size: int = 10000,
+        fsync: bool = True
+    ):
         self.encryption_key = self._get_or_create_encryption_key()
         self.signing_key = self._get_or_create_signing_key()
         self.cipher = Fernet(self.encryption_key)
-        self.last_hash = self._get_last_hash()
+        self.writer = AuditLogWriter(
+            self._seal_event,
+            self._sign_event,
+            directory=log_dir,
+            batch_size=batch_size,
+            checkpoint_interval=checkpoint_interval,
+            max_queue_size=max_queue_size,
+            fsync=fsync
+        )
     
     def _get_or_create_encryption_key(self) -> bytes:
         """Get or create encryption key for audit log encryption."""
@@ -97,10 +135,10 @@ class AuditLogger:
         """Get or create HMAC signing key."""
         return settings.secret_key.encode()
     
-    def _get_last_hash(self) -> str:
-        """Get the hash of the last audit log entry for chain integrity."""
-        # In production, this would query the database for the latest hash
-        return "0" * 64  # Genesis hash
+    @property
+    def last_hash(self) -> str:
+        """Get the hash of the last written audit log entry for chain integrity."""
+        return self.writer.last_hash
     
     def _calculate_hash(self, event: AuditEvent) -> str:
         """Calculate SHA-256 hash of the event for tamper detection."""
@@ -173,7 +211,9 @@ class AuditLogger:
             risk_level: Risk level of the event
             
         Returns:
-            AuditEvent: The logged audit event
+            AuditEvent: The logged audit event. Its sequence, hashes and
+            signature are filled in by the background writer; call flush()
+            to wait for them.
         """
         
         # Create audit event
@@ -190,27 +230,33 @@ class AuditLogger:
             result=result,
             details=self._encrypt_sensitive_data(details),
             compliance_frameworks=compliance_frameworks or [ComplianceFramework.SOC2_TYPE_II],
-            risk_level=risk_level,
-            previous_hash=self.last_hash
+            risk_level=risk_level
         )
         
-        # Calculate hash and signature
-        event.event_hash = self._calculate_hash(event)
-        event.signature = self._sign_event(event.event_hash)
-        
-        # Update last hash for chain integrity
-        self.last_hash = event.event_hash
-        
-        # In production, this would persist to a secure audit database
+        # Hash chaining, signing and persistence happen in the background writer
         self._persist_audit_event(event)
         
         return event
     
     def _persist_audit_event(self, event: AuditEvent):
-        """Persist audit event to secure storage."""
-        # In production, this would write to a tamper-evident database
-        # with replication and backup
-        pass
+        """Queue an audit event for the append-only audit segments."""
+        self.writer.append(event)
+    
+    def _seal_event(self, event: AuditEvent, sequence: int, previous_hash: str) -> Dict[str, Any]:
+        """Link an event into the hash chain and sign it (called by the writer in log order)."""
+        event.sequence = sequence
+        event.previous_hash = previous_hash
+        event.event_hash = self._calculate_hash(event)
+        event.signature = self._sign_event(event.event_hash)
+        return event.to_record()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every event logged so far has been chained and written."""
+        return self.writer.flush(timeout)
+    
+    def close(self) -> None:
+        """Write pending events and stop the background writer."""
+        self.writer.close()
     
     def verify_audit_chain(self, events: List[AuditEvent]) -> bool:
         """
@@ -240,6 +286,68 @@ class AuditLogger:
         
         return True
     
+    def get_events(self, start: int, end: int) -> List[AuditEvent]:
+        """Read persisted events with start <= sequence < end."""
+        self.flush()
+        return [AuditEvent.from_record(record) for record in self.writer.read_range(start, end)]
+    
+    def get_inclusion_proof(self, sequence: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the Merkle inclusion proof of a checkpointed event.
+        
+        Returns:
+            Dict with the signed checkpoint and the proof, or None if the
+            event has not been sealed into a checkpoint yet
+        """
+        self.flush()
+        result = self.writer.inclusion_proof(sequence)
+        if result is None:
+            return None
+        checkpoint, proof = result
+        return {"checkpoint": checkpoint, "proof": proof}
+    
+    def verify_event_proof(self, event: AuditEvent, checkpoint: AuditCheckpoint, proof: List) -> bool:
+        """Verify one event against a signed checkpoint using O(log n) hashes."""
+        if not self.verify_audit_chain([event]):
+            return False
+        if not self.writer.verify_checkpoint(checkpoint):
+            return False
+        return verify_merkle_proof(event.event_hash, proof, checkpoint.root)
+    
+    def verify_range(self, start: int, end: int) -> bool:
+        """
+        Verify persisted events with start <= sequence < end.
+        
+        Events in the range are checked and linked to each other, and both
+        ends are anchored to their Merkle checkpoints (or to the writer's
+        open segment), so only the range is read instead of the whole chain.
+        """
+        events = self.get_events(start, end)
+        end = min(end, self.writer.next_sequence)
+        if len(events) != end - start or [event.sequence for event in events] != list(range(start, end)):
+            return False
+        if not events:
+            return True
+        if not self.verify_audit_chain(events):
+            return False
+        
+        for event in {events[0].sequence: events[0], events[-1].sequence: events[-1]}.values():
+            result = self.writer.inclusion_proof(event.sequence)
+            if result is not None:
+                checkpoint, proof = result
+                if not self.verify_event_proof(event, checkpoint, proof):
+                    return False
+                continue
+            
+            leaf = self.writer.open_leaf(event.sequence)
+            try:
+                if leaf is None or leaf != merkle_leaf(event.event_hash):
+                    return False
+            except ValueError:
+                return False
+        
+        return True
+    
     def get_compliance_report(
         self,
         framework: ComplianceFramework,
@@ -276,7 +384,13 @@ class AuditLogger:
 
 
 # Global audit logger instance
-audit_logger = AuditLogger()
+audit_logger = AuditLogger(
+    log_dir=settings.audit_log_dir,
+    batch_size=settings.audit_log_batch_size,
+    checkpoint_interval=settings.audit_log_checkpoint_interval,
+    max_queue_size=settings.audit_log_max_queue_size,
+    fsync=settings.audit_log_fsync
+)
 
 
 def audit_api_access(
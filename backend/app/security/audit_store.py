@@ -0,0 +1,531 @@
+"""
+Audit Log Storage
+Append-only audit segments written in batches, sealed with signed Merkle checkpoints.
+"""
+
+import os
+import json
+import hmac
+import queue
+import atexit
+import bisect
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GENESIS_HASH = "0" * 64
+
+
+class AuditWriteError(Exception):
+    """Raised when audit events cannot be made durable."""
+    pass
+
+
+def merkle_leaf(event_hash: str) -> bytes:
+    """Hash an event hash into a Merkle leaf."""
+    return hashlib.sha256(b"\x00" + bytes.fromhex(event_hash)).digest()
+
+
+def _merkle_parent(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _merkle_level_up(level: List[bytes]) -> List[bytes]:
+    parents = [_merkle_parent(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        # An unpaired node is promoted unchanged
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(leaves: List[bytes]) -> str:
+    """Compute the Merkle root of a list of leaves."""
+    if not leaves:
+        return hashlib.sha256(b"").hexdigest()
+    
+    level = leaves
+    while len(level) > 1:
+        level = _merkle_level_up(level)
+    return level[0].hex()
+
+
+def merkle_proof(leaves: List[bytes], index: int) -> List[Tuple[str, str]]:
+    """Get the (side, sibling hash) pairs linking a leaf to the root."""
+    proof = []
+    level = leaves
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(("left" if sibling < index else "right", level[sibling].hex()))
+        level = _merkle_level_up(level)
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(event_hash: str, proof: List[Tuple[str, str]], root: str) -> bool:
+    """Check that an event hash is a leaf under root, using O(log n) hashes."""
+    try:
+        node = merkle_leaf(event_hash)
+        for side, sibling in proof:
+            sibling_hash = bytes.fromhex(sibling)
+            node = _merkle_parent(sibling_hash, node) if side == "left" else _merkle_parent(node, sibling_hash)
+    except (TypeError, ValueError):
+        return False
+    return hmac.compare_digest(node.hex(), root)
+
+
+@dataclass
+class AuditCheckpoint:
+    """Signed Merkle root over one sealed audit segment."""
+    
+    index: int
+    first_sequence: int
+    event_count: int
+    root: str
+    last_hash: str
+    created_at: str
+    signature: str = ""
+    
+    def signing_payload(self) -> str:
+        """Get the string covered by the checkpoint signature."""
+        return f"{self.index}:{self.first_sequence}:{self.event_count}:{self.root}:{self.last_hash}"
+
+
+def _read_jsonl(path: str, repair: bool = False) -> List[Dict[str, Any]]:
+    """Read JSON lines, skipping corrupt lines and (optionally) truncating a torn final write."""
+    if not os.path.exists(path):
+        return []
+    
+    with open(path, "rb") as f:
+        data = f.read()
+    
+    records = []
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            logger.warning(f"Skipping corrupt audit record in {path} at byte {offset}")
+        offset += len(line)
+    
+    if repair and offset < len(data):
+        logger.warning(f"Truncating incomplete audit record at the end of {path}")
+        with open(path, "r+b") as f:
+            f.truncate(offset)
+    return records
+
+
+class AuditLogWriter:
+    """
+    Background writer for the audit hash chain.
+    
+    Callers enqueue events and return immediately. A writer thread drains
+    the queue in batches, chains and signs each event through seal_event,
+    and appends the batch to the open segment with one write and fsync.
+    Every checkpoint_interval events the segment is sealed with a signed
+    Merkle root, so an event can be proven against its checkpoint with
+    O(log n) hashes instead of replaying the chain.
+    
+    The chain head only advances once a batch is on disk. A failed write
+    is retried write_retries times; if it still fails, the batch is kept
+    and written first on every later attempt. While events are held back,
+    flush() returns False, and append() raises AuditWriteError once
+    max_queue_size events are waiting. Without a directory the most recent
+    segments are kept in memory only, which is not durable.
+    """
+    
+    def __init__(
+        self,
+        seal_event: Callable[[Any, int, str], Dict[str, Any]],
+        sign: Callable[[str], str],
+        directory: Optional[str] = None,
+        batch_size: int = 256,
+        checkpoint_interval: int = 1024,
+        max_queue_size: int = 10000,
+        fsync: bool = True,
+        memory_segments: int = 64,
+        write_retries: int = 3,
+        retry_interval: float = 1.0
+    ):
+        self.seal_event = seal_event
+        self.sign = sign
+        self.directory = directory
+        self.batch_size = batch_size
+        self.checkpoint_interval = checkpoint_interval
+        self.fsync = fsync
+        self.memory_segments = memory_segments
+        self.max_queue_size = max_queue_size
+        self.write_retries = write_retries
+        self.retry_interval = retry_interval
+        
+        self.last_hash = GENESIS_HASH
+        self.next_sequence = 0
+        self.checkpoints: List[AuditCheckpoint] = []
+        self._checkpoint_starts: List[int] = []
+        self._open_leaves: List[bytes] = []
+        self._segments: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self._segment_file = None
+        # Events not yet on disk, in log order, and the error that held them back
+        self._unwritten: List[Any] = []
+        self.write_error: Optional[Exception] = None
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._write_lock = threading.RLock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {
+            "appended": 0,
+            "written": 0,
+            "batches": 0,
+            "checkpoints": 0,
+            "inline_events": 0,
+            "write_errors": 0
+        }
+        
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._recover()
+    
+    @property
+    def open_segment(self) -> int:
+        """Index of the segment currently being written."""
+        return len(self.checkpoints)
+    
+    @property
+    def open_segment_start(self) -> int:
+        """Sequence number of the first event in the open segment."""
+        return self.next_sequence - len(self._open_leaves)
+    
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"segment-{index:08d}.jsonl")
+    
+    def _checkpoints_path(self) -> str:
+        return os.path.join(self.directory, "checkpoints.jsonl")
+    
+    def _recover(self) -> None:
+        """Restore the chain head and open segment from disk."""
+        for record in _read_jsonl(self._checkpoints_path(), repair=True):
+            self._add_checkpoint(AuditCheckpoint(**record))
+        if self.checkpoints:
+            last = self.checkpoints[-1]
+            self.next_sequence = last.first_sequence + last.event_count
+            self.last_hash = last.last_hash
+        
+        for record in _read_jsonl(self._segment_path(self.open_segment), repair=True):
+            self._open_leaves.append(merkle_leaf(record["event_hash"]))
+            self.last_hash = record["event_hash"]
+            self.next_sequence = record["sequence"] + 1
+        
+        if len(self._open_leaves) >= self.checkpoint_interval:
+            # The segment was filled but the process stopped before sealing it
+            self._seal_segment()
+    
+    def _add_checkpoint(self, checkpoint: AuditCheckpoint) -> None:
+        self.checkpoints.append(checkpoint)
+        self._checkpoint_starts.append(checkpoint.first_sequence)
+    
+    # Writing
+    
+    def append(self, event: Any) -> None:
+        """Queue an event for chaining and persistence without waiting."""
+        if len(self._unwritten) >= self.max_queue_size:
+            raise AuditWriteError(f"Audit log is not writable: {self.write_error}")
+        self.stats["appended"] += 1
+        if self._closed:
+            self._write_inline([event])
+            return
+        
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Backpressure: the caller pays for writing its own event
+            self._write_inline([event])
+    
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+    
+    def _write_inline(self, events: List[Any]) -> None:
+        self.stats["inline_events"] += len(events)
+        self._write_batch(events)
+    
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                # Retry held-back events even when nothing new is logged
+                item = self._queue.get(timeout=self.retry_interval if self._unwritten else None)
+            except queue.Empty:
+                self._write_batch([])
+                continue
+            batch = []
+            markers = []
+            while True:
+                if item is None:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            if batch or self._unwritten:
+                self._write_batch(batch)
+            for marker in markers:
+                marker.set()
+    
+    def _write_batch(self, events: List[Any]) -> None:
+        """Chain, sign and store a batch of events in queue order."""
+        with self._write_lock:
+            events = self._unwritten + list(events)
+            self._unwritten = []
+            written = 0
+            try:
+                if len(self._open_leaves) >= self.checkpoint_interval:
+                    # A checkpoint that failed to write earlier
+                    self._seal_segment()
+                
+                while written < len(events):
+                    records, consumed = self._seal_records(events[written:])
+                    self._store(records)
+                    self._commit(records)
+                    written += consumed
+                    if len(self._open_leaves) >= self.checkpoint_interval:
+                        self._seal_segment()
+            except Exception as e:
+                self.stats["write_errors"] += 1
+                self._unwritten = events[written:]
+                self.write_error = e
+                logger.critical(f"Audit log write failed; {len(self._unwritten)} events are not yet durable: {e}")
+            else:
+                self.write_error = None
+            
+            self.stats["written"] += written
+            self.stats["batches"] += 1
+    
+    def _seal_records(self, events: List[Any]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Chain and sign events up to the end of the open segment, without
+        advancing the chain head. Returns the records and how many events
+        they used up (events that fail to seal are skipped).
+        """
+        records = []
+        consumed = 0
+        last_hash = self.last_hash
+        sequence = self.next_sequence
+        room = self.checkpoint_interval - len(self._open_leaves)
+        for event in events:
+            if len(records) >= room:
+                break
+            consumed += 1
+            try:
+                record = self.seal_event(event, sequence, last_hash)
+            except Exception as e:
+                self.stats["write_errors"] += 1
+                logger.error(f"Error sealing audit event: {e}")
+                continue
+            records.append(record)
+            last_hash = record["event_hash"]
+            sequence += 1
+        return records, consumed
+    
+    def _commit(self, records: List[Dict[str, Any]]) -> None:
+        """Advance the chain head over stored records."""
+        for record in records:
+            self.last_hash = record["event_hash"]
+            self.next_sequence = record["sequence"] + 1
+            self._open_leaves.append(merkle_leaf(record["event_hash"]))
+    
+    def _retrying(self, operation: Callable[[], None], description: str) -> None:
+        """Run a write, retrying with exponential backoff; the last error is raised."""
+        for attempt in range(self.write_retries + 1):
+            try:
+                operation()
+                return
+            except Exception as e:
+                if attempt == self.write_retries:
+                    raise
+                logger.warning(f"Error writing {description} (attempt {attempt + 1}): {e}")
+                time.sleep(min(0.05 * 2 ** attempt, 1.0))
+    
+    def _store(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        
+        if self.directory is None:
+            self._segments.setdefault(self.open_segment, []).extend(records)
+            while len(self._segments) > self.memory_segments:
+                self._segments.popitem(last=False)
+            return
+        
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records).encode("utf-8")
+        self._retrying(lambda: self._append_segment(data), f"audit segment {self.open_segment}")
+    
+    def _append_segment(self, data: bytes) -> None:
+        if self._segment_file is None:
+            self._segment_file = open(self._segment_path(self.open_segment), "ab")
+        start = self._segment_file.tell()
+        try:
+            self._segment_file.write(data)
+            self._segment_file.flush()
+            if self.fsync:
+                os.fsync(self._segment_file.fileno())
+        except Exception:
+            # Cut off whatever part of the batch reached the file before retrying
+            self._segment_file.close()
+            self._segment_file = None
+            try:
+                os.truncate(self._segment_path(self.open_segment), start)
+            except OSError as e:
+                logger.error(f"Error truncating audit segment {self.open_segment}: {e}")
+            raise
+    
+    def _seal_segment(self) -> None:
+        """Write a signed Merkle checkpoint for the open segment and start a new one."""
+        checkpoint = AuditCheckpoint(
+            index=self.open_segment,
+            first_sequence=self.open_segment_start,
+            event_count=len(self._open_leaves),
+            root=merkle_root(self._open_leaves),
+            last_hash=self.last_hash,
+            created_at=datetime.now(timezone.utc).isoformat()
+        )
+        checkpoint.signature = self.sign(checkpoint.signing_payload())
+        
+        if self.directory is not None:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            line = (json.dumps(asdict(checkpoint), separators=(",", ":")) + "\n").encode("utf-8")
+            self._retrying(lambda: self._append_checkpoint(line), f"audit checkpoint {checkpoint.index}")
+        
+        self._add_checkpoint(checkpoint)
+        self._open_leaves = []
+        self.stats["checkpoints"] += 1
+    
+    def _append_checkpoint(self, line: bytes) -> None:
+        path = self._checkpoints_path()
+        with open(path, "ab") as f:
+            start = f.tell()
+            try:
+                f.write(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            except Exception:
+                f.truncate(start)
+                raise
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every event queued so far has been written; False if any is not durable yet."""
+        if self._thread is None or not self._thread.is_alive():
+            return not self._unwritten
+        marker = threading.Event()
+        self._queue.put(marker)
+        return marker.wait(timeout) and not self._unwritten
+    
+    def close(self) -> None:
+        """Write queued events, stop the writer thread and close the open segment."""
+        if self._closed:
+            return
+        
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        
+        # Events queued while shutting down
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not None:
+                leftover.append(item)
+        if leftover or self._unwritten:
+            self._write_inline(leftover)
+        
+        with self._write_lock:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+        
+        if self._unwritten:
+            raise AuditWriteError(f"{len(self._unwritten)} audit events were not written: {self.write_error}")
+    
+    # Reading and proofs
+    
+    def read_segment(self, index: int) -> List[Dict[str, Any]]:
+        """Read the records stored in a segment."""
+        if self.directory is None:
+            return list(self._segments.get(index, []))
+        return _read_jsonl(self._segment_path(index))
+    
+    def _segment_for(self, sequence: int) -> int:
+        if sequence >= self.open_segment_start:
+            return self.open_segment
+        return bisect.bisect_right(self._checkpoint_starts, sequence) - 1
+    
+    def read_range(self, start: int, end: int) -> List[Dict[str, Any]]:
+        """Read the records with start <= sequence < end."""
+        end = min(end, self.next_sequence)
+        if start >= end:
+            return []
+        
+        records = []
+        for index in range(self._segment_for(start), self._segment_for(end - 1) + 1):
+            records.extend(
+                record for record in self.read_segment(index)
+                if start <= record.get("sequence", -1) < end
+            )
+        return records
+    
+    def verify_checkpoint(self, checkpoint: AuditCheckpoint) -> bool:
+        """Check a checkpoint's signature."""
+        return hmac.compare_digest(self.sign(checkpoint.signing_payload()), checkpoint.signature)
+    
+    def inclusion_proof(self, sequence: int) -> Optional[Tuple[AuditCheckpoint, List[Tuple[str, str]]]]:
+        """Get the checkpoint and Merkle proof for a sealed event, or None if it is not sealed or stored."""
+        if sequence < 0 or sequence >= self.open_segment_start:
+            return None
+        
+        checkpoint = self.checkpoints[self._segment_for(sequence)]
+        records = self.read_segment(checkpoint.index)
+        if len(records) != checkpoint.event_count:
+            return None
+        try:
+            leaves = [merkle_leaf(record["event_hash"]) for record in records]
+        except (KeyError, TypeError, ValueError):
+            return None
+        return checkpoint, merkle_proof(leaves, sequence - checkpoint.first_sequence)
+    
+    def open_leaf(self, sequence: int) -> Optional[bytes]:
+        """Get the in-memory Merkle leaf of an event in the open segment."""
+        offset = sequence - self.open_segment_start
+        if 0 <= offset < len(self._open_leaves):
+            return self._open_leaves[offset]
+        return None
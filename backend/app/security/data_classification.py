@@ -5,7 +5,7 @@ Data sensitivity classification and handling for compliance and security.
 
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple, Iterable, Pattern
 from dataclasses import dataclass, field
 from enum import Enum
 import re
@@ -137,19 +137,184 @@ class DataClassification:
         return classification
 
 
+class PatternScanner:
+    """
+    Precompiled scanner over a set of data patterns.
+    
+    Patterns are combined into a single alternation of named lookahead
+    groups, so the content is walked once and every position where any
+    pattern matches is reported with its offsets. Patterns that cannot be
+    embedded in the alternation (e.g. ones using backreferences or inline
+    global flags) are scanned on their own.
+    """
+    
+    def __init__(self, patterns: List[DataPattern]):
+        self.patterns: List[DataPattern] = []
+        self.compiled: List[Pattern] = []
+        self.combined: Optional[Pattern] = None
+        self.standalone: List[int] = []
+        self.errors: Dict[str, str] = {}
+        
+        alternatives = []
+        for pattern in patterns:
+            try:
+                compiled = re.compile(pattern.pattern, re.IGNORECASE)
+            except re.error as e:
+                self.errors[pattern.id] = str(e)
+                logger.error(f"Invalid data pattern {pattern.name}: {e}")
+                continue
+            
+            index = len(self.patterns)
+            self.patterns.append(pattern)
+            self.compiled.append(compiled)
+            if self._can_combine(pattern.pattern):
+                alternatives.append((index, pattern.pattern))
+            else:
+                self.standalone.append(index)
+        
+        # Patterns starting at a word boundary share a single \b test, which
+        # lets the engine skip most positions before trying any alternative
+        bounded = [(index, text[2:]) for index, text in alternatives if self._starts_with_boundary(text)]
+        unbounded = [(index, text) for index, text in alternatives if not self._starts_with_boundary(text)]
+        
+        self._combined_order: List[int] = [index for index, _ in bounded + unbounded]
+        self._combined_rank = {index: rank for rank, index in enumerate(self._combined_order)}
+        branches = []
+        for prefix, group in (("\\b", bounded), ("", unbounded)):
+            if group:
+                source = "|".join(f"(?P<_p{index}>{text})" for index, text in group)
+                branches.append(f"{prefix}(?=(?:{source}))")
+        if branches:
+            try:
+                self.combined = re.compile("|".join(branches), re.IGNORECASE)
+            except re.error:
+                # Conflicting group names between patterns; scan individually
+                self.standalone.extend(self._combined_order)
+                self.standalone.sort()
+                self._combined_order = []
+    
+    @staticmethod
+    def _starts_with_boundary(text: str) -> bool:
+        """Check whether every branch of a pattern starts with a word boundary."""
+        if not text.startswith("\\b"):
+            return False
+        
+        # A top-level alternation would not be covered by the leading \b
+        depth = 0
+        in_class = False
+        escaped = False
+        for char in text:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif in_class:
+                in_class = char != "]"
+            elif char == "[":
+                in_class = True
+            elif char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif char == "|" and depth == 0:
+                return False
+        return True
+    
+    @staticmethod
+    def _can_combine(text: str) -> bool:
+        if re.search(r"\\[1-9]|\(\?P=", text):
+            return False
+        try:
+            re.compile(f"(?:{text})")
+        except re.error:
+            return False
+        return True
+    
+    def scan(self, content: str, state: "PatternScanState", offset: int = 0, start: int = 0, end: Optional[int] = None) -> None:
+        """
+        Record matches starting in content[start:end] into the scan state.
+        
+        Args:
+            content: Text window to scan
+            state: Scan state accumulating matches across windows
+            offset: Position of content[0] in the whole document
+            start: First position in the window to report matches for
+            end: Position in the window at which to stop reporting matches
+        """
+        if end is None:
+            end = len(content) + 1
+        
+        if self.combined is not None:
+            for match in self.combined.finditer(content, start):
+                position = match.start()
+                if position >= end:
+                    break
+                
+                first = int(match.lastgroup[2:])
+                state.record(first, offset + position, offset + match.end(match.lastgroup))
+                
+                # Alternatives before the first match failed here; try the rest
+                for index in self._combined_order[self._combined_rank[first] + 1:]:
+                    if state.is_covered(index, offset + position):
+                        continue
+                    other = self.compiled[index].match(content, position)
+                    if other is not None:
+                        state.record(index, offset + position, offset + other.end())
+        
+        for index in self.standalone:
+            compiled = self.compiled[index]
+            position = max(start, state.next_position(index) - offset)
+            while position <= len(content):
+                match = compiled.search(content, position)
+                if match is None or match.start() >= end:
+                    break
+                state.record(index, offset + match.start(), offset + match.end())
+                position = max(match.end(), match.start() + 1)
+
+
+class PatternScanState:
+    """Matches collected by a PatternScanner, in document offsets."""
+    
+    def __init__(self, pattern_count: int, max_offsets: int = 100):
+        self.max_offsets = max_offsets
+        self.counts = [0] * pattern_count
+        self.offsets: List[List[Tuple[int, int]]] = [[] for _ in range(pattern_count)]
+        self._last_end = [-1] * pattern_count
+    
+    def next_position(self, index: int) -> int:
+        """Get the first position a new match of a pattern may start at."""
+        return max(0, self._last_end[index])
+    
+    def is_covered(self, index: int, position: int) -> bool:
+        """Check whether a position lies inside the previous match of a pattern."""
+        return position < self._last_end[index]
+    
+    def record(self, index: int, start: int, end: int) -> None:
+        """Record a match unless it overlaps the pattern's previous match."""
+        if self.is_covered(index, start):
+            return
+        self.counts[index] += 1
+        if len(self.offsets[index]) < self.max_offsets:
+            self.offsets[index].append((start, end))
+        self._last_end[index] = end if end > start else start + 1
+
+
 class DataClassifier:
     """Classifies data based on sensitivity and compliance requirements."""
     
-    def __init__(self):
+    def __init__(self, stream_overlap: int = 256):
         self.patterns: List[DataPattern] = []
+        self.stream_overlap = stream_overlap
         self.logger = logging.getLogger(__name__)
         
         # Initialize default patterns
         self._initialize_default_patterns()
+        self._scanner = PatternScanner(self.patterns)
     
     def add_pattern(self, pattern: DataPattern) -> None:
         """Add a data pattern for classification."""
         self.patterns.append(pattern)
+        self._scanner = PatternScanner(self.patterns)
         self.logger.info(f"Added data pattern: {pattern.name}")
     
     def remove_pattern(self, pattern_id: str) -> bool:
@@ -157,6 +322,7 @@ class DataClassifier:
         for i, pattern in enumerate(self.patterns):
             if pattern.id == pattern_id:
                 del self.patterns[i]
+                self._scanner = PatternScanner(self.patterns)
                 self.logger.info(f"Removed data pattern: {pattern.name}")
                 return True
         return False
@@ -164,48 +330,130 @@ class DataClassifier:
     def classify_data(self, content: str, data_id: str = "") -> DataClassification:
         """Classify data based on content analysis."""
         try:
-            patterns_found = []
-            categories = set()
-            compliance_frameworks = set()
-            max_sensitivity = DataSensitivityLevel.PUBLIC
+            scanner = self._scanner
+            state = PatternScanState(len(scanner.patterns))
+            
+            # Analyze content against all patterns in a single pass
+            scanner.scan(content, state)
             
-            # Analyze content against patterns
-            for pattern in self.patterns:
-                if re.search(pattern.pattern, content, re.IGNORECASE):
-                    patterns_found.append(pattern)
-                    categories.add(pattern.category)
-                    compliance_frameworks.update(pattern.compliance_frameworks)
-                    
-                    # Update sensitivity level
-                    if self._get_sensitivity_level_value(pattern.sensitivity_level) > self._get_sensitivity_level_value(max_sensitivity):
-                        max_sensitivity = pattern.sensitivity_level
+            classification = self._build_classification(scanner, state, data_id)
+            classification.content = content
             
-            # Calculate confidence score
-            confidence_score = min(1.0, len(patterns_found) * 0.3)
+            self.logger.info(f"Classified data {data_id} as {classification.sensitivity_level.value}")
+            return classification
             
-            classification = DataClassification(
+        except Exception as e:
+            self.logger.error(f"Error classifying data: {e}")
+            # Return default classification
+            return DataClassification(
                 data_id=data_id,
                 content=content,
-                sensitivity_level=max_sensitivity,
-                categories=list(categories),
-                patterns_found=patterns_found,
-                compliance_frameworks=list(compliance_frameworks),
-                confidence_score=confidence_score
+                sensitivity_level=DataSensitivityLevel.PUBLIC,
+                confidence_score=0.0
             )
+    
+    def classify_stream(self, chunks: Iterable[str], data_id: str = "", overlap: Optional[int] = None) -> DataClassification:
+        """
+        Classify a large document chunk by chunk without holding the whole text.
+        
+        Consecutive windows overlap so matches spanning chunk boundaries are
+        found exactly once. The overlap should exceed the longest expected
+        match; the classification does not include the content.
+        
+        Args:
+            chunks: Iterable of text chunks in document order
+            data_id: Identifier of the classified data
+            overlap: Characters of context kept between windows
+        
+        Returns:
+            DataClassification for the whole document
+        """
+        overlap = self.stream_overlap if overlap is None else overlap
+        try:
+            scanner = self._scanner
+            state = PatternScanState(len(scanner.patterns))
+            window = ""
+            window_offset = 0
+            scanned_until = 0
+            content_length = 0
+            
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                window += chunk
+                content_length += len(chunk)
+                
+                # Matches starting in the last `overlap` characters are left for
+                # the next window, which sees what follows them
+                safe_end = len(window) - overlap
+                if safe_end <= scanned_until:
+                    continue
+                scanner.scan(window, state, window_offset, scanned_until, safe_end)
+                
+                # Keep trailing context so boundaries like \b still see the
+                # preceding characters
+                keep_from = max(0, safe_end - overlap)
+                window = window[keep_from:]
+                window_offset += keep_from
+                scanned_until = safe_end - keep_from
             
-            self.logger.info(f"Classified data {data_id} as {max_sensitivity.value}")
+            scanner.scan(window, state, window_offset, scanned_until)
+            
+            classification = self._build_classification(scanner, state, data_id)
+            classification.metadata["streamed"] = True
+            classification.metadata["content_length"] = content_length
+            
+            self.logger.info(f"Classified streamed data {data_id} as {classification.sensitivity_level.value}")
             return classification
             
         except Exception as e:
-            self.logger.error(f"Error classifying data: {e}")
-            # Return default classification
+            self.logger.error(f"Error classifying streamed data: {e}")
             return DataClassification(
                 data_id=data_id,
-                content=content,
                 sensitivity_level=DataSensitivityLevel.PUBLIC,
                 confidence_score=0.0
             )
     
+    def _build_classification(self, scanner: PatternScanner, state: PatternScanState, data_id: str) -> DataClassification:
+        """Build a classification from collected pattern matches."""
+        patterns_found = []
+        categories = set()
+        compliance_frameworks = set()
+        max_sensitivity = DataSensitivityLevel.PUBLIC
+        match_offsets = {}
+        
+        for index, pattern in enumerate(scanner.patterns):
+            if not state.counts[index]:
+                continue
+            
+            patterns_found.append(pattern)
+            categories.add(pattern.category)
+            compliance_frameworks.update(pattern.compliance_frameworks)
+            match_offsets[pattern.id] = [list(span) for span in state.offsets[index]]
+            
+            # Update sensitivity level
+            if self._get_sensitivity_level_value(pattern.sensitivity_level) > self._get_sensitivity_level_value(max_sensitivity):
+                max_sensitivity = pattern.sensitivity_level
+        
+        # Calculate confidence score
+        confidence_score = min(1.0, len(patterns_found) * 0.3)
+        
+        return DataClassification(
+            data_id=data_id,
+            sensitivity_level=max_sensitivity,
+            categories=list(categories),
+            patterns_found=patterns_found,
+            compliance_frameworks=list(compliance_frameworks),
+            confidence_score=confidence_score,
+            metadata={
+                "match_offsets": match_offsets,
+                "match_counts": {
+                    scanner.patterns[index].id: count
+                    for index, count in enumerate(state.counts) if count
+                }
+            }
+        )
+    
     def get_handling_requirements(self, classification: DataClassification) -> Dict[str, Any]:
         """Get handling requirements for classified data."""
         requirements = {
@@ -6,13 +6,18 @@ Advanced encryption and key management for data at rest and in transit.
 import os
 import base64
 import json
-from typing import Dict, Any, Optional, Tuple, List
+import time
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, List, BinaryIO, Union
 from datetime import datetime, timezone, timedelta
 from cryptography.fernet import Fernet
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
 import secrets
 
@@ -29,6 +34,28 @@ class EncryptionAlgorithm:
     RSA_4096 = "rsa-4096"
 
 
+# Chunked streaming AEAD format: header = magic, chunk size, nonce prefix;
+# then length-prefixed chunks sealed under nonce = prefix + counter + last flag
+STREAM_MAGIC = b"XRS1"
+STREAM_NONCE_PREFIX_SIZE = 7
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_TAG_SIZE = 16
+
+
+def _stream_nonce(prefix: bytes, counter: int, last: bool) -> bytes:
+    return prefix + struct.pack(">IB", counter, 1 if last else 0)
+
+
+def _read_exactly(source: BinaryIO, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = source.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
 class KeyRotationStatus:
     """Key rotation status tracking."""
     ACTIVE = "active"
@@ -47,12 +74,20 @@ class EncryptionService:
     - Hardware Security Module (HSM) ready
     - Audit logging for all operations
     - FIPS 140-2 Level 3 compliance ready
+    - Bounded TTL cache of unwrapped data encryption keys
+    - Batch and chunked streaming encryption
     """
     
-    def __init__(self):
+    def __init__(self, dek_cache_size: int = 256, dek_cache_ttl_seconds: float = 300.0):
         self.master_key = self._get_or_create_master_key()
+        self.master_cipher = Fernet(base64.urlsafe_b64encode(self.master_key[:32]))
         self.data_encryption_keys: Dict[str, Dict[str, Any]] = {}
         self.key_rotation_schedule = self._load_rotation_schedule()
+        self.dek_cache_size = dek_cache_size
+        self.dek_cache_ttl_seconds = dek_cache_ttl_seconds
+        self._dek_cache: "OrderedDict[str, Tuple[float, Union[AESGCM, Fernet]]]" = OrderedDict()
+        self._dek_cache_lock = threading.Lock()
+        self.dek_cache_stats = {"hits": 0, "misses": 0}
     
     def _get_or_create_master_key(self) -> bytes:
         """Get or create master encryption key."""
@@ -149,6 +184,7 @@ class EncryptionService:
         # Encrypt the key with master key
         encrypted_key = self._encrypt_with_master_key(key)
         
+        self.invalidate_key_cache(key_id)
         self.data_encryption_keys[key_id] = {
             "encrypted_key": encrypted_key,
             "algorithm": algorithm,
@@ -177,15 +213,79 @@ class EncryptionService:
     def _encrypt_with_master_key(self, data: bytes) -> str:
         """Encrypt data with master key."""
         # Use Fernet for master key encryption
-        f = Fernet(base64.urlsafe_b64encode(self.master_key[:32]))
-        encrypted = f.encrypt(data)
+        encrypted = self.master_cipher.encrypt(data)
         return base64.b64encode(encrypted).decode()
     
     def _decrypt_with_master_key(self, encrypted_data: str) -> bytes:
         """Decrypt data with master key."""
-        f = Fernet(base64.urlsafe_b64encode(self.master_key[:32]))
         encrypted_bytes = base64.b64decode(encrypted_data.encode())
-        return f.decrypt(encrypted_bytes)
+        return self.master_cipher.decrypt(encrypted_bytes)
+    
+    def _get_key_cipher(self, key_id: str) -> Tuple[Dict[str, Any], Union[AESGCM, Fernet]]:
+        """Get a key's metadata and its unwrapped cipher, using the DEK cache."""
+        if key_id not in self.data_encryption_keys:
+            raise ValueError(f"Unknown key ID: {key_id}")
+        
+        key_info = self.data_encryption_keys[key_id]
+        now = time.monotonic()
+        with self._dek_cache_lock:
+            cached = self._dek_cache.get(key_id)
+            if cached is not None and cached[0] > now:
+                self._dek_cache.move_to_end(key_id)
+                self.dek_cache_stats["hits"] += 1
+                return key_info, cached[1]
+        
+        algorithm = key_info["algorithm"]
+        key = self._decrypt_with_master_key(key_info["encrypted_key"])
+        if algorithm == EncryptionAlgorithm.AES_256_GCM:
+            cipher = AESGCM(key)
+        elif algorithm == EncryptionAlgorithm.FERNET:
+            cipher = Fernet(key)
+        else:
+            raise ValueError(f"Encryption not implemented for: {algorithm}")
+        
+        with self._dek_cache_lock:
+            self.dek_cache_stats["misses"] += 1
+            if self.dek_cache_size > 0:
+                self._dek_cache[key_id] = (now + self.dek_cache_ttl_seconds, cipher)
+                self._dek_cache.move_to_end(key_id)
+                while len(self._dek_cache) > self.dek_cache_size:
+                    self._dek_cache.popitem(last=False)
+        return key_info, cipher
+    
+    def invalidate_key_cache(self, key_id: Optional[str] = None) -> None:
+        """Drop one unwrapped key (or all of them) from the DEK cache."""
+        with self._dek_cache_lock:
+            if key_id is None:
+                self._dek_cache.clear()
+            else:
+                self._dek_cache.pop(key_id, None)
+    
+    @staticmethod
+    def _encrypt_with_cipher(cipher: Union[AESGCM, Fernet], data: bytes,
+                             additional_data: Optional[bytes]) -> Tuple[str, str]:
+        if isinstance(cipher, Fernet):
+            return cipher.encrypt(data).decode(), ""  # Fernet includes nonce in output
+        
+        nonce = os.urandom(12)  # 96-bit nonce for GCM
+        sealed = cipher.encrypt(nonce, data, additional_data or None)
+        
+        # Combine nonce, tag, and ciphertext
+        combined = nonce + sealed[-STREAM_TAG_SIZE:] + sealed[:-STREAM_TAG_SIZE]
+        return base64.b64encode(combined).decode(), base64.b64encode(nonce).decode()
+    
+    @staticmethod
+    def _decrypt_with_cipher(cipher: Union[AESGCM, Fernet], encrypted_data: str,
+                             additional_data: Optional[bytes]) -> bytes:
+        if isinstance(cipher, Fernet):
+            return cipher.decrypt(encrypted_data.encode())
+        
+        # Decode the combined data
+        combined_data = base64.b64decode(encrypted_data.encode())
+        nonce_bytes = combined_data[:12]
+        tag = combined_data[12:28]
+        ciphertext = combined_data[28:]
+        return cipher.decrypt(nonce_bytes, ciphertext + tag, additional_data or None)
     
     def encrypt_data(
         self,
@@ -204,39 +304,8 @@ class EncryptionService:
         Returns:
             Tuple[str, str]: (encrypted_data, nonce/iv)
         """
-        if key_id not in self.data_encryption_keys:
-            raise ValueError(f"Unknown key ID: {key_id}")
-        
-        key_info = self.data_encryption_keys[key_id]
-        key = self._decrypt_with_master_key(key_info["encrypted_key"])
-        algorithm = key_info["algorithm"]
-        
-        if algorithm == EncryptionAlgorithm.AES_256_GCM:
-            # AES-256-GCM encryption
-            nonce = os.urandom(12)  # 96-bit nonce for GCM
-            cipher = Cipher(
-                algorithms.AES(key),
-                modes.GCM(nonce),
-                backend=default_backend()
-            )
-            encryptor = cipher.encryptor()
-            
-            if additional_data:
-                encryptor.authenticate_additional_data(additional_data)
-            
-            ciphertext = encryptor.update(data) + encryptor.finalize()
-            
-            # Combine nonce, tag, and ciphertext
-            encrypted_data = base64.b64encode(nonce + encryptor.tag + ciphertext).decode()
-            nonce_b64 = base64.b64encode(nonce).decode()
-            
-        elif algorithm == EncryptionAlgorithm.FERNET:
-            f = Fernet(key)
-            encrypted_data = f.encrypt(data).decode()
-            nonce_b64 = ""  # Fernet includes nonce in output
-            
-        else:
-            raise ValueError(f"Encryption not implemented for: {algorithm}")
+        key_info, cipher = self._get_key_cipher(key_id)
+        encrypted_data, nonce_b64 = self._encrypt_with_cipher(cipher, data, additional_data)
         
         # Update usage count
         key_info["usage_count"] += 1
@@ -262,40 +331,164 @@ class EncryptionService:
         Returns:
             bytes: Decrypted data
         """
-        if key_id not in self.data_encryption_keys:
-            raise ValueError(f"Unknown key ID: {key_id}")
+        _, cipher = self._get_key_cipher(key_id)
+        return self._decrypt_with_cipher(cipher, encrypted_data, additional_data)
+    
+    def encrypt_many(
+        self,
+        items: List[bytes],
+        key_id: str,
+        additional_data: Optional[bytes] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Encrypt several values with one key lookup.
         
-        key_info = self.data_encryption_keys[key_id]
-        key = self._decrypt_with_master_key(key_info["encrypted_key"])
-        algorithm = key_info["algorithm"]
+        Args:
+            items: Values to encrypt
+            key_id: ID of encryption key to use
+            additional_data: Additional authenticated data shared by every value
+            
+        Returns:
+            List[Tuple[str, str]]: (encrypted_data, nonce/iv) per value
+        """
+        key_info, cipher = self._get_key_cipher(key_id)
+        results = [self._encrypt_with_cipher(cipher, data, additional_data) for data in items]
+        key_info["usage_count"] += len(items)
+        return results
+    
+    def decrypt_many(
+        self,
+        encrypted_items: List[str],
+        key_id: str,
+        additional_data: Optional[bytes] = None
+    ) -> List[bytes]:
+        """
+        Decrypt several values with one key lookup.
         
-        if algorithm == EncryptionAlgorithm.AES_256_GCM:
-            # Decode the combined data
-            combined_data = base64.b64decode(encrypted_data.encode())
-            nonce_bytes = combined_data[:12]
-            tag = combined_data[12:28]
-            ciphertext = combined_data[28:]
+        Args:
+            encrypted_items: Encrypted values to decrypt
+            key_id: ID of encryption key to use
+            additional_data: Additional authenticated data shared by every value
             
-            cipher = Cipher(
-                algorithms.AES(key),
-                modes.GCM(nonce_bytes, tag),
-                backend=default_backend()
-            )
-            decryptor = cipher.decryptor()
+        Returns:
+            List[bytes]: Decrypted values, in input order
+        """
+        _, cipher = self._get_key_cipher(key_id)
+        return [self._decrypt_with_cipher(cipher, encrypted_data, additional_data) for encrypted_data in encrypted_items]
+    
+    def _get_stream_cipher(self, key_id: str) -> Tuple[Dict[str, Any], AESGCM]:
+        key_info, cipher = self._get_key_cipher(key_id)
+        if not isinstance(cipher, AESGCM):
+            raise ValueError(f"Streaming encryption requires an {EncryptionAlgorithm.AES_256_GCM} key: {key_id}")
+        return key_info, cipher
+    
+    def encrypt_stream(
+        self,
+        source: BinaryIO,
+        destination: BinaryIO,
+        key_id: str,
+        additional_data: Optional[bytes] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> int:
+        """
+        Encrypt a binary stream in authenticated chunks.
+        
+        Each chunk is sealed with AES-256-GCM under a nonce built from a
+        random prefix, the chunk counter and a final-chunk flag, so chunks
+        cannot be reordered, dropped or truncated without detection, and
+        only one chunk is held in memory at a time.
+        
+        Args:
+            source: Readable binary stream with the plaintext
+            destination: Writable binary stream for the ciphertext
+            key_id: ID of an AES-256-GCM encryption key
+            additional_data: Additional authenticated data for every chunk
+            chunk_size: Plaintext bytes per chunk
             
-            if additional_data:
-                decryptor.authenticate_additional_data(additional_data)
+        Returns:
+            int: Number of plaintext bytes encrypted
+        """
+        key_info, cipher = self._get_stream_cipher(key_id)
+        prefix = os.urandom(STREAM_NONCE_PREFIX_SIZE)
+        header = STREAM_MAGIC + struct.pack(">I", chunk_size) + prefix
+        aad = header + (additional_data or b"")
+        destination.write(header)
+        
+        total = 0
+        counter = 0
+        chunk = _read_exactly(source, chunk_size)
+        while True:
+            # Read one chunk ahead to know whether this one is the last
+            next_chunk = _read_exactly(source, chunk_size) if len(chunk) == chunk_size else b""
+            last = not next_chunk
+            sealed = cipher.encrypt(_stream_nonce(prefix, counter, last), chunk, aad)
+            destination.write(struct.pack(">I", len(sealed)) + sealed)
+            total += len(chunk)
+            counter += 1
+            if last:
+                break
+            chunk = next_chunk
+        
+        key_info["usage_count"] += 1
+        return total
+    
+    def decrypt_stream(
+        self,
+        source: BinaryIO,
+        destination: BinaryIO,
+        key_id: str,
+        additional_data: Optional[bytes] = None
+    ) -> int:
+        """
+        Decrypt a stream written by encrypt_stream.
+        
+        Args:
+            source: Readable binary stream with the ciphertext
+            destination: Writable binary stream for the plaintext
+            key_id: ID of the AES-256-GCM key used for encryption
+            additional_data: Additional authenticated data given at encryption
             
-            plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+        Returns:
+            int: Number of plaintext bytes decrypted
+        """
+        _, cipher = self._get_stream_cipher(key_id)
+        header = _read_exactly(source, len(STREAM_MAGIC) + 4 + STREAM_NONCE_PREFIX_SIZE)
+        if len(header) != len(STREAM_MAGIC) + 4 + STREAM_NONCE_PREFIX_SIZE or not header.startswith(STREAM_MAGIC):
+            raise ValueError("Not an encrypted stream")
+        chunk_size = struct.unpack(">I", header[len(STREAM_MAGIC):len(STREAM_MAGIC) + 4])[0]
+        prefix = header[-STREAM_NONCE_PREFIX_SIZE:]
+        aad = header + (additional_data or b"")
+        
+        total = 0
+        counter = 0
+        while True:
+            length_bytes = _read_exactly(source, 4)
+            if len(length_bytes) != 4:
+                raise ValueError("Encrypted stream is truncated")
+            length = struct.unpack(">I", length_bytes)[0]
+            if length > chunk_size + STREAM_TAG_SIZE:
+                raise ValueError("Encrypted stream chunk is too large")
+            sealed = _read_exactly(source, length)
+            if len(sealed) != length:
+                raise ValueError("Encrypted stream is truncated")
             
-        elif algorithm == EncryptionAlgorithm.FERNET:
-            f = Fernet(key)
-            plaintext = f.decrypt(encrypted_data.encode())
+            # A chunk only authenticates under the flag it was sealed with
+            last = length < chunk_size + STREAM_TAG_SIZE
+            try:
+                plaintext = cipher.decrypt(_stream_nonce(prefix, counter, last), sealed, aad)
+            except InvalidTag:
+                if last:
+                    raise
+                plaintext = cipher.decrypt(_stream_nonce(prefix, counter, True), sealed, aad)
+                last = True
             
-        else:
-            raise ValueError(f"Decryption not implemented for: {algorithm}")
-        
-        return plaintext
+            destination.write(plaintext)
+            total += len(plaintext)
+            counter += 1
+            if last:
+                if source.read(1):
+                    raise ValueError("Unexpected data after the final encrypted chunk")
+                return total
     
     def rotate_key(self, key_id: str) -> str:
         """
@@ -315,6 +508,7 @@ class EncryptionService:
         # Mark old key as retired
         old_key_info["status"] = KeyRotationStatus.RETIRED
         old_key_info["retired_at"] = datetime.now(timezone.utc)
+        self.invalidate_key_cache()
         
         # Generate new key
         new_key_id = f"{key_id}_v{int(datetime.now().timestamp())}"
@@ -449,7 +643,10 @@ class EncryptionService:
 
 
 # Global encryption service instance
-encryption_service = EncryptionService()
+encryption_service = EncryptionService(
+    dek_cache_size=settings.encryption_dek_cache_size,
+    dek_cache_ttl_seconds=settings.encryption_dek_cache_ttl_seconds
+)
 
 # Initialize default encryption keys
 try:
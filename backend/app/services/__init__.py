@@ -8,4 +8,6 @@ from .knowledge_service import KnowledgeService
 from .orchestration_service import OrchestrationService
 from .ruleset_service import RulesetService
 from .reasoning_graph_service import ReasoningGraphService
+from .reasoning_graph_store import ReasoningGraphStore, reasoning_graph_store
 from .metrics_service import ReasoningMetricsService, metrics_service, MetricsDecorator
+from .service_container import ServiceContainer, service_container
@@ -0,0 +1,106 @@
+"""
+Graph Layout
+Incremental placement of new nodes and a cache of computed layouts.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.rendering.force_layout import Position, force_directed_layout
+
+
+def place_new_nodes(
+    node_ids: Sequence[Hashable],
+    edges: Iterable[Tuple[Hashable, Hashable]],
+    previous: Dict[Hashable, Position],
+    iterations: int = 30,
+    seed: int = 42
+) -> Dict[Hashable, Position]:
+    """
+    Extend a previous layout with the nodes it does not contain.
+    
+    New nodes start at the centroid of their already placed neighbors (or
+    of the whole layout) with a little jitter, then only they are moved by
+    a short force-directed refinement, so existing nodes keep their place.
+    """
+    edges = list(edges)
+    kept = {node_id: previous[node_id] for node_id in node_ids if node_id in previous}
+    if not kept:
+        return force_directed_layout(node_ids, edges, iterations=iterations * 2, seed=seed)
+    
+    neighbors: Dict[Hashable, List[Hashable]] = {}
+    for source, target in edges:
+        neighbors.setdefault(source, []).append(target)
+        neighbors.setdefault(target, []).append(source)
+    
+    coords = np.asarray(list(kept.values()), dtype=float)
+    center = coords.mean(axis=0)
+    spread = float(np.ptp(coords, axis=0).max()) or 1.0
+    rng = np.random.default_rng(seed)
+    initial = dict(kept)
+    for node_id in node_ids:
+        if node_id in initial:
+            continue
+        placed = [kept[other] for other in neighbors.get(node_id, []) if other in kept]
+        anchor = np.mean(placed, axis=0) if placed else center
+        initial[node_id] = tuple(anchor + rng.normal(scale=spread * 0.05, size=2))
+    
+    return force_directed_layout(
+        node_ids, edges, initial=initial, fixed=kept.keys(), iterations=iterations, scale=None, seed=seed
+    )
+
+
+class LayoutCache:
+    """
+    LRU cache of computed layouts.
+    
+    Entries are keyed by (graph_id, layout_type) and remember the graph
+    version they were computed for: a matching version is a hit, and an
+    older entry is returned as the base for incremental placement.
+    """
+    
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Hashable, Dict[Hashable, Position]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+    
+    def get(self, graph_id: str, layout_type: str, version: Hashable
+            ) -> Tuple[Optional[Dict[Hashable, Position]], Optional[Dict[Hashable, Position]]]:
+        """Get (layout for this version, layout for an older version)."""
+        with self._lock:
+            entry = self._entries.get((graph_id, layout_type))
+            if entry is None:
+                self.stats["misses"] += 1
+                return None, None
+            self._entries.move_to_end((graph_id, layout_type))
+            if entry[0] == version:
+                self.stats["hits"] += 1
+                return entry[1], None
+            self.stats["misses"] += 1
+            return None, entry[1]
+    
+    def put(self, graph_id: str, layout_type: str, version: Hashable, positions: Dict[Hashable, Position]) -> None:
+        """Store the layout computed for a graph version."""
+        with self._lock:
+            self._entries[(graph_id, layout_type)] = (version, positions)
+            self._entries.move_to_end((graph_id, layout_type))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, graph_id: Optional[str] = None) -> None:
+        """Drop the layouts of one graph, or all layouts."""
+        with self._lock:
+            if graph_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == graph_id]:
+                    del self._entries[key]
+
+
+# Global layout cache shared by every ReasoningGraphService
+layout_cache = LayoutCache(max_entries=settings.reasoning_graph_layout_cache_size)
@@ -1,11 +1,12 @@
 """
 Graph Persistence Service
-Save and load knowledge graphs to/from JSON and Neo4j.
+Save and load knowledge graphs to/from JSON, binary snapshots and Neo4j.
 """
 
 import json
 import os
 import uuid
+import hashlib
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 import logging
@@ -19,6 +20,7 @@ except ImportError:
     NEO4J_AVAILABLE = False
 
 from .modern_reasoning_service import KnowledgeGraph, GraphNode, GraphEdge
+from .graph_snapshot import GraphSnapshotReader, write_graph_snapshot, SNAPSHOT_EXTENSION
 
 logger = logging.getLogger(__name__)
 
@@ -94,37 +96,27 @@ class GraphPersistenceManager:
                 graph_data = json.load(f)
             
             # Create new graph without initializing domain knowledge
-            graph = KnowledgeGraph()
-            # Clear the automatically added domain knowledge
-            graph.nodes.clear()
-            graph.edges.clear()
-            graph.graph.clear()
+            graph = KnowledgeGraph(initialize_domain_knowledge=False)
             
             # Load nodes
             for node_data in graph_data.get("nodes", []):
-                node = GraphNode(
+                graph.add_node(GraphNode(
                     id=node_data["id"],
                     label=node_data["label"],
                     node_type=node_data["node_type"],
                     properties=node_data.get("properties", {}),
                     confidence=node_data.get("confidence", 1.0)
-                )
-                graph.nodes[node.id] = node
-                graph.graph.add_node(node.id, **node.properties)
+                ))
             
             # Load edges
             for edge_data in graph_data.get("edges", []):
-                edge = GraphEdge(
+                graph.add_edge(GraphEdge(
                     source=edge_data["source"],
                     target=edge_data["target"],
                     relationship=edge_data["relationship"],
                     properties=edge_data.get("properties", {}),
                     confidence=edge_data.get("confidence", 1.0)
-                )
-                edge_id = f"{edge.source}->{edge.target}:{edge.relationship}"
-                graph.edges[edge_id] = edge
-                graph.graph.add_edge(edge.source, edge.target, 
-                                   relationship=edge.relationship, **edge.properties)
+                ))
             
             self.logger.info(f"Graph loaded from {filepath}")
             return graph
@@ -133,6 +125,56 @@ class GraphPersistenceManager:
             self.logger.error(f"Error loading graph from JSON: {e}")
             raise
     
+    def save_graph_snapshot(self, graph: KnowledgeGraph, filename: str = None,
+                            compression: Optional[str] = None) -> str:
+        """Save knowledge graph to a streamed binary snapshot file."""
+        try:
+            if not filename:
+                timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+                filename = f"knowledge_graph_{timestamp}{SNAPSHOT_EXTENSION}"
+            
+            filepath = self.storage_dir / filename
+            write_graph_snapshot(graph, str(filepath), compression=compression,
+                                 metadata={"description": "XReason Knowledge Graph"})
+            
+            self.logger.info(f"Graph snapshot saved to {filepath}")
+            return str(filepath)
+            
+        except Exception as e:
+            self.logger.error(f"Error saving graph snapshot: {e}")
+            raise
+    
+    def load_graph_snapshot(self, filepath: str, node_ids: Optional[List[str]] = None,
+                            labels: Optional[List[str]] = None, node_types: Optional[List[str]] = None,
+                            depth: int = 0) -> KnowledgeGraph:
+        """
+        Load knowledge graph from a snapshot file.
+        
+        When any of node_ids, labels or node_types is given, only the matching
+        nodes, their neighbors up to depth hops and the edges between them are
+        loaded.
+        """
+        try:
+            with GraphSnapshotReader(filepath) as reader:
+                if node_ids is None and labels is None and node_types is None:
+                    graph = reader.load_graph()
+                else:
+                    graph = reader.load_subgraph(node_ids=node_ids, labels=labels,
+                                                 node_types=node_types, depth=depth)
+            
+            self.logger.info(f"Graph loaded from snapshot {filepath}")
+            return graph
+            
+        except Exception as e:
+            self.logger.error(f"Error loading graph snapshot: {e}")
+            raise
+    
+    def load_graph_file(self, filepath: str) -> KnowledgeGraph:
+        """Load a saved graph file, JSON or snapshot."""
+        if str(filepath).endswith(SNAPSHOT_EXTENSION):
+            return self.load_graph_snapshot(filepath)
+        return self.load_graph_from_json(filepath)
+    
     def list_saved_graphs(self) -> List[Dict[str, Any]]:
         """List all saved graph files with metadata."""
         graphs = []
@@ -145,6 +187,7 @@ class GraphPersistenceManager:
                 graphs.append({
                     "filename": filepath.name,
                     "filepath": str(filepath),
+                    "format": "json",
                     "created_at": graph_data.get("metadata", {}).get("created_at"),
                     "node_count": graph_data.get("metadata", {}).get("node_count", 0),
                     "edge_count": graph_data.get("metadata", {}).get("edge_count", 0),
@@ -153,6 +196,24 @@ class GraphPersistenceManager:
             except Exception as e:
                 self.logger.warning(f"Error reading graph file {filepath}: {e}")
         
+        for filepath in self.storage_dir.glob(f"*{SNAPSHOT_EXTENSION}"):
+            try:
+                # Only the footer index is read
+                with GraphSnapshotReader(str(filepath)) as reader:
+                    metadata = reader.metadata
+                
+                graphs.append({
+                    "filename": filepath.name,
+                    "filepath": str(filepath),
+                    "format": "snapshot",
+                    "created_at": metadata.get("created_at"),
+                    "node_count": metadata.get("node_count", 0),
+                    "edge_count": metadata.get("edge_count", 0),
+                    "size_bytes": filepath.stat().st_size
+                })
+            except Exception as e:
+                self.logger.warning(f"Error reading graph snapshot {filepath}: {e}")
+        
         return sorted(graphs, key=lambda x: x["created_at"] or "", reverse=True)
     
     def delete_graph(self, filename: str) -> bool:
@@ -171,53 +232,181 @@ class GraphPersistenceManager:
             return False
 
 
+# Cypher statements used by Neo4jPersistenceManager. Rows are sent in
+# parameterized UNWIND batches so each batch is a single round trip.
+NEO4J_SCHEMA_QUERIES = [
+    "CREATE CONSTRAINT knowledge_node_key IF NOT EXISTS "
+    "FOR (n:KnowledgeNode) REQUIRE (n.graph_name, n.id) IS UNIQUE",
+    "CREATE INDEX knowledge_node_graph_name IF NOT EXISTS FOR (n:KnowledgeNode) ON (n.graph_name)",
+    "CREATE INDEX relates_to_graph_name IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.graph_name)",
+]
+
+DELETE_GRAPH_BATCH_QUERY = """
+    MATCH (n:KnowledgeNode {graph_name: $graph_name})
+    WITH n LIMIT $limit
+    DETACH DELETE n
+    RETURN count(*) AS deleted
+"""
+
+CREATE_NODES_QUERY = """
+    UNWIND $rows AS row
+    CREATE (n:KnowledgeNode {graph_name: $graph_name, id: row.id})
+    SET n.label = row.label, n.node_type = row.node_type, n.confidence = row.confidence,
+        n.properties = row.properties, n.content_hash = row.content_hash
+"""
+
+UPSERT_NODES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (n:KnowledgeNode {graph_name: $graph_name, id: row.id})
+    SET n.label = row.label, n.node_type = row.node_type, n.confidence = row.confidence,
+        n.properties = row.properties, n.content_hash = row.content_hash
+"""
+
+CREATE_EDGES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (source:KnowledgeNode {graph_name: $graph_name, id: row.source})
+    MATCH (target:KnowledgeNode {graph_name: $graph_name, id: row.target})
+    CREATE (source)-[r:RELATES_TO {graph_name: $graph_name, relationship: row.relationship}]->(target)
+    SET r.confidence = row.confidence, r.properties = row.properties, r.content_hash = row.content_hash
+"""
+
+UPSERT_EDGES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (source:KnowledgeNode {graph_name: $graph_name, id: row.source})
+    MATCH (target:KnowledgeNode {graph_name: $graph_name, id: row.target})
+    MERGE (source)-[r:RELATES_TO {graph_name: $graph_name, relationship: row.relationship}]->(target)
+    SET r.confidence = row.confidence, r.properties = row.properties, r.content_hash = row.content_hash
+"""
+
+DELETE_NODES_QUERY = """
+    UNWIND $ids AS id
+    MATCH (n:KnowledgeNode {graph_name: $graph_name, id: id})
+    DETACH DELETE n
+"""
+
+DELETE_EDGES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (:KnowledgeNode {graph_name: $graph_name, id: row.source})
+          -[r:RELATES_TO {graph_name: $graph_name, relationship: row.relationship}]->
+          (:KnowledgeNode {graph_name: $graph_name, id: row.target})
+    DELETE r
+"""
+
+NODE_HASHES_QUERY = """
+    MATCH (n:KnowledgeNode {graph_name: $graph_name})
+    RETURN n.id AS id, n.content_hash AS content_hash
+"""
+
+EDGE_HASHES_QUERY = """
+    MATCH (source:KnowledgeNode {graph_name: $graph_name})-[r:RELATES_TO {graph_name: $graph_name}]->(target)
+    RETURN source.id AS source, target.id AS target, r.relationship AS relationship,
+           r.content_hash AS content_hash
+"""
+
+
+def _content_hash(*values: Any) -> str:
+    """Stable hash of the persisted fields of a node or edge."""
+    payload = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _node_row(node: GraphNode) -> Dict[str, Any]:
+    properties = json.dumps(node.properties or {}, sort_keys=True, default=str)
+    return {
+        "id": node.id,
+        "label": node.label,
+        "node_type": node.node_type,
+        "confidence": node.confidence,
+        "properties": properties,
+        "content_hash": _content_hash(node.label, node.node_type, node.confidence, properties)
+    }
+
+
+def _edge_row(edge: GraphEdge) -> Dict[str, Any]:
+    properties = json.dumps(edge.properties or {}, sort_keys=True, default=str)
+    return {
+        "source": edge.source,
+        "target": edge.target,
+        "relationship": edge.relationship,
+        "confidence": edge.confidence,
+        "properties": properties,
+        "content_hash": _content_hash(edge.confidence, properties)
+    }
+
+
+def _batches(rows: List[Any], size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
 class Neo4jPersistenceManager:
-    """Manages persistence operations for Neo4j database."""
+    """
+    Manages persistence operations for Neo4j database.
+    
+    Writes go out as parameterized UNWIND batches of batch_size rows, each
+    in its own write transaction, and rely on a (graph_name, id) uniqueness
+    constraint so node lookups are index seeks. Nodes and relationships
+    carry a content hash, which lets sync_graph_to_neo4j upsert only what
+    changed since the last save.
+    """
     
-    def __init__(self, uri: str, username: str, password: str):
-        if not NEO4J_AVAILABLE:
-            raise ImportError("Neo4j driver not available. Install with: pip install neo4j")
+    def __init__(self, uri: str, username: str, password: str, batch_size: int = 5000, driver=None):
+        if driver is None:
+            if not NEO4J_AVAILABLE:
+                raise ImportError("Neo4j driver not available. Install with: pip install neo4j")
+            driver = GraphDatabase.driver(uri, auth=(username, password))
         
-        self.driver = GraphDatabase.driver(uri, auth=(username, password))
+        self.driver = driver
+        self.batch_size = max(1, batch_size)
+        self._schema_ready = False
         self.logger = logging.getLogger(__name__)
     
     def close(self):
         """Close the Neo4j driver connection."""
         self.driver.close()
     
+    def ensure_schema(self) -> None:
+        """Create the constraint and indexes used by the batched writes (once per manager)."""
+        if self._schema_ready:
+            return
+        
+        with self.driver.session() as session:
+            for query in NEO4J_SCHEMA_QUERIES:
+                try:
+                    session.run(query).consume()
+                except Exception as e:
+                    self.logger.warning(f"Could not create Neo4j schema ({query.split(' IF ')[0]}): {e}")
+        self._schema_ready = True
+    
+    def _write_batches(self, session, query: str, rows: List[Any], graph_name: str, key: str = "rows") -> None:
+        for batch in _batches(rows, self.batch_size):
+            session.execute_write(
+                lambda tx, batch=batch: tx.run(query, {key: batch, "graph_name": graph_name}).consume()
+            )
+    
+    def _delete_graph(self, session, graph_name: str) -> None:
+        # Delete in bounded transactions instead of one huge DETACH DELETE
+        while True:
+            deleted = session.execute_write(
+                lambda tx: tx.run(
+                    DELETE_GRAPH_BATCH_QUERY, graph_name=graph_name, limit=self.batch_size
+                ).single()["deleted"]
+            )
+            if not deleted:
+                break
+    
     def save_graph_to_neo4j(self, graph: KnowledgeGraph, graph_name: str = "xreason_knowledge_graph") -> bool:
-        """Save knowledge graph to Neo4j database."""
+        """Replace a named graph in Neo4j with a full copy of the knowledge graph."""
         try:
+            self.ensure_schema()
             with self.driver.session() as session:
                 # Clear existing graph with same name
-                session.run("MATCH (n) WHERE n.graph_name = $name DETACH DELETE n", name=graph_name)
+                self._delete_graph(session, graph_name)
                 
-                # Create nodes
-                for node_id, node in graph.nodes.items():
-                    session.run("""
-                        CREATE (n:KnowledgeNode {
-                            id: $id,
-                            label: $label,
-                            node_type: $node_type,
-                            confidence: $confidence,
-                            graph_name: $graph_name
-                        })
-                    """, id=node_id, label=node.label, node_type=node.node_type,
-                         confidence=node.confidence, graph_name=graph_name)
-                
-                # Create relationships
-                for edge_id, edge in graph.edges.items():
-                    session.run("""
-                        MATCH (source:KnowledgeNode {id: $source_id, graph_name: $graph_name})
-                        MATCH (target:KnowledgeNode {id: $target_id, graph_name: $graph_name})
-                        CREATE (source)-[r:RELATES_TO {
-                            relationship: $relationship,
-                            confidence: $confidence,
-                            graph_name: $graph_name
-                        }]->(target)
-                    """, source_id=edge.source, target_id=edge.target,
-                         relationship=edge.relationship, confidence=edge.confidence,
-                         graph_name=graph_name)
+                self._write_batches(session, CREATE_NODES_QUERY,
+                                    [_node_row(node) for node in graph.nodes.values()], graph_name)
+                self._write_batches(session, CREATE_EDGES_QUERY,
+                                    [_edge_row(edge) for edge in graph.edges.values()], graph_name)
                 
                 self.logger.info(f"Graph saved to Neo4j with name: {graph_name}")
                 return True
@@ -226,47 +415,103 @@ class Neo4jPersistenceManager:
             self.logger.error(f"Error saving graph to Neo4j: {e}")
             return False
     
+    def sync_graph_to_neo4j(self, graph: KnowledgeGraph,
+                            graph_name: str = "xreason_knowledge_graph") -> Optional[Dict[str, int]]:
+        """
+        Incrementally sync a named graph in Neo4j with the knowledge graph.
+        
+        Stored content hashes are compared with the local graph, then only
+        new or changed nodes and edges are upserted and removed ones deleted.
+        Returns counts of the changes, or None if the sync failed.
+        """
+        try:
+            self.ensure_schema()
+            with self.driver.session() as session:
+                remote_nodes = session.execute_read(
+                    lambda tx: {r["id"]: r["content_hash"] for r in tx.run(NODE_HASHES_QUERY, graph_name=graph_name)}
+                )
+                remote_edges = session.execute_read(
+                    lambda tx: {
+                        (r["source"], r["target"], r["relationship"]): r["content_hash"]
+                        for r in tx.run(EDGE_HASHES_QUERY, graph_name=graph_name)
+                    }
+                )
+                
+                node_rows = [_node_row(node) for node in graph.nodes.values()]
+                changed_nodes = [row for row in node_rows if remote_nodes.get(row["id"]) != row["content_hash"]]
+                local_node_ids = {row["id"] for row in node_rows}
+                removed_nodes = [node_id for node_id in remote_nodes if node_id not in local_node_ids]
+                removed_node_ids = set(removed_nodes)
+                
+                edge_rows = [_edge_row(edge) for edge in graph.edges.values()]
+                changed_edges = [
+                    row for row in edge_rows
+                    if remote_edges.get((row["source"], row["target"], row["relationship"])) != row["content_hash"]
+                ]
+                local_edge_keys = {(row["source"], row["target"], row["relationship"]) for row in edge_rows}
+                removed_edges = [
+                    {"source": source, "target": target, "relationship": relationship}
+                    for source, target, relationship in remote_edges
+                    if (source, target, relationship) not in local_edge_keys
+                    and source not in removed_node_ids and target not in removed_node_ids
+                ]
+                
+                self._write_batches(session, UPSERT_NODES_QUERY, changed_nodes, graph_name)
+                self._write_batches(session, DELETE_EDGES_QUERY, removed_edges, graph_name)
+                self._write_batches(session, UPSERT_EDGES_QUERY, changed_edges, graph_name)
+                self._write_batches(session, DELETE_NODES_QUERY, removed_nodes, graph_name, key="ids")
+                
+                stats = {
+                    "nodes_upserted": len(changed_nodes),
+                    "nodes_deleted": len(removed_nodes),
+                    "edges_upserted": len(changed_edges),
+                    "edges_deleted": len(removed_edges)
+                }
+                self.logger.info(f"Graph synced to Neo4j with name: {graph_name} ({stats})")
+                return stats
+                
+        except Exception as e:
+            self.logger.error(f"Error syncing graph to Neo4j: {e}")
+            return None
+    
     def load_graph_from_neo4j(self, graph_name: str = "xreason_knowledge_graph") -> KnowledgeGraph:
         """Load knowledge graph from Neo4j database."""
         try:
-            graph = KnowledgeGraph()
+            graph = KnowledgeGraph(initialize_domain_knowledge=False)
             
             with self.driver.session() as session:
                 # Load nodes
                 result = session.run("""
                     MATCH (n:KnowledgeNode {graph_name: $graph_name})
                     RETURN n.id as id, n.label as label, n.node_type as node_type,
-                           n.confidence as confidence
+                           n.confidence as confidence, n.properties as properties
                 """, graph_name=graph_name)
                 
                 for record in result:
-                    node = GraphNode(
+                    graph.add_node(GraphNode(
                         id=record["id"],
                         label=record["label"],
                         node_type=record["node_type"],
+                        properties=json.loads(record["properties"]) if record["properties"] else {},
                         confidence=record["confidence"]
-                    )
-                    graph.nodes[node.id] = node
-                    graph.graph.add_node(node.id)
+                    ))
                 
                 # Load relationships
                 result = session.run("""
                     MATCH (source:KnowledgeNode {graph_name: $graph_name})-[r:RELATES_TO {graph_name: $graph_name}]->(target:KnowledgeNode {graph_name: $graph_name})
                     RETURN source.id as source_id, target.id as target_id,
-                           r.relationship as relationship, r.confidence as confidence
+                           r.relationship as relationship, r.confidence as confidence,
+                           r.properties as properties
                 """, graph_name=graph_name)
                 
                 for record in result:
-                    edge = GraphEdge(
+                    graph.add_edge(GraphEdge(
                         source=record["source_id"],
                         target=record["target_id"],
                         relationship=record["relationship"],
+                        properties=json.loads(record["properties"]) if record["properties"] else {},
                         confidence=record["confidence"]
-                    )
-                    edge_id = f"{edge.source}->{edge.target}:{edge.relationship}"
-                    graph.edges[edge_id] = edge
-                    graph.graph.add_edge(edge.source, edge.target, 
-                                       relationship=edge.relationship)
+                    ))
                 
                 self.logger.info(f"Graph loaded from Neo4j with name: {graph_name}")
                 return graph
@@ -313,15 +558,7 @@ class Neo4jPersistenceManager:
         """Delete a graph from Neo4j database."""
         try:
             with self.driver.session() as session:
-                session.run("""
-                    MATCH (n:KnowledgeNode {graph_name: $graph_name})
-                    DETACH DELETE n
-                """, graph_name=graph_name)
-                
-                session.run("""
-                    MATCH ()-[r:RELATES_TO {graph_name: $graph_name}]->()
-                    DELETE r
-                """, graph_name=graph_name)
+                self._delete_graph(session, graph_name)
                 
                 self.logger.info(f"Graph deleted from Neo4j: {graph_name}")
                 return True
@@ -360,22 +597,34 @@ class GraphPersistenceService:
         self.logger = logging.getLogger(__name__)
     
     def save_graph(self, graph: KnowledgeGraph, filename: str = None, 
-                  save_to_neo4j: bool = False, neo4j_graph_name: str = "xreason_knowledge_graph") -> Dict[str, str]:
-        """Save graph to both JSON and optionally Neo4j."""
+                  save_to_neo4j: bool = False, neo4j_graph_name: str = "xreason_knowledge_graph",
+                  format: str = "json", neo4j_incremental: bool = False) -> Dict[str, str]:
+        """
+        Save graph to a JSON or snapshot file and optionally Neo4j.
+        
+        With neo4j_incremental the Neo4j copy is synced (only changed nodes
+        and edges are written) instead of being replaced.
+        """
         results = {}
         
-        # Save to JSON
+        # Save to a file
         try:
-            json_path = self.json_manager.save_graph_to_json(graph, filename)
-            results["json"] = json_path
+            if format == "snapshot":
+                results["snapshot"] = self.json_manager.save_graph_snapshot(graph, filename)
+            else:
+                json_path = self.json_manager.save_graph_to_json(graph, filename)
+                results["json"] = json_path
         except Exception as e:
-            self.logger.error(f"Failed to save to JSON: {e}")
-            results["json"] = f"Error: {str(e)}"
+            self.logger.error(f"Failed to save to {format}: {e}")
+            results[format] = f"Error: {str(e)}"
         
         # Save to Neo4j if available
         if save_to_neo4j and self.neo4j_manager:
             try:
-                success = self.neo4j_manager.save_graph_to_neo4j(graph, neo4j_graph_name)
+                if neo4j_incremental:
+                    success = self.neo4j_manager.sync_graph_to_neo4j(graph, neo4j_graph_name) is not None
+                else:
+                    success = self.neo4j_manager.save_graph_to_neo4j(graph, neo4j_graph_name)
                 results["neo4j"] = "Success" if success else "Failed"
             except Exception as e:
                 self.logger.error(f"Failed to save to Neo4j: {e}")
@@ -385,8 +634,8 @@ class GraphPersistenceService:
     
     def load_graph(self, source: str = "json", filepath: str = None, 
                   neo4j_graph_name: str = "xreason_knowledge_graph") -> KnowledgeGraph:
-        """Load graph from JSON or Neo4j."""
-        if source.lower() == "json":
+        """Load graph from a JSON or snapshot file, or from Neo4j."""
+        if source.lower() in ("json", "snapshot"):
             if not filepath:
                 # Load the most recent graph
                 graphs = self.json_manager.list_saved_graphs()
@@ -394,7 +643,7 @@ class GraphPersistenceService:
                     raise ValueError("No saved graphs found")
                 filepath = graphs[0]["filepath"]
             
-            return self.json_manager.load_graph_from_json(filepath)
+            return self.json_manager.load_graph_file(filepath)
         
         elif source.lower() == "neo4j":
             if not self.neo4j_manager:
@@ -403,7 +652,7 @@ class GraphPersistenceService:
             return self.neo4j_manager.load_graph_from_neo4j(neo4j_graph_name)
         
         else:
-            raise ValueError("Source must be 'json' or 'neo4j'")
+            raise ValueError("Source must be 'json', 'snapshot' or 'neo4j'")
     
     def list_available_graphs(self) -> Dict[str, List[Dict[str, Any]]]:
         """List available graphs from both sources."""
@@ -426,7 +675,7 @@ class GraphPersistenceService:
     
     def delete_graph(self, source: str, identifier: str) -> bool:
         """Delete a graph from the specified source."""
-        if source.lower() == "json":
+        if source.lower() in ("json", "snapshot"):
             return self.json_manager.delete_graph(identifier)
         
         elif source.lower() == "neo4j":
@@ -469,22 +718,34 @@ class GraphPersistenceService:
         self.logger = logging.getLogger(__name__)
     
     def save_graph(self, graph: KnowledgeGraph, filename: str = None, 
-                  save_to_neo4j: bool = False, neo4j_graph_name: str = "xreason_knowledge_graph") -> Dict[str, str]:
-        """Save graph to both JSON and optionally Neo4j."""
+                  save_to_neo4j: bool = False, neo4j_graph_name: str = "xreason_knowledge_graph",
+                  format: str = "json", neo4j_incremental: bool = False) -> Dict[str, str]:
+        """
+        Save graph to a JSON or snapshot file and optionally Neo4j.
+        
+        With neo4j_incremental the Neo4j copy is synced (only changed nodes
+        and edges are written) instead of being replaced.
+        """
         results = {}
         
-        # Save to JSON
+        # Save to a file
         try:
-            json_path = self.json_manager.save_graph_to_json(graph, filename)
-            results["json"] = json_path
+            if format == "snapshot":
+                results["snapshot"] = self.json_manager.save_graph_snapshot(graph, filename)
+            else:
+                json_path = self.json_manager.save_graph_to_json(graph, filename)
+                results["json"] = json_path
         except Exception as e:
-            self.logger.error(f"Failed to save to JSON: {e}")
-            results["json"] = f"Error: {str(e)}"
+            self.logger.error(f"Failed to save to {format}: {e}")
+            results[format] = f"Error: {str(e)}"
         
         # Save to Neo4j if available
         if save_to_neo4j and self.neo4j_manager:
             try:
-                success = self.neo4j_manager.save_graph_to_neo4j(graph, neo4j_graph_name)
+                if neo4j_incremental:
+                    success = self.neo4j_manager.sync_graph_to_neo4j(graph, neo4j_graph_name) is not None
+                else:
+                    success = self.neo4j_manager.save_graph_to_neo4j(graph, neo4j_graph_name)
                 results["neo4j"] = "Success" if success else "Failed"
             except Exception as e:
                 self.logger.error(f"Failed to save to Neo4j: {e}")
@@ -494,8 +755,8 @@ class GraphPersistenceService:
     
     def load_graph(self, source: str = "json", filepath: str = None, 
                   neo4j_graph_name: str = "xreason_knowledge_graph") -> KnowledgeGraph:
-        """Load graph from JSON or Neo4j."""
-        if source.lower() == "json":
+        """Load graph from a JSON or snapshot file, or from Neo4j."""
+        if source.lower() in ("json", "snapshot"):
             if not filepath:
                 # Load the most recent graph
                 graphs = self.json_manager.list_saved_graphs()
@@ -503,7 +764,7 @@ class GraphPersistenceService:
                     raise ValueError("No saved graphs found")
                 filepath = graphs[0]["filepath"]
             
-            return self.json_manager.load_graph_from_json(filepath)
+            return self.json_manager.load_graph_file(filepath)
         
         elif source.lower() == "neo4j":
             if not self.neo4j_manager:
@@ -512,7 +773,7 @@ class GraphPersistenceService:
             return self.neo4j_manager.load_graph_from_neo4j(neo4j_graph_name)
         
         else:
-            raise ValueError("Source must be 'json' or 'neo4j'")
+            raise ValueError("Source must be 'json', 'snapshot' or 'neo4j'")
     
     def list_available_graphs(self) -> Dict[str, List[Dict[str, Any]]]:
         """List available graphs from both sources."""
@@ -535,7 +796,7 @@ class GraphPersistenceService:
     
     def delete_graph(self, source: str, identifier: str) -> bool:
         """Delete a graph from the specified source."""
-        if source.lower() == "json":
+        if source.lower() in ("json", "snapshot"):
             return self.json_manager.delete_graph(identifier)
         
         elif source.lower() == "neo4j":
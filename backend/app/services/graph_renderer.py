@@ -0,0 +1,202 @@
+"""
+Graph Renderer
+Render reasoning graph images in a process pool with a content-addressed cache.
+"""
+
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.rendering.graph_image import _init_render_worker, render_graph_image
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FORMATS = ("png", "svg", "pdf")
+
+
+class GraphRenderer:
+    """
+    Renders graph images off the event loop.
+    
+    Images are rendered by render_function in a process pool, cached by
+    the SHA-256 of the payload and format (in memory up to max_bytes, and
+    optionally as files in cache_dir), and concurrent requests for the
+    same image share one render.
+    """
+    
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_bytes: int = 64 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        executor: Optional[Executor] = None
+    ):
+        self.max_workers = max_workers
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.render_function: Callable[[Dict[str, Any], str], bytes] = render_graph_image
+        
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "coalesced": 0, "renders": 0}
+    
+    @staticmethod
+    def make_payload(nodes, edges, node_colors: Dict[Any, str]) -> Dict[str, Any]:
+        """Build the plain-data render payload for graph nodes and edges."""
+        return {
+            "nodes": [[node.id, node.label, node_colors.get(node.type, "#FFFFFF")] for node in nodes],
+            "edges": [[edge.source, edge.target, edge.label] for edge in edges]
+        }
+    
+    @staticmethod
+    def make_key(payload: Dict[str, Any], format: str) -> str:
+        """Content address of a rendered image."""
+        content = json.dumps({"payload": payload, "format": format}, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+    
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the server's threads or locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_render_worker
+                )
+            return self._executor
+    
+    def _disk_path(self, key: str, format: str) -> Optional[Path]:
+        return self.cache_dir / f"{key}.{format}" if self.cache_dir is not None else None
+    
+    def get_cached(self, key: str, format: str) -> Optional[bytes]:
+        """Get a rendered image from memory or disk."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return data
+        
+        path = self._disk_path(key, format)
+        if path is not None and path.exists():
+            try:
+                data = path.read_bytes()
+            except OSError as e:
+                logger.warning(f"Error reading rendered graph {path}: {e}")
+                return None
+            self.stats["disk_hits"] += 1
+            self._set_memory(key, data)
+            return data
+        return None
+    
+    def _set_memory(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+    
+    def _store(self, key: str, format: str, data: bytes) -> None:
+        self._set_memory(key, data)
+        path = self._disk_path(key, format)
+        if path is not None:
+            try:
+                temp_path = path.with_suffix(".tmp")
+                temp_path.write_bytes(data)
+                temp_path.replace(path)
+            except OSError as e:
+                logger.warning(f"Error caching rendered graph {path}: {e}")
+    
+    async def render(self, payload: Dict[str, Any], format: str) -> bytes:
+        """Render an image in the worker pool, or return the cached or in-flight one."""
+        if format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {format}")
+        
+        key = self.make_key(payload, format)
+        data = self.get_cached(key, format)
+        if data is not None:
+            return data
+        
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            # The render belongs to the renderer, not to the first request, so
+            # a cancelled requester does not cancel it for everyone else
+            task = asyncio.ensure_future(self._render(key, payload, format))
+            self._in_flight[key] = task
+            task.add_done_callback(self._render_done)
+        return await asyncio.shield(task)
+    
+    async def _render(self, key: str, payload: Dict[str, Any], format: str) -> bytes:
+        try:
+            self.stats["renders"] += 1
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(self._get_executor(), self.render_function, payload, format)
+            await asyncio.to_thread(self._store, key, format, data)
+            return data
+        finally:
+            self._in_flight.pop(key, None)
+    
+    @staticmethod
+    def _render_done(task: asyncio.Future) -> None:
+        # Mark a failure as retrieved when every requester has gone away
+        if not task.cancelled():
+            task.exception()
+    
+    def render_sync(self, payload: Dict[str, Any], format: str) -> bytes:
+        """Render an image in the calling thread (for synchronous callers), using the cache."""
+        if format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {format}")
+        
+        key = self.make_key(payload, format)
+        data = self.get_cached(key, format)
+        if data is None:
+            self.stats["renders"] += 1
+            data = self.render_function(payload, format)
+            self._store(key, format, data)
+        return data
+    
+    def shutdown(self) -> None:
+        """Stop the worker pool if this renderer created it."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._owns_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "in_flight": len(self._in_flight)
+        }
+
+
+# Global graph renderer; the worker pool starts on first use
+graph_renderer = GraphRenderer(
+    max_workers=settings.graph_render_workers,
+    max_bytes=settings.graph_render_cache_max_bytes,
+    cache_dir=settings.graph_render_cache_dir
+)
@@ -0,0 +1,397 @@
+"""
+Graph Snapshot Format
+Compact binary knowledge graph snapshots that are written and read as streams.
+
+A snapshot is a header, a sequence of length-prefixed blocks and a footer:
+
+    header   magic "XRGS", version, codec, compression
+    block    kind (S = strings, N = nodes, E = edges), row count, payload size, payload
+    footer   index block (block offsets, row counts, node types per node block,
+             metadata), index offset, magic
+
+Node and edge rows refer to strings (IDs, labels, types, relationships) by
+their position in an interning table. Each string block adds the new strings
+of the block that follows it, so writers never hold the whole graph and
+readers can map the file and decode only the blocks they need.
+"""
+
+import os
+import json
+import mmap
+import zlib
+import struct
+import logging
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set
+
+# Optional msgpack and zstd support
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from .modern_reasoning_service import KnowledgeGraph, GraphNode, GraphEdge
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"XRGS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = ".xrgs"
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_NAMES = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "zstd": COMPRESSION_ZSTD}
+
+BLOCK_STRINGS = b"S"
+BLOCK_NODES = b"N"
+BLOCK_EDGES = b"E"
+BLOCK_INDEX = b"X"
+
+_HEADER = struct.Struct(">4sBBB")
+_BLOCK = struct.Struct(">cII")
+_TRAILER = struct.Struct(">Q4s")
+
+
+def default_compression() -> str:
+    """Best available compression: zstd when installed, otherwise zlib."""
+    return "zstd" if ZSTD_AVAILABLE else "zlib"
+
+
+def _encode(codec: int, value: Any) -> bytes:
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(value, use_bin_type=True, default=str)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _decode(codec: int, payload) -> Any:
+    if codec == CODEC_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("Snapshot uses msgpack. Install with: pip install msgpack")
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(bytes(payload).decode("utf-8"))
+
+
+def _compress(compression: int, payload: bytes) -> bytes:
+    if compression == COMPRESSION_ZSTD:
+        return zstandard.ZstdCompressor().compress(payload)
+    if compression == COMPRESSION_ZLIB:
+        return zlib.compress(payload, 6)
+    return payload
+
+
+def _decompress(compression: int, payload) -> Any:
+    if compression == COMPRESSION_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ImportError("Snapshot uses zstd compression. Install with: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(payload)
+    return payload
+
+
+class GraphSnapshotWriter:
+    """
+    Streaming snapshot writer.
+    
+    Nodes and edges are buffered up to block_size rows, then written as a
+    block (preceded by the strings it introduced), so memory use is bounded
+    by the block size and the interning table.
+    """
+    
+    def __init__(self, fileobj: BinaryIO, compression: Optional[str] = None,
+                 use_msgpack: Optional[bool] = None, block_size: int = 10000):
+        compression = compression or default_compression()
+        if compression not in COMPRESSION_NAMES:
+            raise ValueError(f"Unknown snapshot compression: {compression}")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            raise ImportError("zstd compression not available. Install with: pip install zstandard")
+        if use_msgpack and not MSGPACK_AVAILABLE:
+            raise ImportError("msgpack not available. Install with: pip install msgpack")
+        
+        self.fileobj = fileobj
+        self.codec = CODEC_MSGPACK if (MSGPACK_AVAILABLE if use_msgpack is None else use_msgpack) else CODEC_JSON
+        self.compression = COMPRESSION_NAMES[compression]
+        self.block_size = block_size
+        
+        self._strings: Dict[str, int] = {}
+        self._new_strings: List[str] = []
+        self._node_rows: List[list] = []
+        self._node_types: Set[int] = set()
+        self._edge_rows: List[list] = []
+        self._index: List[list] = []
+        self._offset = 0
+        self.node_count = 0
+        self.edge_count = 0
+        
+        self._write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.codec, self.compression))
+    
+    def _write(self, data: bytes) -> None:
+        self.fileobj.write(data)
+        self._offset += len(data)
+    
+    def _intern(self, value: str) -> int:
+        ref = self._strings.get(value)
+        if ref is None:
+            ref = self._strings[value] = len(self._strings)
+            self._new_strings.append(value)
+        return ref
+    
+    def _write_block(self, kind: bytes, rows: List[Any], extra: Any = None) -> None:
+        payload = _compress(self.compression, _encode(self.codec, rows))
+        self._index.append([kind.decode(), self._offset, len(rows), extra])
+        self._write(_BLOCK.pack(kind, len(rows), len(payload)))
+        self._write(payload)
+    
+    def _flush_strings(self) -> None:
+        if self._new_strings:
+            self._write_block(BLOCK_STRINGS, self._new_strings)
+            self._new_strings = []
+    
+    def _flush_nodes(self) -> None:
+        if self._node_rows:
+            self._flush_strings()
+            self._write_block(BLOCK_NODES, self._node_rows, sorted(self._node_types))
+            self._node_rows = []
+            self._node_types = set()
+    
+    def _flush_edges(self) -> None:
+        if self._edge_rows:
+            self._flush_strings()
+            self._write_block(BLOCK_EDGES, self._edge_rows)
+            self._edge_rows = []
+    
+    def add_node(self, node: GraphNode) -> None:
+        """Add a node to the snapshot."""
+        node_type = self._intern(node.node_type)
+        self._node_types.add(node_type)
+        self._node_rows.append([
+            self._intern(node.id), self._intern(node.label), node_type, node.confidence, node.properties or None
+        ])
+        self.node_count += 1
+        if len(self._node_rows) >= self.block_size:
+            self._flush_nodes()
+    
+    def add_edge(self, edge: GraphEdge) -> None:
+        """Add an edge to the snapshot."""
+        self._edge_rows.append([
+            self._intern(edge.source), self._intern(edge.target), self._intern(edge.relationship),
+            edge.confidence, edge.properties or None
+        ])
+        self.edge_count += 1
+        if len(self._edge_rows) >= self.block_size:
+            self._flush_edges()
+    
+    def write_graph(self, graph: KnowledgeGraph) -> None:
+        """Add every node, then every edge, of a graph."""
+        for node in graph.nodes.values():
+            self.add_node(node)
+        self._flush_nodes()
+        for edge in graph.edges.values():
+            self.add_edge(edge)
+    
+    def close(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Write buffered rows and the footer index."""
+        self._flush_nodes()
+        self._flush_edges()
+        
+        index_offset = self._offset
+        index = {
+            "metadata": {
+                "created_at": datetime.utcnow().isoformat(),
+                "version": SNAPSHOT_VERSION,
+                "node_count": self.node_count,
+                "edge_count": self.edge_count,
+                **(metadata or {})
+            },
+            "blocks": self._index
+        }
+        payload = _encode(self.codec, index)
+        self._write(_BLOCK.pack(BLOCK_INDEX, len(self._index), len(payload)))
+        self._write(payload)
+        self._write(_TRAILER.pack(index_offset, SNAPSHOT_MAGIC))
+
+
+class GraphSnapshotReader:
+    """
+    Memory-mapped snapshot reader.
+    
+    Only the footer is read when the snapshot is opened. Blocks are sliced
+    from the mapping and decoded one at a time, so loading a subgraph keeps
+    just the string table, the current block and the selected nodes and
+    edges in memory.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty graph snapshot: {path}")
+        if len(self._map) < _HEADER.size + _TRAILER.size:
+            self.close()
+            raise ValueError(f"Not a complete graph snapshot: {path}")
+        
+        magic, version, self.codec, self.compression = _HEADER.unpack_from(self._map, 0)
+        index_offset, trailer_magic = _TRAILER.unpack_from(self._map, len(self._map) - _TRAILER.size)
+        if magic != SNAPSHOT_MAGIC or trailer_magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"Not a complete graph snapshot: {path}")
+        if version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported graph snapshot version: {version}")
+        
+        kind, _, size = _BLOCK.unpack_from(self._map, index_offset)
+        index = _decode(self.codec, self._map[index_offset + _BLOCK.size:index_offset + _BLOCK.size + size])
+        self.metadata: Dict[str, Any] = index["metadata"]
+        self.blocks: List[list] = index["blocks"]
+        self._strings: Optional[List[str]] = None
+    
+    def __enter__(self) -> "GraphSnapshotReader":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Unmap and close the snapshot file."""
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+    
+    def _read_block(self, offset: int) -> List[Any]:
+        _, _, size = _BLOCK.unpack_from(self._map, offset)
+        start = offset + _BLOCK.size
+        with memoryview(self._map)[start:start + size] as payload:
+            return _decode(self.codec, _decompress(self.compression, payload))
+    
+    @property
+    def strings(self) -> List[str]:
+        """The interning table (decoded on first use)."""
+        if self._strings is None:
+            strings = []
+            for kind, offset, _, _ in self.blocks:
+                if kind == BLOCK_STRINGS.decode():
+                    strings.extend(self._read_block(offset))
+            self._strings = strings
+        return self._strings
+    
+    def _iter_rows(self, kind: bytes, node_types: Optional[Set[int]] = None) -> Iterator[list]:
+        kind = kind.decode()
+        for block_kind, offset, _, block_types in self.blocks:
+            if block_kind != kind:
+                continue
+            if node_types is not None and not node_types.intersection(block_types or []):
+                continue
+            yield from self._read_block(offset)
+    
+    def _node(self, row: list) -> GraphNode:
+        strings = self.strings
+        return GraphNode(id=strings[row[0]], label=strings[row[1]], node_type=strings[row[2]],
+                         properties=row[4] or {}, confidence=row[3])
+    
+    def _edge(self, row: list) -> GraphEdge:
+        strings = self.strings
+        return GraphEdge(source=strings[row[0]], target=strings[row[1]], relationship=strings[row[2]],
+                         properties=row[4] or {}, confidence=row[3])
+    
+    def iter_nodes(self) -> Iterator[GraphNode]:
+        """Stream every node."""
+        for row in self._iter_rows(BLOCK_NODES):
+            yield self._node(row)
+    
+    def iter_edges(self) -> Iterator[GraphEdge]:
+        """Stream every edge."""
+        for row in self._iter_rows(BLOCK_EDGES):
+            yield self._edge(row)
+    
+    def load_graph(self) -> KnowledgeGraph:
+        """Load the whole graph."""
+        graph = KnowledgeGraph(initialize_domain_knowledge=False)
+        for node in self.iter_nodes():
+            graph.add_node(node)
+        for edge in self.iter_edges():
+            graph.add_edge(edge)
+        return graph
+    
+    def _refs(self, values: Optional[Iterable[str]]) -> Optional[Set[int]]:
+        if values is None:
+            return None
+        wanted = set(values)
+        return {ref for ref, value in enumerate(self.strings) if value in wanted}
+    
+    def load_subgraph(
+        self,
+        node_ids: Optional[Iterable[str]] = None,
+        labels: Optional[Iterable[str]] = None,
+        node_types: Optional[Iterable[str]] = None,
+        depth: int = 0
+    ) -> KnowledgeGraph:
+        """
+        Load the nodes matching any filter, their neighbors up to depth hops
+        (in either direction), and the edges between the loaded nodes.
+        """
+        id_refs = self._refs(node_ids) or set()
+        label_refs = self._refs(labels) or set()
+        type_refs = self._refs(node_types)
+        
+        # Node blocks without a requested type can be skipped when only types are given
+        block_filter = type_refs if node_ids is None and labels is None else None
+        selected: Set[int] = set()
+        for row in self._iter_rows(BLOCK_NODES, block_filter):
+            if row[0] in id_refs or row[1] in label_refs or (type_refs is not None and row[2] in type_refs):
+                selected.add(row[0])
+        
+        frontier = set(selected)
+        for _ in range(depth):
+            if not frontier:
+                break
+            reached = set()
+            for row in self._iter_rows(BLOCK_EDGES):
+                if row[0] in frontier and row[1] not in selected:
+                    reached.add(row[1])
+                elif row[1] in frontier and row[0] not in selected:
+                    reached.add(row[0])
+            selected |= reached
+            frontier = reached
+        
+        graph = KnowledgeGraph(initialize_domain_knowledge=False)
+        for row in self._iter_rows(BLOCK_NODES):
+            if row[0] in selected:
+                graph.add_node(self._node(row))
+        for row in self._iter_rows(BLOCK_EDGES):
+            if row[0] in selected and row[1] in selected:
+                graph.add_edge(self._edge(row))
+        return graph
+
+
+def write_graph_snapshot(graph: KnowledgeGraph, path: str, compression: Optional[str] = None,
+                         use_msgpack: Optional[bool] = None, block_size: int = 10000,
+                         metadata: Optional[Dict[str, Any]] = None) -> int:
+    """Write a graph snapshot atomically (via a temporary file), returning its size in bytes."""
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            writer = GraphSnapshotWriter(f, compression=compression, use_msgpack=use_msgpack, block_size=block_size)
+            writer.write_graph(graph)
+            writer.close(metadata)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return os.path.getsize(path)
@@ -2,18 +2,48 @@
 Knowledge Service for fact storage and verification.
 """
 
+import gc
+import csv
 import json
-from typing import Dict, Any, Optional, List, Set
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Set, Tuple, Iterable, Iterator, Union
 import networkx as nx
 from app.models.reasoning import ReasoningTrace, ReasoningStage, KnowledgeFact
 
 
+@contextmanager
+def _paused_gc():
+    """
+    Pause cyclic garbage collection during bulk loads.
+    
+    Loading allocates many small containers, which would otherwise trigger
+    repeated collections over the whole, ever-growing knowledge base.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
 class KnowledgeService:
     """Service for knowledge graph and fact verification."""
     
     def __init__(self):
         self.graph = nx.DiGraph()
         self.facts: Dict[str, KnowledgeFact] = {}
+        
+        # Triple indexes over fact IDs: subject -> predicate -> ids (SPO),
+        # predicate -> object -> ids (POS) and object -> subject -> ids (OSP)
+        self._spo: Dict[str, Dict[str, Set[str]]] = {}
+        self._pos: Dict[str, Dict[str, Set[str]]] = {}
+        self._osp: Dict[str, Dict[str, Set[str]]] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        
         self._initialize_knowledge_base()
     
     def _initialize_knowledge_base(self):
@@ -137,14 +167,141 @@ class KnowledgeService:
     
     def add_fact(self, fact: KnowledgeFact):
         """Add a fact to the knowledge base."""
-        fact_id = f"{fact.subject}_{fact.predicate}_{fact.object}"
-        self.facts[fact_id] = fact
+        self._index_fact(fact)
         
         # Add to graph
         self.graph.add_node(fact.subject, type="entity")
         self.graph.add_node(fact.object, type="entity")
         self.graph.add_edge(fact.subject, fact.object, predicate=fact.predicate, confidence=fact.confidence)
     
+    def add_facts(self, facts: Iterable[Union[KnowledgeFact, Dict[str, Any]]]) -> int:
+        """
+        Add many facts to the knowledge base at once.
+        
+        Facts are indexed one by one, but the graph is updated with a single
+        bulk insertion and garbage collection is paused while loading.
+        
+        Args:
+            facts: KnowledgeFact objects or dictionaries with fact fields
+            
+        Returns:
+            Number of facts added
+        """
+        nodes = {}
+        edges = []
+        count = 0
+        
+        with _paused_gc():
+            for fact in facts:
+                if not isinstance(fact, KnowledgeFact):
+                    fact = KnowledgeFact.model_validate(fact)
+                self._index_fact(fact)
+                nodes[fact.subject] = None
+                nodes[fact.object] = None
+                edges.append((fact.subject, fact.object, {"predicate": fact.predicate, "confidence": fact.confidence}))
+                count += 1
+            
+            self.graph.add_nodes_from(nodes, type="entity")
+            self.graph.add_edges_from(edges)
+        return count
+    
+    def load_facts(self, path: Union[str, Path], file_format: Optional[str] = None, batch_size: int = 10000) -> int:
+        """
+        Load facts from a JSONL or CSV file.
+        
+        JSONL files contain one fact object per line. CSV files need a header
+        with at least ``subject``, ``predicate`` and ``object`` columns;
+        ``confidence``, ``source`` and a JSON-encoded ``metadata`` column are
+        optional. The file is streamed and added in batches, so facts before an
+        invalid row remain loaded when a ValueError is raised.
+        
+        Args:
+            path: Path to the facts file
+            file_format: 'jsonl' or 'csv'; inferred from the extension if omitted
+            batch_size: Number of facts added per batch
+            
+        Returns:
+            Number of facts loaded
+        """
+        path = Path(path)
+        file_format = (file_format or path.suffix.lstrip(".")).lower()
+        if file_format in ("jsonl", "ndjson"):
+            rows = self._read_jsonl(path)
+        elif file_format == "csv":
+            rows = self._read_csv(path)
+        else:
+            raise ValueError(f"Unsupported fact file format: {file_format}")
+        
+        loaded = 0
+        batch: List[KnowledgeFact] = []
+        with _paused_gc():
+            for line_number, row in rows:
+                try:
+                    batch.append(KnowledgeFact.model_validate(row))
+                except ValueError as e:
+                    raise ValueError(f"Invalid fact on line {line_number} of {path}: {e}") from e
+                if len(batch) >= batch_size:
+                    loaded += self.add_facts(batch)
+                    batch = []
+            
+            if batch:
+                loaded += self.add_facts(batch)
+        return loaded
+    
+    def _read_jsonl(self, path: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_number} of {path}: {e}") from e
+    
+    def _read_csv(self, path: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        with open(path, encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                fact = {key: value for key, value in row.items() if key and value not in (None, "")}
+                if "metadata" in fact:
+                    try:
+                        fact["metadata"] = json.loads(fact["metadata"])
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"Invalid metadata on line {reader.line_num} of {path}: {e}") from e
+                yield reader.line_num, fact
+    
+    def _index_fact(self, fact: KnowledgeFact) -> str:
+        """Store a fact and add it to the triple indexes."""
+        fact_id = f"{fact.subject}_{fact.predicate}_{fact.object}"
+        existing = self.facts.get(fact_id)
+        if existing is not None and (existing.subject, existing.predicate, existing.object) != (fact.subject, fact.predicate, fact.object):
+            # A different triple with a colliding ID replaces the old one
+            self._unindex(fact_id, existing)
+        
+        self.facts[fact_id] = fact
+        if fact_id not in self._order:
+            self._order[fact_id] = self._next_order
+            self._next_order += 1
+        
+        self._spo.setdefault(fact.subject, {}).setdefault(fact.predicate, set()).add(fact_id)
+        self._pos.setdefault(fact.predicate, {}).setdefault(fact.object, set()).add(fact_id)
+        self._osp.setdefault(fact.object, {}).setdefault(fact.subject, set()).add(fact_id)
+        return fact_id
+    
+    def _unindex(self, fact_id: str, fact: KnowledgeFact) -> None:
+        for index, first, second in (
+            (self._spo, fact.subject, fact.predicate),
+            (self._pos, fact.predicate, fact.object),
+            (self._osp, fact.object, fact.subject)
+        ):
+            ids = index.get(first, {}).get(second)
+            if ids is not None:
+                ids.discard(fact_id)
+                if not ids:
+                    del index[first][second]
+                    if not index[first]:
+                        del index[first]
+    
     def query_facts(
         self, 
         subject: Optional[str] = None, 
@@ -152,18 +309,30 @@ class KnowledgeService:
         object: Optional[str] = None
     ) -> List[KnowledgeFact]:
         """Query facts from the knowledge base."""
-        results = []
+        return [self.facts[fact_id] for fact_id in self._query_fact_ids(subject, predicate, object)]
+    
+    def _query_fact_ids(
+        self,
+        subject: Optional[str] = None,
+        predicate: Optional[str] = None,
+        object: Optional[str] = None
+    ) -> List[str]:
+        """Get IDs of matching facts, in insertion order, using the best index."""
+        if subject:
+            by_predicate = self._spo.get(subject, {})
+            groups = [by_predicate.get(predicate, set())] if predicate else list(by_predicate.values())
+            if object:
+                groups = [{fact_id for fact_id in ids if self.facts[fact_id].object == object} for ids in groups]
+        elif predicate:
+            by_object = self._pos.get(predicate, {})
+            groups = [by_object.get(object, set())] if object else list(by_object.values())
+        elif object:
+            groups = list(self._osp.get(object, {}).values())
+        else:
+            return list(self.facts)
         
-        for fact in self.facts.values():
-            if subject and fact.subject != subject:
-                continue
-            if predicate and fact.predicate != predicate:
-                continue
-            if object and fact.object != object:
-                continue
-            results.append(fact)
-        
-        return results
+        fact_ids = set().union(*groups) if groups else set()
+        return sorted(fact_ids, key=self._order.__getitem__)
     
     def verify_hypothesis(
         self, 
@@ -188,15 +357,17 @@ class KnowledgeService:
         
         # Find relevant facts
         relevant_facts = []
+        seen_fact_ids: Set[str] = set()
         verification_results = []
         
         for concept in concepts:
-            facts = self.query_facts(subject=concept)
-            facts.extend(self.query_facts(object=concept))
+            fact_ids = self._query_fact_ids(subject=concept)
+            fact_ids.extend(self._query_fact_ids(object=concept))
             
-            for fact in facts:
-                if fact not in relevant_facts:
-                    relevant_facts.append(fact)
+            for fact_id in fact_ids:
+                if fact_id not in seen_fact_ids:
+                    seen_fact_ids.add(fact_id)
+                    relevant_facts.append(self.facts[fact_id])
         
         # Verify against facts
         for fact in relevant_facts:
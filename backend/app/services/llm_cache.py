@@ -0,0 +1,287 @@
+"""
+LLM Response Cache
+Layered cache for LLM completions: in-process LRU with an optional SQLite tier.
+"""
+
+import re
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
+
+from app.core.config import settings
+from app.services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+CacheValue = Tuple[str, Optional[int]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared in-flight completion whose computing caller was cancelled."""
+
+
+class SQLiteCacheTier:
+    """Persistent cache tier backed by SQLite with TTL and size-based eviction."""
+    
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[CacheValue]:
+        """Get a cached value, dropping it if it has expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        
+        content, tokens_used = json.loads(value)
+        return content, tokens_used
+    
+    def set(self, key: str, value: CacheValue) -> None:
+        """Store a value and evict the least recently used entries over the size limit."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(list(value)), now, now)
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+    
+    def count(self) -> int:
+        """Get the number of stored entries."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    """
+    Layered LLM response cache.
+    
+    Lookups go to an in-process LRU first and then to the optional SQLite
+    tier. Concurrent callers asking for the same prompt share a single
+    in-flight completion instead of each calling the API.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 3600,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_entries: int = 100000
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[CacheValue, float]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.disk: Optional[SQLiteCacheTier] = None
+        if sqlite_path:
+            self.disk = SQLiteCacheTier(sqlite_path, ttl_seconds, sqlite_max_entries)
+        
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0
+        }
+    
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        """Build a cache key from a normalized prompt."""
+        normalized_messages = [
+            {"role": message["role"], "content": _WHITESPACE.sub(" ", message["content"]).strip()}
+            for message in messages
+        ]
+        payload = json.dumps({
+            "model": model,
+            "messages": normalized_messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[CacheValue]]) -> Tuple[CacheValue, bool]:
+        """
+        Get a cached completion or compute it once.
+        
+        Args:
+            key: Cache key from make_key
+            compute: Coroutine factory that calls the LLM
+        
+        Returns:
+            Tuple of (value, whether it was served without calling compute)
+        """
+        while True:
+            value = self._get_memory(key)
+            if value is not None:
+                return value, True
+            
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            self.stats["coalesced"] += 1
+            metrics_service.record_llm_cache_lookup("in_flight", "hit", 0.0)
+            try:
+                return await asyncio.shield(pending), True
+            except _LeaderCancelled:
+                # The caller computing it was cancelled; compute it here or join a new one
+                self.stats["coalesced"] -= 1
+        
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await self._get_disk(key)
+            cached = value is not None
+            if not cached:
+                self.stats["misses"] += 1
+                value = await compute()
+                await self._set_disk(key, value)
+            self._set_memory(key, value)
+            future.set_result(value)
+            return value, cached
+        except asyncio.CancelledError:
+            # Followers were not cancelled themselves, so hand them a retry instead
+            if not future.done():
+                future.set_exception(_LeaderCancelled())
+                future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+    
+    def _get_memory(self, key: str) -> Optional[CacheValue]:
+        start_time = time.perf_counter()
+        entry = self._memory.get(key)
+        value = None
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._memory.move_to_end(key)
+                value = entry[0]
+            else:
+                del self._memory[key]
+        
+        result = "hit" if value is not None else "miss"
+        if value is not None:
+            self.stats["memory_hits"] += 1
+        metrics_service.record_llm_cache_lookup("memory", result, time.perf_counter() - start_time)
+        return value
+    
+    def _set_memory(self, key: str, value: CacheValue) -> None:
+        self._memory[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+        metrics_service.update_llm_cache_entries("memory", len(self._memory))
+    
+    async def _get_disk(self, key: str) -> Optional[CacheValue]:
+        if self.disk is None:
+            return None
+        
+        start_time = time.perf_counter()
+        try:
+            value = await asyncio.to_thread(self.disk.get, key)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading LLM cache: {e}")
+            value = None
+        
+        result = "hit" if value is not None else "miss"
+        if value is not None:
+            self.stats["disk_hits"] += 1
+        metrics_service.record_llm_cache_lookup("disk", result, time.perf_counter() - start_time)
+        return value
+    
+    async def _set_disk(self, key: str, value: CacheValue) -> None:
+        if self.disk is None:
+            return
+        try:
+            await asyncio.to_thread(self.disk.set, key, value)
+        except sqlite3.Error as e:
+            logger.error(f"Error writing LLM cache: {e}")
+    
+    def clear(self) -> None:
+        """Remove all cached entries from every tier."""
+        self._memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        metrics_service.update_llm_cache_entries("memory", 0)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["coalesced"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "disk_entries": self.disk.count() if self.disk is not None else None,
+            "in_flight": len(self._in_flight),
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+
+def create_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Create the LLM response cache from settings, or None when disabled."""
+    if not settings.llm_cache_enabled:
+        return None
+    return LLMResponseCache(
+        max_entries=settings.llm_cache_max_entries,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        sqlite_path=settings.llm_cache_sqlite_path,
+        sqlite_max_entries=settings.llm_cache_sqlite_max_entries
+    )
+
+
+# Global LLM response cache instance
+llm_response_cache = create_llm_response_cache()
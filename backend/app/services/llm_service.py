@@ -4,24 +4,120 @@ LLM Service for System 1 reasoning (intuitive, fast reasoning).
 
 import asyncio
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Tuple
+import httpx
 from openai import AsyncOpenAI
 from app.core.config import settings
 from app.models.reasoning import ReasoningTrace, ReasoningStage
+from app.services.llm_cache import LLMResponseCache, llm_response_cache
 
 
 class LLMService:
     """Service for LLM-based reasoning."""
     
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(self, client: Optional[AsyncOpenAI] = None, cache: Optional[LLMResponseCache] = None):
+        self.client = client or AsyncOpenAI(api_key=settings.openai_api_key)
         self.model = settings.openai_model
+        self.cache = cache if cache is not None else llm_response_cache
+    
+    @classmethod
+    def with_pooled_client(cls) -> "LLMService":
+        """Create an LLM service backed by a shared, connection-pooled HTTP client."""
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_keepalive_connections
+            ),
+            timeout=settings.timeout_seconds
+        )
+        return cls(client=AsyncOpenAI(api_key=settings.openai_api_key, http_client=http_client))
+    
+    async def close(self) -> None:
+        """Close the underlying HTTP client and release pooled connections."""
+        await self.client.close()
+    
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.3,
+        max_tokens: int = 1000,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, Optional[int]]:
+        """
+        Run a chat completion, optionally streaming tokens as they arrive.
+        
+        Completions are served from the response cache when possible, and
+        identical prompts already in flight share one API call. A cached
+        completion is delivered to on_token as a single chunk.
+        
+        Args:
+            messages: Chat messages to send
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            on_token: Optional callback receiving each content token; enables streaming
+            
+        Returns:
+            Tuple of (completion text, total tokens used if reported; 0 for cache hits)
+        """
+        if self.cache is None:
+            return await self._request_completion(messages, temperature, max_tokens, on_token)
+        
+        key = LLMResponseCache.make_key(self.model, messages, temperature, max_tokens)
+        (content, tokens_used), cached = await self.cache.get_or_compute(
+            key,
+            lambda: self._request_completion(messages, temperature, max_tokens, on_token)
+        )
+        
+        if not cached:
+            return content, tokens_used
+        
+        if on_token is not None:
+            on_token(content)
+        return content, 0
+    
+    async def _request_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, Optional[int]]:
+        """Call the chat completions API, streaming tokens to on_token if given."""
+        if on_token is None:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message.content, response.usage.total_tokens
+        
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        
+        parts: List[str] = []
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            token = chunk.choices[0].delta.content
+            if token:
+                parts.append(token)
+                on_token(token)
+        
+        # Usage is not reported for streamed completions
+        return "".join(parts), None
     
     async def generate_hypothesis(
         self, 
         question: str, 
         context: Optional[str] = None,
-        domain: Optional[str] = None
+        domain: Optional[str] = None,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> ReasoningTrace:
         """
         Generate an initial hypothesis using the LLM.
@@ -30,6 +126,7 @@ class LLMService:
             question: The question to reason about
             context: Additional context
             domain: Domain context (e.g., 'healthcare', 'finance')
+            on_token: Optional callback receiving content tokens as they stream in
             
         Returns:
             ReasoningTrace with the LLM hypothesis
@@ -49,25 +146,23 @@ class LLMService:
             user_message += f"\nContext: {context}"
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            hypothesis, tokens_used = await self.chat_completion(
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_message}
                 ],
                 temperature=0.3,
-                max_tokens=1000
+                max_tokens=1000,
+                on_token=on_token
             )
             
-            hypothesis = response.choices[0].message.content
-            
             return ReasoningTrace(
                 stage=ReasoningStage.LLM_HYPOTHESIS,
                 output=hypothesis,
                 confidence=0.8,  # Default confidence for LLM
                 metadata={
                     "model": self.model,
-                    "tokens_used": response.usage.total_tokens,
+                    "tokens_used": tokens_used,
                     "domain": domain
                 }
             )
@@ -159,8 +254,7 @@ class LLMService:
         """
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            validation_result, _ = await self.chat_completion(
                 messages=[
                     {"role": "system", "content": "You are a validation assistant. Respond only in valid JSON."},
                     {"role": "user", "content": validation_prompt}
@@ -169,8 +263,6 @@ class LLMService:
                 max_tokens=500
             )
             
-            validation_result = response.choices[0].message.content
-            
             # Try to parse JSON response
             try:
                 parsed_result = json.loads(validation_result)
@@ -209,8 +301,7 @@ class LLMService:
             Generated response as string
         """
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
+            response, _ = await self.chat_completion(
                 messages=[
                     {"role": "system", "content": "You are a helpful AI assistant. Respond in the requested format."},
                     {"role": "user", "content": prompt}
@@ -219,7 +310,7 @@ class LLMService:
                 max_tokens=1000
             )
             
-            return response.choices[0].message.content
+            return response
             
         except Exception as e:
             return f"Error generating response: {str(e)}"
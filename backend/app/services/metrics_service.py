@@ -108,6 +108,29 @@ class ReasoningMetricsService:
             registry=self.registry
         )
         
+        # LLM cache metrics
+        self.llm_cache_requests_total = Counter(
+            'llm_cache_requests_total',
+            'Total number of LLM response cache lookups',
+            ['tier', 'result'],
+            registry=self.registry
+        )
+        
+        self.llm_cache_lookup_time = Histogram(
+            'llm_cache_lookup_time_seconds',
+            'LLM response cache lookup time in seconds',
+            ['tier'],
+            buckets=[0.00001, 0.0001, 0.001, 0.005, 0.01, 0.05, 0.1],
+            registry=self.registry
+        )
+        
+        self.llm_cache_entries = Gauge(
+            'llm_cache_entries',
+            'Number of entries in the LLM response cache',
+            ['tier'],
+            registry=self.registry
+        )
+        
         # Prolog metrics
         self.prolog_queries_total = Counter(
             'prolog_queries_total',
@@ -193,6 +216,15 @@ class ReasoningMetricsService:
         if completion_tokens > 0:
             self.llm_tokens_used.labels(model=model, token_type="completion").inc(completion_tokens)
     
+    def record_llm_cache_lookup(self, tier: str, result: str, duration: float):
+        """Record an LLM response cache lookup."""
+        self.llm_cache_requests_total.labels(tier=tier, result=result).inc()
+        self.llm_cache_lookup_time.labels(tier=tier).observe(duration)
+    
+    def update_llm_cache_entries(self, tier: str, count: int):
+        """Update LLM response cache size."""
+        self.llm_cache_entries.labels(tier=tier).set(count)
+    
     def record_prolog_query(self, query_type: str, status: str, duration: float):
         """Record Prolog query metrics."""
         self.prolog_queries_total.labels(query_type=query_type, status=status).inc()
@@ -10,8 +10,10 @@ import asyncio
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import logging
+from collections import deque
 import networkx as nx
 from dataclasses import dataclass, field
+from app.models.reasoning import ReasoningTrace, ReasoningStage
 
 logger = logging.getLogger(__name__)
 
@@ -52,18 +54,29 @@ class GraphEdge:
 class KnowledgeGraph:
     """Modern knowledge graph for reasoning."""
     
-    def __init__(self):
+    def __init__(self, initialize_domain_knowledge: bool = True):
         self.graph = nx.DiGraph()
         self.nodes: Dict[str, GraphNode] = {}
         self.edges: Dict[str, GraphEdge] = {}
         self.logger = logging.getLogger(__name__)
         
+        # Label -> node ID (first node with a label wins) and
+        # source -> relationship -> ordered targets
+        self._label_index: Dict[str, str] = {}
+        self._out_edges: Dict[str, Dict[str, Dict[str, None]]] = {}
+        
         # Initialize with domain knowledge
-        self._initialize_domain_knowledge()
+        if initialize_domain_knowledge:
+            self._initialize_domain_knowledge()
     
     def add_node(self, node: GraphNode) -> None:
         """Add a node to the graph."""
+        previous = self.nodes.get(node.id)
+        if previous is not None and previous.label != node.label and self._label_index.get(previous.label) == node.id:
+            del self._label_index[previous.label]
+        
         self.nodes[node.id] = node
+        self._label_index.setdefault(node.label, node.id)
         self.graph.add_node(node.id, **node.properties)
         self.logger.info(f"Added node: {node.label} ({node.id})")
     
@@ -71,83 +84,126 @@ class KnowledgeGraph:
         """Add an edge to the graph."""
         edge_id = f"{edge.source}->{edge.target}:{edge.relationship}"
         self.edges[edge_id] = edge
+        
+        previous = None
+        if self.graph.has_edge(edge.source, edge.target):
+            previous = self.graph.edges[edge.source, edge.target].get('relationship')
+        
         self.graph.add_edge(edge.source, edge.target, 
                            relationship=edge.relationship, **edge.properties)
+        
+        by_relationship = self._out_edges.setdefault(edge.source, {})
+        if previous is not None and previous != edge.relationship:
+            # The graph keeps one edge per node pair, so the new relationship
+            # replaces the old one; reindex it in adjacency order
+            by_relationship.get(previous, {}).pop(edge.target, None)
+            by_relationship[edge.relationship] = {
+                target: None
+                for target, data in self.graph.adj[edge.source].items()
+                if data.get('relationship') == edge.relationship
+            }
+        else:
+            by_relationship.setdefault(edge.relationship, {})[edge.target] = None
+    
+    def rebuild_indexes(self) -> None:
+        """Rebuild the label and out-edge indexes after nodes or graph were changed directly."""
+        self._label_index = {}
+        for node in self.nodes.values():
+            self._label_index.setdefault(node.label, node.id)
+        
+        self._out_edges = {}
+        for source, target, relationship in self.graph.edges(data='relationship'):
+            self._out_edges.setdefault(source, {}).setdefault(relationship, {})[target] = None
+    
+    def get_node_id(self, label: str) -> Optional[str]:
+        """Get the ID of the node with a label."""
+        return self._label_index.get(label)
     
     def query(self, subject: str, predicate: str = None) -> List[Tuple[str, str, Dict[str, Any]]]:
         """Query the graph for relationships."""
-        results = []
-        
-        # Find node by label
-        subject_node_id = None
-        for node_id, node in self.nodes.items():
-            if node.label == subject:
-                subject_node_id = node_id
-                break
-        
-        if not subject_node_id:
-            return results
+        subject_node_id = self.get_node_id(subject)
+        if not subject_node_id or subject_node_id not in self.graph:
+            return []
         
+        out_edges = self.graph.adj[subject_node_id]
         if predicate:
             # Find specific relationships
-            for source, target, data in self.graph.edges(data=True):
-                if source == subject_node_id and data.get('relationship') == predicate:
-                    results.append((source, target, data))
-        else:
-            # Find all relationships from subject
-            for source, target, data in self.graph.edges(data=True):
-                if source == subject_node_id:
-                    results.append((source, target, data))
+            targets = self._out_edges.get(subject_node_id, {}).get(predicate, {})
+            return [(subject_node_id, target, out_edges[target]) for target in targets]
         
-        return results
+        # Find all relationships from subject
+        return [(subject_node_id, target, data) for target, data in out_edges.items()]
     
     def find_path(self, source: str, target: str, max_length: int = 3) -> List[str]:
-        """Find path between two nodes."""
-        try:
-            # Find node IDs by labels
-            source_id = None
-            target_id = None
-            
-            for node_id, node in self.nodes.items():
-                if node.label == source:
-                    source_id = node_id
-                elif node.label == target:
-                    target_id = node_id
-            
-            if not source_id or not target_id:
-                return []
-            
-            path = nx.shortest_path(self.graph, source_id, target_id)
-            return path if len(path) <= max_length else []
-        except nx.NetworkXNoPath:
+        """Find the shortest path of at most ``max_length`` nodes between two concepts."""
+        # Find node IDs by labels
+        source_id = self.get_node_id(source)
+        target_id = self.get_node_id(target)
+        
+        if not source_id or not target_id or source_id not in self.graph:
             return []
+        if source_id == target_id:
+            return [source_id]
+        
+        # Breadth-first search that never expands beyond max_length nodes
+        parents: Dict[str, Optional[str]] = {source_id: None}
+        queue = deque([(source_id, 1)])
+        while queue:
+            node_id, length = queue.popleft()
+            if length >= max_length:
+                continue
+            
+            for neighbor in self.graph.successors(node_id):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = node_id
+                if neighbor == target_id:
+                    path = [neighbor]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                queue.append((neighbor, length + 1))
+        
+        return []
     
-    def get_related_concepts(self, concept: str, max_depth: int = 2) -> List[str]:
-        """Get related concepts up to a certain depth."""
-        related = set()
-        visited = set()
-        
-        # Find node ID by label
-        concept_id = None
-        for node_id, node in self.nodes.items():
-            if node.label == concept:
-                concept_id = node_id
-                break
-        
-        if not concept_id:
-            return []
+    def get_related_concepts(self, concept: str, max_depth: int = 2, limit: Optional[int] = None) -> List[str]:
+        """
+        Get related concepts up to a certain depth.
+        
+        Uses an iterative breadth-first search, so deep graphs cannot exhaust
+        the recursion limit and every node within ``max_depth`` hops is found.
         
-        def dfs(node_id: str, depth: int):
-            if depth > max_depth or node_id in visited:
-                return
-            visited.add(node_id)
-            related.add(node_id)
+        Args:
+            concept: Label of the starting concept
+            max_depth: Maximum number of hops from the concept
+            limit: Stop after this many related concepts have been found
             
-            for neighbor in self.graph.neighbors(node_id):
-                dfs(neighbor, depth + 1)
+        Returns:
+            IDs of related nodes in breadth-first order
+        """
+        concept_id = self.get_node_id(concept)
+        if not concept_id or concept_id not in self.graph:
+            return []
         
-        dfs(concept_id, 0)
-        return list(related - {concept_id})
+        related: List[str] = []
+        visited = {concept_id}
+        queue = deque([(concept_id, 0)])
+        
+        while queue:
+            node_id, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            
+            for neighbor in self.graph.successors(node_id):
+                if neighbor in visited:
+                    continue
+                visited.add(neighbor)
+                related.append(neighbor)
+                if limit is not None and len(related) >= limit:
+                    return related
+                queue.append((neighbor, depth + 1))
+        
+        return related
     
     def _initialize_domain_knowledge(self):
         """Initialize the graph with domain-specific knowledge."""
@@ -426,6 +482,33 @@ class ModernReasoningService:
         
         return results
     
+    async def apply_rules(self, hypothesis: str, question: str, domain: Optional[str] = None) -> ReasoningTrace:
+        """Apply rule-based validation to a hypothesis as a reasoning pipeline stage."""
+        results = await self.reason_about_text(f"{question} {hypothesis}", domain or "general")
+        validations = results["validation_results"]
+        
+        if validations:
+            output = "Rule check results:\n"
+            for name, validation in validations.items():
+                status = "PASS" if validation.is_valid else "FAIL"
+                output += f"- {name}: {status} ({validation.reasoning})\n"
+            confidence = results["overall_confidence"]
+        else:
+            output = "No applicable rules for this domain."
+            confidence = 0.5
+        
+        return ReasoningTrace(
+            stage=ReasoningStage.RULE_CHECK,
+            output=output,
+            confidence=confidence,
+            metadata={
+                "domain": domain,
+                "rules_checked": list(validations.keys()),
+                "graph_insights": results["graph_insights"],
+                "recommendations": results["recommendations"]
+            }
+        )
+    
     def _extract_graph_insights(self, text: str, domain: str) -> Dict[str, Any]:
         """Extract insights using the knowledge graph."""
         insights = {
@@ -2,40 +2,65 @@
 Orchestration Service for coordinating the reasoning pipeline.
 """
 
+import json
 import asyncio
 import time
 import uuid
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Callable, Tuple, AsyncIterator
 from app.models.reasoning import (
     ReasoningRequest, 
     ReasoningResponse, 
     ReasoningTrace, 
     ReasoningStage,
-    ReasoningSession
+    ReasoningSession,
+    BatchReasoningItem
 )
 from app.services.llm_service import LLMService
-from app.services.modern_reasoning_service import create_modern_reasoning_service
+from app.services.modern_reasoning_service import ModernReasoningService, create_modern_reasoning_service
 from app.services.knowledge_service import KnowledgeService
 from app.core.config import settings
 
 
+@dataclass
+class PipelineStage:
+    """A node in the reasoning pipeline DAG."""
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    depends_on: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+    fallback: Optional[Callable[[Dict[str, Any], str], Any]] = None
+    blocking: bool = False  # Run synchronous, CPU-bound work in the default executor
+
+
 class OrchestrationService:
     """Service for orchestrating the reasoning pipeline."""
     
-    def __init__(self):
-        self.llm_service = LLMService()
-        self.symbolic_service = create_modern_reasoning_service(self.llm_service)
-        self.knowledge_service = KnowledgeService()
+    def __init__(
+        self,
+        llm_service: Optional[LLMService] = None,
+        symbolic_service: Optional[ModernReasoningService] = None,
+        knowledge_service: Optional[KnowledgeService] = None
+    ):
+        self.llm_service = llm_service or LLMService()
+        self.symbolic_service = symbolic_service or create_modern_reasoning_service(self.llm_service)
+        self.knowledge_service = knowledge_service or KnowledgeService()
     
     async def reason(
         self, 
-        request: ReasoningRequest
+        request: ReasoningRequest,
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None
     ) -> ReasoningResponse:
         """
         Execute the complete reasoning pipeline.
         
+        The rule check and knowledge verification stages depend only on the
+        LLM hypothesis, so they run concurrently once it is available.
+        
         Args:
             request: Reasoning request
+            on_event: Optional callback receiving (event, data) for each completed
+                trace and each streamed LLM token
             
         Returns:
             ReasoningResponse with answer and trace
@@ -45,62 +70,40 @@ class OrchestrationService:
         reasoning_trace: List[ReasoningTrace] = []
         
         try:
-            # Step 1: Generate LLM hypothesis (System 1)
-            llm_trace = await self.llm_service.generate_hypothesis(
-                question=request.question,
-                context=request.context,
-                domain=request.domain
-            )
-            reasoning_trace.append(llm_trace)
-            
-            # Step 2: Apply symbolic rules (System 2)
-            symbolic_trace = await self.symbolic_service.apply_rules(
-                hypothesis=llm_trace.output,
-                question=request.question,
-                domain=request.domain
-            )
-            reasoning_trace.append(symbolic_trace)
-            
-            # Step 3: Verify against knowledge base
-            knowledge_trace = await self.knowledge_service.verify_hypothesis(
-                hypothesis=llm_trace.output,
-                question=request.question,
-                domain=request.domain
+            results, stage_timings = await self._execute_pipeline(
+                self._build_pipeline(request, on_event),
+                on_stage_complete=self._trace_event_emitter(on_event) if on_event else None
             )
-            reasoning_trace.append(knowledge_trace)
             
-            # Step 4: Generate final answer
-            final_answer = await self._generate_final_answer(
-                llm_hypothesis=llm_trace.output,
-                symbolic_result=symbolic_trace.output,
-                knowledge_result=knowledge_trace.output,
-                question=request.question,
-                domain=request.domain
-            )
-            
-            # Step 5: Calculate overall confidence
+            reasoning_trace = [
+                results[name] for name in ["hypothesis", "rule_check", "knowledge_check"]
+            ]
             overall_confidence = self._calculate_overall_confidence(reasoning_trace)
+            reasoning_trace.append(results["validation"])
             
-            # Step 6: Validate final answer
-            validation_trace = await self.llm_service.validate_answer(
-                question=request.question,
-                answer=final_answer,
-                domain=request.domain
-            )
-            reasoning_trace.append(validation_trace)
-            
+            failed_stages = [
+                name for name, timing in stage_timings.items() if timing["status"] != "completed"
+            ]
             processing_time = time.time() - start_time
+            metadata = {
+                "processing_time": processing_time,
+                "session_id": str(uuid.uuid4()),
+                "steps_completed": len(reasoning_trace),
+                "stage_timings": stage_timings,
+                "partial": bool(failed_stages),
+                "failed_stages": failed_stages
+            }
+            
+            # Every other stage builds on the hypothesis, so without it the answer is only a fallback
+            if "hypothesis" in failed_stages:
+                metadata["error"] = results["hypothesis"].metadata["error"]
             
             return ReasoningResponse(
-                answer=final_answer,
+                answer=results["final_answer"],
                 reasoning_trace=reasoning_trace,
                 confidence=overall_confidence,
                 domain=request.domain,
-                metadata={
-                    "processing_time": processing_time,
-                    "session_id": str(uuid.uuid4()),
-                    "steps_completed": len(reasoning_trace)
-                }
+                metadata=metadata
             )
             
         except Exception as e:
@@ -121,13 +124,309 @@ class OrchestrationService:
                 metadata={"error": str(e)}
             )
     
+    def _build_pipeline(
+        self,
+        request: ReasoningRequest,
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> List[PipelineStage]:
+        """
+        Build the reasoning pipeline DAG for a request.
+        
+        Args:
+            request: Reasoning request
+            on_event: Optional event callback; enables LLM token streaming
+            
+        Returns:
+            Pipeline stages in dependency order
+        """
+        
+        def token_emitter(stage_name: str) -> Optional[Callable[[str], None]]:
+            if on_event is None:
+                return None
+            return lambda token: on_event("token", {"stage": stage_name, "token": token})
+        
+        async def hypothesis(results: Dict[str, Any]) -> ReasoningTrace:
+            return await self.llm_service.generate_hypothesis(
+                question=request.question,
+                context=request.context,
+                domain=request.domain,
+                on_token=token_emitter("hypothesis")
+            )
+        
+        async def rule_check(results: Dict[str, Any]) -> ReasoningTrace:
+            return await self.symbolic_service.apply_rules(
+                hypothesis=results["hypothesis"].output,
+                question=request.question,
+                domain=request.domain
+            )
+        
+        def knowledge_check(results: Dict[str, Any]) -> ReasoningTrace:
+            return self.knowledge_service.verify_hypothesis(
+                hypothesis=results["hypothesis"].output,
+                question=request.question,
+                domain=request.domain
+            )
+        
+        async def final_answer(results: Dict[str, Any]) -> str:
+            return await self._generate_final_answer(
+                llm_hypothesis=results["hypothesis"].output,
+                symbolic_result=results["rule_check"].output,
+                knowledge_result=results["knowledge_check"].output,
+                question=request.question,
+                domain=request.domain,
+                on_token=token_emitter("final_answer")
+            )
+        
+        async def validation(results: Dict[str, Any]) -> ReasoningTrace:
+            return await self.llm_service.validate_answer(
+                question=request.question,
+                answer=results["final_answer"],
+                domain=request.domain
+            )
+        
+        def fallback_trace(stage: ReasoningStage) -> Callable[[Dict[str, Any], str], ReasoningTrace]:
+            def fallback(results: Dict[str, Any], error: str) -> ReasoningTrace:
+                return ReasoningTrace(
+                    stage=stage,
+                    output=f"{stage.value} unavailable: {error}",
+                    confidence=0.0,
+                    metadata={"error": error, "partial": True}
+                )
+            return fallback
+        
+        def fallback_answer(results: Dict[str, Any], error: str) -> str:
+            return (
+                f"Based on the analysis: {results['hypothesis'].output}\n\n"
+                f"Rule check results: {results['rule_check'].output}\n\n"
+                f"Knowledge verification: {results['knowledge_check'].output}"
+            )
+        
+        llm_timeout = settings.llm_stage_timeout_seconds
+        check_timeout = settings.check_stage_timeout_seconds
+        
+        return [
+            PipelineStage("hypothesis", hypothesis, [], llm_timeout,
+                          fallback_trace(ReasoningStage.LLM_HYPOTHESIS)),
+            PipelineStage("rule_check", rule_check, ["hypothesis"], llm_timeout,
+                          fallback_trace(ReasoningStage.RULE_CHECK)),
+            PipelineStage("knowledge_check", knowledge_check, ["hypothesis"], check_timeout,
+                          fallback_trace(ReasoningStage.KNOWLEDGE_GRAPH), blocking=True),
+            PipelineStage("final_answer", final_answer, ["hypothesis", "rule_check", "knowledge_check"],
+                          llm_timeout, fallback_answer),
+            PipelineStage("validation", validation, ["final_answer"], llm_timeout,
+                          fallback_trace(ReasoningStage.VALIDATION)),
+        ]
+    
+    async def _execute_pipeline(
+        self,
+        stages: List[PipelineStage],
+        on_stage_complete: Optional[Callable[[str, Any, Dict[str, Any]], None]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        Execute pipeline stages, starting each one as soon as its dependencies finish.
+        
+        A stage that fails or times out is replaced by its fallback result so
+        dependent stages can still run on partial results.
+        
+        Args:
+            stages: Pipeline stages in dependency order
+            on_stage_complete: Optional callback receiving (name, result, timing)
+            
+        Returns:
+            Tuple of (results by stage name, timings by stage name)
+        """
+        
+        loop = asyncio.get_running_loop()
+        results: Dict[str, Any] = {}
+        stage_timings: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        
+        async def run_stage(stage: PipelineStage, dependencies: List[asyncio.Task]) -> None:
+            if dependencies:
+                await asyncio.gather(*dependencies)
+            
+            ready_at = time.perf_counter()
+            started_at = ready_at
+            
+            def mark_started() -> None:
+                nonlocal started_at
+                started_at = time.perf_counter()
+            
+            def run_blocking() -> Any:
+                mark_started()
+                return stage.run(results)
+            
+            async def run_async() -> Any:
+                mark_started()
+                return await stage.run(results)
+            
+            status = "completed"
+            try:
+                if stage.blocking:
+                    call = loop.run_in_executor(None, run_blocking)
+                else:
+                    call = run_async()
+                result = await asyncio.wait_for(call, timeout=stage.timeout)
+            except asyncio.TimeoutError:
+                status = "timeout"
+                result = self._stage_fallback(stage, results, f"timed out after {stage.timeout}s")
+            except Exception as e:
+                status = "error"
+                result = self._stage_fallback(stage, results, str(e))
+            
+            finished_at = time.perf_counter()
+            timing = {
+                "status": status,
+                "wall_clock_ms": (finished_at - started_at) * 1000,
+                "queue_time_ms": (started_at - ready_at) * 1000
+            }
+            if isinstance(result, ReasoningTrace):
+                result.wall_clock_ms = timing["wall_clock_ms"]
+                result.queue_time_ms = timing["queue_time_ms"]
+            
+            results[stage.name] = result
+            stage_timings[stage.name] = timing
+            if on_stage_complete:
+                on_stage_complete(stage.name, result, timing)
+        
+        for stage in stages:
+            unknown = [name for name in stage.depends_on if name not in tasks]
+            if unknown:
+                raise ValueError(
+                    f"Stage '{stage.name}' depends on unknown or later stages: {', '.join(unknown)}"
+                )
+            dependencies = [tasks[name] for name in stage.depends_on]
+            tasks[stage.name] = asyncio.create_task(run_stage(stage, dependencies))
+        
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        
+        return results, stage_timings
+    
+    def _trace_event_emitter(
+        self,
+        on_event: Callable[[str, Dict[str, Any]], None]
+    ) -> Callable[[str, Any, Dict[str, Any]], None]:
+        """Build a stage-completion callback that emits trace events."""
+        def emit(name: str, result: Any, timing: Dict[str, Any]) -> None:
+            if isinstance(result, ReasoningTrace):
+                on_event("trace", {"stage_name": name, "trace": result.model_dump(mode="json")})
+            else:
+                on_event("stage", {"stage_name": name, "status": timing["status"]})
+        return emit
+    
+    async def reason_stream(self, request: ReasoningRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the reasoning pipeline, yielding events as they happen.
+        
+        Yields ``trace`` events as each stage completes, ``token`` events for
+        streamed LLM output and a final ``result`` event with the full response.
+        
+        Args:
+            request: Reasoning request
+            
+        Yields:
+            Event dictionaries with ``event`` and ``data`` keys
+        """
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def on_event(event: str, data: Dict[str, Any]) -> None:
+            queue.put_nowait({"event": event, "data": data})
+        
+        task = asyncio.create_task(self.reason(request, on_event=on_event))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            
+            response = task.result()
+            yield {"event": "result", "data": response.model_dump(mode="json")}
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    async def reason_many(
+        self,
+        requests: List[ReasoningRequest],
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[BatchReasoningItem]:
+        """
+        Reason about a batch of requests, yielding results in completion order.
+        
+        Identical requests within the batch are reasoned about once and share
+        the result. Failures are reported per item instead of failing the batch.
+        
+        Args:
+            requests: Reasoning requests to process
+            max_concurrency: Maximum requests in flight, capped by settings
+            
+        Yields:
+            BatchReasoningItem for every request, tagged with its batch index
+        """
+        
+        concurrency = min(max_concurrency or settings.batch_max_concurrency, settings.batch_max_concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        groups: Dict[str, List[int]] = {}
+        for index, request in enumerate(requests):
+            key = json.dumps(request.model_dump(mode="json"), sort_keys=True)
+            groups.setdefault(key, []).append(index)
+        
+        async def run(indexes: List[int]) -> Tuple[List[int], Optional[ReasoningResponse], Optional[str]]:
+            request = requests[indexes[0]]
+            async with semaphore:
+                try:
+                    validation = await self.validate_request(request)
+                    if not validation["valid"]:
+                        return indexes, None, f"Invalid request: {', '.join(validation['issues'])}"
+                    response = await self.reason(request)
+                    error = (response.metadata or {}).get("error")
+                    if error:
+                        return indexes, None, str(error)
+                    return indexes, response, None
+                except Exception as e:
+                    return indexes, None, str(e)
+        
+        tasks = [asyncio.create_task(run(indexes)) for indexes in groups.values()]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                indexes, response, error = await completed
+                for position, index in enumerate(indexes):
+                    yield BatchReasoningItem(
+                        index=index,
+                        status="error" if error else "success",
+                        response=response,
+                        error=error,
+                        deduplicated=position > 0
+                    )
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _stage_fallback(self, stage: PipelineStage, results: Dict[str, Any], error: str) -> Any:
+        """Get the partial result for a stage that did not complete."""
+        if stage.fallback is None:
+            raise RuntimeError(f"Stage '{stage.name}' failed: {error}")
+        return stage.fallback(results, error)
+    
     async def _generate_final_answer(
         self,
         llm_hypothesis: str,
         symbolic_result: str,
         knowledge_result: str,
         question: str,
-        domain: Optional[str] = None
+        domain: Optional[str] = None,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> str:
         """
         Generate the final answer based on all reasoning steps.
@@ -138,6 +437,7 @@ class OrchestrationService:
             knowledge_result: Knowledge base verification results
             question: Original question
             domain: Domain context
+            on_token: Optional callback receiving answer tokens as they stream in
             
         Returns:
             Final synthesized answer
@@ -161,17 +461,17 @@ class OrchestrationService:
         """
         
         try:
-            response = await self.llm_service.client.chat.completions.create(
-                model=self.llm_service.model,
+            answer, _ = await self.llm_service.chat_completion(
                 messages=[
                     {"role": "system", "content": "You are a reasoning synthesis assistant. Provide clear, accurate final answers."},
                     {"role": "user", "content": synthesis_prompt}
                 ],
                 temperature=0.2,
-                max_tokens=500
+                max_tokens=500,
+                on_token=on_token
             )
             
-            return response.choices[0].message.content
+            return answer
             
         except Exception as e:
             # Fallback to simple synthesis
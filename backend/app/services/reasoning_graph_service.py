@@ -3,14 +3,14 @@ Reasoning Graph Service for visualizing and persisting reasoning steps.
 """
 
 import json
+import asyncio
 import uuid
 import time
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 
 import networkx as nx
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
@@ -20,13 +20,22 @@ from app.models.reasoning_graph import (
     ReasoningGraphDB, GraphExecutionLog
 )
 from app.models.reasoning import ReasoningTrace, ReasoningStage
+from app.services.reasoning_graph_store import ReasoningGraphStore, reasoning_graph_store
+from app.services.graph_layout import force_directed_layout, place_new_nodes, layout_cache
+from app.services.graph_renderer import graph_renderer
 
 
 class ReasoningGraphService:
     """Service for managing reasoning graphs with visualization and persistence."""
     
-    def __init__(self):
-        self.graphs: Dict[str, ReasoningGraph] = {}
+    # Layouts that new nodes can be placed into without moving existing ones
+    INCREMENTAL_LAYOUTS = {"force_directed", "kamada_kawai", "spring"}
+    # Kamada-Kawai is O(n^3); larger graphs use the force-directed layout
+    KAMADA_KAWAI_MAX_NODES = 300
+    
+    def __init__(self, store: Optional[ReasoningGraphStore] = None):
+        # Graphs live in a bounded store shared across service instances
+        self.graphs = store if store is not None else reasoning_graph_store
         self.node_colors = {
             NodeType.INPUT: "#E3F2FD",  # Light blue
             NodeType.LLM_HYPOTHESIS: "#FFF3E0",  # Light orange
@@ -62,9 +71,23 @@ class ReasoningGraphService:
                 "version": "1.0.0"
             }
         )
-        self.graphs[graph_id] = graph
+        self.graphs.put(graph)
         return graph
     
+    def get_graph(self, graph_id: str) -> Optional[ReasoningGraph]:
+        """Get a reasoning graph by ID."""
+        return self.graphs.get(graph_id)
+    
+    def list_graphs(self, session_id: Optional[str] = None, tenant_id: Optional[str] = None,
+                    offset: int = 0, limit: int = 50) -> Tuple[List[ReasoningGraph], int]:
+        """List reasoning graphs, newest first; returns the page and the total count."""
+        return self.graphs.list_graphs(session_id=session_id, tenant_id=tenant_id, offset=offset, limit=limit)
+    
+    def delete_graph(self, graph_id: str) -> bool:
+        """Delete a reasoning graph."""
+        layout_cache.invalidate(graph_id)
+        return self.graphs.delete(graph_id)
+    
     def add_input_node(self, graph_id: str, question: str, context: Optional[Dict[str, Any]] = None) -> GraphNode:
         """Add an input node to the graph."""
         graph = self.graphs.get(graph_id)
@@ -86,6 +109,7 @@ class ReasoningGraphService:
         )
         
         graph.nodes.append(node)
+        self.graphs.put(graph)
         return node
     
     def add_llm_hypothesis_node(self, graph_id: str, hypothesis: str, confidence: float, metadata: Optional[Dict[str, Any]] = None) -> GraphNode:
@@ -109,6 +133,7 @@ class ReasoningGraphService:
         )
         
         graph.nodes.append(node)
+        self.graphs.put(graph)
         return node
     
     def add_rule_node(self, graph_id: str, rule_name: str, rule_type: NodeType, result: Dict[str, Any], confidence: float) -> GraphNode:
@@ -133,6 +158,7 @@ class ReasoningGraphService:
         )
         
         graph.nodes.append(node)
+        self.graphs.put(graph)
         return node
     
     def add_edge(self, graph_id: str, source_id: str, target_id: str, edge_type: EdgeType, label: str, weight: float = 1.0) -> GraphEdge:
@@ -152,147 +178,167 @@ class ReasoningGraphService:
         )
         
         graph.edges.append(edge)
+        self.graphs.put(graph)
         return edge
     
     def build_graph_from_traces(self, session_id: str, traces: List[ReasoningTrace]) -> ReasoningGraph:
         """Build a reasoning graph from reasoning traces."""
-        graph = self.create_graph(session_id)
-        
-        # Add input node (assuming first trace has the question)
-        if traces:
-            first_trace = traces[0]
-            input_node = self.add_input_node(
-                graph_id=graph.id,
-                question=first_trace.metadata.get("question", "Unknown question"),
-                context=first_trace.metadata
-            )
-        
-        previous_node = input_node
-        
-        for i, trace in enumerate(traces):
-            # Create node based on trace stage
-            if trace.stage == ReasoningStage.LLM_HYPOTHESIS:
-                node = self.add_llm_hypothesis_node(
+        # Nodes and edges are written to the store once, when the graph is complete
+        with self.graphs.batch():
+            graph = self.create_graph(session_id)
+            
+            # Add input node (assuming first trace has the question)
+            if traces:
+                first_trace = traces[0]
+                input_node = self.add_input_node(
                     graph_id=graph.id,
-                    hypothesis=trace.output,
-                    confidence=trace.confidence,
-                    metadata=trace.metadata
+                    question=first_trace.metadata.get("question", "Unknown question"),
+                    context=first_trace.metadata
                 )
-                edge_type = EdgeType.GENERATES
-                edge_label = "Generates Hypothesis"
+            
+            previous_node = input_node
+            
+            for i, trace in enumerate(traces):
+                # Create node based on trace stage
+                if trace.stage == ReasoningStage.LLM_HYPOTHESIS:
+                    node = self.add_llm_hypothesis_node(
+                        graph_id=graph.id,
+                        hypothesis=trace.output,
+                        confidence=trace.confidence,
+                        metadata=trace.metadata
+                    )
+                    edge_type = EdgeType.GENERATES
+                    edge_label = "Generates Hypothesis"
                 
-            elif trace.stage == ReasoningStage.RULE_CHECK:
-                node = self.add_rule_node(
-                    graph_id=graph.id,
-                    rule_name="Symbolic Rule Check",
-                    rule_type=NodeType.SYMBOLIC_RULE,
-                    result={"output": trace.output, "metadata": trace.metadata},
-                    confidence=trace.confidence
-                )
-                edge_type = EdgeType.VALIDATES
-                edge_label = "Validates Hypothesis"
+                elif trace.stage == ReasoningStage.RULE_CHECK:
+                    node = self.add_rule_node(
+                        graph_id=graph.id,
+                        rule_name="Symbolic Rule Check",
+                        rule_type=NodeType.SYMBOLIC_RULE,
+                        result={"output": trace.output, "metadata": trace.metadata},
+                        confidence=trace.confidence
+                    )
+                    edge_type = EdgeType.VALIDATES
+                    edge_label = "Validates Hypothesis"
                 
-            elif trace.stage == ReasoningStage.KNOWLEDGE_CHECK:
-                node = self.add_rule_node(
-                    graph_id=graph.id,
-                    rule_name="Knowledge Graph Check",
-                    rule_type=NodeType.KNOWLEDGE_CHECK,
-                    result={"output": trace.output, "metadata": trace.metadata},
-                    confidence=trace.confidence
-                )
-                edge_type = EdgeType.SUPPORTS
-                edge_label = "Supports with Knowledge"
+                elif trace.stage == ReasoningStage.KNOWLEDGE_CHECK:
+                    node = self.add_rule_node(
+                        graph_id=graph.id,
+                        rule_name="Knowledge Graph Check",
+                        rule_type=NodeType.KNOWLEDGE_CHECK,
+                        result={"output": trace.output, "metadata": trace.metadata},
+                        confidence=trace.confidence
+                    )
+                    edge_type = EdgeType.SUPPORTS
+                    edge_label = "Supports with Knowledge"
                 
-            else:
-                # Generic node for other stages
-                node = GraphNode(
-                    id=f"stage_{trace.stage.value}_{i}",
-                    type=NodeType.DECISION,
-                    label=f"{trace.stage.value.replace('_', ' ').title()}",
-                    content={"output": trace.output, "metadata": trace.metadata},
-                    confidence=trace.confidence,
-                    metadata={"stage": trace.stage.value}
-                )
-                graph.nodes.append(node)
-                edge_type = EdgeType.LEADS_TO
-                edge_label = "Leads to Next Stage"
+                else:
+                    # Generic node for other stages
+                    node = GraphNode(
+                        id=f"stage_{trace.stage.value}_{i}",
+                        type=NodeType.DECISION,
+                        label=f"{trace.stage.value.replace('_', ' ').title()}",
+                        content={"output": trace.output, "metadata": trace.metadata},
+                        confidence=trace.confidence,
+                        metadata={"stage": trace.stage.value}
+                    )
+                    graph.nodes.append(node)
+                    edge_type = EdgeType.LEADS_TO
+                    edge_label = "Leads to Next Stage"
+                
+                # Add edge from previous node
+                if previous_node:
+                    self.add_edge(
+                        graph_id=graph.id,
+                        source_id=previous_node.id,
+                        target_id=node.id,
+                        edge_type=edge_type,
+                        label=edge_label,
+                        weight=trace.confidence
+                    )
+                
+                previous_node = node
             
-            # Add edge from previous node
-            if previous_node:
-                self.add_edge(
-                    graph_id=graph.id,
-                    source_id=previous_node.id,
-                    target_id=node.id,
-                    edge_type=edge_type,
-                    label=edge_label,
-                    weight=trace.confidence
+            # Add output node
+            if traces:
+                final_trace = traces[-1]
+                output_node = GraphNode(
+                    id="output_final",
+                    type=NodeType.OUTPUT,
+                    label="Final Answer",
+                    content={
+                        "answer": final_trace.output,
+                        "confidence": final_trace.confidence,
+                        "timestamp": datetime.utcnow().isoformat()
+                    },
+                    confidence=final_trace.confidence,
+                    metadata={"final_output": True}
                 )
+                graph.nodes.append(output_node)
+                
+                if previous_node:
+                    self.add_edge(
+                        graph_id=graph.id,
+                        source_id=previous_node.id,
+                        target_id=output_node.id,
+                        edge_type=EdgeType.LEADS_TO,
+                        label="Final Result",
+                        weight=final_trace.confidence
+                    )
             
-            previous_node = node
-        
-        # Add output node
-        if traces:
-            final_trace = traces[-1]
-            output_node = GraphNode(
-                id="output_final",
-                type=NodeType.OUTPUT,
-                label="Final Answer",
-                content={
-                    "answer": final_trace.output,
-                    "confidence": final_trace.confidence,
-                    "timestamp": datetime.utcnow().isoformat()
-                },
-                confidence=final_trace.confidence,
-                metadata={"final_output": True}
-            )
-            graph.nodes.append(output_node)
-            
-            if previous_node:
-                self.add_edge(
-                    graph_id=graph.id,
-                    source_id=previous_node.id,
-                    target_id=output_node.id,
-                    edge_type=EdgeType.LEADS_TO,
-                    label="Final Result",
-                    weight=final_trace.confidence
-                )
-        
-        return graph
+            return graph
     
     def calculate_layout(self, graph: ReasoningGraph, layout_type: str = "hierarchical") -> ReasoningGraph:
-        """Calculate node positions for visualization with custom layouts."""
+        """
+        Calculate node positions for visualization with custom layouts.
+        
+        Layouts are cached per graph, layout type and graph structure. When
+        nodes were added since the cached layout, force-based layouts only
+        place the new nodes instead of recomputing everything.
+        
+        The stored graph is shared with other requests, so positions are
+        applied to a copy and only the layout cache keeps them.
+        """
         if not graph.nodes:
             return graph
         
-        # Create NetworkX graph for layout calculation
-        nx_graph = nx.DiGraph()
+        node_ids = [node.id for node in graph.nodes]
+        edges = [(edge.source, edge.target) for edge in graph.edges]
+        version = hash((tuple(node_ids), tuple(edges)))
         
-        # Add nodes
-        for node in graph.nodes:
-            nx_graph.add_node(node.id, pos=(0, 0))
+        pos, previous = layout_cache.get(graph.id, layout_type, version)
+        if pos is None:
+            if previous is not None and layout_type in self.INCREMENTAL_LAYOUTS:
+                pos = place_new_nodes(node_ids, edges, previous)
+            else:
+                pos = self._compute_layout(graph, node_ids, edges, layout_type)
+            layout_cache.put(graph.id, layout_type, version, pos)
         
-        # Add edges
-        for edge in graph.edges:
-            nx_graph.add_edge(edge.source, edge.target)
+        positioned = graph.model_copy(deep=True)
+        for node in positioned.nodes:
+            if node.id in pos:
+                node.x, node.y = (float(value) for value in pos[node.id])
+        
+        return positioned
+    
+    def _compute_layout(self, graph: ReasoningGraph, node_ids: List[str], edges: List[tuple], layout_type: str) -> dict:
+        """Compute a layout from scratch."""
+        # Create NetworkX graph for layout calculation
+        nx_graph = nx.DiGraph()
+        nx_graph.add_nodes_from(node_ids)
+        nx_graph.add_edges_from(edges)
         
         # Calculate layout based on type
         if layout_type == "hierarchical":
-            pos = self._hierarchical_layout(nx_graph, graph)
+            return self._hierarchical_layout(nx_graph, graph)
         elif layout_type == "circular":
-            pos = self._circular_layout(nx_graph, graph)
+            return self._circular_layout(nx_graph, graph)
         elif layout_type == "force_directed":
-            pos = self._force_directed_layout(nx_graph, graph)
+            return self._force_directed_layout(nx_graph, graph)
         elif layout_type == "kamada_kawai":
-            pos = self._kamada_kawai_layout(nx_graph, graph)
+            return self._kamada_kawai_layout(nx_graph, graph)
         else:
-            pos = self._spring_layout(nx_graph, graph)
-        
-        # Update node positions
-        for node in graph.nodes:
-            if node.id in pos:
-                node.x, node.y = pos[node.id]
-        
-        return graph
+            return self._spring_layout(nx_graph, graph)
     
     def _hierarchical_layout(self, nx_graph, graph: ReasoningGraph) -> dict:
         """Hierarchical layout based on reasoning stages."""
@@ -333,13 +379,15 @@ class ReasoningGraphService:
     def _force_directed_layout(self, nx_graph, graph: ReasoningGraph) -> dict:
         """Force-directed layout for natural node distribution."""
         try:
-            return nx.spring_layout(nx_graph, k=3, iterations=100, scale=5)
+            return force_directed_layout(list(nx_graph.nodes), list(nx_graph.edges), iterations=100, scale=5)
         except:
             return self._fallback_layout(graph)
     
     def _kamada_kawai_layout(self, nx_graph, graph: ReasoningGraph) -> dict:
         """Kamada-Kawai layout for optimal node spacing."""
         try:
+            if nx_graph.number_of_nodes() > self.KAMADA_KAWAI_MAX_NODES:
+                return force_directed_layout(list(nx_graph.nodes), list(nx_graph.edges), iterations=100, scale=5)
             return nx.kamada_kawai_layout(nx_graph, scale=5)
         except:
             return self._fallback_layout(graph)
@@ -347,7 +395,7 @@ class ReasoningGraphService:
     def _spring_layout(self, nx_graph, graph: ReasoningGraph) -> dict:
         """Spring layout with custom parameters."""
         try:
-            return nx.spring_layout(nx_graph, k=2, iterations=50, scale=4)
+            return force_directed_layout(list(nx_graph.nodes), list(nx_graph.edges), iterations=50, scale=4)
         except:
             return self._fallback_layout(graph)
     
@@ -364,9 +412,8 @@ class ReasoningGraphService:
         if not graph:
             raise ValueError(f"Graph not found: {graph_id}")
         
-        # Calculate layout if not already done or if layout type changed
-        if not any(node.x is not None for node in graph.nodes):
-            graph = self.calculate_layout(graph, layout_type)
+        # Layouts are cached, so this is cheap unless the graph or layout type changed
+        graph = self.calculate_layout(graph, layout_type)
         
         # Prepare nodes for visualization
         nodes_data = []
@@ -657,6 +704,21 @@ class ReasoningGraphService:
         else:
             raise ValueError(f"Unsupported export format: {format}")
     
+    async def export_graph_async(self, graph_id: str, format: GraphExportFormat, **kwargs) -> Union[str, bytes]:
+        """
+        Export the graph without blocking the event loop.
+        
+        Images are rendered in the graph renderer's process pool, cached by
+        content and shared between concurrent requests for the same image.
+        """
+        if format in (GraphExportFormat.PNG, GraphExportFormat.SVG, GraphExportFormat.PDF):
+            graph = await asyncio.to_thread(self.graphs.get, graph_id)
+            if not graph:
+                raise ValueError(f"Graph not found: {graph_id}")
+            return await graph_renderer.render(self._render_payload(graph), format.value)
+        
+        return await asyncio.to_thread(self.export_graph, graph_id, format, **kwargs)
+    
     def _export_dot(self, graph: ReasoningGraph) -> str:
         """Export graph as DOT format."""
         dot_lines = ["digraph ReasoningGraph {"]
@@ -677,36 +739,8 @@ class ReasoningGraphService:
         return "\n".join(dot_lines)
     
     def _export_image(self, graph: ReasoningGraph, format: str) -> bytes:
-        """Export graph as image."""
-        # Create NetworkX graph
-        nx_graph = nx.DiGraph()
-        
-        # Add nodes and edges
-        for node in graph.nodes:
-            nx_graph.add_node(node.id, label=node.label, color=self.node_colors.get(node.type, "#FFFFFF"))
-        
-        for edge in graph.edges:
-            nx_graph.add_edge(edge.source, edge.target, label=edge.label)
-        
-        # Create matplotlib figure
-        plt.figure(figsize=(12, 8))
-        pos = nx.spring_layout(nx_graph, k=3, iterations=50)
-        
-        # Draw nodes
-        nx.draw_networkx_nodes(nx_graph, pos, node_color=[nx_graph.nodes[node]["color"] for node in nx_graph.nodes()])
-        
-        # Draw edges
-        nx.draw_networkx_edges(nx_graph, pos, edge_color='gray', arrows=True)
-        
-        # Draw labels
-        nx.draw_networkx_labels(nx_graph, pos, labels={node: nx_graph.nodes[node]["label"] for node in nx_graph.nodes()})
-        
-        plt.title("Reasoning Graph")
-        plt.axis('off')
-        
-        # Save to bytes
-        import io
-        buf = io.BytesIO()
-        plt.savefig(buf, format=format, bbox_inches='tight')
-        plt.close()
-        return buf.getvalue()
+        """Export graph as image (rendered in the calling thread; cached)."""
+        return graph_renderer.render_sync(self._render_payload(graph), format)
+    
+    def _render_payload(self, graph: ReasoningGraph) -> Dict[str, Any]:
+        return graph_renderer.make_payload(graph.nodes, graph.edges, self.node_colors)
@@ -0,0 +1,376 @@
+"""
+Reasoning Graph Store
+Persistent reasoning graph storage with a bounded in-memory read cache.
+"""
+
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, create_engine, select
+
+from app.core.config import settings
+from app.models.reasoning_graph import ReasoningGraph, ReasoningGraphDB
+
+logger = logging.getLogger(__name__)
+
+
+def _graph_tenant(graph: ReasoningGraph) -> Optional[str]:
+    return graph.metadata.get("tenant_id")
+
+
+def _matches(session_id: Optional[str], tenant_id: Optional[str], created_after: Optional[datetime],
+             created_before: Optional[datetime], graph_session: str, graph_tenant: Optional[str],
+             created_at: datetime) -> bool:
+    return (
+        (session_id is None or graph_session == session_id)
+        and (tenant_id is None or graph_tenant == tenant_id)
+        and (created_after is None or created_at >= created_after)
+        and (created_before is None or created_at < created_before)
+    )
+
+
+class MemoryGraphBackend:
+    """Backend kept in process memory (unbounded, not shared; for tests and single-shot tools)."""
+    
+    def __init__(self):
+        self._graphs: Dict[str, ReasoningGraph] = {}
+    
+    def get(self, graph_id: str) -> Optional[ReasoningGraph]:
+        graph = self._graphs.get(graph_id)
+        return graph.model_copy(deep=True) if graph is not None else None
+    
+    def version(self, graph_id: str) -> Optional[datetime]:
+        graph = self._graphs.get(graph_id)
+        return graph.updated_at if graph is not None else None
+    
+    def put(self, graph: ReasoningGraph) -> None:
+        self._graphs[graph.id] = graph.model_copy(deep=True)
+    
+    def delete(self, graph_id: str) -> bool:
+        return self._graphs.pop(graph_id, None) is not None
+    
+    def list(self, session_id: Optional[str] = None, tenant_id: Optional[str] = None,
+             created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+             offset: int = 0, limit: int = 50) -> Tuple[List[ReasoningGraph], int]:
+        graphs = sorted(
+            (g for g in self._graphs.values()
+             if _matches(session_id, tenant_id, created_after, created_before, g.session_id, _graph_tenant(g), g.created_at)),
+            key=lambda g: g.created_at, reverse=True
+        )
+        return graphs[offset:offset + limit], len(graphs)
+
+
+class SQLGraphBackend:
+    """
+    Backend stored in the reasoning_graphs table (ReasoningGraphDB).
+    
+    Works with any SQLAlchemy database URL; with SQLite every worker
+    process on a host shares the same graphs.
+    """
+    
+    def __init__(self, database_url: str):
+        connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        self.engine = create_engine(database_url, connect_args=connect_args)
+        self._table_ready = False
+    
+    def _session(self) -> Session:
+        # The table is created on first use, not when the app imports the store
+        if not self._table_ready:
+            ReasoningGraphDB.__table__.create(self.engine, checkfirst=True)
+            self._table_ready = True
+        return Session(self.engine)
+    
+    @staticmethod
+    def _to_graph(row: ReasoningGraphDB) -> ReasoningGraph:
+        return ReasoningGraph(
+            id=row.id,
+            session_id=row.session_id,
+            nodes=json.loads(row.nodes_data),
+            edges=json.loads(row.edges_data),
+            metadata=json.loads(row.meta_data),
+            created_at=row.created_at,
+            updated_at=row.updated_at
+        )
+    
+    def get(self, graph_id: str) -> Optional[ReasoningGraph]:
+        with self._session() as session:
+            row = session.get(ReasoningGraphDB, graph_id)
+            return self._to_graph(row) if row else None
+    
+    def version(self, graph_id: str) -> Optional[datetime]:
+        with self._session() as session:
+            return session.exec(select(ReasoningGraphDB.updated_at).where(ReasoningGraphDB.id == graph_id)).first()
+    
+    def put(self, graph: ReasoningGraph) -> None:
+        data = graph.model_dump(mode="json")
+        with self._session() as session:
+            row = session.get(ReasoningGraphDB, graph.id) or ReasoningGraphDB(id=graph.id, created_at=graph.created_at)
+            row.session_id = graph.session_id
+            row.nodes_data = json.dumps(data["nodes"])
+            row.edges_data = json.dumps(data["edges"])
+            row.meta_data = json.dumps(data["metadata"])
+            row.updated_at = graph.updated_at
+            row.tenant_id = _graph_tenant(graph)
+            session.add(row)
+            session.commit()
+    
+    def delete(self, graph_id: str) -> bool:
+        with self._session() as session:
+            row = session.get(ReasoningGraphDB, graph_id)
+            if row is None:
+                return False
+            session.delete(row)
+            session.commit()
+            return True
+    
+    def list(self, session_id: Optional[str] = None, tenant_id: Optional[str] = None,
+             created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+             offset: int = 0, limit: int = 50) -> Tuple[List[ReasoningGraph], int]:
+        conditions = []
+        if session_id is not None:
+            conditions.append(ReasoningGraphDB.session_id == session_id)
+        if tenant_id is not None:
+            conditions.append(ReasoningGraphDB.tenant_id == tenant_id)
+        if created_after is not None:
+            conditions.append(ReasoningGraphDB.created_at >= created_after)
+        if created_before is not None:
+            conditions.append(ReasoningGraphDB.created_at < created_before)
+        
+        with self._session() as session:
+            total = session.exec(select(func.count()).select_from(ReasoningGraphDB).where(*conditions)).one()
+            rows = session.exec(
+                select(ReasoningGraphDB).where(*conditions)
+                .order_by(ReasoningGraphDB.created_at.desc()).offset(offset).limit(limit)
+            ).all()
+            return [self._to_graph(row) for row in rows], total
+
+
+class FileGraphBackend:
+    """
+    Backend stored as one JSON file per graph.
+    
+    Listing and version checks read each file once and cache its session,
+    tenant, creation and update times by modification time.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._summaries: Dict[str, Tuple[int, str, Optional[str], datetime, datetime]] = {}
+    
+    def _path(self, graph_id: str) -> Path:
+        if not graph_id or Path(graph_id).name != graph_id:
+            raise ValueError(f"Invalid graph ID: {graph_id}")
+        return self.directory / f"{graph_id}.json"
+    
+    def get(self, graph_id: str) -> Optional[ReasoningGraph]:
+        path = self._path(graph_id)
+        if not path.exists():
+            return None
+        return ReasoningGraph.model_validate_json(path.read_text(encoding="utf-8"))
+    
+    def version(self, graph_id: str) -> Optional[datetime]:
+        path = self._path(graph_id)
+        try:
+            return self._summary(path)[3]
+        except FileNotFoundError:
+            return None
+    
+    def put(self, graph: ReasoningGraph) -> None:
+        path = self._path(graph.id)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(graph.model_dump_json(), encoding="utf-8")
+        temp_path.replace(path)
+    
+    def delete(self, graph_id: str) -> bool:
+        path = self._path(graph_id)
+        self._summaries.pop(graph_id, None)
+        if not path.exists():
+            return False
+        path.unlink()
+        return True
+    
+    def _summary(self, path: Path) -> Tuple[str, Optional[str], datetime, datetime]:
+        graph_id = path.stem
+        mtime = path.stat().st_mtime_ns
+        cached = self._summaries.get(graph_id)
+        if cached is None or cached[0] != mtime:
+            graph = ReasoningGraph.model_validate_json(path.read_text(encoding="utf-8"))
+            cached = self._summaries[graph_id] = (
+                mtime, graph.session_id, _graph_tenant(graph), graph.created_at, graph.updated_at
+            )
+        return cached[1:]
+    
+    def list(self, session_id: Optional[str] = None, tenant_id: Optional[str] = None,
+             created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+             offset: int = 0, limit: int = 50) -> Tuple[List[ReasoningGraph], int]:
+        matches = []
+        for path in self.directory.glob("*.json"):
+            try:
+                graph_session, graph_tenant, created_at, _ = self._summary(path)
+            except Exception as e:
+                logger.warning(f"Error reading reasoning graph file {path}: {e}")
+                continue
+            if _matches(session_id, tenant_id, created_after, created_before, graph_session, graph_tenant, created_at):
+                matches.append((created_at, path.stem))
+        
+        matches.sort(reverse=True)
+        graphs = [self.get(graph_id) for _, graph_id in matches[offset:offset + limit]]
+        return [graph for graph in graphs if graph is not None], len(matches)
+
+
+class ReasoningGraphStore:
+    """
+    Persistent reasoning graph store with an LRU read cache.
+    
+    The backend is the source of truth: every put writes through, so graphs
+    survive restarts and are shared by every worker using the same backend.
+    Up to max_graphs graphs are kept in memory with the version (updated_at)
+    they were read or written at; a cached graph is served again only after
+    checking that the backend still holds that version, at most once every
+    ttl_seconds. Inside batch(), writes are deferred until the block exits
+    so multi-step edits are written once.
+    """
+    
+    def __init__(self, backend=None, max_graphs: int = 256, ttl_seconds: float = 0.0):
+        self.backend = backend if backend is not None else MemoryGraphBackend()
+        self.max_graphs = max(1, max_graphs)
+        self.ttl_seconds = ttl_seconds
+        # graph_id -> (graph, version, monotonic time of the last version check)
+        self._hot: "OrderedDict[str, Tuple[ReasoningGraph, datetime, float]]" = OrderedDict()
+        self._batch: ContextVar[Optional[Dict[str, ReasoningGraph]]] = ContextVar(f"graph_batch_{id(self)}", default=None)
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "writes": 0}
+    
+    def _cache(self, graph: ReasoningGraph) -> None:
+        with self._lock:
+            self._hot[graph.id] = (graph, graph.updated_at, time.monotonic())
+            self._hot.move_to_end(graph.id)
+            while len(self._hot) > self.max_graphs:
+                self._hot.popitem(last=False)
+                self.stats["evictions"] += 1
+    
+    def get(self, graph_id: str) -> Optional[ReasoningGraph]:
+        """Get a graph, from memory if the backend still holds the cached version."""
+        pending = self._batch.get()
+        if pending is not None and graph_id in pending:
+            return pending[graph_id]
+        
+        with self._lock:
+            entry = self._hot.get(graph_id)
+        if entry is not None:
+            graph, version, checked_at = entry
+            now = time.monotonic()
+            if now - checked_at < self.ttl_seconds or self.backend.version(graph_id) == version:
+                with self._lock:
+                    if graph_id in self._hot:
+                        self._hot[graph_id] = (graph, version, now)
+                        self._hot.move_to_end(graph_id)
+                    self.stats["hits"] += 1
+                return graph
+            self.stats["stale"] += 1
+        
+        self.stats["misses"] += 1
+        graph = self.backend.get(graph_id)
+        with self._lock:
+            if graph is None:
+                self._hot.pop(graph_id, None)
+                return None
+        self._cache(graph)
+        return graph
+    
+    def put(self, graph: ReasoningGraph) -> None:
+        """Write a new or changed graph through to the backend."""
+        graph.updated_at = datetime.utcnow()
+        pending = self._batch.get()
+        if pending is not None:
+            pending[graph.id] = graph
+            return
+        try:
+            self.backend.put(graph)
+        except Exception:
+            # Do not keep serving in-place changes that were never stored
+            with self._lock:
+                self._hot.pop(graph.id, None)
+            raise
+        self.stats["writes"] += 1
+        self._cache(graph)
+    
+    @contextmanager
+    def batch(self):
+        """Defer writes made in this context (thread or task) and write each changed graph once on exit."""
+        if self._batch.get() is not None:
+            yield
+            return
+        pending: Dict[str, ReasoningGraph] = {}
+        token = self._batch.set(pending)
+        try:
+            yield
+        except BaseException:
+            with self._lock:
+                for graph_id in pending:
+                    self._hot.pop(graph_id, None)
+            raise
+        finally:
+            self._batch.reset(token)
+        for graph in pending.values():
+            self.put(graph)
+    
+    def delete(self, graph_id: str) -> bool:
+        """Delete a graph from the backend and the cache."""
+        with self._lock:
+            self._hot.pop(graph_id, None)
+        pending = self._batch.get()
+        if pending is not None:
+            pending.pop(graph_id, None)
+        return self.backend.delete(graph_id)
+    
+    def list_graphs(self, session_id: Optional[str] = None, tenant_id: Optional[str] = None,
+                    created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                    offset: int = 0, limit: int = 50) -> Tuple[List[ReasoningGraph], int]:
+        """List graphs, newest first, with filters and pagination; returns the page and the total count."""
+        return self.backend.list(session_id, tenant_id, created_after, created_before, offset, limit)
+    
+    def iter_graphs(self, page_size: int = 100, **filters) -> Iterator[ReasoningGraph]:
+        """Iterate over all graphs matching the filters, one page at a time."""
+        offset = 0
+        while True:
+            graphs, total = self.list_graphs(offset=offset, limit=page_size, **filters)
+            yield from graphs
+            offset += len(graphs)
+            if not graphs or offset >= total:
+                break
+    
+    def __contains__(self, graph_id: str) -> bool:
+        return self.get(graph_id) is not None
+
+
+def create_reasoning_graph_store() -> ReasoningGraphStore:
+    """Create the reasoning graph store from settings."""
+    backend_name = settings.reasoning_graph_store_backend
+    if backend_name == "sql":
+        backend = SQLGraphBackend(settings.reasoning_graph_store_path or settings.database_url)
+    elif backend_name == "filesystem":
+        backend = FileGraphBackend(settings.reasoning_graph_store_path or "./data/reasoning_graphs")
+    elif backend_name == "memory":
+        backend = MemoryGraphBackend()
+    else:
+        raise ValueError(f"Unknown reasoning graph store backend: {backend_name}")
+    return ReasoningGraphStore(
+        backend,
+        max_graphs=settings.reasoning_graph_cache_size,
+        ttl_seconds=settings.reasoning_graph_cache_ttl_seconds
+    )
+
+
+# Global reasoning graph store shared by every ReasoningGraphService
+reasoning_graph_store = create_reasoning_graph_store()
@@ -0,0 +1,201 @@
+"""
+Ruleset Compiler
+Compiles ruleset definitions into immutable execution plans.
+"""
+
+import re
+from dataclasses import dataclass
+from types import CodeType, MappingProxyType
+from typing import Dict, Any, Optional, Tuple, Mapping, Pattern
+
+from app.models.rulesets import RulesetDefinition, RuleDefinition, RuleType, RuleCondition
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """A rule condition with its comparison value prepared ahead of time."""
+    field: str
+    operator: str
+    value: str
+    case_sensitive: bool
+    pattern: Optional[Pattern] = None
+    
+    def evaluate(self, fields: "ConditionFields") -> bool:
+        """Evaluate the condition against request fields."""
+        if self.operator == "regex":
+            if self.pattern is None:
+                return False
+            return bool(self.pattern.search(fields.get(self.field, lowered=False)))
+        
+        field_value = fields.get(self.field, lowered=not self.case_sensitive)
+        if self.operator == "contains":
+            return self.value in field_value
+        elif self.operator == "equals":
+            return field_value == self.value
+        elif self.operator == "starts_with":
+            return field_value.startswith(self.value)
+        elif self.operator == "ends_with":
+            return field_value.endswith(self.value)
+        else:
+            return False
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A rule with its content compiled for repeated execution."""
+    rule: RuleDefinition
+    conditions: Tuple[CompiledCondition, ...] = ()
+    code: Optional[CodeType] = None
+    pattern: Optional[Pattern] = None
+    keywords: Tuple[str, ...] = ()
+    compile_error: Optional[str] = None
+    
+    @property
+    def id(self) -> str:
+        return self.rule.id
+    
+    @property
+    def name(self) -> str:
+        return self.rule.name
+    
+    @property
+    def type(self) -> RuleType:
+        return self.rule.type
+    
+    @property
+    def weight(self) -> float:
+        return self.rule.weight
+    
+    def is_applicable(self, fields: "ConditionFields") -> bool:
+        """Check whether all of the rule's conditions are met."""
+        return all(condition.evaluate(fields) for condition in self.conditions)
+
+
+@dataclass(frozen=True)
+class RulesetExecutionPlan:
+    """Immutable, precompiled form of a ruleset."""
+    ruleset_id: str
+    version: str
+    ruleset_name: str
+    domain: str
+    rules: Tuple[CompiledRule, ...]
+    weights: Mapping[str, float]
+    compile_errors: Tuple[str, ...] = ()
+
+
+class ConditionFields:
+    """Request fields for condition evaluation, lowercased at most once each."""
+    
+    def __init__(self, question: str, hypothesis: str, context: Optional[Dict[str, Any]] = None):
+        self.question = question
+        self.hypothesis = hypothesis
+        self.context = context
+        self._values: Dict[Tuple[str, bool], str] = {}
+    
+    def get(self, field: str, lowered: bool) -> str:
+        """Get a field value, optionally lowercased."""
+        key = (field, lowered)
+        if key not in self._values:
+            value = self.get(field, False).lower() if lowered else self._resolve(field)
+            self._values[key] = value
+        return self._values[key]
+    
+    def _resolve(self, field: str) -> str:
+        if field == "question":
+            return self.question
+        elif field == "hypothesis":
+            return self.hypothesis
+        elif field == "domain" and self.context:
+            return str(self.context.get("domain", ""))
+        return str(self.context.get(field, "")) if self.context else ""
+
+
+def compile_condition(condition: RuleCondition) -> CompiledCondition:
+    """Compile a single rule condition."""
+    value = str(condition.value)
+    pattern = None
+    
+    if condition.operator == "regex":
+        flags = 0 if condition.case_sensitive else re.IGNORECASE
+        try:
+            pattern = re.compile(value, flags)
+        except re.error:
+            pattern = None
+    elif not condition.case_sensitive:
+        value = value.lower()
+    
+    return CompiledCondition(
+        field=condition.field,
+        operator=condition.operator,
+        value=value,
+        case_sensitive=condition.case_sensitive,
+        pattern=pattern
+    )
+
+
+def compile_rule(rule: RuleDefinition) -> CompiledRule:
+    """Compile a single rule definition."""
+    conditions = tuple(compile_condition(c) for c in rule.conditions or [])
+    code = None
+    pattern = None
+    keywords: Tuple[str, ...] = ()
+    compile_error = None
+    
+    if rule.type == RuleType.PYTHON:
+        try:
+            code = compile(rule.content, f"<rule {rule.id}>", "exec")
+        except SyntaxError as e:
+            compile_error = str(e)
+    elif rule.type == RuleType.REGEX:
+        try:
+            pattern = re.compile(rule.content, re.IGNORECASE)
+        except re.error as e:
+            compile_error = f"Invalid regex: {str(e)}"
+    elif rule.type == RuleType.KEYWORD:
+        keywords = tuple(keyword.strip() for keyword in rule.content.lower().split(','))
+    
+    return CompiledRule(
+        rule=rule,
+        conditions=conditions,
+        code=code,
+        pattern=pattern,
+        keywords=keywords,
+        compile_error=compile_error
+    )
+
+
+def compile_ruleset(ruleset: RulesetDefinition) -> RulesetExecutionPlan:
+    """
+    Compile a ruleset into an immutable execution plan.
+    
+    Disabled rules are dropped. Regexes are precompiled, Python rule
+    sources are compiled to code objects, keywords are pre-lowered and
+    rule weights are indexed by rule ID.
+    
+    Args:
+        ruleset: Ruleset definition to compile
+    
+    Returns:
+        RulesetExecutionPlan for the ruleset
+    """
+    compiled_rules = tuple(compile_rule(rule) for rule in ruleset.rules if rule.enabled)
+    
+    weights: Dict[str, float] = {}
+    for compiled in compiled_rules:
+        # First definition wins for duplicate IDs
+        weights.setdefault(compiled.id, compiled.weight)
+    
+    compile_errors = tuple(
+        f"Rule {compiled.id} failed to compile: {compiled.compile_error}"
+        for compiled in compiled_rules if compiled.compile_error
+    )
+    
+    return RulesetExecutionPlan(
+        ruleset_id=ruleset.id,
+        version=ruleset.version,
+        ruleset_name=ruleset.name,
+        domain=ruleset.domain,
+        rules=compiled_rules,
+        weights=MappingProxyType(weights),
+        compile_errors=compile_errors
+    )
@@ -4,8 +4,11 @@ Enterprise-grade ruleset management with cryptographic signatures and integrity
 """
 
 import json
+import time
+import asyncio
 import hashlib
 import hmac
+import logging
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
 from enum import Enum
@@ -20,9 +23,12 @@ from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPubl
 from cryptography.hazmat.backends import default_backend
 from cryptography.exceptions import InvalidSignature
 
+from app.core.config import settings
 from app.security.audit_logger import audit_logger, AuditEventType, ComplianceFramework
 from app.security.encryption_service import encryption_service
 
+logger = logging.getLogger(__name__)
+
 
 class RulesetStatus(str, Enum):
     """Ruleset lifecycle status."""
@@ -99,6 +105,11 @@ class SignedRuleset:
     last_verified: Optional[datetime] = None
 
 
+def serialize_ruleset_content(ruleset_content: Dict[str, Any]) -> bytes:
+    """Canonical JSON encoding of ruleset content for hashing and signing."""
+    return json.dumps(ruleset_content, sort_keys=True, default=str).encode()
+
+
 class RulesetRegistry:
     """
     Enterprise Signed Ruleset Registry.
@@ -110,13 +121,22 @@ class RulesetRegistry:
     - Partner and third-party ruleset certification
     - Compliance framework mapping
     - Automated security scanning
+    - Memoized verification with a background re-verification sweep
     """
     
-    def __init__(self):
+    def __init__(self, verification_ttl_seconds: float = 3600.0):
         self.registry: Dict[str, SignedRuleset] = {}
         self.signing_keys: Dict[str, RSAPrivateKey] = {}
         self.public_keys: Dict[str, RSAPublicKey] = {}
+        self.public_key_fingerprints: Dict[str, str] = {}
         self.trusted_signers: Dict[str, Dict[str, Any]] = {}
+        
+        # ruleset_id -> ((integrity_hash, key fingerprint, signature), is_valid, errors, expires_at)
+        self.verification_ttl_seconds = verification_ttl_seconds
+        self._verification_cache: Dict[str, Tuple[Tuple[str, Optional[str], str], bool, List[str], float]] = {}
+        self.verification_stats = {"hits": 0, "misses": 0, "sweeps": 0}
+        self._sweep_task: Optional[asyncio.Task] = None
+        
         self._initialize_registry()
     
     def _initialize_registry(self):
@@ -168,12 +188,40 @@ class RulesetRegistry:
                 risk_level="high"
             )
         
-        public_key = private_key.public_key()
-        
         # Store keys
-        signer_id = "xreason_registry"
-        self.signing_keys[signer_id] = private_key
+        self.set_signer_key("xreason_registry", private_key.public_key(), private_key)
+    
+    @staticmethod
+    def _public_key_fingerprint(public_key: RSAPublicKey) -> str:
+        """SHA-256 fingerprint of a public key's DER encoding."""
+        public_key_bytes = public_key.public_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        return hashlib.sha256(public_key_bytes).hexdigest()
+    
+    def set_signer_key(self, signer_id: str, public_key: RSAPublicKey,
+                       private_key: Optional[RSAPrivateKey] = None) -> None:
+        """
+        Install or replace a signer's keys.
+        
+        Memoized verifications of rulesets signed by this signer are dropped.
+        """
         self.public_keys[signer_id] = public_key
+        self.public_key_fingerprints[signer_id] = self._public_key_fingerprint(public_key)
+        if private_key is not None:
+            self.signing_keys[signer_id] = private_key
+        
+        for ruleset_id, signed_ruleset in list(self.registry.items()):
+            if signed_ruleset.signature.signer_id == signer_id:
+                self.invalidate_verification(ruleset_id)
+    
+    def invalidate_verification(self, ruleset_id: Optional[str] = None) -> None:
+        """Forget the memoized verification of one ruleset, or of all rulesets."""
+        if ruleset_id is None:
+            self._verification_cache.clear()
+        else:
+            self._verification_cache.pop(ruleset_id, None)
     
     def _load_trusted_signers(self):
         """Load trusted signer configurations."""
@@ -401,11 +449,11 @@ class RulesetRegistry:
             "metadata": asdict(metadata),
             "rules": rules
         }
-        content_json = json.dumps(ruleset_content, sort_keys=True)
-        integrity_hash = hashlib.sha256(content_json.encode()).hexdigest()
+        content_bytes = serialize_ruleset_content(ruleset_content)
+        integrity_hash = hashlib.sha256(content_bytes).hexdigest()
         
         # Sign the ruleset
-        signature = self._sign_ruleset(ruleset_content, signer_id)
+        signature = self._sign_ruleset(ruleset_content, signer_id, content_bytes)
         
         # Create signed ruleset
         signed_ruleset = SignedRuleset(
@@ -413,11 +461,12 @@ class RulesetRegistry:
             rules=rules,
             signature=signature,
             integrity_hash=integrity_hash,
-            size_bytes=len(content_json.encode()),
+            size_bytes=len(content_bytes),
             download_count=0
         )
         
         # Store in registry
+        self.invalidate_verification(ruleset_id)
         self.registry[ruleset_id] = signed_ruleset
         
         # Log audit event
@@ -441,13 +490,15 @@ class RulesetRegistry:
         
         return ruleset_id
     
-    def _sign_ruleset(self, ruleset_content: Dict[str, Any], signer_id: str) -> RulesetSignature:
+    def _sign_ruleset(self, ruleset_content: Dict[str, Any], signer_id: str,
+                      content_bytes: Optional[bytes] = None) -> RulesetSignature:
         """
         Create digital signature for ruleset.
         
         Args:
             ruleset_content: Complete ruleset content
             signer_id: ID of the signer
+            content_bytes: Already serialized content, if available
             
         Returns:
             RulesetSignature: Digital signature
@@ -459,8 +510,9 @@ class RulesetRegistry:
         public_key = self.public_keys[signer_id]
         
         # Create content hash for signing
-        content_json = json.dumps(ruleset_content, sort_keys=True)
-        content_hash = hashlib.sha256(content_json.encode()).digest()
+        if content_bytes is None:
+            content_bytes = serialize_ruleset_content(ruleset_content)
+        content_hash = hashlib.sha256(content_bytes).digest()
         
         # Sign using RSA-PSS
         signature_bytes = private_key.sign(
@@ -473,11 +525,7 @@ class RulesetRegistry:
         )
         
         # Get public key fingerprint
-        public_key_bytes = public_key.public_bytes(
-            encoding=serialization.Encoding.DER,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        )
-        public_key_fingerprint = hashlib.sha256(public_key_bytes).hexdigest()
+        public_key_fingerprint = self.public_key_fingerprints.get(signer_id) or self._public_key_fingerprint(public_key)
         
         return RulesetSignature(
             signature_id=str(uuid.uuid4()),
@@ -489,12 +537,26 @@ class RulesetRegistry:
             signed_at=datetime.now(timezone.utc)
         )
     
-    def verify_ruleset(self, ruleset_id: str) -> Tuple[bool, List[str]]:
+    def _verification_key(self, signed_ruleset: SignedRuleset) -> Tuple[str, Optional[str], str]:
+        signer_id = signed_ruleset.signature.signer_id
+        return (
+            signed_ruleset.integrity_hash,
+            self.public_key_fingerprints.get(signer_id),
+            signed_ruleset.signature.signature_value
+        )
+    
+    def verify_ruleset(self, ruleset_id: str, use_cache: bool = True) -> Tuple[bool, List[str]]:
         """
         Verify ruleset signature and integrity.
         
+        Results are memoized per ruleset on its integrity hash, signer key
+        fingerprint and signature, for up to verification_ttl_seconds.
+        Re-registering the ruleset or replacing the signer's key invalidates
+        the entry, and the background sweep re-verifies every ruleset in full.
+        
         Args:
             ruleset_id: ID of ruleset to verify
+            use_cache: Whether a memoized result may be returned
             
         Returns:
             Tuple[bool, List[str]]: (is_valid, verification_errors)
@@ -510,6 +572,14 @@ class RulesetRegistry:
         if signer_id not in self.trusted_signers:
             errors.append(f"Untrusted signer: {signer_id}")
         
+        cache_key = self._verification_key(signed_ruleset)
+        if use_cache and not errors:
+            cached = self._verification_cache.get(ruleset_id)
+            if cached is not None and cached[0] == cache_key and cached[3] > time.monotonic():
+                self.verification_stats["hits"] += 1
+                return cached[1], list(cached[2])
+        self.verification_stats["misses"] += 1
+        
         # Verify public key
         if signer_id not in self.public_keys:
             errors.append(f"No public key for signer: {signer_id}")
@@ -517,20 +587,20 @@ class RulesetRegistry:
         
         public_key = self.public_keys[signer_id]
         
+        # Serialize once for both the signature and the integrity hash
+        ruleset_content = {
+            "metadata": asdict(signed_ruleset.metadata),
+            "rules": signed_ruleset.rules
+        }
+        content_digest = hashlib.sha256(serialize_ruleset_content(ruleset_content))
+        
         # Verify signature
         try:
-            ruleset_content = {
-                "metadata": asdict(signed_ruleset.metadata),
-                "rules": signed_ruleset.rules
-            }
-            content_json = json.dumps(ruleset_content, sort_keys=True)
-            content_hash = hashlib.sha256(content_json.encode()).digest()
-            
             signature_bytes = base64.b64decode(signed_ruleset.signature.signature_value)
             
             public_key.verify(
                 signature_bytes,
-                content_hash,
+                content_digest.digest(),
                 padding.PSS(
                     mgf=padding.MGF1(hashes.SHA256()),
                     salt_length=padding.PSS.MAX_LENGTH
@@ -544,20 +614,18 @@ class RulesetRegistry:
             errors.append(f"Signature verification error: {str(e)}")
         
         # Verify integrity hash
-        ruleset_content = {
-            "metadata": asdict(signed_ruleset.metadata),
-            "rules": signed_ruleset.rules
-        }
-        content_json = json.dumps(ruleset_content, sort_keys=True)
-        calculated_hash = hashlib.sha256(content_json.encode()).hexdigest()
-        
-        if calculated_hash != signed_ruleset.integrity_hash:
+        if content_digest.hexdigest() != signed_ruleset.integrity_hash:
             errors.append("Integrity hash mismatch - ruleset may be tampered")
         
         # Update verification timestamp
         if not errors:
             signed_ruleset.last_verified = datetime.now(timezone.utc)
         
+        if signer_id in self.trusted_signers:
+            self._verification_cache[ruleset_id] = (
+                cache_key, not errors, list(errors), time.monotonic() + self.verification_ttl_seconds
+            )
+        
         # Log verification attempt
         audit_logger.log_event(
             event_type=AuditEventType.RULESET_ACCESS,
@@ -575,6 +643,50 @@ class RulesetRegistry:
         
         return len(errors) == 0, errors
     
+    def sweep_verifications(self) -> Dict[str, Any]:
+        """
+        Re-verify every ruleset without the memo, refreshing memoized results.
+        
+        Returns:
+            Dict with the number of rulesets verified and the invalid ruleset IDs
+        """
+        invalid = []
+        ruleset_ids = list(self.registry)
+        for ruleset_id in ruleset_ids:
+            is_valid, _ = self.verify_ruleset(ruleset_id, use_cache=False)
+            if not is_valid:
+                invalid.append(ruleset_id)
+        
+        self.verification_stats["sweeps"] += 1
+        if invalid:
+            logger.warning(f"Ruleset verification sweep found invalid rulesets: {invalid}")
+        return {"verified": len(ruleset_ids), "invalid": invalid}
+    
+    async def start_verification_sweep(self, interval_seconds: float) -> None:
+        """Start re-verifying every ruleset in the background each interval."""
+        if self._sweep_task is not None:
+            return
+        self._sweep_task = asyncio.create_task(self._run_verification_sweep(interval_seconds))
+    
+    async def stop_verification_sweep(self) -> None:
+        """Stop the background verification sweep."""
+        if self._sweep_task is None:
+            return
+        self._sweep_task.cancel()
+        try:
+            await self._sweep_task
+        except asyncio.CancelledError:
+            pass
+        self._sweep_task = None
+    
+    async def _run_verification_sweep(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.sweep_verifications)
+            except Exception as e:
+                logger.error(f"Error in ruleset verification sweep: {e}")
+    
     def get_ruleset(self, ruleset_id: str, verify: bool = True) -> Optional[SignedRuleset]:
         """
         Retrieve ruleset from registry.
@@ -729,4 +841,4 @@ class RulesetRegistry:
 
 
 # Global registry instance
-ruleset_registry = RulesetRegistry()
+ruleset_registry = RulesetRegistry(verification_ttl_seconds=settings.ruleset_verification_ttl_seconds)
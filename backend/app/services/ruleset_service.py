@@ -6,15 +6,18 @@ import json
 import yaml
 import re
 import time
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Tuple
 from pathlib import Path
 from datetime import datetime
 
 from app.models.rulesets import (
-    RulesetDefinition, RuleDefinition, RuleType, RuleCondition,
+    RulesetDefinition, RuleType,
     RulesetExecutionResult, RuleExecutionResult, RulesetValidationResult
 )
 from app.services.symbolic_service import SymbolicService
+from app.services.ruleset_compiler import (
+    CompiledRule, ConditionFields, RulesetExecutionPlan, compile_ruleset
+)
 
 
 class RulesetService:
@@ -22,6 +25,7 @@ class RulesetService:
     
     def __init__(self):
         self.rulesets: Dict[str, RulesetDefinition] = {}
+        self._plans: Dict[Tuple[str, str], RulesetExecutionPlan] = {}
         self.symbolic_service = SymbolicService()
         self._load_builtin_rulesets()
     
@@ -55,6 +59,7 @@ class RulesetService:
     def load_ruleset_from_dict(self, data: Dict[str, Any]) -> RulesetDefinition:
         """Load a ruleset from a dictionary."""
         ruleset = RulesetDefinition(**data)
+        self.invalidate_plans(ruleset.id)
         self.rulesets[ruleset.id] = ruleset
         return ruleset
     
@@ -174,6 +179,25 @@ class RulesetService:
         else:
             return "Medium"
     
+    def compile_ruleset(self, ruleset: RulesetDefinition) -> RulesetExecutionPlan:
+        """Get the cached execution plan for a ruleset, compiling it if needed."""
+        key = (ruleset.id, ruleset.version)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = compile_ruleset(ruleset)
+            self._plans[key] = plan
+        return plan
+    
+    def invalidate_plans(self, ruleset_id: str) -> None:
+        """Drop cached execution plans for every version of a ruleset."""
+        for key in [key for key in self._plans if key[0] == ruleset_id]:
+            del self._plans[key]
+    
+    def remove_ruleset(self, ruleset_id: str) -> bool:
+        """Remove a ruleset and its cached execution plans."""
+        self.invalidate_plans(ruleset_id)
+        return self.rulesets.pop(ruleset_id, None) is not None
+    
     async def execute_ruleset(
         self, 
         ruleset_id: str, 
@@ -190,16 +214,22 @@ class RulesetService:
             raise ValueError(f"Ruleset is disabled: {ruleset_id}")
         
         start_time = time.time()
+        plan = self.compile_ruleset(ruleset)
         rule_results = []
         errors = []
         
         # Filter rules based on conditions
-        applicable_rules = self._filter_applicable_rules(ruleset.rules, question, hypothesis, context)
+        fields = ConditionFields(question, hypothesis, context)
+        applicable_rules = [rule for rule in plan.rules if rule.is_applicable(fields)]
+        
+        # Rule input text, shared by every rule in this execution
+        text = f"{question} {hypothesis}"
+        text_lower = text.lower()
         
         for rule in applicable_rules:
             rule_start_time = time.time()
             try:
-                result = await self._execute_rule(rule, question, hypothesis, context)
+                result = await self._execute_rule(rule, question, hypothesis, context, text, text_lower)
                 rule_results.append(result)
             except Exception as e:
                 error_msg = f"Rule {rule.id} execution failed: {str(e)}"
@@ -221,7 +251,7 @@ class RulesetService:
         total_weight = sum(rule.weight for rule in applicable_rules)
         if total_weight > 0:
             weighted_confidence = sum(
-                r.confidence * next((rule.weight for rule in applicable_rules if rule.id == r.rule_id), 1.0)
+                r.confidence * plan.weights.get(r.rule_id, 1.0)
                 for r in rule_results
             ) / total_weight
         else:
@@ -240,85 +270,16 @@ class RulesetService:
             errors=errors
         )
     
-    def _filter_applicable_rules(
-        self, 
-        rules: List[RuleDefinition], 
-        question: str, 
-        hypothesis: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> List[RuleDefinition]:
-        """Filter rules based on conditions."""
-        applicable_rules = []
-        
-        for rule in rules:
-            if not rule.enabled:
-                continue
-            
-            if not rule.conditions:
-                applicable_rules.append(rule)
-                continue
-            
-            # Check all conditions
-            all_conditions_met = True
-            for condition in rule.conditions:
-                if not self._evaluate_condition(condition, question, hypothesis, context):
-                    all_conditions_met = False
-                    break
-            
-            if all_conditions_met:
-                applicable_rules.append(rule)
-        
-        return applicable_rules
-    
-    def _evaluate_condition(
-        self, 
-        condition: RuleCondition, 
-        question: str, 
-        hypothesis: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> bool:
-        """Evaluate a rule condition."""
-        # Get the field value
-        if condition.field == "question":
-            field_value = question
-        elif condition.field == "hypothesis":
-            field_value = hypothesis
-        elif condition.field == "domain" and context:
-            field_value = context.get("domain", "")
-        else:
-            field_value = str(context.get(condition.field, "")) if context else ""
-        
-        if not condition.case_sensitive:
-            field_value = field_value.lower()
-            condition_value = str(condition.value).lower()
-        else:
-            condition_value = str(condition.value)
-        
-        # Apply operator
-        if condition.operator == "contains":
-            return condition_value in field_value
-        elif condition.operator == "equals":
-            return field_value == condition_value
-        elif condition.operator == "regex":
-            try:
-                return bool(re.search(condition_value, field_value))
-            except re.error:
-                return False
-        elif condition.operator == "starts_with":
-            return field_value.startswith(condition_value)
-        elif condition.operator == "ends_with":
-            return field_value.endswith(condition_value)
-        else:
-            return False
-    
     async def _execute_rule(
         self, 
-        rule: RuleDefinition, 
+        rule: CompiledRule, 
         question: str, 
         hypothesis: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]],
+        text: str,
+        text_lower: str
     ) -> RuleExecutionResult:
-        """Execute a single rule."""
+        """Execute a single compiled rule."""
         start_time = time.time()
         
         try:
@@ -327,9 +288,9 @@ class RulesetService:
             elif rule.type == RuleType.PYTHON:
                 result = await self._execute_python_rule(rule, question, hypothesis, context)
             elif rule.type == RuleType.REGEX:
-                result = await self._execute_regex_rule(rule, question, hypothesis, context)
+                result = await self._execute_regex_rule(rule, text)
             elif rule.type == RuleType.KEYWORD:
-                result = await self._execute_keyword_rule(rule, question, hypothesis, context)
+                result = await self._execute_keyword_rule(rule, text_lower)
             else:
                 raise ValueError(f"Unsupported rule type: {rule.type}")
             
@@ -359,7 +320,7 @@ class RulesetService:
     
     async def _execute_prolog_rule(
         self, 
-        rule: RuleDefinition, 
+        rule: CompiledRule, 
         question: str, 
         hypothesis: str,
         context: Optional[Dict[str, Any]] = None
@@ -375,12 +336,19 @@ class RulesetService:
     
     async def _execute_python_rule(
         self, 
-        rule: RuleDefinition, 
+        rule: CompiledRule, 
         question: str, 
         hypothesis: str,
         context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Execute a Python rule."""
+        """Execute a precompiled Python rule."""
+        if rule.code is None:
+            return {
+                "passed": False,
+                "confidence": 0.0,
+                "output": {"error": rule.compile_error}
+            }
+        
         # Create a safe execution environment
         local_vars = {
             "question": question,
@@ -390,7 +358,7 @@ class RulesetService:
         }
         
         try:
-            exec(rule.content, {"__builtins__": {}}, local_vars)
+            exec(rule.code, {"__builtins__": {}}, local_vars)
             return local_vars.get("result", {"passed": False, "confidence": 0.0, "output": {}})
         except Exception as e:
             return {
@@ -399,46 +367,30 @@ class RulesetService:
                 "output": {"error": str(e)}
             }
     
-    async def _execute_regex_rule(
-        self, 
-        rule: RuleDefinition, 
-        question: str, 
-        hypothesis: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """Execute a regex rule."""
-        text = f"{question} {hypothesis}"
-        pattern = rule.content
-        
-        try:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            passed = len(matches) > 0
-            confidence = min(len(matches) / 10.0, 1.0) if passed else 0.0
-            
-            return {
-                "passed": passed,
-                "confidence": confidence,
-                "output": {"matches": matches, "count": len(matches)}
-            }
-        except re.error as e:
+    async def _execute_regex_rule(self, rule: CompiledRule, text: str) -> Dict[str, Any]:
+        """Execute a precompiled regex rule."""
+        if rule.pattern is None:
             return {
                 "passed": False,
                 "confidence": 0.0,
-                "output": {"error": f"Invalid regex: {str(e)}"}
+                "output": {"error": rule.compile_error}
             }
+        
+        matches = rule.pattern.findall(text)
+        passed = len(matches) > 0
+        confidence = min(len(matches) / 10.0, 1.0) if passed else 0.0
+        
+        return {
+            "passed": passed,
+            "confidence": confidence,
+            "output": {"matches": matches, "count": len(matches)}
+        }
     
-    async def _execute_keyword_rule(
-        self, 
-        rule: RuleDefinition, 
-        question: str, 
-        hypothesis: str,
-        context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """Execute a keyword-based rule."""
-        text = f"{question} {hypothesis}".lower()
-        keywords = rule.content.lower().split(',')
+    async def _execute_keyword_rule(self, rule: CompiledRule, text_lower: str) -> Dict[str, Any]:
+        """Execute a keyword-based rule against pre-lowered text."""
+        keywords = rule.keywords
         
-        found_keywords = [kw.strip() for kw in keywords if kw.strip() in text]
+        found_keywords = [kw for kw in keywords if kw in text_lower]
         passed = len(found_keywords) > 0
         confidence = len(found_keywords) / len(keywords) if keywords else 0.0
         
@@ -447,3 +399,7 @@ class RulesetService:
             "confidence": confidence,
             "output": {"found_keywords": found_keywords, "total_keywords": len(keywords)}
         }
+
+
+# Global ruleset service instance
+ruleset_service = RulesetService()
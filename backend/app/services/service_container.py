@@ -0,0 +1,111 @@
+"""
+Service Container
+App-scoped holder for the reasoning pipeline services, built once per process.
+"""
+
+import time
+import logging
+from typing import Dict, Any, Callable, Optional
+
+from app.services.llm_service import LLMService
+from app.services.symbolic_service import SymbolicService
+from app.services.knowledge_service import KnowledgeService
+from app.services.modern_reasoning_service import ModernReasoningService, create_modern_reasoning_service
+from app.services.orchestration_service import OrchestrationService
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Process-wide container that builds the reasoning services once and shares them."""
+    
+    def __init__(self):
+        self.llm_service: Optional[LLMService] = None
+        self.symbolic_service: Optional[SymbolicService] = None
+        self.knowledge_service: Optional[KnowledgeService] = None
+        self.modern_reasoning_service: Optional[ModernReasoningService] = None
+        self.orchestration_service: Optional[OrchestrationService] = None
+        self.startup_timings: Dict[str, float] = {}
+        self.started = False
+        self.logger = logging.getLogger(__name__)
+    
+    def _build(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Build a component and record its construction time in milliseconds."""
+        start_time = time.perf_counter()
+        component = factory()
+        self.startup_timings[name] = (time.perf_counter() - start_time) * 1000
+        return component
+    
+    def start(self) -> None:
+        """Build all services. Safe to call more than once."""
+        if self.started:
+            return
+        
+        start_time = time.perf_counter()
+        self.startup_timings = {}
+        
+        self.llm_service = self._build("llm_service", LLMService.with_pooled_client)
+        self.symbolic_service = self._build("symbolic_service", SymbolicService)
+        self.knowledge_service = self._build("knowledge_service", KnowledgeService)
+        self.modern_reasoning_service = self._build(
+            "modern_reasoning_service",
+            lambda: create_modern_reasoning_service(self.llm_service)
+        )
+        self.orchestration_service = self._build(
+            "orchestration_service",
+            lambda: OrchestrationService(
+                llm_service=self.llm_service,
+                symbolic_service=self.modern_reasoning_service,
+                knowledge_service=self.knowledge_service
+            )
+        )
+        
+        self.startup_timings["total"] = (time.perf_counter() - start_time) * 1000
+        self.started = True
+        
+        for name, duration_ms in self.startup_timings.items():
+            self.logger.info(f"Service startup: {name} built in {duration_ms:.1f}ms")
+    
+    async def shutdown(self) -> None:
+        """Release shared resources such as the pooled LLM HTTP client."""
+        if not self.started:
+            return
+        
+        try:
+            await self.llm_service.close()
+        except Exception as e:
+            self.logger.error(f"Error closing LLM client: {e}")
+        
+        self.llm_service = None
+        self.symbolic_service = None
+        self.knowledge_service = None
+        self.modern_reasoning_service = None
+        self.orchestration_service = None
+        self.started = False
+        self.logger.info("Service container shut down")
+    
+    def get_orchestration_service(self) -> OrchestrationService:
+        """Get the shared orchestration service, building the container on first use."""
+        self.start()
+        return self.orchestration_service
+    
+    def get_symbolic_service(self) -> SymbolicService:
+        """Get the shared symbolic service, building the container on first use."""
+        self.start()
+        return self.symbolic_service
+    
+    def get_knowledge_service(self) -> KnowledgeService:
+        """Get the shared knowledge service, building the container on first use."""
+        self.start()
+        return self.knowledge_service
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get container status including per-component startup cost."""
+        return {
+            "started": self.started,
+            "startup_timings_ms": dict(self.startup_timings)
+        }
+
+
+# Global service container instance
+service_container = ServiceContainer()
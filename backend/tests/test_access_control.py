@@ -0,0 +1,99 @@
+"""
+Tests for the effective-permission index in access control.
+"""
+
+from app.security.access_control import (
+    AccessControlManager, Permission, PermissionLevel, ResourceType
+)
+
+
+def ruleset_permission(resource_id, level=PermissionLevel.READ):
+    return Permission(resource_type=ResourceType.RULESET, resource_id=resource_id, permission_level=level)
+
+
+def scan_roles(manager, user_id, resource_type, resource_id, level, tenant_id=None):
+    roles = manager.get_user_roles(user_id) + (manager.get_tenant_roles(tenant_id) if tenant_id else [])
+    return any(role.has_permission(resource_type, resource_id, level) for role in roles)
+
+
+def test_index_follows_assignments_and_role_edits():
+    """Checks should match a scan of the assigned roles after every change."""
+    manager = AccessControlManager()
+    reader = manager.create_role("Ruleset Reader", permissions=[ruleset_permission("hipaa")])
+    editor = manager.create_role("Ruleset Editor", permissions=[ruleset_permission("hipaa", PermissionLevel.WRITE)])
+    cases = [
+        (ResourceType.RULESET, "hipaa", PermissionLevel.READ),
+        (ResourceType.RULESET, "hipaa", PermissionLevel.WRITE),
+        (ResourceType.RULESET, "gdpr", PermissionLevel.READ),
+        (ResourceType.API, "anything", PermissionLevel.READ)
+    ]
+    
+    def assert_matches_scan():
+        for case in cases:
+            for tenant_id in (None, "acme"):
+                expected = scan_roles(manager, "alice", *case, tenant_id=tenant_id)
+                assert manager.check_permission("alice", *case, tenant_id=tenant_id) == expected
+    
+    manager.assign_role_to_user("alice", reader.id)
+    assert manager.check_permission("alice", ResourceType.RULESET, "hipaa", PermissionLevel.READ)
+    assert_matches_scan()
+    
+    manager.assign_role_to_tenant("acme", editor.id)
+    assert manager.check_permission("alice", ResourceType.RULESET, "hipaa", PermissionLevel.WRITE, tenant_id="acme")
+    assert not manager.check_permission("alice", ResourceType.RULESET, "hipaa", PermissionLevel.WRITE)
+    assert_matches_scan()
+    
+    gdpr = ruleset_permission("gdpr")
+    reader.add_permission(gdpr)
+    assert manager.check_permission("alice", ResourceType.RULESET, "gdpr", PermissionLevel.READ)
+    reader.remove_permission(gdpr.id)
+    assert_matches_scan()
+    
+    manager.assign_role_to_user("alice", manager.get_role_by_name("Viewer").id)
+    assert manager.check_permission("alice", ResourceType.API, "anything", PermissionLevel.READ)
+    manager.update_role(reader.id, permissions=[])
+    manager.remove_role_from_tenant("acme", editor.id)
+    assert_matches_scan()
+    
+    manager.delete_role(reader.id)
+    assert not manager.check_permission("alice", ResourceType.RULESET, "hipaa", PermissionLevel.READ)
+    assert_matches_scan()
+
+
+def test_shared_permissions_survive_removing_one_role():
+    """A grant held through two roles should remain after one of them is removed."""
+    manager = AccessControlManager()
+    shared = ruleset_permission("sox")
+    first = manager.create_role("First", permissions=[shared])
+    second = manager.create_role("Second", permissions=[shared])
+    manager.assign_role_to_user("bob", first.id)
+    manager.assign_role_to_user("bob", second.id)
+    
+    assert [perm.id for perm in manager.get_user_permissions("bob")] == [shared.id]
+    manager.remove_role_from_user("bob", first.id)
+    assert manager.check_permission("bob", ResourceType.RULESET, "sox", PermissionLevel.READ)
+    manager.remove_role_from_user("bob", second.id)
+    assert manager.get_user_permissions("bob") == []
+    
+    second.permissions.append(ruleset_permission("pci"))
+    manager.assign_role_to_user("bob", second.id)
+    manager.refresh_permission_index()
+    assert manager.check_permission("bob", ResourceType.RULESET, "pci", PermissionLevel.READ)
+
+
+def test_check_permissions_batch():
+    """Batch checks should honor specific grants, wildcards and tenant roles."""
+    manager = AccessControlManager()
+    role = manager.create_role("Some Rulesets", permissions=[ruleset_permission("hipaa"), ruleset_permission("sox")])
+    everything = manager.create_role("All Rulesets", permissions=[ruleset_permission("*")])
+    manager.assign_role_to_user("carol", role.id)
+    manager.assign_role_to_tenant("acme", everything.id)
+    resource_ids = ["hipaa", "gdpr", "sox", "pci"]
+    
+    assert manager.check_permissions("carol", ResourceType.RULESET, resource_ids, PermissionLevel.READ) == {
+        "hipaa": True, "gdpr": False, "sox": True, "pci": False
+    }
+    assert all(manager.check_permissions(
+        "carol", ResourceType.RULESET, resource_ids, PermissionLevel.READ, tenant_id="acme"
+    ).values())
+    assert not any(manager.check_permissions("nobody", ResourceType.RULESET, resource_ids, PermissionLevel.READ).values())
@@ -0,0 +1,131 @@
+"""
+Tests for the batched, checkpointed audit log.
+"""
+
+import json
+from app.security.audit_logger import AuditLogger, AuditEventType
+from app.security.audit_store import merkle_leaf, merkle_root, merkle_proof, verify_merkle_proof
+
+
+def log_events(logger, count, start=0):
+    return [
+        logger.log_event(AuditEventType.API_ACCESS, f"GET /items/{i}", "success", {"index": i}, user_id="user_1")
+        for i in range(start, start + count)
+    ]
+
+
+def test_merkle_proofs_for_every_leaf():
+    """Proofs should verify for each leaf, including unpaired ones, and reject other hashes."""
+    hashes = [f"{i:064x}" for i in range(11)]
+    leaves = [merkle_leaf(h) for h in hashes]
+    root = merkle_root(leaves)
+    
+    for index, event_hash in enumerate(hashes):
+        proof = merkle_proof(leaves, index)
+        assert len(proof) <= 4
+        assert verify_merkle_proof(event_hash, proof, root)
+        assert not verify_merkle_proof(hashes[(index + 1) % len(hashes)], proof, root)
+
+
+def test_events_are_chained_in_background_and_checkpointed(tmp_path):
+    """Logged events should be chained in order, written to segments and sealed every interval."""
+    logger = AuditLogger(log_dir=str(tmp_path), batch_size=8, checkpoint_interval=10, fsync=False)
+    events = log_events(logger, 25)
+    assert logger.flush(timeout=5)
+    
+    assert [event.sequence for event in events] == list(range(25))
+    assert events[0].previous_hash == "0" * 64
+    assert logger.verify_audit_chain(events)
+    assert logger.last_hash == events[-1].event_hash
+    assert len(logger.writer.checkpoints) == 2
+    assert (tmp_path / "segment-00000002.jsonl").read_text().count("\n") == 5
+    
+    proof = logger.get_inclusion_proof(13)
+    assert logger.verify_event_proof(events[13], proof["checkpoint"], proof["proof"])
+    assert logger.get_inclusion_proof(22) is None
+    assert logger.verify_range(0, 25)
+    assert logger.verify_range(7, 23)
+    logger.close()
+
+
+def test_verify_range_detects_tampering(tmp_path):
+    """A re-signed edit should break the chain and its Merkle checkpoint."""
+    logger = AuditLogger(log_dir=str(tmp_path), checkpoint_interval=10, fsync=False)
+    log_events(logger, 20)
+    logger.close()
+    
+    segment = tmp_path / "segment-00000001.jsonl"
+    lines = segment.read_text().splitlines()
+    forged = logger.get_events(14, 15)[0]
+    forged.result = "failure"
+    forged.event_hash = logger._calculate_hash(forged)
+    forged.signature = logger._sign_event(forged.event_hash)
+    lines[4] = json.dumps(forged.to_record())
+    segment.write_text("\n".join(lines) + "\n")
+    
+    assert logger.verify_range(0, 10)
+    assert not logger.verify_range(12, 20)
+    assert not logger.verify_range(14, 15)
+
+
+def test_writer_recovers_chain_after_restart(tmp_path):
+    """A new logger should continue the chain from the persisted segments."""
+    first = AuditLogger(log_dir=str(tmp_path), checkpoint_interval=10, fsync=False)
+    log_events(first, 15)
+    first.close()
+    
+    with open(tmp_path / "segment-00000001.jsonl", "a") as f:
+        f.write('{"sequence": 15, "event_')
+    
+    second = AuditLogger(log_dir=str(tmp_path), checkpoint_interval=10, fsync=False)
+    assert second.writer.next_sequence == 15
+    events = log_events(second, 10, start=15)
+    second.close()
+    
+    assert events[0].previous_hash == first.last_hash
+    assert len(second.writer.checkpoints) == 2
+    assert second.verify_range(0, 25)
+
+
+def test_memory_mode_and_inline_writes_after_close():
+    """Without a directory segments stay in memory, and closed loggers write inline."""
+    logger = AuditLogger(checkpoint_interval=4)
+    log_events(logger, 6)
+    logger.close()
+    
+    event = logger.log_event(AuditEventType.ADMIN_ACTION, "rotate", "success", {"password": "secret"})
+    assert event.sequence == 6 and event.event_hash == logger.last_hash
+    assert event.details["password"].startswith("ENCRYPTED:")
+    assert logger.verify_range(0, 7)
+
+
+def test_failed_writes_hold_events_back_until_they_are_durable(tmp_path, monkeypatch):
+    """A failing disk should not advance the chain; held-back events are written once it recovers."""
+    from app.security import audit_store
+    
+    logger = AuditLogger(log_dir=str(tmp_path), batch_size=8, checkpoint_interval=4)
+    logger.writer.write_retries = 0
+    logger.writer.retry_interval = 0.05
+    real_fsync = audit_store.os.fsync
+    disk_full = [True]
+    
+    def failing_fsync(fd):
+        if disk_full[0]:
+            raise OSError(28, "No space left on device")
+        real_fsync(fd)
+    
+    monkeypatch.setattr(audit_store.os, "fsync", failing_fsync)
+    events = log_events(logger, 6)
+    assert logger.flush(timeout=5) is False
+    assert logger.writer.next_sequence == 0 and logger.last_hash == "0" * 64
+    assert (tmp_path / "segment-00000000.jsonl").read_text() == ""
+    
+    disk_full[0] = False
+    log_events(logger, 1, start=6)
+    assert logger.flush(timeout=5) is True
+    assert [event.sequence for event in events] == list(range(6))
+    assert len(logger.writer.checkpoints) == 1
+    assert logger.verify_range(0, 7)
+    proof = logger.get_inclusion_proof(2)
+    assert logger.verify_event_proof(events[2], proof["checkpoint"], proof["proof"])
+    logger.close()
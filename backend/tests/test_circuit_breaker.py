@@ -0,0 +1,108 @@
+"""
+Tests for ring-buffer windowed circuit breakers.
+"""
+
+import asyncio
+import time
+import pytest
+from app.reliability.circuit_breaker import (
+    CircuitBreaker, CircuitBreakerConfig, CircuitBreakerException, CircuitState, WindowedCounters
+)
+
+
+def test_windowed_counters_expire_whole_slots():
+    """Counts should leave the window when their slot is reused."""
+    counters = WindowedCounters(window_seconds=60, slots=6)
+    for _ in range(3):
+        counters.record(1.0, success=False)
+    counters.record(31.0, success=True, response_time=0.2)
+    counters.record(32.0, timeout=True)
+    counters.record(33.0, blocked=True)
+    
+    assert counters.error_rate(35.0) == pytest.approx(4 / 6 * 100)
+    assert counters.average_response_time(35.0) == pytest.approx(0.2)
+    assert counters.error_rate(65.0) == pytest.approx(1 / 3 * 100)
+    assert counters.error_rate(500.0) == 0.0
+    assert counters.successes == counters.failures == counters.timeouts == counters.blocked == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_call_does_not_block_other_callers():
+    """Calls should run concurrently rather than being serialized by the breaker lock."""
+    breaker = CircuitBreaker("concurrent")
+    
+    async def slow():
+        await asyncio.sleep(0.5)
+        return "slow"
+    
+    async def fast():
+        return "fast"
+    
+    slow_task = asyncio.create_task(breaker.call(slow))
+    await asyncio.sleep(0.01)
+    start = time.monotonic()
+    assert await breaker.call(fast) == "fast"
+    assert time.monotonic() - start < 0.2
+    assert await slow_task == "slow"
+    assert breaker.get_metrics()["successful_requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_limits_half_open_trials():
+    """Failures should open the circuit, and half-open should admit a bounded number of trials."""
+    config = CircuitBreakerConfig(failure_threshold=2, recovery_timeout=0, success_threshold=1, error_rate_threshold=100.1)
+    breaker = CircuitBreaker("trials", config)
+    
+    async def fail():
+        raise ValueError("boom")
+    
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await breaker.call(fail)
+    
+    release = asyncio.Event()
+    
+    async def wait_for_release():
+        await release.wait()
+        return "ok"
+    
+    trial = asyncio.create_task(breaker.call(wait_for_release))
+    await asyncio.sleep(0.01)
+    assert breaker.state == CircuitState.HALF_OPEN
+    with pytest.raises(CircuitBreakerException):
+        await breaker.call(wait_for_release)
+    
+    release.set()
+    assert await trial == "ok"
+    assert await breaker.call(wait_for_release) == "ok"
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_trial_releases_its_slot():
+    """A cancelled trial call should not leave the breaker half-open and busy."""
+    config = CircuitBreakerConfig(failure_threshold=1, recovery_timeout=0, success_threshold=1, error_rate_threshold=100.1)
+    breaker = CircuitBreaker("cancelled-trial", config)
+    
+    async def fail():
+        raise ValueError("boom")
+    
+    async def hang():
+        await asyncio.Event().wait()
+    
+    async def succeed():
+        return "ok"
+    
+    with pytest.raises(ValueError):
+        await breaker.call(fail)
+    
+    trial = asyncio.create_task(breaker.call(hang))
+    await asyncio.sleep(0.01)
+    assert breaker.state == CircuitState.HALF_OPEN
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+    
+    assert breaker._half_open_in_flight == 0
+    assert await breaker.call(succeed) == "ok"
+    assert breaker.state == CircuitState.CLOSED
@@ -0,0 +1,88 @@
+"""
+Tests for single-pass and streaming data classification.
+"""
+
+import re
+from app.security.data_classification import (
+    DataClassifier, DataPattern, DataCategory, DataSensitivityLevel
+)
+
+
+SAMPLE = (
+    "Contact john.doe@example.com or call 555.123.4567. "
+    "Card 4111 1111 1111 1111 was charged; SSN 123-45-6789 on file. "
+    "Login from 10.0.0.1 and again from 192.168.1.20."
+)
+
+
+def expected_spans(classifier, text):
+    spans = {}
+    for pattern in classifier.patterns:
+        found = [list(m.span()) for m in re.finditer(pattern.pattern, text, re.IGNORECASE)]
+        if found:
+            spans[pattern.id] = found
+    return spans
+
+
+def test_single_pass_matches_per_pattern_search():
+    """The combined scan should find the same patterns and offsets as searching each pattern."""
+    classifier = DataClassifier()
+    
+    classification = classifier.classify_data(SAMPLE, "doc-1")
+    
+    assert classification.metadata["match_offsets"] == expected_spans(classifier, SAMPLE)
+    assert classification.sensitivity_level == DataSensitivityLevel.HIGHLY_RESTRICTED
+    assert classification.content == SAMPLE
+    assert [p.name for p in classification.patterns_found] == [
+        p.name for p in classifier.patterns if re.search(p.pattern, SAMPLE, re.IGNORECASE)
+    ]
+
+
+def test_stream_finds_matches_across_chunk_boundaries():
+    """Matches split between chunks should be found once with document offsets."""
+    classifier = DataClassifier()
+    text = SAMPLE * 20
+    chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+    
+    classification = classifier.classify_stream(chunks, "doc-2", overlap=64)
+    
+    assert classification.metadata["match_offsets"] == expected_spans(classifier, text)
+    assert classification.metadata["content_length"] == len(text)
+    assert classification.content == ""
+
+
+def test_stream_honours_zero_overlap():
+    """An explicit overlap of zero should scan each chunk on its own, not fall back to the default."""
+    classifier = DataClassifier()
+    split = SAMPLE.index("@")
+    
+    whole = classifier.classify_stream([SAMPLE, SAMPLE], "doc-3", overlap=0)
+    broken = classifier.classify_stream([SAMPLE[:split], SAMPLE[split:]], "doc-4", overlap=0)
+    default = classifier.classify_stream([SAMPLE[:split], SAMPLE[split:]], "doc-5")
+    
+    assert whole.metadata["match_offsets"] == expected_spans(classifier, SAMPLE * 2)
+    assert broken.metadata["match_offsets"] != expected_spans(classifier, SAMPLE)
+    assert default.metadata["match_offsets"] == expected_spans(classifier, SAMPLE)
+
+
+def test_added_and_removed_patterns_are_recompiled():
+    """Custom patterns, including ones that cannot be combined, should be scanned."""
+    classifier = DataClassifier()
+    employee_id = DataPattern(
+        name="Employee ID",
+        pattern=r"\bEMP-\d{6}\b",
+        category=DataCategory.PERSONAL,
+        sensitivity_level=DataSensitivityLevel.INTERNAL
+    )
+    repeated = DataPattern(name="Repeated Character", pattern=r"(\w)\1\1")
+    invalid = DataPattern(name="Invalid", pattern=r"(unclosed")
+    for pattern in [employee_id, repeated, invalid]:
+        classifier.add_pattern(pattern)
+    
+    classification = classifier.classify_data("Badge emp-004211 issued, zzz")
+    names = {p.name for p in classification.patterns_found}
+    assert names == {"Employee ID", "Repeated Character"}
+    
+    assert classifier.remove_pattern(employee_id.id) is True
+    classification = classifier.classify_data("Badge EMP-004211 issued")
+    assert classification.patterns_found == []
@@ -0,0 +1,81 @@
+"""
+Tests for cached data keys and batch/streaming encryption.
+"""
+
+import io
+import pytest
+from cryptography.exceptions import InvalidTag
+from app.security.encryption_service import EncryptionService, EncryptionAlgorithm
+
+
+@pytest.fixture
+def service():
+    service = EncryptionService()
+    service.generate_data_encryption_key("phi", EncryptionAlgorithm.AES_256_GCM, "user_data")
+    service.generate_data_encryption_key("tokens", EncryptionAlgorithm.FERNET, "api_keys")
+    return service
+
+
+def test_data_keys_are_unwrapped_once_and_cleared_on_rotation(service):
+    """Repeated operations should reuse the cached key until it is rotated or expires."""
+    encrypted, nonce = service.encrypt_data(b"patient record", "phi", b"record:1")
+    for _ in range(5):
+        assert service.decrypt_data(encrypted, "phi", nonce, b"record:1") == b"patient record"
+    assert service.dek_cache_stats == {"hits": 5, "misses": 1}
+    
+    service.rotate_key("phi")
+    assert service.decrypt_data(encrypted, "phi", nonce, b"record:1") == b"patient record"
+    assert service.dek_cache_stats["misses"] == 2
+    
+    service.dek_cache_ttl_seconds = 0
+    service.invalidate_key_cache("phi")
+    service.encrypt_data(b"a", "phi")
+    service.encrypt_data(b"b", "phi")
+    assert service.dek_cache_stats["misses"] == 4
+
+
+def test_encrypt_many_round_trips_both_algorithms(service):
+    """Batch APIs should match single-value encryption and keep input order."""
+    values = [f"ssn-{i}".encode() for i in range(20)]
+    for key_id in ("phi", "tokens"):
+        encrypted = service.encrypt_many(values, key_id, b"batch")
+        assert len({data for data, _ in encrypted}) == len(values)
+        assert service.decrypt_many([data for data, _ in encrypted], key_id, b"batch") == values
+        assert service.decrypt_data(encrypted[3][0], key_id, encrypted[3][1], b"batch") == values[3]
+    assert service.data_encryption_keys["phi"]["usage_count"] == 20
+    
+    encrypted = service.encrypt_many([b"v"], "phi", b"context a")
+    with pytest.raises(InvalidTag):
+        service.decrypt_many([encrypted[0][0]], "phi", b"context b")
+
+
+@pytest.mark.parametrize("size", [0, 10, 4096, 4096 * 3, 4096 * 3 + 1])
+def test_stream_round_trip(service, size):
+    """Streams should round-trip at and around chunk boundaries."""
+    plaintext = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    encrypted = io.BytesIO()
+    assert service.encrypt_stream(io.BytesIO(plaintext), encrypted, "phi", b"graph:1", chunk_size=4096) == size
+    
+    decrypted = io.BytesIO()
+    assert service.decrypt_stream(io.BytesIO(encrypted.getvalue()), decrypted, "phi", b"graph:1") == size
+    assert decrypted.getvalue() == plaintext
+
+
+def test_stream_detects_truncation_and_tampering(service):
+    """Dropped chunks, edited bytes and other keys should fail authentication."""
+    encrypted = io.BytesIO()
+    service.encrypt_stream(io.BytesIO(b"x" * 10000), encrypted, "phi", chunk_size=4096)
+    data = encrypted.getvalue()
+    header_size, sealed_size = 15, 4 + 4096 + 16
+    
+    with pytest.raises(ValueError, match="truncated"):
+        service.decrypt_stream(io.BytesIO(data[:header_size + 2 * sealed_size]), io.BytesIO(), "phi")
+    
+    tampered = bytearray(data)
+    tampered[header_size + 10] ^= 1
+    with pytest.raises(InvalidTag):
+        service.decrypt_stream(io.BytesIO(bytes(tampered)), io.BytesIO(), "phi")
+    with pytest.raises(InvalidTag):
+        service.decrypt_stream(io.BytesIO(data), io.BytesIO(), "phi", b"other context")
+    with pytest.raises(ValueError, match="aes-256-gcm"):
+        service.encrypt_stream(io.BytesIO(b"x"), io.BytesIO(), "tokens")
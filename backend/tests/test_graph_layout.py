@@ -0,0 +1,98 @@
+"""
+Tests for force-directed layouts and layout caching.
+"""
+
+import numpy as np
+from app.rendering.force_layout import force_directed_layout, _barnes_hut_repulsion, _exact_repulsion
+from app.services.graph_layout import place_new_nodes, LayoutCache
+from app.services.reasoning_graph_service import ReasoningGraphService
+from app.services.reasoning_graph_store import ReasoningGraphStore
+from app.models.reasoning_graph import EdgeType
+
+
+def test_barnes_hut_matches_exact_repulsion():
+    """The quadtree approximation should stay close to the exact forces, for any subset of points."""
+    pos = np.random.default_rng(1).random((800, 2))
+    targets = np.arange(800)
+    exact = _exact_repulsion(pos, 0.05, targets)
+    approx = _barnes_hut_repulsion(pos, 0.05, 1.0, targets)
+    error = np.linalg.norm(exact - approx, axis=1) / np.linalg.norm(exact, axis=1)
+    assert np.median(error) < 0.02
+    
+    subset = np.array([3, 400, 799])
+    assert np.allclose(_barnes_hut_repulsion(pos, 0.05, 1.0, subset), approx[subset])
+
+
+def test_layout_keeps_neighbors_close_and_fits_scale():
+    """Chained nodes should end up closer to each other than to arbitrary nodes."""
+    for count, threshold in ((120, 500), (120, 50)):
+        ids = list(range(count))
+        pos = force_directed_layout(ids, [(i, i + 1) for i in range(count - 1)], scale=2.0,
+                                    barnes_hut_threshold=threshold)
+        coords = np.array([pos[i] for i in ids])
+        assert np.abs(coords).max() <= 2.0 + 1e-9
+        neighbor = np.linalg.norm(coords[1:] - coords[:-1], axis=1).mean()
+        other = np.linalg.norm(coords - coords[(np.arange(count) * 37) % count], axis=1).mean()
+        assert neighbor < other / 3
+
+
+def test_new_nodes_are_placed_without_moving_existing_ones():
+    """Incremental placement should keep previous positions and put new nodes near their neighbors."""
+    ids = list(range(50))
+    edges = [(i, i + 1) for i in range(49)]
+    previous = force_directed_layout(ids, edges)
+    
+    extended = place_new_nodes(ids + [50], edges + [(10, 50)], previous)
+    assert all(extended[i] == previous[i] for i in ids)
+    distance_to_anchor = np.hypot(*np.subtract(extended[50], previous[10]))
+    assert distance_to_anchor < np.ptp(np.array(list(previous.values())), axis=0).max() / 2
+
+
+def test_layout_cache_versions():
+    """A matching version is a hit; an older one is returned as the incremental base."""
+    cache = LayoutCache(max_entries=1)
+    cache.put("g", "spring", 1, {"a": (0.0, 0.0)})
+    assert cache.get("g", "spring", 1) == ({"a": (0.0, 0.0)}, None)
+    assert cache.get("g", "spring", 2) == (None, {"a": (0.0, 0.0)})
+    cache.put("h", "spring", 1, {})
+    assert cache.get("g", "spring", 1) == (None, None)
+
+
+def test_service_caches_layouts_and_respects_layout_type():
+    """Repeated visualization should reuse the layout, and changing the layout type should relayout."""
+    service = ReasoningGraphService(ReasoningGraphStore())
+    graph = service.create_graph("session")
+    first = service.add_input_node(graph.id, "q")
+    second = service.add_llm_hypothesis_node(graph.id, "h", 0.7)
+    service.add_edge(graph.id, first.id, second.id, EdgeType.GENERATES, "generates")
+    
+    hierarchical = service.generate_visualization_data(graph.id, "hierarchical")
+    circular = service.generate_visualization_data(graph.id, "circular")
+    assert [(n["x"], n["y"]) for n in hierarchical.nodes] != [(n["x"], n["y"]) for n in circular.nodes]
+    
+    spring = service.generate_visualization_data(graph.id, "spring")
+    assert service.generate_visualization_data(graph.id, "spring").nodes == spring.nodes
+    
+    third = service.add_llm_hypothesis_node(graph.id, "h2", 0.6)
+    service.add_edge(graph.id, second.id, third.id, EdgeType.SUPPORTS, "supports")
+    extended = service.generate_visualization_data(graph.id, "spring")
+    assert len(extended.nodes) == 3
+    assert [(n["x"], n["y"]) for n in extended.nodes[:2]] == [(n["x"], n["y"]) for n in spring.nodes]
+
+
+def test_calculate_layout_leaves_the_stored_graph_untouched():
+    """Layouts should be applied to a copy, never to the shared cached graph or the store."""
+    store = ReasoningGraphStore()
+    service = ReasoningGraphService(store)
+    graph = service.create_graph("session")
+    service.add_input_node(graph.id, "q")
+    service.add_llm_hypothesis_node(graph.id, "h", 0.7)
+    stored = store.get(graph.id)
+    writes = store.stats["writes"]
+    
+    positioned = service.calculate_layout(stored, "spring")
+    
+    assert positioned is not stored
+    assert all(node.x is not None for node in positioned.nodes)
+    assert all(node.x is None for node in store.get(graph.id).nodes)
+    assert store.stats["writes"] == writes
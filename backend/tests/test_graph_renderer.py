@@ -0,0 +1,110 @@
+"""
+Tests for off-loop graph image rendering.
+"""
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.services.graph_renderer import GraphRenderer, render_graph_image
+
+PAYLOAD = {"nodes": [["a", "Input", "#E3F2FD"], ["b", "Output", "#FAFAFA"]], "edges": [["a", "b", "leads to"]]}
+
+
+def counting_renderer(**kwargs):
+    renderer = GraphRenderer(executor=ThreadPoolExecutor(max_workers=4), **kwargs)
+    calls = []
+    lock = threading.Lock()
+    
+    def render(payload, format):
+        with lock:
+            calls.append((len(payload["nodes"]), format))
+        time.sleep(0.05)
+        return f"{format}:{len(payload['nodes'])}".encode()
+    
+    renderer.render_function = render
+    return renderer, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_renders_are_deduplicated_and_cached():
+    """Identical concurrent requests should share one render; later ones hit the cache."""
+    renderer, calls = counting_renderer()
+    results = await asyncio.gather(*[renderer.render(PAYLOAD, "png") for _ in range(5)])
+    assert results == [b"png:2"] * 5
+    assert calls == [(2, "png")]
+    assert renderer.stats["coalesced"] == 4
+    
+    assert await renderer.render(PAYLOAD, "png") == b"png:2"
+    assert await renderer.render(PAYLOAD, "svg") == b"svg:2"
+    assert calls == [(2, "png"), (2, "svg")]
+    assert renderer.stats["memory_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_and_memory_budget(tmp_path):
+    """Rendered images should persist on disk and the memory tier should stay within its budget."""
+    renderer, calls = counting_renderer(cache_dir=str(tmp_path), max_bytes=8)
+    await renderer.render(PAYLOAD, "png")
+    await renderer.render({"nodes": [], "edges": []}, "png")
+    assert renderer.get_stats()["memory_bytes"] <= 8
+    assert len(list(tmp_path.glob("*.png"))) == 2
+    
+    restarted, restarted_calls = counting_renderer(cache_dir=str(tmp_path))
+    assert await restarted.render(PAYLOAD, "png") == b"png:2"
+    assert restarted_calls == [] and restarted.stats["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_requester_does_not_cancel_shared_render():
+    """Cancelling the request that started a render should not fail the others waiting for it."""
+    renderer, calls = counting_renderer()
+    first = asyncio.create_task(renderer.render(PAYLOAD, "png"))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(renderer.render(PAYLOAD, "png"))
+    await asyncio.sleep(0)
+    first.cancel()
+    
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert await second == b"png:2"
+    assert calls == [(2, "png")]
+    assert renderer.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_render_is_not_cached():
+    """Errors should reach the caller without leaving a cache entry."""
+    renderer, _ = counting_renderer()
+    renderer.render_function = lambda payload, format: 1 / 0
+    with pytest.raises(ZeroDivisionError):
+        await renderer.render(PAYLOAD, "png")
+    with pytest.raises(ValueError):
+        await renderer.render(PAYLOAD, "bmp")
+    assert renderer.get_stats()["memory_entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_renders_png_in_process_pool():
+    """The default renderer should draw real images in a spawned worker process."""
+    renderer = GraphRenderer(max_workers=1)
+    try:
+        image = await renderer.render(PAYLOAD, "png")
+    finally:
+        renderer.shutdown()
+    assert image.startswith(b"\x89PNG")
+    assert render_graph_image(PAYLOAD, "svg").lstrip().startswith(b"<?xml")
+
+
+def test_worker_entry_point_does_not_import_services():
+    """Render workers should load the drawing code without the app.services package."""
+    code = (
+        "import sys, app.rendering.graph_image; "
+        "print(any(name.startswith('app.services') for name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+    assert render_graph_image.__module__ == "app.rendering.graph_image"
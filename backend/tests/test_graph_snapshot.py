@@ -0,0 +1,84 @@
+"""
+Tests for binary graph snapshots.
+"""
+
+import pytest
+from app.services.modern_reasoning_service import KnowledgeGraph, GraphNode, GraphEdge
+from app.services.graph_snapshot import GraphSnapshotReader, write_graph_snapshot
+from app.services.graph_persistence import GraphPersistenceManager
+
+
+def build_graph(count=25):
+    graph = KnowledgeGraph(initialize_domain_knowledge=False)
+    for i in range(count):
+        node_type = "drug" if i % 5 == 0 else "condition"
+        graph.add_node(GraphNode(f"n{i}", f"Node {i}", node_type, {"rank": i}, confidence=0.5 + i / 100))
+    for i in range(count - 1):
+        graph.add_edge(GraphEdge(f"n{i}", f"n{i + 1}", "next", {"weight": i}))
+    return graph
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_snapshot_round_trip_across_blocks(tmp_path, compression):
+    """Every node and edge should survive a multi-block snapshot."""
+    graph = build_graph()
+    path = str(tmp_path / "graph.xrgs")
+    size = write_graph_snapshot(graph, path, compression=compression, block_size=4, metadata={"name": "test"})
+    assert size > 0
+    
+    with GraphSnapshotReader(path) as reader:
+        assert reader.metadata["node_count"] == 25 and reader.metadata["name"] == "test"
+        assert sum(1 for block in reader.blocks if block[0] == "N") == 7
+        loaded = reader.load_graph()
+    
+    assert {n.id: (n.label, n.node_type, n.properties, n.confidence) for n in loaded.nodes.values()} == \
+        {n.id: (n.label, n.node_type, n.properties, n.confidence) for n in graph.nodes.values()}
+    assert set(loaded.edges) == set(graph.edges)
+    assert [target for _, target, _ in loaded.query("Node 3", "next")] == ["n4"]
+    assert loaded.get_node_id("Node 7") == "n7"
+
+
+def test_load_subgraph_by_ids_types_and_depth(tmp_path):
+    """Subgraph loads should include matches, neighbors up to depth and the edges between them."""
+    path = str(tmp_path / "graph.xrgs")
+    write_graph_snapshot(build_graph(), path, block_size=4)
+    
+    with GraphSnapshotReader(path) as reader:
+        by_id = reader.load_subgraph(node_ids=["n10"], depth=2)
+        assert set(by_id.nodes) == {"n8", "n9", "n10", "n11", "n12"}
+        assert len(by_id.edges) == 4
+        
+        drugs = reader.load_subgraph(node_types=["drug"])
+        assert set(drugs.nodes) == {"n0", "n5", "n10", "n15", "n20"}
+        assert not drugs.edges
+        
+        by_label = reader.load_subgraph(labels=["Node 24"], depth=1)
+        assert set(by_label.nodes) == {"n23", "n24"}
+
+
+def test_truncated_snapshot_is_rejected(tmp_path):
+    """A partially written snapshot should fail to open."""
+    path = tmp_path / "graph.xrgs"
+    write_graph_snapshot(build_graph(), str(path))
+    path.write_bytes(path.read_bytes()[:-5])
+    
+    with pytest.raises(ValueError):
+        GraphSnapshotReader(str(path))
+
+
+def test_manager_lists_and_loads_both_formats(tmp_path):
+    """JSON and snapshot files should both be listed and load with working indexes."""
+    manager = GraphPersistenceManager(storage_dir=str(tmp_path))
+    graph = build_graph(6)
+    manager.save_graph_to_json(graph, "graph.json")
+    snapshot_path = manager.save_graph_snapshot(graph, "graph.xrgs")
+    
+    formats = {info["filename"]: (info["format"], info["node_count"]) for info in manager.list_saved_graphs()}
+    assert formats == {"graph.json": ("json", 6), "graph.xrgs": ("snapshot", 6)}
+    
+    from_json = manager.load_graph_file(str(tmp_path / "graph.json"))
+    assert [target for _, target, _ in from_json.query("Node 2", "next")] == ["n3"]
+    assert from_json.get_node_id("Node 4") == "n4"
+    
+    subgraph = manager.load_graph_snapshot(snapshot_path, node_ids=["n0"], depth=1)
+    assert set(subgraph.nodes) == {"n0", "n1"}
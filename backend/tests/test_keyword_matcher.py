@@ -0,0 +1,39 @@
+"""
+Tests for the shared compliance keyword matcher.
+"""
+
+import pytest
+from app.pilots.keyword_matcher import KeywordAutomaton, ComplianceKeywordMatcher, compliance_keyword_matcher
+from app.pilots.legal_compliance import legal_pilot
+
+
+def test_automaton_matches_substring_semantics():
+    """Overlapping and nested keywords should all be found."""
+    keywords = ["he", "she", "his", "hers", "irr", "tier 1", "risk-weighted assets"]
+    text = "ushers irrelevant tier 10 and risk-weighted assets"
+    
+    automaton = KeywordAutomaton(keywords)
+    
+    assert automaton.find_all(text) == {kw for kw in keywords if kw in text}
+
+
+def test_rule_violation_matches_per_keyword_scan():
+    """The shared matcher should agree with scanning each keyword separately."""
+    matcher = ComplianceKeywordMatcher()
+    rule = {"keywords": ["Data Subject", "consent", "erasure", "portability"]}
+    
+    assert matcher.check_rule_violation("We obtain CONSENT from each data subject.", rule) is False
+    assert matcher.check_rule_violation("We obtain consent.", rule) is True
+    assert matcher.rule_hits("Right to erasure and portability", rule) == ["erasure", "portability"]
+
+
+@pytest.mark.asyncio
+async def test_comprehensive_analysis_scans_text_once():
+    """Analyzing several domains over the same text should reuse one scan."""
+    compliance_keyword_matcher.clear_cache()
+    scans_before = compliance_keyword_matcher.stats["scans"]
+    text = "This agreement covers personal data, consent, protected health information and termination."
+    
+    await legal_pilot.analyze_legal_compliance(text)
+    
+    assert compliance_keyword_matcher.stats["scans"] - scans_before == 1
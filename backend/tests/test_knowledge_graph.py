@@ -0,0 +1,72 @@
+"""
+Tests for label lookups and bounded traversal in the reasoning knowledge graph.
+"""
+
+from app.services.modern_reasoning_service import KnowledgeGraph, GraphNode, GraphEdge
+
+
+def build_chain(length):
+    graph = KnowledgeGraph()
+    nodes = [GraphNode(label=f"step_{i}", node_type="concept") for i in range(length)]
+    for node in nodes:
+        graph.add_node(node)
+    for source, target in zip(nodes, nodes[1:]):
+        graph.add_edge(GraphEdge(source=source.id, target=target.id, relationship="next"))
+    return graph, nodes
+
+
+def test_query_uses_out_edges_by_relationship():
+    """Queries should return the subject's out-edges, filtered by relationship."""
+    graph = KnowledgeGraph()
+    hipaa_id = graph.get_node_id("HIPAA")
+    audit = GraphNode(label="Audit Logging", node_type="requirement")
+    graph.add_node(audit)
+    graph.add_edge(GraphEdge(source=hipaa_id, target=audit.id, relationship="recommends"))
+    
+    all_edges = graph.query("HIPAA")
+    required = graph.query("HIPAA", "requires")
+    
+    assert [target for _, target, _ in all_edges] == list(graph.graph.successors(hipaa_id))
+    assert {graph.nodes[target].label for _, target, _ in required} == {"Access Control", "Authentication"}
+    
+    graph.add_edge(GraphEdge(source=hipaa_id, target=audit.id, relationship="requires"))
+    assert graph.query("HIPAA", "recommends") == []
+    assert audit.id in [target for _, target, _ in graph.query("HIPAA", "requires")]
+    assert graph.query("Unknown Concept") == []
+
+
+def test_related_concepts_handle_deep_graphs():
+    """Traversal should be iterative, bounded by depth and able to stop early."""
+    graph, nodes = build_chain(5000)
+    
+    assert len(graph.get_related_concepts("step_0", max_depth=10000)) == 4999
+    assert graph.get_related_concepts("step_0", max_depth=2) == [nodes[1].id, nodes[2].id]
+    assert len(graph.get_related_concepts("step_0", max_depth=10000, limit=10)) == 10
+
+
+def test_find_path_respects_max_length():
+    """Paths longer than max_length nodes should not be returned."""
+    graph, nodes = build_chain(10)
+    
+    assert graph.find_path("step_0", "step_2") == [nodes[0].id, nodes[1].id, nodes[2].id]
+    assert graph.find_path("step_0", "step_3") == []
+    assert len(graph.find_path("step_0", "step_9", max_length=10)) == 10
+    assert graph.find_path("step_3", "step_0") == []
+
+
+def test_indexes_survive_json_round_trip_and_direct_writes(tmp_path):
+    """Loaded graphs should answer label lookups and paths; direct writes are fixed by rebuild_indexes."""
+    from app.services.graph_persistence import GraphPersistenceManager
+    
+    graph, nodes = build_chain(3)
+    manager = GraphPersistenceManager(str(tmp_path))
+    loaded = manager.load_graph_from_json(manager.save_graph_to_json(graph, "chain.json"))
+    assert loaded.get_node_id("step_0") == nodes[0].id
+    assert loaded.find_path("step_0", "step_2") == [node.id for node in nodes]
+    
+    extra = GraphNode(label="step_3", node_type="concept")
+    loaded.nodes[extra.id] = extra
+    loaded.graph.add_edge(nodes[2].id, extra.id, relationship="next")
+    loaded.rebuild_indexes()
+    assert loaded.get_node_id("step_3") == extra.id
+    assert [target for _, target, _ in loaded.query("step_2", "next")] == [extra.id]
@@ -0,0 +1,82 @@
+"""
+Tests for the indexed knowledge service.
+"""
+
+import json
+import itertools
+import pytest
+from app.models.reasoning import KnowledgeFact
+from app.services.knowledge_service import KnowledgeService
+
+
+def linear_query(service, subject=None, predicate=None, object=None):
+    return [
+        fact for fact in service.facts.values()
+        if not (subject and fact.subject != subject)
+        and not (predicate and fact.predicate != predicate)
+        and not (object and fact.object != object)
+    ]
+
+
+def test_indexed_queries_match_linear_scan():
+    """Every combination of bound terms should return the same facts in the same order."""
+    service = KnowledgeService()
+    service.add_facts([
+        {"subject": "current_ratio", "predicate": "formula", "object": "assets / liabilities"},
+        {"subject": "quick_ratio", "predicate": "healthy_range", "object": "1.5_to_3.0"},
+        {"subject": "current_ratio", "predicate": "related_to", "object": "quick_ratio"}
+    ])
+    
+    subjects = [None, "current_ratio", "quick_ratio", "access_control_mechanisms", "missing"]
+    predicates = [None, "formula", "healthy_range", "includes", "related_to"]
+    objects = [None, "1.5_to_3.0", "quick_ratio", "authentication", "missing"]
+    for subject, predicate, object in itertools.product(subjects, predicates, objects):
+        assert service.query_facts(subject, predicate, object) == linear_query(service, subject, predicate, object)
+
+
+def test_verify_hypothesis_dedupes_facts():
+    """Facts matched through several concepts should be checked once."""
+    service = KnowledgeService()
+    service.add_fact(KnowledgeFact(subject="roi", predicate="compared_with", object="current_ratio"))
+    
+    trace = service.verify_hypothesis("Compare the roi with the current_ratio", "Is the current_ratio healthy?")
+    
+    checked = [(r["fact"].subject, r["fact"].predicate, r["fact"].object) for r in trace.metadata["verification_results"]]
+    assert len(checked) == len(set(checked)) == trace.metadata["facts_checked"]
+    assert ("roi", "compared_with", "current_ratio") in checked
+    assert ("current_ratio", "healthy_range", "1.5_to_3.0") in checked
+
+
+def test_load_facts_from_jsonl_and_csv(tmp_path):
+    """Bulk loaders should index facts and add them to the graph."""
+    service = KnowledgeService()
+    jsonl_path = tmp_path / "facts.jsonl"
+    jsonl_path.write_text("\n".join(
+        json.dumps({"subject": f"policy_{i}", "predicate": "requires", "object": "encryption", "confidence": 0.9})
+        for i in range(50)
+    ))
+    csv_path = tmp_path / "facts.csv"
+    csv_path.write_text(
+        "subject,predicate,object,confidence,source,metadata\n"
+        "encryption,includes,aes_256,0.95,NIST,\"{\"\"section\"\": \"\"3.1\"\"}\"\n"
+        "encryption,includes,tls,,,\n"
+    )
+    
+    assert service.load_facts(jsonl_path, batch_size=20) == 50
+    assert service.load_facts(csv_path) == 2
+    
+    assert len(service.query_facts(predicate="requires", object="encryption")) == 50
+    aes = service.query_facts(subject="encryption", object="aes_256")[0]
+    assert aes.confidence == 0.95 and aes.metadata == {"section": "3.1"}
+    assert service.query_facts(subject="encryption", object="tls")[0].confidence == 1.0
+    assert service.graph.has_edge("policy_7", "encryption")
+
+
+def test_load_facts_reports_invalid_rows(tmp_path):
+    """Invalid rows should be reported with their line number."""
+    service = KnowledgeService()
+    path = tmp_path / "facts.jsonl"
+    path.write_text('{"subject": "a", "predicate": "b", "object": "c"}\n{"subject": "a"}\n')
+    
+    with pytest.raises(ValueError, match="line 2"):
+        service.load_facts(path)
@@ -0,0 +1,129 @@
+"""
+Tests for the layered LLM response cache.
+"""
+
+import asyncio
+import pytest
+from app.services.llm_cache import LLMResponseCache, SQLiteCacheTier
+from app.services.llm_service import LLMService
+
+
+class CountingService(LLMService):
+    """LLM service whose API call is replaced by a counter."""
+    
+    def __init__(self, cache):
+        super().__init__(cache=cache)
+        self.calls = 0
+    
+    async def _request_completion(self, messages, temperature, max_tokens, on_token=None):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if on_token:
+            on_token("streamed")
+        return f"answer {self.calls}", 42
+
+
+def test_key_ignores_whitespace_differences():
+    """Prompts that differ only in whitespace should share a key."""
+    first = LLMResponseCache.make_key("gpt-4o", [{"role": "user", "content": "Is  this\n   compliant?"}], 0.3, 100)
+    second = LLMResponseCache.make_key("gpt-4o", [{"role": "user", "content": "Is this compliant? "}], 0.3, 100)
+    other = LLMResponseCache.make_key("gpt-4o", [{"role": "user", "content": "Is this compliant?"}], 0.1, 100)
+    
+    assert first == second
+    assert first != other
+
+
+@pytest.mark.asyncio
+async def test_repeated_prompts_are_served_from_memory():
+    """A repeated prompt should not call the API again."""
+    service = CountingService(LLMResponseCache(max_entries=10))
+    
+    first = await service.generate("What is the current ratio?")
+    second = await service.generate("What is the current ratio?")
+    
+    assert first == second == "answer 1"
+    assert service.calls == 1
+    assert service.cache.get_stats()["memory_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_prompts_share_one_call():
+    """Identical prompts in flight at the same time should be deduplicated."""
+    service = CountingService(LLMResponseCache(max_entries=10))
+    
+    results = await asyncio.gather(*[service.generate("Same question") for _ in range(5)])
+    
+    assert results == ["answer 1"] * 5
+    assert service.calls == 1
+    assert service.cache.get_stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cached_completion_is_delivered_to_stream_callback():
+    """A cache hit should still reach streaming callers as a single chunk."""
+    service = CountingService(LLMResponseCache(max_entries=10))
+    messages = [{"role": "user", "content": "Explain HIPAA"}]
+    await service.chat_completion(messages)
+    
+    tokens = []
+    content, tokens_used = await service.chat_completion(messages, on_token=tokens.append)
+    
+    assert tokens == ["answer 1"]
+    assert tokens_used == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_lru_evicts_and_disk_tier_backfills(tmp_path):
+    """Entries evicted from memory should still be found on disk."""
+    cache = LLMResponseCache(max_entries=1, sqlite_path=str(tmp_path / "cache.db"))
+    service = CountingService(cache)
+    
+    await service.generate("first")
+    await service.generate("second")
+    assert await service.generate("first") == "answer 1"
+    
+    assert service.calls == 2
+    assert cache.get_stats()["disk_hits"] == 1
+
+
+def test_sqlite_tier_ttl_and_size_eviction(tmp_path):
+    """The disk tier should expire old entries and respect its size limit."""
+    tier = SQLiteCacheTier(str(tmp_path / "cache.db"), ttl_seconds=3600, max_entries=2)
+    for key in ["a", "b", "c"]:
+        tier.set(key, (key, 1))
+    
+    assert tier.count() == 2
+    assert tier.get("a") is None
+    assert tier.get("c") == ("c", 1)
+    
+    tier.ttl_seconds = -1
+    assert tier.get("c") is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_computation_to_waiting_follower():
+    """Cancelling the caller computing a completion should not cancel coalesced callers."""
+    cache = LLMResponseCache(max_entries=10)
+    started = asyncio.Event()
+    calls = []
+    
+    async def compute():
+        calls.append(len(calls) + 1)
+        started.set()
+        await asyncio.sleep(0.05)
+        return f"answer {len(calls)}", 1
+    
+    leader = asyncio.create_task(cache.get_or_compute("key", compute))
+    await started.wait()
+    follower = asyncio.create_task(cache.get_or_compute("key", compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    value, served = await follower
+    
+    assert value == ("answer 2", 1)
+    assert served is False
+    assert calls == [1, 2]
+    assert cache.get_stats()["in_flight"] == 0
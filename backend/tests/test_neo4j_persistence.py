@@ -0,0 +1,159 @@
+"""
+Tests for batched and incremental Neo4j persistence, using an in-memory fake driver.
+"""
+
+from app.services import graph_persistence as gp
+from app.services.modern_reasoning_service import KnowledgeGraph, GraphNode, GraphEdge
+
+
+class FakeResult:
+    def __init__(self, records=None):
+        self.records = records or []
+    
+    def __iter__(self):
+        return iter(self.records)
+    
+    def single(self):
+        return self.records[0] if self.records else None
+    
+    def consume(self):
+        return None
+
+
+class FakeDriver:
+    """Applies the manager's Cypher statements to in-memory node and edge maps."""
+    
+    def __init__(self):
+        self.nodes = {}
+        self.edges = {}
+        self.writes = []
+        self.transactions = 0
+    
+    def session(self):
+        return FakeSession(self)
+    
+    def close(self):
+        pass
+    
+    def run(self, query, params=None, **kwargs):
+        params = {**(params or {}), **kwargs}
+        graph = params.get("graph_name")
+        if query in (gp.CREATE_NODES_QUERY, gp.UPSERT_NODES_QUERY):
+            for row in params["rows"]:
+                self.nodes[(graph, row["id"])] = row
+        elif query in (gp.CREATE_EDGES_QUERY, gp.UPSERT_EDGES_QUERY):
+            for row in params["rows"]:
+                if (graph, row["source"]) in self.nodes and (graph, row["target"]) in self.nodes:
+                    self.edges[(graph, row["source"], row["target"], row["relationship"])] = row
+        elif query == gp.DELETE_EDGES_QUERY:
+            for row in params["rows"]:
+                self.edges.pop((graph, row["source"], row["target"], row["relationship"]), None)
+        elif query == gp.DELETE_NODES_QUERY:
+            self._delete_nodes(graph, params["ids"])
+        elif query == gp.DELETE_GRAPH_BATCH_QUERY:
+            ids = [node_id for g, node_id in self.nodes if g == graph][:params["limit"]]
+            self._delete_nodes(graph, ids)
+            return FakeResult([{"deleted": len(ids)}])
+        elif query == gp.NODE_HASHES_QUERY:
+            return FakeResult([{"id": row["id"], "content_hash": row["content_hash"]}
+                               for (g, _), row in self.nodes.items() if g == graph])
+        elif query == gp.EDGE_HASHES_QUERY:
+            return FakeResult([row for key, row in self.edges.items() if key[0] == graph])
+        elif "n.properties as properties" in query:
+            return FakeResult([row for (g, _), row in self.nodes.items() if g == graph])
+        elif "source.id as source_id" in query:
+            return FakeResult([{**row, "source_id": row["source"], "target_id": row["target"]}
+                               for key, row in self.edges.items() if key[0] == graph])
+        if "rows" in params or "ids" in params:
+            self.writes.append((query, len(params.get("rows", params.get("ids")))))
+        return FakeResult()
+    
+    def _delete_nodes(self, graph, ids):
+        for node_id in ids:
+            self.nodes.pop((graph, node_id), None)
+            for key in [key for key in self.edges if key[0] == graph and node_id in key[1:3]]:
+                del self.edges[key]
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        pass
+    
+    def run(self, query, params=None, **kwargs):
+        return self.driver.run(query, params, **kwargs)
+    
+    def execute_write(self, work):
+        self.driver.transactions += 1
+        return work(self)
+    
+    execute_read = execute_write
+
+
+def build_graph(count=5):
+    graph = KnowledgeGraph(initialize_domain_knowledge=False)
+    for i in range(count):
+        graph.add_node(GraphNode(f"n{i}", f"Node {i}", "concept", {"rank": i}))
+    for i in range(count - 1):
+        graph.add_edge(GraphEdge(f"n{i}", f"n{i + 1}", "next"))
+    return graph
+
+
+def test_save_writes_unwind_batches_and_loads_back():
+    """A full save should send one write per batch and round-trip properties."""
+    driver = FakeDriver()
+    manager = gp.Neo4jPersistenceManager(None, None, None, batch_size=2, driver=driver)
+    
+    assert manager.save_graph_to_neo4j(build_graph(), "kg")
+    assert driver.writes == [
+        (gp.CREATE_NODES_QUERY, 2), (gp.CREATE_NODES_QUERY, 2), (gp.CREATE_NODES_QUERY, 1),
+        (gp.CREATE_EDGES_QUERY, 2), (gp.CREATE_EDGES_QUERY, 2)
+    ]
+    
+    loaded = manager.load_graph_from_neo4j("kg")
+    assert set(loaded.nodes) == {"n0", "n1", "n2", "n3", "n4"}
+    assert loaded.nodes["n3"].properties == {"rank": 3}
+    assert loaded.get_node_id("Node 2") == "n2"
+    assert len(loaded.edges) == 4
+    
+    # Saving again replaces the graph
+    assert manager.save_graph_to_neo4j(build_graph(3), "kg")
+    assert len(driver.nodes) == 3 and len(driver.edges) == 2
+
+
+def test_incremental_sync_writes_only_changes():
+    """Sync should upsert changed rows, delete removed ones and leave the rest alone."""
+    driver = FakeDriver()
+    manager = gp.Neo4jPersistenceManager(None, None, None, batch_size=100, driver=driver)
+    graph = build_graph()
+    
+    assert manager.sync_graph_to_neo4j(graph, "kg") == {
+        "nodes_upserted": 5, "nodes_deleted": 0, "edges_upserted": 4, "edges_deleted": 0
+    }
+    assert manager.sync_graph_to_neo4j(graph, "kg") == {
+        "nodes_upserted": 0, "nodes_deleted": 0, "edges_upserted": 0, "edges_deleted": 0
+    }
+    
+    updated = build_graph()
+    updated.nodes["n1"].properties = {"rank": 10}
+    del updated.nodes["n4"]
+    del updated.edges["n3->n4:next"]
+    del updated.edges["n0->n1:next"]
+    updated.add_edge(GraphEdge("n0", "n2", "related_to", confidence=0.5))
+    driver.writes.clear()
+    
+    assert manager.sync_graph_to_neo4j(updated, "kg") == {
+        "nodes_upserted": 1, "nodes_deleted": 1, "edges_upserted": 1, "edges_deleted": 1
+    }
+    assert [query for query, _ in driver.writes] == [
+        gp.UPSERT_NODES_QUERY, gp.DELETE_EDGES_QUERY, gp.UPSERT_EDGES_QUERY, gp.DELETE_NODES_QUERY
+    ]
+    
+    loaded = manager.load_graph_from_neo4j("kg")
+    assert set(loaded.edges) == set(updated.edges)
+    assert loaded.nodes["n1"].properties == {"rank": 10}
@@ -0,0 +1,179 @@
+"""
+Tests for the concurrent reasoning pipeline in OrchestrationService.
+"""
+
+import asyncio
+import time
+import pytest
+from app.core.config import settings
+from app.models.reasoning import ReasoningRequest, ReasoningTrace, ReasoningStage
+from app.services.orchestration_service import OrchestrationService
+from app.services.knowledge_service import KnowledgeService
+
+
+class StubLLMService:
+    model = "stub-model"
+    
+    async def generate_hypothesis(self, question, context=None, domain=None, on_token=None):
+        if on_token:
+            for token in ["hypo", "thesis"]:
+                on_token(token)
+        return ReasoningTrace(stage=ReasoningStage.LLM_HYPOTHESIS, output="hypothesis", confidence=0.8)
+    
+    async def validate_answer(self, question, answer, domain=None):
+        return ReasoningTrace(stage=ReasoningStage.VALIDATION, output="valid", confidence=0.9)
+
+
+class StubRuleService:
+    def __init__(self, delay):
+        self.delay = delay
+    
+    async def apply_rules(self, hypothesis, question, domain=None):
+        await asyncio.sleep(self.delay)
+        return ReasoningTrace(stage=ReasoningStage.RULE_CHECK, output="rules ok", confidence=0.7)
+
+
+class SlowKnowledgeService(KnowledgeService):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+    
+    def verify_hypothesis(self, hypothesis, question, domain=None):
+        time.sleep(self.delay)
+        return super().verify_hypothesis(hypothesis, question, domain)
+
+
+def make_service(rule_delay=0.0, knowledge_delay=0.0):
+    service = OrchestrationService(
+        llm_service=StubLLMService(),
+        symbolic_service=StubRuleService(rule_delay),
+        knowledge_service=SlowKnowledgeService(knowledge_delay)
+    )
+    
+    async def final_answer(**kwargs):
+        return f"answer from {kwargs['symbolic_result']}"
+    
+    service._generate_final_answer = final_answer
+    return service
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_run_concurrently():
+    """Rule check and knowledge check should overlap after the hypothesis."""
+    service = make_service(rule_delay=0.3, knowledge_delay=0.3)
+    
+    start = time.perf_counter()
+    response = await service.reason(ReasoningRequest(question="Is the debt ratio healthy?"))
+    elapsed = time.perf_counter() - start
+    
+    assert elapsed < 0.55
+    assert response.answer == "answer from rules ok"
+    assert response.metadata["partial"] is False
+    assert [t.stage for t in response.reasoning_trace] == [
+        ReasoningStage.LLM_HYPOTHESIS, ReasoningStage.RULE_CHECK,
+        ReasoningStage.KNOWLEDGE_GRAPH, ReasoningStage.VALIDATION
+    ]
+    for trace in response.reasoning_trace:
+        assert trace.wall_clock_ms is not None
+        assert trace.queue_time_ms is not None
+
+
+@pytest.mark.asyncio
+async def test_stage_timeout_returns_partial_result(monkeypatch):
+    """A timed-out stage should be replaced by a fallback trace."""
+    monkeypatch.setattr(settings, "llm_stage_timeout_seconds", 0.1)
+    service = make_service(rule_delay=1.0)
+    
+    response = await service.reason(ReasoningRequest(question="Is the debt ratio healthy?"))
+    
+    assert response.metadata["partial"] is True
+    assert response.metadata["failed_stages"] == ["rule_check"]
+    assert response.metadata["stage_timings"]["rule_check"]["status"] == "timeout"
+    rule_trace = response.reasoning_trace[1]
+    assert rule_trace.confidence == 0.0
+    assert "unavailable" in rule_trace.output
+
+
+@pytest.mark.asyncio
+async def test_reason_stream_emits_traces_tokens_and_result():
+    """Streaming should yield traces as stages finish and the final response last."""
+    service = make_service()
+    
+    events = [event async for event in service.reason_stream(ReasoningRequest(question="Is the debt ratio healthy?"))]
+    
+    tokens = [e["data"]["token"] for e in events if e["event"] == "token"]
+    traces = [e["data"]["stage_name"] for e in events if e["event"] == "trace"]
+    assert tokens == ["hypo", "thesis"]
+    assert traces[0] == "hypothesis"
+    assert set(traces) == {"hypothesis", "rule_check", "knowledge_check", "validation"}
+    assert events[-1]["event"] == "result"
+    assert events[-1]["data"]["answer"] == "answer from rules ok"
+
+
+class CountingRuleService(StubRuleService):
+    def __init__(self, delay):
+        super().__init__(delay)
+        self.running = 0
+        self.max_running = 0
+        self.questions = []
+    
+    async def apply_rules(self, hypothesis, question, domain=None):
+        self.questions.append(question)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            return await super().apply_rules(hypothesis, question, domain)
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_reason_many_dedupes_bounds_concurrency_and_reports_errors(monkeypatch):
+    """Batches should share identical requests, respect the limit and isolate failures."""
+    monkeypatch.setattr(settings, "batch_max_concurrency", 2)
+    service = make_service()
+    rules = CountingRuleService(0.05)
+    service.symbolic_service = rules
+    
+    async def final_answer(**kwargs):
+        return f"answer to {kwargs['question']}"
+    
+    service._generate_final_answer = final_answer
+    questions = ["Is the ratio healthy?", "Is the policy valid?", "Is the ratio healthy?", "x" * 1001, "Is the loan compliant?"]
+    
+    items = [item async for item in service.reason_many([ReasoningRequest(question=q) for q in questions], max_concurrency=10)]
+    
+    by_index = {item.index: item for item in items}
+    assert sorted(by_index) == [0, 1, 2, 3, 4]
+    assert rules.max_running == 2
+    assert sorted(rules.questions) == sorted(set(questions) - {"x" * 1001})
+    assert by_index[2].deduplicated is True
+    assert by_index[2].response.answer == by_index[0].response.answer == "answer to Is the ratio healthy?"
+    assert by_index[3].status == "error"
+    assert "too long" in by_index[3].error
+    assert all(by_index[i].status == "success" for i in [0, 1, 2, 4])
+
+
+class FailingLLMService(StubLLMService):
+    async def generate_hypothesis(self, question, context=None, domain=None, on_token=None):
+        if "fail" in question:
+            raise RuntimeError("model unavailable")
+        return await super().generate_hypothesis(question, context, domain, on_token)
+
+
+@pytest.mark.asyncio
+async def test_reason_many_reports_failed_reasoning_as_error():
+    """A request whose reasoning failed should not be reported as a success."""
+    service = make_service()
+    service.llm_service = FailingLLMService()
+    
+    items = [item async for item in service.reason_many([
+        ReasoningRequest(question="Is the ratio healthy?"),
+        ReasoningRequest(question="Should this fail?")
+    ])]
+    
+    by_index = {item.index: item for item in items}
+    assert by_index[0].status == "success"
+    assert by_index[1].status == "error"
+    assert by_index[1].response is None
+    assert "model unavailable" in by_index[1].error
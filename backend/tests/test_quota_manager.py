@@ -0,0 +1,122 @@
+"""
+Tests for store-backed quota enforcement and rate limiting.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from app.billing.quota_manager import (
+    QuotaManager, QuotaLimit, QuotaPeriod, QuotaType, QuotaViolationLevel, _period_bounds
+)
+from app.billing.quota_store import MemoryQuotaStore, SQLiteQuotaStore
+
+
+def reserve_concurrently(managers, tenant_id, attempts_per_thread=200, threads_per_manager=4):
+    granted = []
+    lock = threading.Lock()
+    
+    def worker(manager):
+        count = sum(manager.reserve(tenant_id, QuotaType.API_CALLS) for _ in range(attempts_per_thread))
+        with lock:
+            granted.append(count)
+    
+    threads = [
+        threading.Thread(target=worker, args=(manager,))
+        for manager in managers for _ in range(threads_per_manager)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(granted)
+
+
+def test_reserve_never_exceeds_hard_limit():
+    """Concurrent reservations should stop exactly at the hard limit."""
+    manager = QuotaManager(MemoryQuotaStore(shards=4))
+    manager.set_quota("tenant", QuotaType.API_CALLS, 500)
+    
+    assert reserve_concurrently([manager], "tenant") == 500
+    assert manager.check_usage("tenant", QuotaType.API_CALLS) is False
+    assert manager.get_usage_summary("tenant")["quotas"]["api_calls"]["current_usage"] == 500
+
+
+def test_sqlite_store_shares_limit_between_workers(tmp_path):
+    """Managers with separate connections to one database should enforce one limit."""
+    path = str(tmp_path / "quotas.db")
+    managers = [QuotaManager(SQLiteQuotaStore(path)) for _ in range(3)]
+    for manager in managers:
+        manager.set_quota("tenant", QuotaType.API_CALLS, 300)
+    
+    assert reserve_concurrently(managers, "tenant", attempts_per_thread=50, threads_per_manager=3) == 300
+    assert managers[0].check_usage("tenant", QuotaType.API_CALLS) is False
+
+
+def test_violations_are_recorded_when_level_escalates():
+    """Repeated usage above a threshold should record one violation per level."""
+    manager = QuotaManager()
+    manager.set_quota("tenant", QuotaType.LLM_TOKENS, 100, hard_limit=120)
+    
+    results = [manager.update_usage("tenant", QuotaType.LLM_TOKENS, 10) for _ in range(15)]
+    
+    assert results == [True] * 12 + [False] * 3
+    levels = [v.violation_level for v in manager.get_active_violations("tenant")]
+    assert levels == [QuotaViolationLevel.WARNING, QuotaViolationLevel.SOFT_LIMIT, QuotaViolationLevel.HARD_LIMIT]
+    
+    manager._reset_quota(manager.get_quota("tenant", QuotaType.LLM_TOKENS))
+    assert manager.check_usage("tenant", QuotaType.LLM_TOKENS, 100) is True
+
+
+def test_rate_limits_use_token_bucket_and_sliding_window():
+    """Bursts should be capped by the bucket and totals by the sliding window."""
+    manager = QuotaManager()
+    manager.set_rate_limit("bursty", requests_per_second=0.001, burst=5)
+    manager.set_rate_limit("windowed", requests_per_second=1000, burst=1000, window_limit=3, window_seconds=3600)
+    
+    assert [manager.allow_request("bursty") for _ in range(7)] == [True] * 5 + [False] * 2
+    assert [manager.allow_request("windowed") for _ in range(5)] == [True] * 3 + [False] * 2
+    assert manager.allow_request("unlimited") is True
+
+
+def test_sqlite_buckets_survive_a_clock_reset(tmp_path):
+    """State written before a reboot (a later timestamp) should not drain buckets or lock windows."""
+    store = SQLiteQuotaStore(str(tmp_path / "quotas.db"))
+    assert store.take_tokens("bucket", 1, capacity=5, refill_rate=1.0) is True
+    assert store.reserve_window("window", 1, limit=3, window_seconds=60) is True
+    store._conn.execute("UPDATE quota_buckets SET updated = updated + 86400")
+    
+    assert [store.take_tokens("bucket", 1, capacity=5, refill_rate=1.0) for _ in range(5)] == [True] * 4 + [False]
+    assert [store.reserve_window("window", 1, limit=3, window_seconds=60) for _ in range(3)] == [True, True, False]
+
+
+def test_quota_created_mid_period_keeps_its_full_period():
+    """Periods should run from the quota's start, not from epoch-aligned blocks."""
+    manager = QuotaManager(MemoryQuotaStore())
+    weekly = manager.set_quota("tenant", QuotaType.API_CALLS, 10, period=QuotaPeriod.WEEKLY)
+    daily = manager.set_quota("tenant", QuotaType.LLM_TOKENS, 10, period=QuotaPeriod.DAILY)
+    
+    assert weekly.reset_date - weekly.period_start == timedelta(weeks=1)
+    assert daily.reset_date - daily.period_start == timedelta(days=1)
+    
+    anchor = datetime(2026, 1, 31, 12)
+    assert _period_bounds(QuotaPeriod.MONTHLY, anchor, datetime(2026, 2, 15)) == \
+        (anchor, datetime(2026, 2, 28, 12))
+    assert _period_bounds(QuotaPeriod.MONTHLY, anchor, datetime(2026, 3, 1)) == \
+        (datetime(2026, 2, 28, 12), datetime(2026, 3, 31, 12))
+    assert _period_bounds(QuotaPeriod.YEARLY, anchor, datetime(2027, 1, 31, 11)) == \
+        (anchor, datetime(2027, 1, 31, 12))
+
+
+def test_restored_quota_keeps_period_start_and_usage(tmp_path):
+    """A quota restored into an empty store should keep its anchor and current usage."""
+    original = QuotaManager(MemoryQuotaStore())
+    original.set_quota("tenant", QuotaType.API_CALLS, 10)
+    original.update_usage("tenant", QuotaType.API_CALLS, 4)
+    saved = original.get_quota("tenant", QuotaType.API_CALLS).to_dict()
+    
+    restored = QuotaManager(SQLiteQuotaStore(str(tmp_path / "quotas.db")))
+    quota = restored.add_quota(QuotaLimit.from_dict(saved))
+    
+    assert quota.period_start.isoformat() == saved["period_start"]
+    assert quota.current_usage == 4
+    assert restored.check_usage("tenant", QuotaType.API_CALLS, 6) is True
+    assert restored.check_usage("tenant", QuotaType.API_CALLS, 7) is False
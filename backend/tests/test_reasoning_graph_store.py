@@ -0,0 +1,106 @@
+"""
+Tests for the bounded reasoning graph store.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from app.models.reasoning_graph import ReasoningGraph, NodeType, EdgeType
+from app.services.reasoning_graph_service import ReasoningGraphService
+from app.services.reasoning_graph_store import (
+    ReasoningGraphStore, SQLGraphBackend, FileGraphBackend, MemoryGraphBackend
+)
+
+
+def make_backend(kind, tmp_path):
+    if kind == "sql":
+        return SQLGraphBackend(f"sqlite:///{tmp_path / 'graphs.db'}")
+    if kind == "filesystem":
+        return FileGraphBackend(str(tmp_path / "graphs"))
+    return MemoryGraphBackend()
+
+
+@pytest.mark.parametrize("kind", ["sql", "filesystem", "memory"])
+def test_graphs_are_written_through_with_a_bounded_cache(tmp_path, kind):
+    """Every change reaches the backend at once; only max_graphs stay in memory."""
+    backend = make_backend(kind, tmp_path)
+    store = ReasoningGraphStore(backend, max_graphs=2)
+    service = ReasoningGraphService(store)
+    
+    graph_ids = [service.create_graph(f"session-{i % 2}").id for i in range(5)]
+    assert len(store._hot) == 2
+    assert store.stats["evictions"] == 3
+    
+    first_id = graph_ids[0]
+    input_node = service.add_input_node(first_id, "What applies?", {"domain": "legal"})
+    hypothesis = service.add_llm_hypothesis_node(first_id, "Rule A applies", 0.8)
+    service.add_edge(first_id, input_node.id, hypothesis.id, EdgeType.GENERATES, "generates")
+    
+    # Nothing is held back in memory: the backend alone has the changes
+    stored = backend.get(first_id)
+    assert [node.type for node in stored.nodes] == [NodeType.INPUT, NodeType.LLM_HYPOTHESIS]
+    assert stored.nodes[0].content["context"] == {"domain": "legal"}
+    assert stored.edges[0].target == hypothesis.id
+    assert all(backend.get(graph_id) is not None for graph_id in graph_ids)
+
+
+@pytest.mark.parametrize("kind", ["sql", "filesystem"])
+def test_list_graphs_filters_and_paginates(tmp_path, kind):
+    """Listing should filter by session and tenant and page newest first."""
+    store = ReasoningGraphStore(make_backend(kind, tmp_path), max_graphs=3)
+    start = datetime(2026, 1, 1)
+    for i in range(7):
+        store.put(ReasoningGraph(
+            id=f"g{i}", session_id=f"s{i % 2}", metadata={"tenant_id": "acme" if i < 4 else "other"},
+            created_at=start + timedelta(minutes=i)
+        ))
+    
+    page, total = store.list_graphs(offset=2, limit=3)
+    assert total == 7 and [g.id for g in page] == ["g4", "g3", "g2"]
+    
+    page, total = store.list_graphs(session_id="s0", tenant_id="acme")
+    assert total == 2 and [g.id for g in page] == ["g2", "g0"]
+    
+    page, total = store.list_graphs(created_after=start + timedelta(minutes=5))
+    assert [g.id for g in page] == ["g6", "g5"]
+    assert [g.id for g in store.iter_graphs(page_size=2, tenant_id="other")] == ["g6", "g5", "g4"]
+
+
+def test_workers_share_graphs_and_see_each_others_changes(tmp_path):
+    """Stores (workers) on one database should see new, changed and deleted graphs immediately."""
+    url = f"sqlite:///{tmp_path / 'graphs.db'}"
+    first = ReasoningGraphService(ReasoningGraphStore(SQLGraphBackend(url)))
+    second = ReasoningGraphService(ReasoningGraphStore(SQLGraphBackend(url)))
+    
+    graph = first.create_graph("session")
+    first.add_input_node(graph.id, "q")
+    assert len(second.get_graph(graph.id).nodes) == 1
+    
+    # The second worker's cached copy is replaced once the first one changes the graph
+    first.add_llm_hypothesis_node(graph.id, "h", 0.5)
+    assert len(second.get_graph(graph.id).nodes) == 2
+    assert second.graphs.stats["stale"] == 1
+    
+    assert second.delete_graph(graph.id)
+    assert first.get_graph(graph.id) is None
+    assert not first.delete_graph(graph.id)
+
+
+def test_batch_writes_each_graph_once(tmp_path):
+    """Changes made inside batch() should be written once when it exits, and dropped on error."""
+    store = ReasoningGraphStore(SQLGraphBackend(f"sqlite:///{tmp_path / 'graphs.db'}"))
+    service = ReasoningGraphService(store)
+    
+    with store.batch():
+        graph = service.create_graph("session")
+        for i in range(5):
+            service.add_input_node(graph.id, f"q{i}")
+        assert store.backend.get(graph.id) is None
+    assert store.stats["writes"] == 1
+    assert len(store.backend.get(graph.id).nodes) == 5
+    
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            service.add_input_node(graph.id, "lost")
+            raise RuntimeError("failed halfway")
+    assert store.stats["writes"] == 1
+    assert len(service.get_graph(graph.id).nodes) == 5
@@ -0,0 +1,93 @@
+"""
+Tests for compiled ruleset execution.
+"""
+
+import pytest
+from app.services.ruleset_service import RulesetService
+
+
+RULESET = {
+    "id": "compiled_test",
+    "name": "Compiled Test Rules",
+    "description": "Rules used to exercise the compiled execution plan",
+    "domain": "finance",
+    "version": "1.0.0",
+    "rules": [
+        {
+            "id": "ratio_keywords",
+            "name": "Ratio Keywords",
+            "description": "Mentions financial ratios",
+            "type": "keyword",
+            "content": "Debt, Equity, liquidity",
+            "weight": 2.0,
+            "conditions": [{"field": "domain", "operator": "contains", "value": "FIN"}]
+        },
+        {
+            "id": "percentages",
+            "name": "Percentages",
+            "description": "Finds percentages",
+            "type": "regex",
+            "content": r"\d+(\.\d+)?%"
+        },
+        {
+            "id": "python_check",
+            "name": "Python Check",
+            "description": "Checks hypothesis length",
+            "type": "python",
+            "content": "result = {'passed': 'Equity' in hypothesis, 'confidence': 0.9, 'output': {}}"
+        },
+        {
+            "id": "broken_python",
+            "name": "Broken Python",
+            "description": "Does not compile",
+            "type": "python",
+            "content": "result = ("
+        }
+    ]
+}
+
+
+@pytest.mark.asyncio
+async def test_execution_uses_cached_plan():
+    """Repeated executions should reuse one compiled plan."""
+    service = RulesetService()
+    ruleset = service.load_ruleset_from_dict(RULESET)
+    
+    first = await service.execute_ruleset("compiled_test", "What is the debt ratio?", "Equity is 40%", {"domain": "finance"})
+    plan = service.compile_ruleset(ruleset)
+    second = await service.execute_ruleset("compiled_test", "What is the debt ratio?", "Equity is 40%", {"domain": "finance"})
+    
+    assert service._plans[("compiled_test", "1.0.0")] is plan
+    assert first.total_rules == second.total_rules == 4
+    results = {r.rule_id: r for r in second.rule_results}
+    assert results["ratio_keywords"].output["found_keywords"] == ["debt", "equity"]
+    assert results["percentages"].output["count"] == 1
+    assert results["python_check"].passed is True
+    assert results["broken_python"].passed is False
+    assert "error" in results["broken_python"].output
+
+
+@pytest.mark.asyncio
+async def test_conditions_filter_rules():
+    """Rules whose conditions are not met should be skipped."""
+    service = RulesetService()
+    service.load_ruleset_from_dict(RULESET)
+    
+    result = await service.execute_ruleset("compiled_test", "question", "hypothesis text", {"domain": "legal"})
+    
+    assert "ratio_keywords" not in {r.rule_id for r in result.rule_results}
+    assert result.total_rules == 3
+
+
+def test_reloading_ruleset_invalidates_plan():
+    """Re-registering a ruleset should drop its compiled plan."""
+    service = RulesetService()
+    ruleset = service.load_ruleset_from_dict(RULESET)
+    service.compile_ruleset(ruleset)
+    
+    service.load_ruleset_from_dict(RULESET)
+    assert ("compiled_test", "1.0.0") not in service._plans
+    
+    service.compile_ruleset(service.get_ruleset("compiled_test"))
+    assert service.remove_ruleset("compiled_test") is True
+    assert ("compiled_test", "1.0.0") not in service._plans
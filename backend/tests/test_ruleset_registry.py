@@ -0,0 +1,81 @@
+"""
+Tests for memoized ruleset verification.
+"""
+
+import asyncio
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from app.services.ruleset_registry import RulesetRegistry, RulesetSource
+
+HIPAA_ID = "healthcare_hipaa_compliance_rules_1.0.0"
+
+
+@pytest.fixture
+def registry():
+    return RulesetRegistry()
+
+
+def register_partner_ruleset(registry, rules):
+    return registry.register_ruleset(
+        name="Claims Rules", version="1.0.0", rules=rules, author="partner", organization="Partner",
+        domain="healthcare", compliance_frameworks=["hipaa"], source=RulesetSource.PARTNER
+    )
+
+
+def test_repeated_fetches_verify_once(registry):
+    """Only the first verified fetch should run the signature check."""
+    for _ in range(5):
+        assert registry.get_ruleset(HIPAA_ID) is not None
+    assert registry.verification_stats["misses"] == 1
+    assert registry.verification_stats["hits"] == 4
+    
+    assert registry.verify_ruleset(HIPAA_ID, use_cache=False) == (True, [])
+    assert registry.verification_stats["misses"] == 2
+    
+    registry.verification_ttl_seconds = 0
+    registry.verify_ruleset(HIPAA_ID, use_cache=False)
+    registry.verify_ruleset(HIPAA_ID)
+    assert registry.verification_stats["misses"] == 4
+
+
+def test_reregistration_and_key_change_invalidate(registry):
+    """New content or a new signer key should be verified again."""
+    ruleset_id = register_partner_ruleset(registry, {"rules": [{"id": "r1"}]})
+    assert registry.verify_ruleset(ruleset_id) == (True, [])
+    
+    register_partner_ruleset(registry, {"rules": [{"id": "r2"}]})
+    misses = registry.verification_stats["misses"]
+    assert registry.verify_ruleset(ruleset_id) == (True, [])
+    assert registry.verification_stats["misses"] == misses + 1
+    
+    new_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    registry.set_signer_key("xreason_registry", new_key.public_key())
+    is_valid, errors = registry.verify_ruleset(ruleset_id)
+    assert not is_valid and errors == ["Invalid digital signature"]
+    assert registry.get_ruleset(ruleset_id) is None
+
+
+def test_sweep_detects_in_memory_tampering(registry):
+    """The sweep should re-verify in full and refresh memoized results."""
+    assert registry.get_ruleset(HIPAA_ID) is not None
+    registry.registry[HIPAA_ID].rules["rules"] = []
+    assert registry.verify_ruleset(HIPAA_ID)[0]
+    
+    result = registry.sweep_verifications()
+    assert result == {"verified": 3, "invalid": [HIPAA_ID]}
+    assert registry.get_ruleset(HIPAA_ID) is None
+    assert "Integrity hash mismatch - ruleset may be tampered" in registry.verify_ruleset(HIPAA_ID)[1]
+
+
+@pytest.mark.asyncio
+async def test_background_sweep(registry):
+    """The background sweep should run every interval until stopped."""
+    await registry.start_verification_sweep(0.01)
+    for _ in range(200):
+        if registry.verification_stats["sweeps"] >= 2:
+            break
+        await asyncio.sleep(0.01)
+    await registry.stop_verification_sweep()
+    
+    assert registry.verification_stats["sweeps"] >= 2
+    assert registry._sweep_task is None
@@ -0,0 +1,44 @@
+"""
+Tests for the app-scoped service container.
+"""
+
+import pytest
+from app.services.service_container import ServiceContainer
+
+
+def test_services_are_built_once():
+    """The container should hand out the same instances on every call."""
+    container = ServiceContainer()
+    first = container.get_orchestration_service()
+    second = container.get_orchestration_service()
+    
+    assert first is second
+    assert first.llm_service is container.llm_service
+    assert first.knowledge_service is container.get_knowledge_service()
+    assert first.symbolic_service is container.modern_reasoning_service
+
+
+def test_startup_timings_are_reported():
+    """Startup cost should be recorded for each component."""
+    container = ServiceContainer()
+    container.start()
+    
+    status = container.get_status()
+    assert status["started"] is True
+    for name in ["llm_service", "symbolic_service", "knowledge_service",
+                 "modern_reasoning_service", "orchestration_service", "total"]:
+        assert status["startup_timings_ms"][name] >= 0
+
+
+@pytest.mark.asyncio
+async def test_shutdown_closes_client():
+    """Shutdown should close the pooled client and reset the container."""
+    container = ServiceContainer()
+    container.start()
+    client = container.llm_service.client
+    
+    await container.shutdown()
+    
+    assert client.is_closed()
+    assert container.started is False
+    assert container.orchestration_service is None
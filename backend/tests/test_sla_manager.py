@@ -0,0 +1,65 @@
+"""
+Tests for sketch-based SLA measurement windows.
+"""
+
+import random
+import statistics
+import pytest
+from datetime import datetime, timezone, timedelta
+from app.reliability.metric_sketch import QuantileSketch, RollingSketch
+from app.reliability.sla_manager import SLAManager, SLAType, ServiceTier
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    """Quantile estimates should stay within the sketch's relative accuracy."""
+    rng = random.Random(3)
+    values = [rng.lognormvariate(5, 1) for _ in range(20000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    
+    ordered = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= exact * 0.011
+    assert sketch.mean == pytest.approx(statistics.mean(values))
+    
+    halves = QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        halves[i % 2].add(value)
+    halves[0].merge(halves[1])
+    assert halves[0].quantile(0.95) == sketch.quantile(0.95)
+
+
+def test_rolling_sketch_expires_old_slots():
+    """Samples should leave the window once their slot is older than the window."""
+    rolling = RollingSketch(window_seconds=60, slots=6)
+    for second in range(60):
+        rolling.add(1000.0 if second < 30 else 10.0, timestamp=second, now=second)
+    
+    count, mean, _ = rolling.snapshot(now=59)
+    assert count == 60 and mean == pytest.approx(505.0)
+    
+    count, _, window = rolling.snapshot(now=100)
+    assert count == 20
+    assert window.quantile(0.99) == pytest.approx(10.0, rel=0.01)
+    assert rolling.add(5.0, timestamp=10, now=100) is False
+
+
+@pytest.mark.asyncio
+async def test_sla_metrics_use_window_percentiles():
+    """Response time SLAs should report the windowed p95 and sample count."""
+    manager = SLAManager()
+    now = datetime.now(timezone.utc)
+    for i in range(200):
+        await manager.record_metric(SLAType.RESPONSE_TIME, ServiceTier.ENTERPRISE, float(i + 1), now)
+    await manager.record_metric(SLAType.RESPONSE_TIME, ServiceTier.ENTERPRISE, 9999.0, now - timedelta(hours=2))
+    
+    metrics = manager.current_metrics["response_time_enterprise"]
+    assert metrics.sample_count == 200
+    assert metrics.current_value == pytest.approx(190.0, rel=0.02)
+    
+    percentiles = manager.get_percentiles(SLAType.RESPONSE_TIME, ServiceTier.ENTERPRISE)
+    assert percentiles["p50"] == pytest.approx(100.0, rel=0.02)
+    report = manager.get_sla_report(ServiceTier.ENTERPRISE, now - timedelta(days=1), now)
+    assert report["current_percentiles"]["response_time"]["p99"] == pytest.approx(198.0, rel=0.02)
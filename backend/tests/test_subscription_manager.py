@@ -0,0 +1,59 @@
+"""
+Tests for subscription lookup and the per-period usage ledger.
+"""
+
+import pytest
+from decimal import Decimal
+from app.billing.subscription_manager import (
+    SubscriptionManager, SubscriptionTier, SubscriptionStatus, UsageType
+)
+
+
+def test_active_subscription_index_follows_status_changes():
+    """The customer index should track creation order and status changes."""
+    manager = SubscriptionManager()
+    first = manager.create_subscription("customer-a", "Org A", SubscriptionTier.STARTER)
+    second = manager.create_subscription("customer-a", "Org A", SubscriptionTier.ENTERPRISE, start_trial=False)
+    
+    assert manager.get_customer_subscription("customer-a").subscription_id == first
+    
+    manager.update_subscription_status(first, SubscriptionStatus.CANCELED)
+    assert manager.get_customer_subscription("customer-a").subscription_id == second
+    
+    manager.update_subscription_status(second, SubscriptionStatus.SUSPENDED)
+    assert manager.get_customer_subscription("customer-a") is None
+    with pytest.raises(ValueError):
+        manager.record_usage("customer-a", UsageType.API_CALLS, Decimal("1"))
+    
+    manager.update_subscription_status(first, SubscriptionStatus.ACTIVE)
+    assert manager.get_customer_subscription("customer-a").subscription_id == first
+
+
+def test_bill_and_dashboard_use_ledger_totals():
+    """Bills should be computed from running totals with the same results as summing records."""
+    manager = SubscriptionManager(recent_usage_records=5)
+    subscription_id = manager.create_subscription("customer-b", "Org B", SubscriptionTier.STARTER, start_trial=False)
+    subscription = manager.get_subscription(subscription_id)
+    included = subscription.tier_limits.api_calls_per_month
+    unit_price = subscription.usage_based_pricing["api_call_overage"]
+    
+    for _ in range(10):
+        manager.record_usage("customer-b", UsageType.API_CALLS, Decimal(included) / 8)
+    manager.record_usage("customer-b", UsageType.DATA_STORAGE, Decimal("0.5"))
+    
+    totals = manager.get_period_usage(subscription_id)[UsageType.API_CALLS.value]
+    assert totals.records == 10
+    assert totals.quantity == Decimal(included) / 8 * 10
+    
+    bill = manager.calculate_monthly_bill(subscription_id)
+    api_calls = bill["charges"]["overage_charges"]["api_calls"]
+    assert api_calls["used"] == int(totals.quantity)
+    assert api_calls["cost"] == float(totals.quantity * unit_price)
+    assert "data_storage" not in bill["charges"]["overage_charges"]
+    
+    dashboard = manager.get_subscription_dashboard()
+    assert len(manager.usage_records) == 5
+    assert dashboard["usage_metrics"]["total_usage_records"] == 11
+    assert dashboard["usage_metrics"]["total_usage_revenue_this_month"] == float(
+        totals.cost + Decimal("0.5") * subscription.usage_based_pricing["storage_overage_per_gb"]
+    )
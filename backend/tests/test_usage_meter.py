@@ -0,0 +1,101 @@
+"""
+Tests for the time-bucketed usage meter.
+"""
+
+import random
+from datetime import datetime, timedelta
+from app.billing.usage_meter import (
+    UsageMeter, UsageMetric, UsageMetricType, ReasoningUnit, ReasoningUnitType
+)
+
+
+NOW = datetime(2026, 3, 15, 12, 30, 0)
+
+
+def record_events(meter, count=3000, seed=7):
+    rng = random.Random(seed)
+    events = []
+    for _ in range(count):
+        timestamp = NOW - timedelta(seconds=rng.randint(0, 20 * 86400))
+        user_id = rng.choice(["alice", "bob", None])
+        metric_type = rng.choice([UsageMetricType.API_CALLS, UsageMetricType.LLM_TOKENS])
+        value = float(rng.randint(1, 100))
+        meter.record_metric(UsageMetric(
+            tenant_id="tenant-1", user_id=user_id, metric_type=metric_type, value=value, timestamp=timestamp
+        ))
+        events.append((timestamp, user_id, metric_type, value))
+    return events
+
+
+def expected_totals(events, start, end, user_id=None):
+    totals = {}
+    for timestamp, event_user, metric_type, value in events:
+        if start <= timestamp <= end and (user_id is None or event_user == user_id):
+            total, count = totals.get(metric_type, (0.0, 0))
+            totals[metric_type] = (total + value, count + 1)
+    return totals
+
+
+def test_minute_aligned_ranges_match_event_scan():
+    """Queries aligned to minutes should match a scan over the raw events."""
+    meter = UsageMeter(minute_retention_hours=24 * 30)
+    events = record_events(meter)
+    
+    ranges = [
+        (NOW - timedelta(days=30), NOW),
+        (NOW - timedelta(days=3, hours=5, minutes=17), NOW - timedelta(hours=2, minutes=3, seconds=1)),
+        (datetime(2026, 3, 1), datetime(2026, 3, 8) - timedelta(microseconds=1)),
+    ]
+    for start, end in ranges:
+        for user_id in [None, "alice"]:
+            expected = expected_totals(events, start, end, user_id)
+            if user_id is None:
+                usage = meter.get_tenant_usage("tenant-1", start, end)
+            else:
+                usage = meter.get_user_usage("tenant-1", user_id, start, end)
+            for metric_type in [UsageMetricType.API_CALLS, UsageMetricType.LLM_TOKENS]:
+                total, count = expected.get(metric_type, (0.0, 0))
+                assert usage[f"{metric_type.value}_total"] == total
+                assert usage[f"{metric_type.value}_count"] == count
+
+
+def test_expired_minute_buckets_fall_back_to_hours():
+    """Once minute buckets expire, range edges should resolve to whole hours."""
+    meter = UsageMeter(minute_retention_hours=1)
+    meter.record_metric(UsageMetric(tenant_id="t", metric_type=UsageMetricType.API_CALLS, value=1.0,
+                                    timestamp=NOW - timedelta(days=2, minutes=50)))
+    meter.record_metric(UsageMetric(tenant_id="t", metric_type=UsageMetricType.API_CALLS, value=1.0,
+                                    timestamp=NOW))
+    
+    store = meter.stores["t"]
+    assert len(store.buckets[60]) == 1
+    
+    usage = meter.get_tenant_usage("t", NOW - timedelta(days=2, minutes=45), NOW)
+    assert usage["api_calls_count"] == 2
+    usage = meter.get_tenant_usage("t", NOW - timedelta(days=2) + timedelta(hours=1), NOW)
+    assert usage["api_calls_count"] == 1
+
+
+def test_reasoning_units_and_retention_drop_whole_buckets():
+    """Reasoning unit keys should be kept and clear_old_data should drop old buckets."""
+    meter = UsageMeter()
+    now = datetime.utcnow()
+    meter.record_reasoning_unit("t", ReasoningUnit(type=ReasoningUnitType.LEGAL_REVIEW, complexity=2.0,
+                                                   timestamp=now - timedelta(days=100)))
+    meter.record_reasoning_unit("t", ReasoningUnit(type=ReasoningUnitType.LEGAL_REVIEW, complexity=3.0,
+                                                   timestamp=now - timedelta(minutes=5)), user_id="alice")
+    
+    usage = meter.get_tenant_usage("t")
+    assert usage["legal_review_units"] == 3.0 and usage["legal_review_count"] == 1
+    assert usage["basic_reasoning_count"] == 0
+    assert usage["reasoning_units_total"] == 3.0
+    assert meter.get_user_usage("t", "alice")["reasoning_units_count"] == 1
+    assert meter.get_tenant_usage("t", now - timedelta(days=120), now)["legal_review_units"] == 5.0
+    
+    meter.clear_old_data(days_to_keep=90)
+    assert meter.get_tenant_usage("t", now - timedelta(days=120), now)["legal_review_units"] == 3.0
+    assert len(meter.stores["t"].buckets[86400]) == 1
+    
+    export = meter.export_usage_data("t")
+    assert [row["series"] for row in export["reasoning_units"]] == ["legal_review"]
+    assert export["metrics"][0]["user_id"] == "alice"
@@ -0,0 +1,122 @@
+"""
+Tests for the write-behind usage event pipeline.
+"""
+
+import json
+import asyncio
+import pytest
+from decimal import Decimal
+from sqlalchemy import create_engine, text
+from app.billing.usage_pipeline import UsageEventPipeline
+from app.billing.usage_meter import usage_meter, UsageMetricType, ReasoningUnitType
+from app.billing.quota_manager import quota_manager, QuotaType
+from app.billing.subscription_manager import subscription_manager, UsageType
+
+
+@pytest.mark.asyncio
+async def test_events_are_coalesced_and_persisted_on_shutdown(tmp_path):
+    """Queued events should be applied once per tenant and key and bulk inserted."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'usage.db'}")
+    pipeline = UsageEventPipeline(flush_interval=60.0, batch_size=10000, engine=engine)
+    quota_manager.set_quota("pipeline-tenant", QuotaType.API_CALLS, 5000)
+    
+    await pipeline.start()
+    for i in range(1000):
+        pipeline.record_api_call("pipeline-tenant", user_id=f"user-{i % 2}")
+        pipeline.update_quota("pipeline-tenant", QuotaType.API_CALLS, 1.0)
+    pipeline.record_reasoning_unit("pipeline-tenant", ReasoningUnitType.LEGAL_REVIEW, 2.5)
+    assert usage_meter.get_tenant_usage("pipeline-tenant") == {}
+    await pipeline.stop()
+    
+    usage = usage_meter.get_tenant_usage("pipeline-tenant")
+    assert usage["api_calls_total"] == 1000.0 and usage["api_calls_count"] == 1000
+    assert usage["legal_review_units"] == 2.5
+    assert usage_meter.get_user_usage("pipeline-tenant", "user-1")["api_calls_count"] == 500
+    assert quota_manager.get_quota("pipeline-tenant", QuotaType.API_CALLS).current_usage == 1000.0
+    assert pipeline.stats["flushed_events"] == 2001 and pipeline.stats["flush_errors"] == 0
+    
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT kind, SUM(event_count), COUNT(*) FROM usage_events GROUP BY kind ORDER BY kind")).all()
+    counts = {kind: (events, stored) for kind, events, stored in rows}
+    assert counts["metric"][0] == 1000 and counts["metric"][1] <= 4
+    assert counts["quota"][0] == 1000 and counts["quota"][1] <= 2
+    assert counts["reasoning_unit"] == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_events_inline():
+    """A saturated queue should push work back onto the caller rather than drop events."""
+    pipeline = UsageEventPipeline(flush_interval=60.0, max_queue_size=5, persist=False)
+    
+    await pipeline.start()
+    for _ in range(20):
+        pipeline.record_metric("backpressure-tenant", UsageMetricType.LLM_TOKENS, 10.0)
+    assert pipeline.stats["inline_events"] == 15
+    await pipeline.stop()
+    
+    usage = usage_meter.get_tenant_usage("backpressure-tenant")
+    assert usage["llm_tokens_total"] == 200.0 and usage["llm_tokens_count"] == 20
+
+
+def test_subscription_usage_keeps_returned_id_when_not_running():
+    """Without a running batcher, events are applied immediately under the returned ID."""
+    pipeline = UsageEventPipeline(persist=False)
+    
+    usage_id = pipeline.record_subscription_usage(
+        "customer_demo_001", UsageType.API_CALLS, Decimal("3"), metadata={"endpoint": "/reason"}
+    )
+    
+    record = subscription_manager.usage_records[-1]
+    assert record.usage_id == usage_id
+    assert record.quantity == Decimal("3")
+    assert record.metadata == {"endpoint": "/reason"}
+
+
+@pytest.mark.asyncio
+async def test_each_subscription_event_is_stored_under_its_returned_id():
+    """Subscription usage submitted together should not be merged under one ID."""
+    pipeline = UsageEventPipeline(flush_interval=60.0, persist=False)
+    
+    await pipeline.start()
+    usage_ids = [
+        pipeline.record_subscription_usage("customer_demo_001", UsageType.API_CALLS, Decimal("2"))
+        for _ in range(3)
+    ]
+    await pipeline.stop()
+    
+    records = {record.usage_id: record for record in subscription_manager.usage_records}
+    assert all(records[usage_id].quantity == Decimal("2") for usage_id in usage_ids)
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_are_retried_and_failed_usage_is_dead_lettered(tmp_path):
+    """Rows that fail to insert should be written later; usage that cannot be applied should not vanish."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'usage.db'}")
+    dead_letter_path = tmp_path / "dead_letters.jsonl"
+    pipeline = UsageEventPipeline(flush_interval=0.01, engine=engine, max_attempts=2,
+                                  dead_letter_path=str(dead_letter_path))
+    await pipeline.start()
+    
+    write_rows = pipeline._write_rows
+    failures = []
+    
+    def flaky_write(rows):
+        if not failures:
+            failures.append(len(rows))
+            raise RuntimeError("database is locked")
+        write_rows(rows)
+    
+    pipeline._write_rows = flaky_write
+    pipeline.record_metric("retry-tenant", UsageMetricType.API_CALLS, 1.0)
+    pipeline.record_subscription_usage("no-such-customer", UsageType.API_CALLS, Decimal("1"))
+    await asyncio.sleep(0.2)
+    await pipeline.stop()
+    
+    assert failures == [1] and pipeline.stats["flush_errors"] == 1
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM usage_events WHERE tenant_id = 'retry-tenant'")).scalar() == 1
+    
+    assert [entry["stage"] for entry in pipeline.dead_letters] == ["apply"]
+    assert pipeline.dead_letters[0]["group"]["tenant_id"] == "no-such-customer"
+    assert pipeline.dead_letters[0]["group"]["attempts"] == 2
+    assert json.loads(dead_letter_path.read_text().splitlines()[0])["stage"] == "apply"
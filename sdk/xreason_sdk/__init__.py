@@ -4,7 +4,7 @@ XReason SDK - Python client for XReason Reasoning as a Service
 
 from .client import XReasonClient
 from .models import (
-    ReasoningRequest, ReasoningResponse, ReasoningTrace,
+    ReasoningRequest, ReasoningResponse, ReasoningTrace, ReasoningStreamEvent, BatchReasoningItem,
     LegalAnalysisRequest, LegalAnalysisResponse,
     ScientificAnalysisRequest, ScientificAnalysisResponse,
     PilotSummaryResponse
@@ -20,6 +20,8 @@ __all__ = [
     "ReasoningRequest",
     "ReasoningResponse", 
     "ReasoningTrace",
+    "ReasoningStreamEvent",
+    "BatchReasoningItem",
     "LegalAnalysisRequest",
     "LegalAnalysisResponse",
     "ScientificAnalysisRequest",
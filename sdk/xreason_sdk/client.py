@@ -2,13 +2,14 @@
 XReason SDK Client
 """
 
+import json
 import httpx
 import asyncio
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator
 from urllib.parse import urljoin
 
 from .models import (
-    CybersecurityAnalysisRequest, CybersecurityAnalysisResponse, FinanceAnalysisRequest, FinanceAnalysisResponse, HealthcareAnalysisRequest, HealthcareAnalysisResponse, ManufacturingAnalysisRequest, ManufacturingAnalysisResponse, ReasoningRequest, ReasoningResponse,
+    CybersecurityAnalysisRequest, CybersecurityAnalysisResponse, FinanceAnalysisRequest, FinanceAnalysisResponse, HealthcareAnalysisRequest, HealthcareAnalysisResponse, ManufacturingAnalysisRequest, ManufacturingAnalysisResponse, ReasoningRequest, ReasoningResponse, ReasoningStreamEvent, BatchReasoningItem,
     LegalAnalysisRequest, LegalAnalysisResponse,
     ScientificAnalysisRequest, ScientificAnalysisResponse,
     PilotSummaryResponse
@@ -136,6 +137,104 @@ class XReasonClient:
         
         return ReasoningResponse(**response_data)
     
+    async def reason_stream(
+        self,
+        question: str,
+        context: Optional[str] = None,
+        domain: Optional[str] = None,
+        ruleset_id: Optional[str] = None
+    ) -> AsyncIterator[ReasoningStreamEvent]:
+        """
+        Perform reasoning on a question, yielding events as the pipeline progresses.
+        
+        Args:
+            question: The question to reason about
+            context: Additional context for reasoning
+            domain: Domain for reasoning (e.g., 'healthcare', 'finance')
+            ruleset_id: Specific ruleset to use
+            
+        Yields:
+            ReasoningStreamEvent for each trace, token and the final result
+        """
+        request_data = ReasoningRequest(
+            question=question,
+            context=context,
+            domain=domain,
+            ruleset_id=ruleset_id
+        ).dict(exclude_none=True)
+        
+        async for event in self._stream_events("/api/v1/reason/stream", request_data):
+            yield event
+    
+    async def reason_many(
+        self,
+        requests: List[Union[str, ReasoningRequest, Dict[str, Any]]],
+        max_concurrency: Optional[int] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[BatchReasoningItem]:
+        """
+        Perform reasoning on many questions, yielding results as they complete.
+        
+        Requests are sent in batches of ``batch_size``; the server reasons about
+        each batch with bounded concurrency and deduplicates identical requests.
+        Results arrive in completion order, so use ``index`` to match them to
+        the submitted requests. A failed request yields an item with an error
+        instead of raising.
+        
+        Args:
+            requests: Questions, ReasoningRequest objects or request dictionaries
+            max_concurrency: Maximum requests the server processes at once
+            batch_size: Number of requests sent per API call
+            
+        Yields:
+            BatchReasoningItem for every request
+        """
+        reasoning_requests = [
+            ReasoningRequest(question=request) if isinstance(request, str)
+            else request if isinstance(request, ReasoningRequest)
+            else ReasoningRequest(**request)
+            for request in requests
+        ]
+        
+        for offset in range(0, len(reasoning_requests), batch_size):
+            batch = reasoning_requests[offset:offset + batch_size]
+            request_data: Dict[str, Any] = {"requests": [r.dict(exclude_none=True) for r in batch]}
+            if max_concurrency:
+                request_data["max_concurrency"] = max_concurrency
+            
+            async for event in self._stream_events("/api/v1/reason/batch", request_data):
+                if event.event == "item":
+                    item = BatchReasoningItem(**event.data)
+                    item.index += offset
+                    yield item
+                elif event.event == "error":
+                    raise XReasonAPIError(f"Batch request failed: {event.data.get('error')}")
+    
+    async def _stream_events(self, endpoint: str, data: Dict[str, Any]) -> AsyncIterator[ReasoningStreamEvent]:
+        """Post a request and parse the Server-Sent Events response."""
+        await self._ensure_client()
+        
+        url = urljoin(self.base_url, endpoint)
+        
+        try:
+            async with self._client.stream("POST", url, json=data) as response:
+                if response.status_code >= 400:
+                    body = await response.aread()
+                    raise XReasonAPIError(f"API request failed: {body.decode()}", response.status_code)
+                
+                event_type = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        event_type = line[len("event:"):].strip()
+                    elif line.startswith("data:") and event_type:
+                        yield ReasoningStreamEvent(
+                            event=event_type,
+                            data=json.loads(line[len("data:"):].strip())
+                        )
+                        event_type = None
+        except httpx.RequestError as e:
+            raise XReasonAPIError(f"Request failed: {str(e)}")
+    
     # Legal Compliance API
     async def analyze_gdpr_compliance(
         self,
@@ -13,6 +13,8 @@ class ReasoningTrace(BaseModel):
     output: str = Field(..., description="Output from this stage")
     confidence: Optional[float] = Field(None, description="Confidence score for this stage")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
+    wall_clock_ms: Optional[float] = Field(None, description="Time spent executing this stage")
+    queue_time_ms: Optional[float] = Field(None, description="Time this stage waited before starting")
 
 
 class ReasoningRequest(BaseModel):
@@ -28,10 +30,25 @@ class ReasoningResponse(BaseModel):
     answer: str = Field(..., description="The reasoned answer")
     confidence: float = Field(..., description="Overall confidence score")
     reasoning_trace: List[ReasoningTrace] = Field(..., description="Step-by-step reasoning trace")
-    session_id: str = Field(..., description="Session identifier")
+    session_id: Optional[str] = Field(None, description="Session identifier")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
 
 
+class ReasoningStreamEvent(BaseModel):
+    """Event emitted by the streaming reasoning API."""
+    event: str = Field(..., description="Event type: trace, token, stage, result or error")
+    data: Dict[str, Any] = Field(..., description="Event payload")
+
+
+class BatchReasoningItem(BaseModel):
+    """Result for a single request of a batch reasoning call."""
+    index: int = Field(..., description="Position of the request in the submitted list")
+    status: str = Field(..., description="'success' or 'error'")
+    response: Optional[ReasoningResponse] = Field(None, description="Reasoning response when successful")
+    error: Optional[str] = Field(None, description="Error message when the request failed")
+    deduplicated: bool = Field(False, description="Whether the result was shared with an identical request")
+
+
 # Legal Analysis Models
 class LegalAnalysisRequest(BaseModel):
     """Request model for legal analysis."""